@@ -48,8 +48,13 @@ if driver.config.model_dump().get('enable_console'):
     driver.register_adapter(ConsoleAdapter)
 
 # 加载插件
-nonebot.load_plugins('src/service')
-nonebot.load_plugins('src/plugins')
+if driver.config.model_dump().get('omega_startup_profile'):
+    # 启用启动性能分析, 逐个加载插件并输出各插件导入耗时及内存占用
+    from src.utils.import_utils import load_plugins_with_profile
+    load_plugins_with_profile('src/service', 'src/plugins')
+else:
+    nonebot.load_plugins('src/service')
+    nonebot.load_plugins('src/plugins')
 
 # Modify some config / config depends on loaded configs
 # config = nonebot.get_driver().config
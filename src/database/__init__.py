@@ -13,6 +13,7 @@ from .internal import *
 
 __all__ = [
     'ArtworkCollectionDAL',
+    'ArtworkImageHashDAL',
     'AuthSettingDAL',
     'BotSelfDAL',
     'CoolDownDAL',
@@ -20,10 +21,13 @@ __all__ = [
     'FriendshipDAL',
     'GlobalCacheDAL',
     'HistoryDAL',
+    'HistoryTermFrequencyDAL',
     'PluginDAL',
     'SignInDAL',
+    'SignInSummaryDAL',
     'SocialMediaContentDAL',
     'StatisticDAL',
+    'StatisticRollupDAL',
     'SubscriptionDAL',
     'SubscriptionSourceDAL',
     'SystemSettingDAL',
@@ -42,6 +42,7 @@ class DatabaseConnector(BaseModel):
     """数据库链接对象"""
     url: str
     connect_args: dict[str, Any]
+    pragmas: dict[str, str | int] = {}  # 每个连接建立时执行的 PRAGMA 设置 (仅 SQLite)
 
 
 class DatabaseType(BaseModel):
@@ -54,6 +55,11 @@ class DatabaseType(BaseModel):
     def connector(self) -> DatabaseConnector:
         raise NotImplementedError
 
+    @property
+    def read_connector(self) -> DatabaseConnector | None:
+        """只读连接, 为空则读写共用 connector 创建的连接"""
+        return None
+
     @property
     def table_args(self) -> dict[str, Any] | None:
         return None
@@ -114,15 +120,101 @@ class SQLiteDatabaseConfig(DatabaseType):
     db_driver: SQLiteDriver
     db_name: str
     db_prefix: str
+    # 高并发模式: 启用 WAL 日志模式及连接 PRAGMA 调优, 读写分离为独立连接池, 写连接池仅有单个连接以串行化写事务
+    db_sqlite_performance_mode: bool = False
+    db_sqlite_synchronous: Literal['OFF', 'NORMAL', 'FULL'] = 'NORMAL'  # WAL 模式下 NORMAL 仅在断电时可能丢失最近的事务
+    db_sqlite_cache_size: int = -65536  # 每个连接的页缓存大小, 负数单位为 KiB
+    db_sqlite_mmap_size: int = 268435456  # 内存映射 I/O 大小, 单位为字节
+    db_sqlite_busy_timeout: int = 5000  # 等待其他进程释放数据库锁的时间, 单位为毫秒
+    db_sqlite_read_pool_size: int = 5  # 只读连接池大小
+    # 写事务排队等待写连接的超时时间, 单位为秒; 在持有写连接的任务或其子任务中嵌套开启写事务将直接抛出异常而非等待超时
+    db_sqlite_write_queue_timeout: float = 60
 
     @property
-    def connector(self) -> DatabaseConnector:
+    def _url(self) -> str:
         database_path = pathlib.Path(os.path.abspath(sys.path[0])).joinpath(f'{self.db_name}.db').resolve()
+        return f'{self.database}+{self.db_driver.value}:///{database_path}'
+
+    @property
+    def _pragmas(self) -> dict[str, str | int]:
+        return {
+            'journal_mode': 'WAL',
+            'synchronous': self.db_sqlite_synchronous,
+            'cache_size': self.db_sqlite_cache_size,
+            'mmap_size': self.db_sqlite_mmap_size,
+            'busy_timeout': self.db_sqlite_busy_timeout,
+            'temp_store': 'MEMORY',
+        }
+
+    @property
+    def connector(self) -> DatabaseConnector:
+        if not self.db_sqlite_performance_mode:
+            return DatabaseConnector(url=self._url, connect_args={})
+
         return DatabaseConnector(
-            url=f'{self.database}+{self.db_driver.value}:///{database_path}',
-            connect_args={}
+            url=self._url,
+            connect_args={
+                'pool_size': 1,
+                'max_overflow': 0,
+                'pool_timeout': self.db_sqlite_write_queue_timeout,
+                'connect_args': {'timeout': self.db_sqlite_busy_timeout / 1000},
+            },
+            pragmas=self._pragmas,
         )
 
+    @property
+    def read_connector(self) -> DatabaseConnector | None:
+        if not self.db_sqlite_performance_mode:
+            return None
+
+        return DatabaseConnector(
+            url=self._url,
+            connect_args={
+                'pool_size': self.db_sqlite_read_pool_size,
+                'max_overflow': self.db_sqlite_read_pool_size,
+                'connect_args': {'timeout': self.db_sqlite_busy_timeout / 1000},
+            },
+            pragmas={**self._pragmas, 'query_only': 'ON'},
+        )
+
+
+class DatabaseProfilerConfig(BaseModel):
+    """数据库查询性能分析配置"""
+    # 启用查询性能统计
+    db_profiler_enable: bool = False
+    # 每类查询保留用于计算耗时分位数的样本数量
+    db_profiler_sample_size: int = 1024
+    # 慢查询日志阈值(秒), 为空则不记录慢查询
+    db_slow_query_threshold: float | None = None
+
+    model_config = ConfigDict(extra='ignore')
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.db_profiler_enable or self.db_slow_query_threshold is not None
+
+
+class DatabaseHistoryArchiveConfig(BaseModel):
+    """消息历史记录归档配置"""
+    # 消息历史记录在数据库中保留的天数, 超出的记录将被移动至本地压缩归档文件, 为 0 则永久保留在数据库中
+    db_history_retention_days: int = 0
+    # 归档文件保存路径, 相对路径以项目根目录为基准
+    db_history_archive_folder: str = 'history_archive'
+    # 每批归档的记录数量
+    db_history_archive_batch_size: int = 5000
+    # 每次执行最多归档的批次数量
+    db_history_archive_max_batches: int = 20
+
+    model_config = ConfigDict(extra='ignore')
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.db_history_retention_days > 0
+
+    @property
+    def archive_path(self) -> pathlib.Path:
+        return pathlib.Path(os.path.abspath(sys.path[0])).joinpath(self.db_history_archive_folder).resolve()
+
 
 try:
     database_type = get_plugin_config(DatabaseType)  # 导入并验证数据库类型
@@ -135,6 +227,8 @@ try:
             database_config = get_plugin_config(SQLiteDatabaseConfig)
         case _:
             raise ValueError(f'illegal database type: {database_type.database}')
+    database_profiler_config = get_plugin_config(DatabaseProfilerConfig)
+    database_history_archive_config = get_plugin_config(DatabaseHistoryArchiveConfig)
 except (ValidationError, ValueError) as e:
     logger.opt(colors=True).critical(f'<r>数据库配置格式验证失败</r>, 错误信息:\n{e}')
     sys.exit(f'数据库配置格式验证失败, {e}')
@@ -142,4 +236,6 @@ except (ValidationError, ValueError) as e:
 
 __all__ = [
     'database_config',
+    'database_history_archive_config',
+    'database_profiler_config',
 ]
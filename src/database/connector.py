@@ -8,33 +8,123 @@
 @Software       : PyCharm
 """
 
+import weakref
+from contextvars import ContextVar
+from typing import Any
+
 from nonebot.log import logger
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
-from .config import database_config
+from .config import DatabaseConnector, database_config, database_profiler_config
+from .profiler import query_profiler
 
 engine: AsyncEngine
+"""读写连接, 未配置读写分离时同时用于读取"""
+read_engine: AsyncEngine
+"""只读连接, 未配置读写分离时与 engine 相同"""
 async_session_factory: async_sessionmaker[AsyncSession]
 
 
+_WRITE_SESSION: ContextVar['weakref.ref[ReadWriteSplitSession] | None'] = ContextVar(
+    'omega_database_write_session', default=None
+)
+"""当前任务(及其创建的子任务)中占用写连接的 Session"""
+
+
+class ReadWriteSplitSession(Session):
+    """读写分离 Session
+
+    仅 SELECT 语句使用只读连接, 其余语句及 flush 使用写连接;
+    事务内一旦使用了写连接, 后续读取也使用写连接, 以保证能读取到本事务尚未提交的数据
+
+    写连接池仅有单个连接, 占用写连接的事务未结束前, 在同一任务或其子任务中开启另一个写事务将一直等待自身释放写连接,
+    此时直接抛出异常而非等待写连接排队超时
+    """
+
+    def __init__(self, *args: Any, write_bind: Engine, read_bind: Engine, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._write_bind = write_bind
+        self._read_bind = read_bind
+        self._use_write_bind = False
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kwargs: Any) -> Engine:
+        if not self._use_write_bind and not self._flushing and clause is not None and clause.is_select:
+            return self._read_bind
+        if not self._use_write_bind:
+            self._check_nested_write_session()
+            _WRITE_SESSION.set(weakref.ref(self))
+        self._use_write_bind = True
+        return self._write_bind
+
+    def _check_nested_write_session(self) -> None:
+        holder_ref = _WRITE_SESSION.get()
+        holder = holder_ref() if holder_ref is not None else None
+        if holder is not None and holder is not self and holder._use_write_bind:
+            raise InvalidRequestError(
+                'Nested write session: the current task or its parent task already holds the only SQLite write '
+                'connection in an uncommitted transaction, opening another write transaction would wait for itself. '
+                'Commit the outer session first or perform the writes within the same session'
+            )
+
+
+@event.listens_for(ReadWriteSplitSession, 'after_transaction_end')
+def _reset_session_write_bind(session: ReadWriteSplitSession, transaction: Any) -> None:
+    if transaction.parent is None:
+        session._use_write_bind = False
+
+
+def _create_engine(connector: DatabaseConnector) -> AsyncEngine:
+    """按连接配置创建数据库引擎, 并在每个连接建立时执行 PRAGMA 设置"""
+    new_engine = create_async_engine(
+        connector.url,
+        future=True,  # 使用 2.0 API，向后兼容
+        pool_pre_ping=True, pool_recycle=3600, echo=False,  # 连接池配置
+        **connector.connect_args  # 数据库连接参数
+    )
+
+    if connector.pragmas:
+        @event.listens_for(new_engine.sync_engine, 'connect')
+        def _set_connection_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            for key, value in connector.pragmas.items():
+                cursor.execute(f'PRAGMA {key}={value}')
+            cursor.close()
+
+    return new_engine
+
+
 def _init_database() -> None:
     """创建数据库连接并初始化数据库"""
-    global engine, async_session_factory
+    global engine, read_engine, async_session_factory
 
     try:
         # 创建数据库连接
-        engine = create_async_engine(
-            database_config.connector.url,
-            future=True,  # 使用 2.0 API，向后兼容
-            pool_pre_ping=True, pool_recycle=3600, echo=False,  # 连接池配置
-            **database_config.connector.connect_args  # 数据库连接参数
-        )
+        engine = _create_engine(database_config.connector)
+        read_connector = database_config.read_connector
+        read_engine = _create_engine(read_connector) if read_connector is not None else engine
         logger.opt(colors=True).info(f'<lc>Database</lc> | 已配置 <lg>{database_config.database}</lg> 数据库连接')
 
+        # 按需启用查询性能统计及慢查询日志
+        if database_profiler_config.is_enabled:
+            query_profiler.attach(engine)
+            if read_engine is not engine:
+                query_profiler.attach(read_engine)
+            logger.opt(colors=True).info('<lc>Database</lc> | 已启用数据库查询性能统计')
+
         # expire_on_commit=False will prevent attributes from being expired after commit.
-        async_session_factory = async_sessionmaker(
-            engine, class_=AsyncSession, autoflush=True, expire_on_commit=False
-        )
+        if read_engine is engine:
+            async_session_factory = async_sessionmaker(
+                engine, class_=AsyncSession, autoflush=True, expire_on_commit=False
+            )
+        else:
+            async_session_factory = async_sessionmaker(
+                class_=AsyncSession, sync_session_class=ReadWriteSplitSession, autoflush=True, expire_on_commit=False,
+                write_bind=engine.sync_engine, read_bind=read_engine.sync_engine,
+            )
+            logger.opt(colors=True).info('<lc>Database</lc> | 已启用读写分离, 写事务将排队使用单个写连接')
     except Exception as e:
         import sys
         logger.opt(colors=True).critical(f'<r>创建数据库连接失败</r>, 错误信息: {e}')
@@ -48,4 +138,5 @@ _init_database()
 __all__ = [
     'async_session_factory',
     'engine',
+    'read_engine',
 ]
@@ -17,7 +17,7 @@ from nonebot import get_driver, logger
 from nonebot.matcher import current_event, current_matcher
 from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session
 
-from .connector import async_session_factory, engine
+from .connector import async_session_factory, engine, read_engine
 from .schema_base import OmegaDeclarativeBase
 
 
@@ -47,6 +47,8 @@ async def __database_dispose():
     """断开数据库链接 (for AsyncEngine created in function scope, close and clean-up pooled connections)"""
 
     await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
     logger.opt(colors=True).info('<lc>Database</lc> | <ly>已断开数据库连接</ly>')
 
 
@@ -0,0 +1,149 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/17 20:41:09
+@FileName       : history_archive.py
+@Project        : omega-miya
+@Description    : 消息历史记录冷数据归档
+
+归档文件按 机器人ID/事件实体ID/月份 存放, 每次归档追加一个独立的 gzip 压缩 msgpack 数据块,
+同名 .idx 索引文件追加记录 (message_id, user_entity_id) 到数据块偏移量及长度的映射, 读取时仅需解压对应数据块
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import gzip
+import os
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import msgpack
+
+from .config import database_history_archive_config
+
+type _IndexKey = tuple[str, str]
+"""索引键: message_id, user_entity_id"""
+type _IndexLocation = tuple[int, int]
+"""数据块位置: 偏移量, 长度"""
+
+_UNSAFE_PATH_CHARS_PATTERN = re.compile(r'[^\w.-]')
+_DATA_FILE_SUFFIX: str = '.msgpack.gz'
+_INDEX_FILE_SUFFIX: str = '.idx'
+
+
+def _safe_path_name(value: str) -> str:
+    return _UNSAFE_PATH_CHARS_PATTERN.sub('_', value) or '_'
+
+
+def _dump_record(record: dict[str, Any]) -> dict[str, Any]:
+    return {k: v.isoformat() if isinstance(v, datetime) else v for k, v in record.items()}
+
+
+class HistoryArchive:
+    """消息历史记录归档文件读写"""
+
+    def __init__(self, root: Path, *, index_cache_size: int = 16):
+        self.root = root
+        self.index_cache_size = index_cache_size
+        self._index_cache: OrderedDict[Path, tuple[tuple[int, int], dict[_IndexKey, _IndexLocation]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(root={self.root.as_posix()!r})'
+
+    def _get_entity_folder(self, bot_self_id: str, event_entity_id: str) -> Path:
+        return self.root.joinpath(_safe_path_name(bot_self_id), _safe_path_name(event_entity_id))
+
+    @staticmethod
+    def _append(file: Path, content: bytes) -> int:
+        """追加写入并落盘, 返回写入位置的偏移量"""
+        with file.open('ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        return offset
+
+    def write(self, records: Sequence[dict[str, Any]]) -> int:
+        """按实体及月份分组追加写入归档文件, 返回写入的记录数量
+
+        需先写入数据块再写入索引, 若写入后删除数据库记录前中断, 重复归档的记录在读取时以最后写入的为准
+        """
+        groups: dict[tuple[str, str, str], list[dict[str, Any]]] = defaultdict(list)
+        for record in records:
+            month = datetime.fromtimestamp(record['received_time']).strftime('%Y-%m')
+            groups[(record['bot_self_id'], record['event_entity_id'], month)].append(_dump_record(record))
+
+        with self._lock:
+            for (bot_self_id, event_entity_id, month), group_records in groups.items():
+                folder = self._get_entity_folder(bot_self_id=bot_self_id, event_entity_id=event_entity_id)
+                folder.mkdir(parents=True, exist_ok=True)
+
+                chunk = gzip.compress(msgpack.packb(group_records), compresslevel=6)
+                offset = self._append(folder.joinpath(f'{month}{_DATA_FILE_SUFFIX}'), chunk)
+                index = [[x['message_id'], x['user_entity_id'], offset, len(chunk)] for x in group_records]
+                self._append(folder.joinpath(f'{month}{_INDEX_FILE_SUFFIX}'), msgpack.packb(index))
+        return len(records)
+
+    def _load_index(self, index_file: Path) -> dict[_IndexKey, _IndexLocation]:
+        """读取索引文件, 按文件大小及修改时间缓存最近使用的索引"""
+        stat = index_file.stat()
+        version = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if (cached := self._index_cache.get(index_file)) is not None and cached[0] == version:
+                self._index_cache.move_to_end(index_file)
+                return cached[1]
+
+        index: dict[_IndexKey, _IndexLocation] = {}
+        with index_file.open('rb') as f:
+            for entries in msgpack.Unpacker(f, use_list=False):
+                index.update(((x[0], x[1]), (x[2], x[3])) for x in entries)
+
+        with self._lock:
+            self._index_cache[index_file] = (version, index)
+            self._index_cache.move_to_end(index_file)
+            while len(self._index_cache) > self.index_cache_size:
+                self._index_cache.popitem(last=False)
+        return index
+
+    def query_unique(
+            self,
+            message_id: str,
+            bot_self_id: str,
+            event_entity_id: str,
+            user_entity_id: str,
+    ) -> dict[str, Any] | None:
+        """从归档文件中查询消息记录, 由近到远依次查找各月份索引"""
+        folder = self._get_entity_folder(bot_self_id=bot_self_id, event_entity_id=event_entity_id)
+        if not folder.is_dir():
+            return None
+
+        for index_file in sorted(folder.glob(f'*{_INDEX_FILE_SUFFIX}'), reverse=True):
+            location = self._load_index(index_file).get((message_id, user_entity_id))
+            if location is None:
+                continue
+
+            offset, length = location
+            data_file = index_file.with_name(index_file.name.removesuffix(_INDEX_FILE_SUFFIX) + _DATA_FILE_SUFFIX)
+            with data_file.open('rb') as f:
+                f.seek(offset)
+                chunk = f.read(length)
+
+            for record in reversed(msgpack.unpackb(gzip.decompress(chunk))):
+                if record['message_id'] == message_id and record['user_entity_id'] == user_entity_id:
+                    return record
+        return None
+
+
+history_archive: HistoryArchive = HistoryArchive(root=database_history_archive_config.archive_path)
+"""全局消息历史记录归档"""
+
+
+__all__ = [
+    'HistoryArchive',
+    'history_archive',
+]
@@ -9,6 +9,7 @@
 """
 
 from .artwork_collection import ArtworkCollectionDAL
+from .artwork_image_hash import ArtworkImageHashDAL
 from .auth_setting import AuthSettingDAL
 from .bot import BotSelfDAL
 from .cooldown import CoolDownDAL
@@ -16,10 +17,13 @@ from .entity import EntityDAL
 from .friendship import FriendshipDAL
 from .global_cache import GlobalCacheDAL
 from .history import HistoryDAL
+from .history_term_frequency import HistoryTermFrequencyDAL
 from .plugin import PluginDAL
 from .sign_in import SignInDAL
+from .sign_in_summary import SignInSummaryDAL
 from .social_media_content import SocialMediaContentDAL
 from .statistic import StatisticDAL
+from .statistic_rollup import StatisticRollupDAL
 from .subscription import SubscriptionDAL
 from .subscription_source import SubscriptionSourceDAL
 from .system_setting import SystemSettingDAL
@@ -27,6 +31,7 @@ from .word_bank import WordBankDAL
 
 __all__ = [
     'ArtworkCollectionDAL',
+    'ArtworkImageHashDAL',
     'AuthSettingDAL',
     'BotSelfDAL',
     'CoolDownDAL',
@@ -34,10 +39,13 @@ __all__ = [
     'FriendshipDAL',
     'GlobalCacheDAL',
     'HistoryDAL',
+    'HistoryTermFrequencyDAL',
     'PluginDAL',
     'SignInDAL',
+    'SignInSummaryDAL',
     'SocialMediaContentDAL',
     'StatisticDAL',
+    'StatisticRollupDAL',
     'SubscriptionDAL',
     'SubscriptionSourceDAL',
     'SystemSettingDAL',
@@ -12,11 +12,11 @@ from collections.abc import Sequence
 from datetime import datetime
 from typing import Literal
 
-from sqlalchemy import and_, delete, desc, func, or_, select, update
+from sqlalchemy import Select, and_, delete, desc, func, or_, select, update
 
 from src.compat import parse_obj_as
 from ..model import BaseDataAccessLayerModel, BaseDataQueryResultModel
-from ..schema import ArtworkCollectionOrm
+from ..schema import ArtworkCollectionOrm, ArtworkImageHashOrm
 
 
 class ArtworkCollection(BaseDataQueryResultModel):
@@ -87,6 +87,8 @@ class ArtworkCollectionDAL(BaseDataAccessLayerModel[ArtworkCollectionOrm, Artwor
             acc_mode: bool = False,
             ratio: int | None = None,
             order_mode: Literal['random', 'latest', 'aid', 'aid_desc'] = 'random',
+            unique_only: bool = False,
+            unique_oversampling: int = 3,
     ) -> list[ArtworkCollection]:
         """按条件搜索图库收录作品
 
@@ -100,6 +102,8 @@ class ArtworkCollectionDAL(BaseDataAccessLayerModel[ArtworkCollectionOrm, Artwor
         :param acc_mode: 是否启用精确搜索模式
         :param ratio: 图片长宽, 1: 横图, -1: 纵图, 0: 正方形图
         :param order_mode: 排序模式
+        :param unique_only: 是否仅返回不重复的作品, 近似重复分组相同的作品仅保留排序最靠前的一个
+        :param unique_oversampling: 仅返回不重复的作品时, 按该倍数多查询作品后再去重
         """
         if classification_min > classification_max:
             raise ValueError('param: classification_min must be less than classification_max')
@@ -168,6 +172,9 @@ class ArtworkCollectionDAL(BaseDataAccessLayerModel[ArtworkCollectionOrm, Artwor
             case 'random' | _:
                 stmt = stmt.order_by(func.random())
 
+        if unique_only:
+            return await self._query_unique_by_stmt(stmt=stmt, num=num, oversampling=unique_oversampling)
+
         # 结果数量限制
         if num is None:
             pass
@@ -177,6 +184,31 @@ class ArtworkCollectionDAL(BaseDataAccessLayerModel[ArtworkCollectionOrm, Artwor
         session_result = await self.db_session.execute(stmt)
         return parse_obj_as(list[ArtworkCollection], session_result.scalars().all())
 
+    async def _query_unique_by_stmt(self, stmt: Select, num: int | None, oversampling: int) -> list[ArtworkCollection]:
+        """内部方法, 关联作品近似重复分组, 过采样查询后按分组去重, 未计算哈希的作品视为不重复"""
+        stmt = stmt.add_columns(ArtworkImageHashOrm.group_key).outerjoin(
+            ArtworkImageHashOrm,
+            and_(ArtworkImageHashOrm.origin == ArtworkCollectionOrm.origin,
+                 ArtworkImageHashOrm.aid == ArtworkCollectionOrm.aid)
+        )
+        if num is not None:
+            stmt = stmt.limit(num * max(oversampling, 1))
+
+        session_result = await self.db_session.execute(stmt)
+
+        seen_group_keys: set[str] = set()
+        unique_artworks = []
+        for artwork, group_key in session_result.all():
+            group_key = f'{artwork.origin}:{artwork.aid}' if group_key is None else group_key
+            if group_key in seen_group_keys:
+                continue
+            seen_group_keys.add(group_key)
+            unique_artworks.append(artwork)
+            if num is not None and len(unique_artworks) >= num:
+                break
+
+        return parse_obj_as(list[ArtworkCollection], unique_artworks)
+
     async def query_classification_statistic(
             self,
             origin: str | None = None,
@@ -0,0 +1,159 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/9 15:06:21
+@FileName       : artwork_image_hash.py
+@Project        : omega-miya
+@Description    : ArtworkImageHash DAL
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from collections.abc import Sequence
+from datetime import datetime
+
+from pydantic import field_validator
+from sqlalchemy import delete, func, or_, select, update
+
+from src.compat import parse_obj_as
+from ..model import BaseDataAccessLayerModel, BaseDataQueryResultModel
+from ..schema import ArtworkImageHashOrm
+
+_HASH_MASK: int = (1 << 64) - 1
+"""64 位哈希值掩码"""
+_SEGMENT_MASK: int = (1 << 16) - 1
+"""16 位哈希分段掩码"""
+
+
+def _to_signed(value: int) -> int:
+    """将 64 位无符号哈希值转换为有符号整数以便存入 BigInteger 字段"""
+    value &= _HASH_MASK
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def split_hash_segments(value: int) -> tuple[int, int, int, int]:
+    """将 64 位哈希值按低位到高位拆分为 4 个 16 位分段"""
+    value &= _HASH_MASK
+    return (
+        value & _SEGMENT_MASK,
+        (value >> 16) & _SEGMENT_MASK,
+        (value >> 32) & _SEGMENT_MASK,
+        (value >> 48) & _SEGMENT_MASK,
+    )
+
+
+class ArtworkImageHash(BaseDataQueryResultModel):
+    """图库作品图片感知哈希 Model, 哈希值为 64 位无符号整数"""
+    origin: str
+    aid: str
+    dhash: int
+    phash: int
+    group_key: str
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+    @field_validator('dhash', 'phash', mode='after')
+    @classmethod
+    def _to_unsigned(cls, value: int) -> int:
+        return value & _HASH_MASK
+
+    @property
+    def artwork_key(self) -> str:
+        return f'{self.origin}:{self.aid}'
+
+
+class ArtworkImageHashDAL(BaseDataAccessLayerModel[ArtworkImageHashOrm, ArtworkImageHash]):
+    """图库作品图片感知哈希 数据库操作对象"""
+
+    async def query_unique(self, origin: str, aid: str) -> ArtworkImageHash:
+        stmt = (select(ArtworkImageHashOrm)
+                .where(ArtworkImageHashOrm.origin == origin)
+                .where(ArtworkImageHashOrm.aid == aid))
+        session_result = await self.db_session.execute(stmt)
+        return ArtworkImageHash.model_validate(session_result.scalar_one())
+
+    async def query_candidates(self, dhash: int) -> list[ArtworkImageHash]:
+        """多索引哈希查询, 返回与给定 dHash 至少有一个 16 位分段完全相同的全部记录
+
+        汉明距离不超过 3 的近似哈希必然至少有一个分段完全相同, 调用方需再按汉明距离筛选
+        """
+        seg0, seg1, seg2, seg3 = split_hash_segments(dhash)
+        stmt = select(ArtworkImageHashOrm).where(or_(
+            ArtworkImageHashOrm.dhash_seg0 == seg0,
+            ArtworkImageHashOrm.dhash_seg1 == seg1,
+            ArtworkImageHashOrm.dhash_seg2 == seg2,
+            ArtworkImageHashOrm.dhash_seg3 == seg3,
+        ))
+        session_result = await self.db_session.execute(stmt)
+        return parse_obj_as(list[ArtworkImageHash], session_result.scalars().all())
+
+    async def query_duplicate_groups(self, origin: str | None = None) -> dict[str, list[ArtworkImageHash]]:
+        """查询包含多个作品的近似重复分组
+
+        :param origin: 仅返回包含该来源作品的分组, 为空则返回全部
+        """
+        group_stmt = (select(ArtworkImageHashOrm.group_key)
+                      .group_by(ArtworkImageHashOrm.group_key)
+                      .having(func.count(ArtworkImageHashOrm.aid) > 1))
+        if origin is not None:
+            group_stmt = group_stmt.where(ArtworkImageHashOrm.group_key.in_(
+                select(ArtworkImageHashOrm.group_key).where(ArtworkImageHashOrm.origin == origin)
+            ))
+
+        stmt = (select(ArtworkImageHashOrm)
+                .where(ArtworkImageHashOrm.group_key.in_(group_stmt))
+                .order_by(ArtworkImageHashOrm.group_key, ArtworkImageHashOrm.created_at))
+        session_result = await self.db_session.execute(stmt)
+
+        result: dict[str, list[ArtworkImageHash]] = {}
+        for item in parse_obj_as(list[ArtworkImageHash], session_result.scalars().all()):
+            result.setdefault(item.group_key, []).append(item)
+        return result
+
+    async def query_all(self) -> list[ArtworkImageHash]:
+        stmt = select(ArtworkImageHashOrm).order_by(ArtworkImageHashOrm.created_at)
+        session_result = await self.db_session.execute(stmt)
+        return parse_obj_as(list[ArtworkImageHash], session_result.scalars().all())
+
+    async def add(self, origin: str, aid: str, dhash: int, phash: int, group_key: str) -> None:
+        seg0, seg1, seg2, seg3 = split_hash_segments(dhash)
+        new_obj = ArtworkImageHashOrm(origin=origin, aid=aid, dhash=_to_signed(dhash), phash=_to_signed(phash),
+                                      dhash_seg0=seg0, dhash_seg1=seg1, dhash_seg2=seg2, dhash_seg3=seg3,
+                                      group_key=group_key, created_at=datetime.now())
+        await self._add(new_obj)
+
+    async def upsert(self, origin: str, aid: str, dhash: int, phash: int, group_key: str) -> None:
+        seg0, seg1, seg2, seg3 = split_hash_segments(dhash)
+        new_obj = ArtworkImageHashOrm(origin=origin, aid=aid, dhash=_to_signed(dhash), phash=_to_signed(phash),
+                                      dhash_seg0=seg0, dhash_seg1=seg1, dhash_seg2=seg2, dhash_seg3=seg3,
+                                      group_key=group_key, updated_at=datetime.now())
+        await self._merge(new_obj)
+
+    async def update(self, origin: str, aid: str, *, group_key: str) -> None:
+        stmt = (update(ArtworkImageHashOrm)
+                .where(ArtworkImageHashOrm.origin == origin)
+                .where(ArtworkImageHashOrm.aid == aid)
+                .values(group_key=group_key, updated_at=datetime.now()))
+        stmt.execution_options(synchronize_session='fetch')
+        await self.db_session.execute(stmt)
+
+    async def update_group_keys(self, group_keys: Sequence[tuple[str, str, str]]) -> None:
+        """批量更新分组
+
+        :param group_keys: (origin, aid, group_key) 列表
+        """
+        for origin, aid, group_key in group_keys:
+            await self.update(origin=origin, aid=aid, group_key=group_key)
+
+    async def delete(self, origin: str, aid: str) -> None:
+        stmt = (delete(ArtworkImageHashOrm)
+                .where(ArtworkImageHashOrm.origin == origin)
+                .where(ArtworkImageHashOrm.aid == aid))
+        stmt.execution_options(synchronize_session='fetch')
+        await self.db_session.execute(stmt)
+
+
+__all__ = [
+    'ArtworkImageHash',
+    'ArtworkImageHashDAL',
+    'split_hash_segments',
+]
@@ -8,6 +8,7 @@
 @Software       : PyCharm
 """
 
+from collections.abc import Sequence
 from datetime import datetime, timedelta
 
 from sqlalchemy import delete, select
@@ -50,6 +51,27 @@ class GlobalCacheDAL(BaseDataAccessLayerModel[GlobalCacheOrm, GlobalCache]):
         session_result = await self.db_session.execute(stmt)
         return parse_obj_as(list[GlobalCache], session_result.scalars().all())
 
+    async def query_batch(
+            self,
+            cache_name: str,
+            cache_keys: Sequence[str],
+            *,
+            include_expired: bool = False,
+    ) -> list[GlobalCache]:
+        """批量查询指定的多个缓存"""
+        if not cache_keys:
+            return []
+
+        stmt = (select(GlobalCacheOrm)
+                .where(GlobalCacheOrm.cache_name == cache_name)
+                .where(GlobalCacheOrm.cache_key.in_(cache_keys)))
+
+        if not include_expired:
+            stmt = stmt.where(GlobalCacheOrm.expired_at >= datetime.now())
+
+        session_result = await self.db_session.execute(stmt)
+        return parse_obj_as(list[GlobalCache], session_result.scalars().all())
+
     async def query_all(self, *, include_expired: bool = False) -> list[GlobalCache]:
         stmt = select(GlobalCacheOrm).order_by(GlobalCacheOrm.cache_name)
 
@@ -8,11 +8,15 @@
 @Software       : PyCharm
 """
 
+from collections.abc import AsyncGenerator, Sequence
 from datetime import datetime
 
-from sqlalchemy import desc, select
+from nonebot.utils import run_sync
+from sqlalchemy import Row, and_, delete, desc, func, or_, select
+from sqlalchemy.exc import NoResultFound
 
 from src.compat import parse_obj_as
+from ..history_archive import history_archive
 from ..model import BaseDataAccessLayerModel, BaseDataQueryResultModel
 from ..schema import HistoryOrm
 
@@ -48,7 +52,19 @@ class HistoryDAL(BaseDataAccessLayerModel[HistoryOrm, History]):
                 .where(HistoryOrm.event_entity_id == event_entity_id)
                 .where(HistoryOrm.user_entity_id == user_entity_id))
         session_result = await self.db_session.execute(stmt)
-        return History.model_validate(session_result.scalar_one())
+        try:
+            return History.model_validate(session_result.scalar_one())
+        except NoResultFound:
+            # 数据库中不存在时从已归档的历史记录中查找
+            archived_record = await run_sync(history_archive.query_unique)(
+                message_id=str(message_id),
+                bot_self_id=bot_self_id,
+                event_entity_id=event_entity_id,
+                user_entity_id=user_entity_id,
+            )
+            if archived_record is None:
+                raise
+            return History.model_validate(archived_record)
 
     async def query_entity_records(
             self,
@@ -92,6 +108,130 @@ class HistoryDAL(BaseDataAccessLayerModel[HistoryOrm, History]):
         session_result = await self.db_session.execute(stmt)
         return parse_obj_as(list[History], session_result.scalars().all())
 
+    async def iter_entity_records(
+            self,
+            bot_self_id: str,
+            event_entity_id: str | None = None,
+            user_entity_id: str | None = None,
+            *,
+            columns: Sequence[str] = ('message_text',),
+            chunk_size: int = 1000,
+            start_time: datetime | None = None,
+            end_time: datetime | None = None,
+            message_type: str | None = None,
+            exclude_bot_self_message: bool = False,
+            after_key: tuple[int, int] | None = None,
+    ) -> AsyncGenerator[Sequence[Row], None]:
+        """按 (received_time, id) 键集分页逐批迭代某个实体一段时间内的消息历史记录, 筛选参数同 `query_entity_records`
+
+        仅查询所需的列, 每批返回不超过 `chunk_size` 行, 行对象可按列名访问,
+        分页所需的 received_time 及 id 列总会附加在所需列之后
+
+        :param columns: 需要查询的列名
+        :param chunk_size: 每批返回的最大记录数
+        :param after_key: 仅返回 (received_time, id) 大于该值的记录, 为空则返回全部
+        """
+        if event_entity_id is None and user_entity_id is None:
+            raise ValueError('need at least one of the event_entity_id and user_entity_id parameters')
+        if chunk_size <= 0:
+            raise ValueError('chunk_size must be greater than 0')
+
+        table_columns = HistoryOrm.__table__.columns
+        if unknown_columns := [x for x in columns if x not in table_columns]:
+            raise ValueError(f'unknown history columns: {", ".join(unknown_columns)}')
+        select_columns = [*columns, *(x for x in ('received_time', 'id') if x not in columns)]
+
+        stmt = (select(*(getattr(HistoryOrm, x) for x in select_columns))
+                .where(HistoryOrm.bot_self_id == bot_self_id))
+        if event_entity_id is not None:
+            stmt = stmt.where(HistoryOrm.event_entity_id == event_entity_id)
+        if user_entity_id is not None:
+            stmt = stmt.where(HistoryOrm.user_entity_id == user_entity_id)
+        if start_time is not None:
+            stmt = stmt.where(HistoryOrm.received_time >= int(start_time.timestamp()))
+        if end_time is not None:
+            stmt = stmt.where(HistoryOrm.received_time <= int(end_time.timestamp()))
+        if message_type is not None:
+            stmt = stmt.where(HistoryOrm.message_type == message_type)
+        if exclude_bot_self_message:
+            stmt = stmt.where(HistoryOrm.bot_self_id != HistoryOrm.user_entity_id)
+        stmt = stmt.order_by(HistoryOrm.received_time, HistoryOrm.id).limit(chunk_size)
+
+        last_key = after_key
+        while True:
+            page_stmt = stmt
+            if last_key is not None:
+                last_received_time, last_id = last_key
+                page_stmt = stmt.where(or_(
+                    HistoryOrm.received_time > last_received_time,
+                    and_(HistoryOrm.received_time == last_received_time, HistoryOrm.id > last_id),
+                ))
+
+            # 每页均为独立的有限查询, 无需服务端游标
+            session_result = await self.db_session.execute(page_stmt)
+            rows = session_result.all()
+            if not rows:
+                return
+
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            last_key = (rows[-1].received_time, rows[-1].id)
+
+    async def count_entity_records(
+            self,
+            bot_self_id: str,
+            event_entity_id: str | None = None,
+            user_entity_id: str | None = None,
+            *,
+            start_time: datetime | None = None,
+            end_time: datetime | None = None,
+            exclude_bot_self_message: bool = False,
+    ) -> int:
+        """统计某个实体一段时间内的消息历史记录数量, 参数同 `query_entity_records`"""
+        if event_entity_id is None and user_entity_id is None:
+            raise ValueError('need at least one of the event_entity_id and user_entity_id parameters')
+
+        stmt = select(func.count(HistoryOrm.id)).where(HistoryOrm.bot_self_id == bot_self_id)
+        if event_entity_id is not None:
+            stmt = stmt.where(HistoryOrm.event_entity_id == event_entity_id)
+        if user_entity_id is not None:
+            stmt = stmt.where(HistoryOrm.user_entity_id == user_entity_id)
+        if start_time is not None:
+            stmt = stmt.where(HistoryOrm.received_time >= int(start_time.timestamp()))
+        if end_time is not None:
+            stmt = stmt.where(HistoryOrm.received_time <= int(end_time.timestamp()))
+        if exclude_bot_self_message:
+            stmt = stmt.where(HistoryOrm.bot_self_id != HistoryOrm.user_entity_id)
+        session_result = await self.db_session.execute(stmt)
+        return session_result.scalar_one()
+
+    async def query_records_after(
+            self,
+            after_key: tuple[int, int] | None = None,
+            *,
+            limit: int = 1000,
+            end_time: datetime | None = None,
+    ) -> list[History]:
+        """按 (received_time, id) 键集顺序查询指定位置之后的消息历史记录, 用于增量处理新增记录
+
+        :param after_key: 仅返回 (received_time, id) 大于该值的记录, 为空则从头开始
+        :param limit: 单次返回的最大记录数
+        :param end_time: 结束时间, 为空则返回全部
+        """
+        stmt = select(HistoryOrm)
+        if after_key is not None:
+            after_received_time, after_id = after_key
+            stmt = stmt.where(or_(
+                HistoryOrm.received_time > after_received_time,
+                and_(HistoryOrm.received_time == after_received_time, HistoryOrm.id > after_id),
+            ))
+        if end_time is not None:
+            stmt = stmt.where(HistoryOrm.received_time <= int(end_time.timestamp()))
+        stmt = stmt.order_by(HistoryOrm.received_time, HistoryOrm.id).limit(limit)
+        session_result = await self.db_session.execute(stmt)
+        return parse_obj_as(list[History], session_result.scalars().all())
+
     async def query_all(self) -> list[History]:
         raise NotImplementedError
 
@@ -120,6 +260,33 @@ class HistoryDAL(BaseDataAccessLayerModel[HistoryOrm, History]):
     async def delete(self, *args, **kwargs) -> None:
         raise NotImplementedError
 
+    async def query_before(self, received_time: int, *, limit: int = 1000) -> list[History]:
+        """按 ID 顺序查询接收时间早于指定时间的消息历史记录, 用于分批归档
+
+        :param received_time: 查询该时间戳以前的记录
+        :param limit: 单次返回的最大记录数
+        """
+        stmt = (select(HistoryOrm)
+                .where(HistoryOrm.received_time < received_time)
+                .order_by(HistoryOrm.id)
+                .limit(limit))
+        session_result = await self.db_session.execute(stmt)
+        return parse_obj_as(list[History], session_result.scalars().all())
+
+    async def delete_before(self, received_time: int, *, min_id: int, max_id: int) -> None:
+        """按主键范围删除接收时间早于指定时间的消息历史记录, 避免长时间锁表
+
+        :param received_time: 删除该时间戳以前的记录
+        :param min_id: 仅删除 ID 不小于该值的记录
+        :param max_id: 仅删除 ID 不大于该值的记录
+        """
+        stmt = (delete(HistoryOrm)
+                .where(HistoryOrm.id >= min_id)
+                .where(HistoryOrm.id <= max_id)
+                .where(HistoryOrm.received_time < received_time)
+                .execution_options(synchronize_session='fetch'))
+        await self.db_session.execute(stmt)
+
 
 __all__ = [
     'History',
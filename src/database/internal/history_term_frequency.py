@@ -0,0 +1,177 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/2 15:21:07
+@FileName       : history_term_frequency.py
+@Project        : omega-miya
+@Description    : HistoryTermFrequency DAL
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from collections.abc import Mapping
+from datetime import date, datetime
+
+from sqlalchemy import delete, func, select
+
+from ..model import BaseDataAccessLayerModel, BaseDataQueryResultModel
+from ..schema import HistoryTermFrequencyOrm
+
+
+class HistoryTermFrequency(BaseDataQueryResultModel):
+    """消息记录词频统计 Model"""
+    bot_self_id: str
+    event_entity_id: str
+    user_entity_id: str
+    stat_date: date
+    term: str
+    frequency: int
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+class HistoryTermFrequencyDAL(BaseDataAccessLayerModel[HistoryTermFrequencyOrm, HistoryTermFrequency]):
+    """消息记录词频统计 数据库操作对象"""
+
+    async def query_unique(
+            self,
+            bot_self_id: str,
+            event_entity_id: str,
+            user_entity_id: str,
+            stat_date: date,
+            term: str,
+    ) -> HistoryTermFrequency:
+        stmt = (select(HistoryTermFrequencyOrm)
+                .where(HistoryTermFrequencyOrm.bot_self_id == bot_self_id)
+                .where(HistoryTermFrequencyOrm.event_entity_id == event_entity_id)
+                .where(HistoryTermFrequencyOrm.user_entity_id == user_entity_id)
+                .where(HistoryTermFrequencyOrm.stat_date == stat_date)
+                .where(HistoryTermFrequencyOrm.term == term))
+        session_result = await self.db_session.execute(stmt)
+        return HistoryTermFrequency.model_validate(session_result.scalar_one())
+
+    async def query_entity_term_frequency(
+            self,
+            bot_self_id: str,
+            event_entity_id: str | None = None,
+            user_entity_id: str | None = None,
+            *,
+            start_date: date | None = None,
+            end_date: date | None = None,
+            exclude_bot_self_message: bool = False,
+    ) -> dict[str, int]:
+        """汇总某个实体一段日期内的词频统计
+
+        :param bot_self_id: 收到消息的机器人ID
+        :param event_entity_id: 消息事件实体ID, 为空则汇总全部
+        :param user_entity_id: 发送对象实体ID, 为空则汇总全部
+        :param start_date: 起始日期(包含), 为空则汇总全部
+        :param end_date: 结束日期(包含), 为空则汇总全部
+        :param exclude_bot_self_message: 是否排除机器人自身的消息
+        """
+        if event_entity_id is None and user_entity_id is None:
+            raise ValueError('need at least one of the event_entity_id and user_entity_id parameters')
+
+        stmt = (select(HistoryTermFrequencyOrm.term, func.sum(HistoryTermFrequencyOrm.frequency))
+                .where(HistoryTermFrequencyOrm.bot_self_id == bot_self_id))
+        if event_entity_id is not None:
+            stmt = stmt.where(HistoryTermFrequencyOrm.event_entity_id == event_entity_id)
+        if user_entity_id is not None:
+            stmt = stmt.where(HistoryTermFrequencyOrm.user_entity_id == user_entity_id)
+        if start_date is not None:
+            stmt = stmt.where(HistoryTermFrequencyOrm.stat_date >= start_date)
+        if end_date is not None:
+            stmt = stmt.where(HistoryTermFrequencyOrm.stat_date <= end_date)
+        if exclude_bot_self_message:
+            stmt = stmt.where(HistoryTermFrequencyOrm.bot_self_id != HistoryTermFrequencyOrm.user_entity_id)
+        stmt = stmt.group_by(HistoryTermFrequencyOrm.term)
+        session_result = await self.db_session.execute(stmt)
+        return {term: int(frequency) for term, frequency in session_result.all()}
+
+    async def query_all(self) -> list[HistoryTermFrequency]:
+        raise NotImplementedError
+
+    async def add(
+            self,
+            bot_self_id: str,
+            event_entity_id: str,
+            user_entity_id: str,
+            stat_date: date,
+            term: str,
+            frequency: int,
+    ) -> None:
+        new_obj = HistoryTermFrequencyOrm(bot_self_id=bot_self_id, event_entity_id=event_entity_id,
+                                          user_entity_id=user_entity_id, stat_date=stat_date, term=term,
+                                          frequency=frequency, created_at=datetime.now())
+        await self._add(new_obj)
+
+    async def upsert(
+            self,
+            bot_self_id: str,
+            event_entity_id: str,
+            user_entity_id: str,
+            stat_date: date,
+            term: str,
+            frequency: int,
+    ) -> None:
+        new_obj = HistoryTermFrequencyOrm(bot_self_id=bot_self_id, event_entity_id=event_entity_id,
+                                          user_entity_id=user_entity_id, stat_date=stat_date, term=term,
+                                          frequency=frequency, updated_at=datetime.now())
+        await self._merge(new_obj)
+
+    async def increase(
+            self,
+            bot_self_id: str,
+            event_entity_id: str,
+            user_entity_id: str,
+            stat_date: date,
+            term_frequency: Mapping[str, int],
+    ) -> None:
+        """在已有统计的基础上累加词频, 不存在的词语则新增行
+
+        词语按去除首尾空白后的小写形式合并, 与数据库大小写不敏感的排序规则保持一致, 避免主键冲突
+        """
+        merged_term_frequency: dict[str, int] = {}
+        for term, frequency in term_frequency.items():
+            if normalized_term := term.strip().lower():
+                merged_term_frequency[normalized_term] = merged_term_frequency.get(normalized_term, 0) + frequency
+        if not merged_term_frequency:
+            return
+
+        stmt = (select(HistoryTermFrequencyOrm)
+                .where(HistoryTermFrequencyOrm.bot_self_id == bot_self_id)
+                .where(HistoryTermFrequencyOrm.event_entity_id == event_entity_id)
+                .where(HistoryTermFrequencyOrm.user_entity_id == user_entity_id)
+                .where(HistoryTermFrequencyOrm.stat_date == stat_date)
+                .where(HistoryTermFrequencyOrm.term.in_(list(merged_term_frequency.keys()))))
+        session_result = await self.db_session.execute(stmt)
+        # 大小写不敏感的排序规则下, 已有行的词语可能与查询的词语大小写不同
+        exists_objs = {x.term.strip().lower(): x for x in session_result.scalars().all()}
+
+        for term, frequency in merged_term_frequency.items():
+            if (exists_obj := exists_objs.get(term)) is not None:
+                exists_obj.frequency += frequency
+                exists_obj.updated_at = datetime.now()
+            else:
+                self.db_session.add(HistoryTermFrequencyOrm(
+                    bot_self_id=bot_self_id, event_entity_id=event_entity_id, user_entity_id=user_entity_id,
+                    stat_date=stat_date, term=term, frequency=frequency, created_at=datetime.now()
+                ))
+        await self.db_session.flush()
+
+    async def update(self, *args, **kwargs) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *args, **kwargs) -> None:
+        raise NotImplementedError
+
+    async def delete_before(self, stat_date: date) -> None:
+        """清理指定日期以前的所有词频统计"""
+        stmt = delete(HistoryTermFrequencyOrm).where(HistoryTermFrequencyOrm.stat_date < stat_date)
+        stmt.execution_options(synchronize_session='fetch')
+        await self.db_session.execute(stmt)
+
+
+__all__ = [
+    'HistoryTermFrequency',
+    'HistoryTermFrequencyDAL',
+]
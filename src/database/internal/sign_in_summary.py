@@ -0,0 +1,147 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/20 21:05:48
+@FileName       : sign_in_summary.py
+@Project        : omega-miya
+@Description    : SignInSummary DAL
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from collections.abc import Sequence
+from datetime import date, datetime
+
+from sqlalchemy import delete, desc, select
+
+from src.compat import parse_obj_as
+from ..model import BaseDataAccessLayerModel, BaseDataQueryResultModel
+from ..schema import SignInOrm, SignInSummaryOrm
+
+
+class SignInSummary(BaseDataQueryResultModel):
+    """签到汇总 Model"""
+    entity_index_id: int
+    current_streak: int
+    longest_streak: int
+    total_days: int
+    last_sign_in_date: date
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+def _calculate_streaks(sign_in_dates: Sequence[date]) -> tuple[int, int]:
+    """由升序且已去重的签到日期计算截至最后签到日期的连续签到天数及最长连续签到天数"""
+    current_streak = longest_streak = 0
+    last_ordinal: int | None = None
+    for sign_in_date in sign_in_dates:
+        ordinal = sign_in_date.toordinal()
+        current_streak = current_streak + 1 if last_ordinal is not None and ordinal == last_ordinal + 1 else 1
+        longest_streak = max(longest_streak, current_streak)
+        last_ordinal = ordinal
+    return current_streak, longest_streak
+
+
+class SignInSummaryDAL(BaseDataAccessLayerModel[SignInSummaryOrm, SignInSummary]):
+    """签到汇总 数据库操作对象"""
+
+    async def query_unique(self, entity_index_id: int) -> SignInSummary:
+        stmt = select(SignInSummaryOrm).where(SignInSummaryOrm.entity_index_id == entity_index_id)
+        session_result = await self.db_session.execute(stmt)
+        return SignInSummary.model_validate(session_result.scalar_one())
+
+    async def query_all(self) -> list[SignInSummary]:
+        stmt = select(SignInSummaryOrm).order_by(desc(SignInSummaryOrm.longest_streak))
+        session_result = await self.db_session.execute(stmt)
+        return parse_obj_as(list[SignInSummary], session_result.scalars().all())
+
+    async def query_missing_entity_index_ids(self, limit: int = 500) -> list[int]:
+        """查询有签到记录但尚未生成签到汇总的实体"""
+        stmt = (select(SignInOrm.entity_index_id)
+                .where(SignInOrm.entity_index_id.not_in(select(SignInSummaryOrm.entity_index_id)))
+                .group_by(SignInOrm.entity_index_id)
+                .order_by(SignInOrm.entity_index_id)
+                .limit(limit))
+        session_result = await self.db_session.execute(stmt)
+        return parse_obj_as(list[int], session_result.scalars().all())
+
+    async def add(
+            self,
+            entity_index_id: int,
+            current_streak: int,
+            longest_streak: int,
+            total_days: int,
+            last_sign_in_date: date,
+    ) -> None:
+        new_obj = SignInSummaryOrm(entity_index_id=entity_index_id, current_streak=current_streak,
+                                   longest_streak=longest_streak, total_days=total_days,
+                                   last_sign_in_date=last_sign_in_date, created_at=datetime.now())
+        await self._add(new_obj)
+
+    async def upsert(
+            self,
+            entity_index_id: int,
+            current_streak: int,
+            longest_streak: int,
+            total_days: int,
+            last_sign_in_date: date,
+    ) -> None:
+        new_obj = SignInSummaryOrm(entity_index_id=entity_index_id, current_streak=current_streak,
+                                   longest_streak=longest_streak, total_days=total_days,
+                                   last_sign_in_date=last_sign_in_date, updated_at=datetime.now())
+        await self._merge(new_obj)
+
+    async def rebuild(self, entity_index_id: int) -> None:
+        """由全部签到记录重新生成实体的签到汇总"""
+        stmt = (select(SignInOrm.sign_in_date)
+                .where(SignInOrm.entity_index_id == entity_index_id)
+                .group_by(SignInOrm.sign_in_date)
+                .order_by(SignInOrm.sign_in_date))
+        session_result = await self.db_session.execute(stmt)
+        sign_in_dates = parse_obj_as(list[date], session_result.scalars().all())
+
+        if not sign_in_dates:
+            await self.delete(entity_index_id=entity_index_id)
+            return
+
+        current_streak, longest_streak = _calculate_streaks(sign_in_dates)
+        await self.upsert(
+            entity_index_id=entity_index_id,
+            current_streak=current_streak,
+            longest_streak=longest_streak,
+            total_days=len(sign_in_dates),
+            last_sign_in_date=sign_in_dates[-1],
+        )
+
+    async def increase(self, entity_index_id: int, sign_in_date: date) -> None:
+        """新增一天签到记录后增量更新签到汇总, 补签早于最后签到日期的记录时重新生成汇总"""
+        stmt = select(SignInSummaryOrm).where(SignInSummaryOrm.entity_index_id == entity_index_id)
+        session_result = await self.db_session.execute(stmt)
+        exists_obj = session_result.scalar_one_or_none()
+
+        if exists_obj is None or sign_in_date <= exists_obj.last_sign_in_date:
+            await self.rebuild(entity_index_id=entity_index_id)
+            return
+
+        if sign_in_date.toordinal() == exists_obj.last_sign_in_date.toordinal() + 1:
+            exists_obj.current_streak += 1
+        else:
+            exists_obj.current_streak = 1
+        exists_obj.longest_streak = max(exists_obj.longest_streak, exists_obj.current_streak)
+        exists_obj.total_days += 1
+        exists_obj.last_sign_in_date = sign_in_date
+        exists_obj.updated_at = datetime.now()
+        await self.db_session.flush()
+
+    async def update(self, *args, **kwargs) -> None:
+        raise NotImplementedError
+
+    async def delete(self, entity_index_id: int) -> None:
+        stmt = delete(SignInSummaryOrm).where(SignInSummaryOrm.entity_index_id == entity_index_id)
+        stmt.execution_options(synchronize_session='fetch')
+        await self.db_session.execute(stmt)
+
+
+__all__ = [
+    'SignInSummary',
+    'SignInSummaryDAL',
+]
@@ -11,9 +11,12 @@
 from collections.abc import Sequence
 from datetime import datetime
 
+from pydantic import BaseModel
 from sqlalchemy import desc, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 
 from src.compat import parse_obj_as
+from ..config import database_config
 from ..model import BaseDataAccessLayerModel, BaseDataQueryResultModel
 from ..schema import SocialMediaContentOrm
 
@@ -30,6 +33,17 @@ class SocialMediaContent(BaseDataQueryResultModel):
     updated_at: datetime | None = None
 
 
+class SocialMediaContentData(BaseModel):
+    """批量写入的社交媒体平台内容"""
+    source: str
+    m_id: str
+    m_type: str
+    m_uid: str
+    title: str
+    content: str
+    ref_content: str = ''
+
+
 class SocialMediaContentDAL(BaseDataAccessLayerModel[SocialMediaContentOrm, SocialMediaContent]):
     """社交媒体平台内容 数据库操作对象"""
 
@@ -91,6 +105,17 @@ class SocialMediaContentDAL(BaseDataAccessLayerModel[SocialMediaContentOrm, Soci
         session_result = await self.db_session.execute(stmt)
         return parse_obj_as(list[str], session_result.scalars().all())
 
+    async def query_user_recent_mids(self, source: str, uid: str, limit: int = 512) -> list[str]:
+        """查询指定来源平台指定用户最近收录的记录行中的 mid"""
+        # m_id 为字符串, 按其排序不能反映内容新旧, 以收录时间排序
+        stmt = (select(SocialMediaContentOrm.m_id)
+                .where(SocialMediaContentOrm.source == source)
+                .where(SocialMediaContentOrm.m_uid == uid)
+                .order_by(desc(SocialMediaContentOrm.created_at), desc(SocialMediaContentOrm.m_id))
+                .limit(limit))
+        session_result = await self.db_session.execute(stmt)
+        return parse_obj_as(list[str], session_result.scalars().all())
+
     async def query_user_exists_mids(self, source: str, uid: str, mids: Sequence[str]) -> list[str]:
         """根据提供的 mids 查询对应用户其中已经存在于数据库记录中的条目"""
         stmt = (select(SocialMediaContentOrm.m_id)
@@ -136,6 +161,36 @@ class SocialMediaContentDAL(BaseDataAccessLayerModel[SocialMediaContentOrm, Soci
                                         updated_at=datetime.now())
         await self._merge(new_obj)
 
+    async def upsert_many(self, contents: Sequence[SocialMediaContentData]) -> None:
+        """以单条多行 INSERT 语句批量写入, 主键已存在的行则更新"""
+        values = {
+            (x.source, x.m_id): {
+                'source': x.source, 'm_id': x.m_id, 'm_type': x.m_type, 'm_uid': x.m_uid, 'title': x.title[:255],
+                'content': x.content[:4096], 'ref_content': x.ref_content[:4096],
+                'created_at': datetime.now(), 'updated_at': datetime.now(),
+            }
+            for x in contents
+        }
+        if not values:
+            return
+
+        update_columns = ('m_type', 'm_uid', 'title', 'content', 'ref_content', 'updated_at')
+        match database_config.database:
+            case 'mysql':
+                mysql_stmt = mysql.insert(SocialMediaContentOrm).values(list(values.values()))
+                stmt = mysql_stmt.on_duplicate_key_update({k: mysql_stmt.inserted[k] for k in update_columns})
+            case 'postgresql':
+                pg_stmt = postgresql.insert(SocialMediaContentOrm).values(list(values.values()))
+                stmt = pg_stmt.on_conflict_do_update(
+                    index_elements=['source', 'm_id'], set_={k: pg_stmt.excluded[k] for k in update_columns}
+                )
+            case _:
+                sqlite_stmt = sqlite.insert(SocialMediaContentOrm).values(list(values.values()))
+                stmt = sqlite_stmt.on_conflict_do_update(
+                    index_elements=['source', 'm_id'], set_={k: sqlite_stmt.excluded[k] for k in update_columns}
+                )
+        await self.db_session.execute(stmt)
+
     async def update(self, *args, **kwargs) -> None:
         raise NotImplementedError
 
@@ -146,4 +201,5 @@ class SocialMediaContentDAL(BaseDataAccessLayerModel[SocialMediaContentOrm, Soci
 __all__ = [
     'SocialMediaContent',
     'SocialMediaContentDAL',
+    'SocialMediaContentData',
 ]
@@ -10,7 +10,7 @@
 
 from datetime import datetime
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import and_, delete, desc, func, or_, select
 
 from src.compat import parse_obj_as
 from ..model import BaseDataAccessLayerModel, BaseDataQueryResultModel
@@ -50,13 +50,19 @@ class StatisticDAL(BaseDataAccessLayerModel[StatisticOrm, Statistic]):
             parent_entity_id: str | None = None,
             entity_id: str | None = None,
             start_time: datetime | None = None,
+            end_time: datetime | None = None,
+            after_key: tuple[datetime, int] | None = None,
+            max_key: tuple[datetime, int] | None = None,
     ) -> list[CountStatisticModel]:
         """按条件查询统计信息
 
         :param bot_self_id: bot id, 为空则返回全部
         :param parent_entity_id: 父对象 id, 为空则返回全部
         :param entity_id: 调用对象 id, 为空则返回全部
-        :param start_time: 统计起始时间, 为空则返回全部
+        :param start_time: 统计起始时间(包含), 为空则返回全部
+        :param end_time: 统计结束时间(不包含), 为空则返回全部
+        :param after_key: 仅统计 (call_time, id) 大于该值的记录, 为空则返回全部
+        :param max_key: 仅统计 (call_time, id) 不大于该值的记录, 为空则返回全部
         """
         stmt = select(func.count(StatisticOrm.plugin_name), StatisticOrm.plugin_name)
         if bot_self_id is not None:
@@ -67,11 +73,54 @@ class StatisticDAL(BaseDataAccessLayerModel[StatisticOrm, Statistic]):
             stmt = stmt.where(StatisticOrm.entity_id == entity_id)
         if start_time is not None:
             stmt = stmt.where(StatisticOrm.call_time >= start_time)
+        if end_time is not None:
+            stmt = stmt.where(StatisticOrm.call_time < end_time)
+        if after_key is not None:
+            after_call_time, after_id = after_key
+            stmt = stmt.where(or_(
+                StatisticOrm.call_time > after_call_time,
+                and_(StatisticOrm.call_time == after_call_time, StatisticOrm.id > after_id),
+            ))
+        if max_key is not None:
+            max_call_time, max_id = max_key
+            stmt = stmt.where(or_(
+                StatisticOrm.call_time < max_call_time,
+                and_(StatisticOrm.call_time == max_call_time, StatisticOrm.id <= max_id),
+            ))
         stmt = stmt.group_by(StatisticOrm.plugin_name)
         session_result = await self.db_session.execute(stmt)
         data = [{'custom_name': plugin_name, 'call_count': count} for count, plugin_name in session_result.all()]
         return parse_obj_as(list[CountStatisticModel], data)
 
+    async def query_records_after(
+            self,
+            after_key: tuple[datetime, int] | None = None,
+            *,
+            limit: int = 1000,
+            end_time: datetime | None = None,
+    ) -> list[Statistic]:
+        """按 (call_time, id) 键集顺序查询指定位置之后的统计信息, 用于增量汇总新增记录, 不查询调用信息
+
+        :param after_key: 仅返回 (call_time, id) 大于该值的记录, 为空则从头开始
+        :param limit: 单次返回的最大记录数
+        :param end_time: 调用时间上限(包含), 为空则返回全部
+        """
+        stmt = select(
+            StatisticOrm.id, StatisticOrm.module_name, StatisticOrm.plugin_name, StatisticOrm.bot_self_id,
+            StatisticOrm.parent_entity_id, StatisticOrm.entity_id, StatisticOrm.call_time
+        )
+        if after_key is not None:
+            after_call_time, after_id = after_key
+            stmt = stmt.where(or_(
+                StatisticOrm.call_time > after_call_time,
+                and_(StatisticOrm.call_time == after_call_time, StatisticOrm.id > after_id),
+            ))
+        if end_time is not None:
+            stmt = stmt.where(StatisticOrm.call_time <= end_time)
+        stmt = stmt.order_by(StatisticOrm.call_time, StatisticOrm.id).limit(limit)
+        session_result = await self.db_session.execute(stmt)
+        return parse_obj_as(list[Statistic], [x._asdict() for x in session_result.all()])
+
     async def query_all(self) -> list[Statistic]:
         stmt = select(StatisticOrm).order_by(desc(StatisticOrm.call_time))
         session_result = await self.db_session.execute(stmt)
@@ -101,6 +150,30 @@ class StatisticDAL(BaseDataAccessLayerModel[StatisticOrm, Statistic]):
     async def delete(self, *args, **kwargs) -> None:
         raise NotImplementedError
 
+    async def delete_before(self, call_time: datetime, *, limit: int = 1000) -> int:
+        """按 ID 顺序分批清理调用时间早于指定时间的统计信息, 返回本批清理的记录数量
+
+        :param call_time: 清理该时间以前的记录
+        :param limit: 单批清理的最大记录数
+        """
+        stmt = (select(StatisticOrm.id)
+                .where(StatisticOrm.call_time < call_time)
+                .order_by(StatisticOrm.id)
+                .limit(limit))
+        session_result = await self.db_session.execute(stmt)
+        delete_ids = session_result.scalars().all()
+        if not delete_ids:
+            return 0
+
+        # 按主键范围删除, 避免长时间锁表
+        delete_stmt = (delete(StatisticOrm)
+                       .where(StatisticOrm.id >= delete_ids[0])
+                       .where(StatisticOrm.id <= delete_ids[-1])
+                       .where(StatisticOrm.call_time < call_time))
+        delete_stmt.execution_options(synchronize_session='fetch')
+        await self.db_session.execute(delete_stmt)
+        return len(delete_ids)
+
 
 __all__ = [
     'CountStatisticModel',
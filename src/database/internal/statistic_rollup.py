@@ -0,0 +1,181 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/4 20:12:36
+@FileName       : statistic_rollup.py
+@Project        : omega-miya
+@Description    : StatisticRollup DAL
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Literal
+
+from sqlalchemy import delete, func, select
+
+from ..model import BaseDataAccessLayerModel, BaseDataQueryResultModel
+from ..schema import StatisticRollupOrm
+
+type RollupBucketType = Literal['hour', 'day']
+"""统计信息汇总粒度"""
+
+
+class StatisticRollup(BaseDataQueryResultModel):
+    """统计信息汇总 Model"""
+    bucket_type: str
+    bucket_start: datetime
+    bot_self_id: str
+    parent_entity_id: str
+    entity_id: str
+    plugin_name: str
+    call_count: int
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
+class StatisticRollupDAL(BaseDataAccessLayerModel[StatisticRollupOrm, StatisticRollup]):
+    """统计信息汇总 数据库操作对象"""
+
+    async def query_unique(
+            self,
+            bucket_type: RollupBucketType,
+            bucket_start: datetime,
+            bot_self_id: str,
+            parent_entity_id: str,
+            entity_id: str,
+            plugin_name: str,
+    ) -> StatisticRollup:
+        stmt = (select(StatisticRollupOrm)
+                .where(StatisticRollupOrm.bucket_type == bucket_type)
+                .where(StatisticRollupOrm.bucket_start == bucket_start)
+                .where(StatisticRollupOrm.bot_self_id == bot_self_id)
+                .where(StatisticRollupOrm.parent_entity_id == parent_entity_id)
+                .where(StatisticRollupOrm.entity_id == entity_id)
+                .where(StatisticRollupOrm.plugin_name == plugin_name))
+        session_result = await self.db_session.execute(stmt)
+        return StatisticRollup.model_validate(session_result.scalar_one())
+
+    async def count_by_condition(
+            self,
+            bucket_type: RollupBucketType,
+            *,
+            bot_self_id: str | None = None,
+            parent_entity_id: str | None = None,
+            entity_id: str | None = None,
+            start_time: datetime | None = None,
+            end_time: datetime | None = None,
+    ) -> dict[str, int]:
+        """按条件汇总各插件调用次数
+
+        :param bucket_type: 汇总粒度
+        :param bot_self_id: bot id, 为空则返回全部
+        :param parent_entity_id: 父对象 id, 为空则返回全部
+        :param entity_id: 调用对象 id, 为空则返回全部
+        :param start_time: 汇总时段起始时间(包含), 为空则返回全部
+        :param end_time: 汇总时段起始时间(不包含), 为空则返回全部
+        """
+        stmt = (select(StatisticRollupOrm.plugin_name, func.sum(StatisticRollupOrm.call_count))
+                .where(StatisticRollupOrm.bucket_type == bucket_type))
+        if bot_self_id is not None:
+            stmt = stmt.where(StatisticRollupOrm.bot_self_id == bot_self_id)
+        if parent_entity_id is not None:
+            stmt = stmt.where(StatisticRollupOrm.parent_entity_id == parent_entity_id)
+        if entity_id is not None:
+            stmt = stmt.where(StatisticRollupOrm.entity_id == entity_id)
+        if start_time is not None:
+            stmt = stmt.where(StatisticRollupOrm.bucket_start >= start_time)
+        if end_time is not None:
+            stmt = stmt.where(StatisticRollupOrm.bucket_start < end_time)
+        stmt = stmt.group_by(StatisticRollupOrm.plugin_name)
+        session_result = await self.db_session.execute(stmt)
+        return {plugin_name: int(call_count) for plugin_name, call_count in session_result.all()}
+
+    async def query_all(self) -> list[StatisticRollup]:
+        raise NotImplementedError
+
+    async def add(
+            self,
+            bucket_type: RollupBucketType,
+            bucket_start: datetime,
+            bot_self_id: str,
+            parent_entity_id: str,
+            entity_id: str,
+            plugin_name: str,
+            call_count: int,
+    ) -> None:
+        new_obj = StatisticRollupOrm(bucket_type=bucket_type, bucket_start=bucket_start, bot_self_id=bot_self_id,
+                                     parent_entity_id=parent_entity_id, entity_id=entity_id, plugin_name=plugin_name,
+                                     call_count=call_count, created_at=datetime.now())
+        await self._add(new_obj)
+
+    async def upsert(
+            self,
+            bucket_type: RollupBucketType,
+            bucket_start: datetime,
+            bot_self_id: str,
+            parent_entity_id: str,
+            entity_id: str,
+            plugin_name: str,
+            call_count: int,
+    ) -> None:
+        new_obj = StatisticRollupOrm(bucket_type=bucket_type, bucket_start=bucket_start, bot_self_id=bot_self_id,
+                                     parent_entity_id=parent_entity_id, entity_id=entity_id, plugin_name=plugin_name,
+                                     call_count=call_count, updated_at=datetime.now())
+        await self._merge(new_obj)
+
+    async def increase(
+            self,
+            bucket_type: RollupBucketType,
+            bucket_start: datetime,
+            bot_self_id: str,
+            parent_entity_id: str,
+            entity_id: str,
+            plugin_call_count: Mapping[str, int],
+    ) -> None:
+        """在已有汇总的基础上累加各插件调用次数, 不存在的插件则新增行"""
+        if not plugin_call_count:
+            return
+
+        stmt = (select(StatisticRollupOrm)
+                .where(StatisticRollupOrm.bucket_type == bucket_type)
+                .where(StatisticRollupOrm.bucket_start == bucket_start)
+                .where(StatisticRollupOrm.bot_self_id == bot_self_id)
+                .where(StatisticRollupOrm.parent_entity_id == parent_entity_id)
+                .where(StatisticRollupOrm.entity_id == entity_id)
+                .where(StatisticRollupOrm.plugin_name.in_(list(plugin_call_count.keys()))))
+        session_result = await self.db_session.execute(stmt)
+        exists_objs = {x.plugin_name: x for x in session_result.scalars().all()}
+
+        for plugin_name, call_count in plugin_call_count.items():
+            if (exists_obj := exists_objs.get(plugin_name)) is not None:
+                exists_obj.call_count += call_count
+                exists_obj.updated_at = datetime.now()
+            else:
+                self.db_session.add(StatisticRollupOrm(
+                    bucket_type=bucket_type, bucket_start=bucket_start, bot_self_id=bot_self_id,
+                    parent_entity_id=parent_entity_id, entity_id=entity_id, plugin_name=plugin_name,
+                    call_count=call_count, created_at=datetime.now()
+                ))
+        await self.db_session.flush()
+
+    async def update(self, *args, **kwargs) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *args, **kwargs) -> None:
+        raise NotImplementedError
+
+    async def delete_before(self, bucket_type: RollupBucketType, bucket_start: datetime) -> None:
+        """清理指定时间以前的某一粒度的全部汇总"""
+        stmt = (delete(StatisticRollupOrm)
+                .where(StatisticRollupOrm.bucket_type == bucket_type)
+                .where(StatisticRollupOrm.bucket_start < bucket_start))
+        stmt.execution_options(synchronize_session='fetch')
+        await self.db_session.execute(stmt)
+
+
+__all__ = [
+    'RollupBucketType',
+    'StatisticRollup',
+    'StatisticRollupDAL',
+]
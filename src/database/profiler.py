@@ -0,0 +1,330 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/14 15:02:36
+@FileName       : profiler.py
+@Project        : omega-miya
+@Description    : 数据库查询性能统计, 慢查询日志及联合索引建议
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import hashlib
+import math
+import re
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+from nonebot.log import logger
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import event
+
+from .config import database_config, database_profiler_config
+from .schema_base import OmegaDeclarativeBase
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, ExceptionContext, ExecutionContext
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+_STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_PATTERN = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_PATTERN = re.compile(r'%\(\w+\)s|%s|\$\d+')
+_IN_LIST_PATTERN = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+_WHERE_CLAUSE_PATTERN = re.compile(
+    r'\bWHERE\b(?P<where>.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|\bFOR UPDATE\b|$)', re.IGNORECASE
+)
+_PREDICATE_PATTERN = re.compile(
+    r'(?P<table>\w+)\.(?P<column>\w+)\s*(?P<op>=|>=|<=|>|<|IN\b)\s*\(?\s*\?', re.IGNORECASE
+)
+_EXPLAINABLE_STATEMENT: tuple[str, ...] = ('SELECT', 'UPDATE', 'DELETE')
+
+_START_TIME_KEY: str = 'omega_query_start_time'
+"""记录语句开始执行时间的连接信息键, 值为以执行上下文 id 为键的开始时间"""
+
+
+def normalize_statement(statement: str) -> str:
+    """将 SQL 语句规范化为查询指纹, 字面量及参数占位符统一替换为 `?`, IN 列表合并为单个占位符"""
+    fingerprint = _STRING_LITERAL_PATTERN.sub('?', statement)
+    fingerprint = _PLACEHOLDER_PATTERN.sub('?', fingerprint)
+    fingerprint = _NUMBER_LITERAL_PATTERN.sub('?', fingerprint)
+    fingerprint = _IN_LIST_PATTERN.sub('IN (?)', fingerprint)
+    return _WHITESPACE_PATTERN.sub(' ', fingerprint).strip()
+
+
+class QueryStatistic:
+    """单类查询的执行统计"""
+
+    __slots__ = ('fingerprint', 'count', 'total_time', 'max_time', 'total_rows', 'latencies', 'sample')
+
+    def __init__(self, fingerprint: str, sample_size: int):
+        self.fingerprint = fingerprint
+        self.count: int = 0
+        self.total_time: float = 0.0
+        self.max_time: float = 0.0
+        self.total_rows: int = 0
+        self.latencies: deque[float] = deque(maxlen=sample_size)
+        self.sample: tuple[str, Any] | None = None
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(count={self.count}, p50={self.p50:.4f}, fingerprint={self.fingerprint!r})'
+
+    def record(self, elapsed: float, rows: int, statement: str, parameters: Any) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.total_rows += max(rows, 0)
+        self.latencies.append(elapsed)
+        self.sample = (statement, parameters)
+
+    def percentile(self, percent: float) -> float:
+        """按最近邻秩法计算最近样本的耗时分位数"""
+        if not self.latencies:
+            return 0.0
+        sorted_latencies = sorted(self.latencies)
+        index = max(math.ceil(percent * len(sorted_latencies) / 100) - 1, 0)
+        return sorted_latencies[min(index, len(sorted_latencies) - 1)]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+
+class QueryProfiler:
+    """数据库查询性能统计, 通过 SQLAlchemy 游标执行事件记录每条语句的耗时及影响行数
+
+    行数取自 DBAPI cursor.rowcount, 部分驱动对 SELECT 语句不提供该值, 此时不计入
+    """
+
+    def __init__(
+            self,
+            *,
+            sample_size: int = 1024,
+            slow_query_threshold: float | None = None,
+            enable_statistic: bool = True,
+    ):
+        """
+        :param sample_size: 每类查询保留用于计算耗时分位数的样本数量
+        :param slow_query_threshold: 慢查询日志阈值(秒), 为空则不记录慢查询
+        :param enable_statistic: 是否统计查询耗时, 为否时仅记录慢查询
+        """
+        self.sample_size = sample_size
+        self.slow_query_threshold = slow_query_threshold
+        self.enable_statistic = enable_statistic
+        self._statistics: dict[str, QueryStatistic] = {}
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(fingerprints={len(self._statistics)})'
+
+    def _before_cursor_execute(
+            self,
+            conn: 'Connection',
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: 'ExecutionContext | None',
+            *_: Any,
+    ) -> None:
+        conn.info.setdefault(_START_TIME_KEY, {})[id(context)] = time.perf_counter()
+
+    @staticmethod
+    def _handle_error(exception_context: 'ExceptionContext') -> None:
+        """语句执行失败时不会触发 after_cursor_execute, 需在此清除对应的开始时间"""
+        if exception_context.connection is None:
+            return
+        start_times = exception_context.connection.info.get(_START_TIME_KEY, {})
+        start_times.pop(id(exception_context.execution_context), None)
+
+    def _after_cursor_execute(
+            self,
+            conn: 'Connection',
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: 'ExecutionContext | None',
+            *_: Any,
+    ) -> None:
+        start_time = conn.info.get(_START_TIME_KEY, {}).pop(id(context), None)
+        if start_time is None:
+            return
+        elapsed = time.perf_counter() - start_time
+
+        if self.slow_query_threshold is not None and elapsed >= self.slow_query_threshold:
+            statement_text = _WHITESPACE_PATTERN.sub(' ', statement)[:1024]
+            parameters_text = str(parameters)[:256]
+            logger.warning(f'Database | Slow query took {elapsed:.3f}s: {statement_text}, params: {parameters_text}')
+
+        if not self.enable_statistic:
+            return
+
+        fingerprint = normalize_statement(statement)
+        statistic = self._statistics.get(fingerprint)
+        if statistic is None:
+            statistic = self._statistics[fingerprint] = QueryStatistic(fingerprint, sample_size=self.sample_size)
+        rows = getattr(cursor, 'rowcount', -1)
+        statistic.record(elapsed=elapsed, rows=rows, statement=statement, parameters=parameters)
+
+    def attach(self, engine: 'AsyncEngine') -> None:
+        """在数据库引擎上注册游标执行事件"""
+        event.listen(engine.sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine.sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine.sync_engine, 'handle_error', self._handle_error)
+
+    def detach(self, engine: 'AsyncEngine') -> None:
+        """移除数据库引擎上的游标执行事件"""
+        event.remove(engine.sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(engine.sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.remove(engine.sync_engine, 'handle_error', self._handle_error)
+
+    def reset(self) -> None:
+        self._statistics.clear()
+
+    def get_top_statistics(self, top: int = 10, *, order_by: str = 'total_time') -> list[QueryStatistic]:
+        """获取排名靠前的查询统计
+
+        :param top: 返回数量
+        :param order_by: 排序字段, 可选 total_time, count, p50, p99, max_time, total_rows
+        """
+        return sorted(self._statistics.values(), key=lambda x: getattr(x, order_by), reverse=True)[:top]
+
+    def generate_report(self, top: int = 10) -> str:
+        """生成按累计耗时排序的查询统计报告"""
+        statistics = self.get_top_statistics(top=top)
+        if not statistics:
+            return '暂无查询统计数据'
+        return '\n\n'.join(
+            f'#{index} count={x.count}, total={x.total_time:.3f}s, p50={x.p50 * 1000:.2f}ms, '
+            f'p99={x.p99 * 1000:.2f}ms, max={x.max_time * 1000:.2f}ms, rows={x.total_rows}\n{x.fingerprint[:512]}'
+            for index, x in enumerate(statistics, start=1)
+        )
+
+
+class IndexAdvice(BaseModel):
+    """联合索引建议"""
+    table: str
+    columns: list[str]
+    fingerprint: str
+    query_plan: list[str]
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+    @property
+    def index_name(self) -> str:
+        name = f'ix_{self.table}_{"_".join(self.columns)}'
+        if len(name) > 60:
+            digest = hashlib.blake2b(name.encode('utf8'), digest_size=4).hexdigest()
+            name = f'ix_{self.table}_{digest}'[:60]
+        return name
+
+    @property
+    def migration(self) -> str:
+        """Alembic 迁移脚本中的对应操作"""
+        return f'op.create_index({self.index_name!r}, {self.table!r}, {self.columns!r}, unique=False)'
+
+
+def _extract_index_columns(fingerprint: str) -> dict[str, list[str]]:
+    """从查询指纹的 WHERE 子句中提取各表的过滤列, 等值条件列在前, 范围条件列仅保留第一个并置于最后"""
+    if (where_match := _WHERE_CLAUSE_PATTERN.search(fingerprint)) is None:
+        return {}
+
+    equality_columns: dict[str, list[str]] = {}
+    range_columns: dict[str, str] = {}
+    for predicate in _PREDICATE_PATTERN.finditer(where_match.group('where')):
+        table, column, op = predicate.group('table', 'column', 'op')
+        if op.upper() in ('=', 'IN'):
+            if column not in (columns := equality_columns.setdefault(table, [])):
+                columns.append(column)
+        else:
+            range_columns.setdefault(table, column)
+
+    result: dict[str, list[str]] = {}
+    for table in equality_columns.keys() | range_columns.keys():
+        columns = list(equality_columns.get(table, []))
+        if (range_column := range_columns.get(table)) is not None and range_column not in columns:
+            columns.append(range_column)
+        result[table] = columns
+    return result
+
+
+def _is_covered_by_existing_index(table_name: str, columns: list[str]) -> bool:
+    """判断已有索引(含主键)是否已能覆盖该组过滤列"""
+    table = OmegaDeclarativeBase.metadata.tables.get(table_name)
+    if table is None:
+        return True
+
+    # 存在唯一索引的单列等值条件已能精确定位行
+    unique_columns = {c.name for c in table.columns if c.primary_key or c.unique}
+    unique_columns.update(
+        next(iter(x.columns)).name for x in table.indexes if x.unique and len(x.columns) == 1
+    )
+    if unique_columns.intersection(columns):
+        return True
+
+    existing_indexes = [[c.name for c in x.columns] for x in table.indexes]
+    existing_indexes.append([c.name for c in table.primary_key.columns])
+    return any(set(x[:len(columns)]) == set(columns) for x in existing_indexes)
+
+
+async def advise_composite_indexes(
+        profiler: QueryProfiler,
+        engine: 'AsyncEngine',
+        *,
+        top: int = 10,
+) -> list[IndexAdvice]:
+    """对累计耗时最高的查询执行 EXPLAIN 并给出联合索引建议
+
+    建议的索引应添加到 schema 对应表的 `__table_args__` 中, 再通过 `run_revision` 生成迁移脚本
+    """
+    explain_prefix = 'EXPLAIN QUERY PLAN' if database_config.database == 'sqlite' else 'EXPLAIN'
+
+    advices: dict[tuple[str, tuple[str, ...]], IndexAdvice] = {}
+    for statistic in profiler.get_top_statistics(top=top):
+        if statistic.sample is None or not statistic.fingerprint.upper().startswith(_EXPLAINABLE_STATEMENT):
+            continue
+
+        candidates = {
+            table: columns
+            for table, columns in _extract_index_columns(statistic.fingerprint).items()
+            if len(columns) >= 2 and not _is_covered_by_existing_index(table, columns)
+        }
+        if not candidates:
+            continue
+
+        statement, parameters = statistic.sample
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(f'{explain_prefix} {statement}', parameters)
+                query_plan = [' | '.join(str(v) for v in row) for row in result.fetchall()]
+        except Exception as e:
+            logger.warning(f'Database | Explain query failed, {e!r}')
+            query_plan = []
+
+        for table, columns in candidates.items():
+            advices.setdefault((table, tuple(columns)), IndexAdvice(
+                table=table, columns=columns, fingerprint=statistic.fingerprint, query_plan=query_plan
+            ))
+    return list(advices.values())
+
+
+query_profiler: QueryProfiler = QueryProfiler(
+    sample_size=database_profiler_config.db_profiler_sample_size,
+    slow_query_threshold=database_profiler_config.db_slow_query_threshold,
+    enable_statistic=database_profiler_config.db_profiler_enable,
+)
+"""全局数据库查询统计实例"""
+
+
+__all__ = [
+    'IndexAdvice',
+    'QueryProfiler',
+    'QueryStatistic',
+    'advise_composite_indexes',
+    'normalize_statement',
+    'query_profiler',
+]
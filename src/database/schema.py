@@ -9,8 +9,9 @@
 """
 
 from datetime import date, datetime
+from typing import Any
 
-from sqlalchemy import ForeignKey, Sequence
+from sqlalchemy import ForeignKey, Index, Sequence
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import BigInteger, Date, DateTime, Float, Integer, String
 
@@ -19,6 +20,11 @@ from .schema_base import OmegaDeclarativeBase as Base
 from .types import IndexInt
 
 
+def _table_args(*args: Any) -> tuple[Any, ...]:
+    """组合联合索引等表级参数及数据库对应的表参数"""
+    return (*args, database_config.table_args) if database_config.table_args is not None else args
+
+
 class GlobalCacheOrm(Base):
     """全局缓存表, 存放各种需要持久化的缓存数据"""
     __tablename__ = f'{database_config.db_prefix}global_cache'
@@ -108,11 +114,47 @@ class StatisticOrm(Base):
                 f'created_at={self.created_at!r}, updated_at={self.updated_at!r})')
 
 
+class StatisticRollupOrm(Base):
+    """统计信息汇总表, 按小时及日期汇总的插件调用次数"""
+    __tablename__ = f'{database_config.db_prefix}statistic_rollup'
+    if database_config.table_args is not None:
+        __table_args__ = database_config.table_args
+
+    # 表结构
+    bucket_type: Mapped[str] = mapped_column(
+        String(16), primary_key=True, nullable=False, index=True, comment='汇总粒度, hour/day'
+    )
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime, primary_key=True, nullable=False, index=True, comment='汇总时段起始时间'
+    )
+    bot_self_id: Mapped[str] = mapped_column(
+        String(64), primary_key=True, nullable=False, index=True, comment='对应的Bot'
+    )
+    parent_entity_id: Mapped[str] = mapped_column(
+        String(64), primary_key=True, nullable=False, index=True, comment='对应调用用户父实体信息'
+    )
+    entity_id: Mapped[str] = mapped_column(
+        String(64), primary_key=True, nullable=False, index=True, comment='对应调用用户实体信息'
+    )
+    plugin_name: Mapped[str] = mapped_column(String(64), primary_key=True, nullable=False, comment='插件显示名称')
+    call_count: Mapped[int] = mapped_column(Integer, nullable=False, comment='调用次数')
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return (f'StatisticRollupOrm(bucket_type={self.bucket_type!r}, bucket_start={self.bucket_start!r}, '
+                f'bot_self_id={self.bot_self_id!r}, parent_entity_id={self.parent_entity_id!r}, '
+                f'entity_id={self.entity_id!r}, plugin_name={self.plugin_name!r}, call_count={self.call_count!r}, '
+                f'created_at={self.created_at!r}, updated_at={self.updated_at!r})')
+
+
 class HistoryOrm(Base):
     """原始消息记录表"""
     __tablename__ = f'{database_config.db_prefix}message_history'
-    if database_config.table_args is not None:
-        __table_args__ = database_config.table_args
+    __table_args__ = _table_args(
+        Index(f'ix_{__tablename__}_message_identity', 'message_id', 'bot_self_id', 'event_entity_id', 'user_entity_id'),
+        Index(f'ix_{__tablename__}_event_received_time', 'bot_self_id', 'event_entity_id', 'received_time'),
+    )
 
     # 表结构
     id: Mapped[int] = mapped_column(
@@ -137,6 +179,35 @@ class HistoryOrm(Base):
                 f'created_at={self.created_at!r}, updated_at={self.updated_at!r})')
 
 
+class HistoryTermFrequencyOrm(Base):
+    """消息记录词频统计表, 按实体及日期汇总的分词词频"""
+    __tablename__ = f'{database_config.db_prefix}message_history_term_frequency'
+    if database_config.table_args is not None:
+        __table_args__ = database_config.table_args
+
+    # 表结构
+    bot_self_id: Mapped[str] = mapped_column(
+        String(64), primary_key=True, nullable=False, index=True, comment='收到消息的机器人ID'
+    )
+    event_entity_id: Mapped[str] = mapped_column(
+        String(64), primary_key=True, nullable=False, index=True, comment='消息事件实体ID'
+    )
+    user_entity_id: Mapped[str] = mapped_column(
+        String(64), primary_key=True, nullable=False, index=True, comment='发送对象实体ID'
+    )
+    stat_date: Mapped[date] = mapped_column(Date, primary_key=True, nullable=False, index=True, comment='统计日期')
+    term: Mapped[str] = mapped_column(String(64), primary_key=True, nullable=False, comment='词语')
+    frequency: Mapped[int] = mapped_column(Integer, nullable=False, comment='出现次数')
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return (f'HistoryTermFrequencyOrm(bot_self_id={self.bot_self_id!r}, '
+                f'event_entity_id={self.event_entity_id!r}, user_entity_id={self.user_entity_id!r}, '
+                f'stat_date={self.stat_date!r}, term={self.term!r}, frequency={self.frequency!r}, '
+                f'created_at={self.created_at!r}, updated_at={self.updated_at!r})')
+
+
 class BotSelfOrm(Base):
     """Bot表 对应不同机器人协议端"""
     __tablename__ = f'{database_config.db_prefix}bots'
@@ -200,6 +271,10 @@ class EntityOrm(Base):
     entity_signin: Mapped[list['SignInOrm']] = relationship(
         'SignInOrm', back_populates='signin_back_entity', cascade='all, delete-orphan', passive_deletes=True
     )
+    entity_signin_summary: Mapped[list['SignInSummaryOrm']] = relationship(
+        'SignInSummaryOrm', back_populates='signin_summary_back_entity', cascade='all, delete-orphan',
+        passive_deletes=True
+    )
     entity_auth: Mapped[list['AuthSettingOrm']] = relationship(
         'AuthSettingOrm', back_populates='auth_back_entity', cascade='all, delete-orphan', passive_deletes=True
     )
@@ -277,11 +352,40 @@ class SignInOrm(Base):
                 f'sign_in_info={self.sign_in_info!r}, created_at={self.created_at!r}, updated_at={self.updated_at!r})')
 
 
+class SignInSummaryOrm(Base):
+    """签到汇总表, 按实体记录连续签到及累计签到天数, 随签到增量更新"""
+    __tablename__ = f'{database_config.db_prefix}sign_in_summary'
+    if database_config.table_args is not None:
+        __table_args__ = database_config.table_args
+
+    entity_index_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey(EntityOrm.id, ondelete='CASCADE'), primary_key=True, nullable=False
+    )
+    current_streak: Mapped[int] = mapped_column(Integer, nullable=False, comment='截至最后签到日期的连续签到天数')
+    longest_streak: Mapped[int] = mapped_column(Integer, nullable=False, comment='历史最长连续签到天数')
+    total_days: Mapped[int] = mapped_column(Integer, nullable=False, comment='累计签到天数')
+    last_sign_in_date: Mapped[date] = mapped_column(Date, nullable=False, comment='最后签到日期')
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    # 设置级联和关系加载
+    signin_summary_back_entity: Mapped[EntityOrm] = relationship(
+        EntityOrm, back_populates='entity_signin_summary', lazy='joined', innerjoin=True
+    )
+
+    def __repr__(self) -> str:
+        return (f'SignInSummaryOrm(entity_index_id={self.entity_index_id!r}, '
+                f'current_streak={self.current_streak!r}, longest_streak={self.longest_streak!r}, '
+                f'total_days={self.total_days!r}, last_sign_in_date={self.last_sign_in_date!r}, '
+                f'created_at={self.created_at!r}, updated_at={self.updated_at!r})')
+
+
 class AuthSettingOrm(Base):
     """授权配置表, 主要用于权限管理, 同时兼用于存放使用插件时需要持久化的配置"""
     __tablename__ = f'{database_config.db_prefix}auth_setting'
-    if database_config.table_args is not None:
-        __table_args__ = database_config.table_args
+    __table_args__ = _table_args(
+        Index(f'ix_{__tablename__}_entity_node', 'entity_index_id', 'module', 'plugin', 'node'),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer, Sequence(f'{__tablename__}_id_seq'), primary_key=True, nullable=False, index=True, unique=True
@@ -311,8 +415,9 @@ class AuthSettingOrm(Base):
 class CoolDownOrm(Base):
     """冷却事件表"""
     __tablename__ = f'{database_config.db_prefix}cooldown'
-    if database_config.table_args is not None:
-        __table_args__ = database_config.table_args
+    __table_args__ = _table_args(
+        Index(f'ix_{__tablename__}_entity_event', 'entity_index_id', 'event'),
+    )
 
     # 表结构
     id: Mapped[int] = mapped_column(
@@ -463,6 +568,34 @@ class ArtworkCollectionOrm(Base):
                 f'created_at={self.created_at!r}, updated_at={self.updated_at!r})')
 
 
+class ArtworkImageHashOrm(Base):
+    """图库作品图片感知哈希表, 用于检测不同来源收录的近似重复作品"""
+    __tablename__ = f'{database_config.db_prefix}artwork_image_hash'
+    if database_config.table_args is not None:
+        __table_args__ = database_config.table_args
+
+    # 表结构
+    origin: Mapped[str] = mapped_column(String(64), primary_key=True, nullable=False, index=True, comment='作品来源')
+    aid: Mapped[str] = mapped_column(String(64), primary_key=True, nullable=False, index=True, comment='作品原始ID')
+    dhash: Mapped[int] = mapped_column(BigInteger, nullable=False, comment='首页图片差异哈希(dHash), 有符号整数存储')
+    phash: Mapped[int] = mapped_column(BigInteger, nullable=False, comment='首页图片感知哈希(pHash), 有符号整数存储')
+    # 多索引哈希分段, 汉明距离小于分段数的近似哈希至少有一个分段完全相同
+    dhash_seg0: Mapped[int] = mapped_column(Integer, nullable=False, index=True, comment='dHash 第 0-15 位')
+    dhash_seg1: Mapped[int] = mapped_column(Integer, nullable=False, index=True, comment='dHash 第 16-31 位')
+    dhash_seg2: Mapped[int] = mapped_column(Integer, nullable=False, index=True, comment='dHash 第 32-47 位')
+    dhash_seg3: Mapped[int] = mapped_column(Integer, nullable=False, index=True, comment='dHash 第 48-63 位')
+    group_key: Mapped[str] = mapped_column(
+        String(160), nullable=False, index=True, comment='近似重复分组, 为组内最先收录作品的 origin:aid'
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return (f'ArtworkImageHashOrm(origin={self.origin!r}, aid={self.aid!r}, '
+                f'dhash={self.dhash!r}, phash={self.phash!r}, group_key={self.group_key!r}, '
+                f'created_at={self.created_at!r}, updated_at={self.updated_at!r})')
+
+
 class WordBankOrm(Base):
     """问答语料词句表"""
     __tablename__ = f'{database_config.db_prefix}word_bank'
@@ -492,16 +625,20 @@ __all__ = [
     'SystemSettingOrm',
     'PluginOrm',
     'StatisticOrm',
+    'StatisticRollupOrm',
     'HistoryOrm',
+    'HistoryTermFrequencyOrm',
     'BotSelfOrm',
     'EntityOrm',
     'FriendshipOrm',
     'SignInOrm',
+    'SignInSummaryOrm',
     'AuthSettingOrm',
     'CoolDownOrm',
     'SubscriptionSourceOrm',
     'SubscriptionOrm',
     'SocialMediaContentOrm',
     'ArtworkCollectionOrm',
+    'ArtworkImageHashOrm',
     'WordBankOrm',
 ]
@@ -15,6 +15,7 @@ from nonebot import logger
 from nonebot.exception import ActionFailed
 
 from src.database import SocialMediaContentDAL, begin_db_session
+from src.database.internal.social_media_content import SocialMediaContentData
 from src.exception import WebSourceException
 from src.service import (
     OmegaEntity,
@@ -30,6 +31,7 @@ from src.service import (
 from src.service.omega_base.internal import OmegaBiliDynamicSubSource
 from src.utils import run_async_delay, semaphore_gather
 from src.utils.bilibili_api import BilibiliDynamic, BilibiliUser
+from src.utils.seen_filter import SeenContentFilter
 from .consts import (
     BILI_DYNAMIC_SUB_TYPE,
     IGNORED_DYNAMIC_TYPES,
@@ -51,19 +53,43 @@ async def _query_dynamic_sub_source(user_id: int | str) -> 'SubscriptionSource':
     return source_res
 
 
-async def _check_new_dynamic(items: Sequence['DynItem']) -> list['DynItem']:
-    """检查新的动态(数据库中没有的)"""
+_DYNAMIC_SEEN_FILTER: SeenContentFilter = SeenContentFilter()
+"""已知动态过滤器, 仅对不在近期已知窗口中的动态查询数据库"""
+
+
+async def _query_user_recent_dynamic_ids(user_id: int | str) -> list[str]:
     async with begin_db_session() as session:
-        new_ids = await SocialMediaContentDAL(session=session).query_source_not_exists_mids(
-            source=BILI_DYNAMIC_SUB_TYPE, mids=[x.id_str for x in items]
+        return await SocialMediaContentDAL(session=session).query_user_recent_mids(
+            source=BILI_DYNAMIC_SUB_TYPE, uid=str(user_id), limit=_DYNAMIC_SEEN_FILTER.window_size
         )
-    return [x for x in items if x.id_str in new_ids]
 
 
-async def _add_upgrade_dynamic_content(item: 'DynItem') -> None:
-    """在数据库中添加动态信息"""
+async def _query_not_exists_dynamic_ids(mids: Sequence[str]) -> list[str]:
     async with begin_db_session() as session:
-        await SocialMediaContentDAL(session=session).upsert(
+        return await SocialMediaContentDAL(session=session).query_source_not_exists_mids(
+            source=BILI_DYNAMIC_SUB_TYPE, mids=mids
+        )
+
+
+async def _check_new_dynamic(user_id: int | str, items: Sequence['DynItem']) -> list['DynItem']:
+    """检查新的动态(数据库中没有的)"""
+    new_ids = await _DYNAMIC_SEEN_FILTER.filter_new(
+        source=BILI_DYNAMIC_SUB_TYPE,
+        uid=str(user_id),
+        ids=[x.id_str for x in items],
+        load_known=lambda: _query_user_recent_dynamic_ids(user_id=user_id),
+        confirm_new=_query_not_exists_dynamic_ids,
+    )
+    return [x for x in items if x.id_str in new_ids]
+
+
+async def _add_upgrade_dynamic_contents(user_id: int | str, items: Sequence['DynItem']) -> None:
+    """在数据库中批量添加动态信息"""
+    if not items:
+        return
+
+    contents = [
+        SocialMediaContentData(
             source=BILI_DYNAMIC_SUB_TYPE,
             m_id=str(item.id_str),
             m_type=str(item.type),
@@ -71,15 +97,18 @@ async def _add_upgrade_dynamic_content(item: 'DynItem') -> None:
             title=f'{item.modules.module_author.name}的动态',
             content=item.dyn_text,
         )
+        for item in items
+    ]
+    async with begin_db_session() as session:
+        await SocialMediaContentDAL(session=session).upsert_many(contents=contents)
+    _DYNAMIC_SEEN_FILTER.mark_seen(source=BILI_DYNAMIC_SUB_TYPE, uid=str(user_id), ids=[x.m_id for x in contents])
 
 
 async def _add_user_new_dynamic_content(user_id: int | str) -> None:
     """在数据库中更新目标用户的所有动态(仅新增不更新)"""
     dynamics = await BilibiliDynamic.query_user_space_dynamics(host_mid=user_id)
-    new_dynamic_item = await _check_new_dynamic(items=dynamics.data.items)
-
-    tasks = [_add_upgrade_dynamic_content(item=item) for item in new_dynamic_item]
-    await semaphore_gather(tasks=tasks, semaphore_num=10, return_exceptions=False)
+    new_dynamic_item = await _check_new_dynamic(user_id=user_id, items=dynamics.data.items)
+    await _add_upgrade_dynamic_contents(user_id=user_id, items=new_dynamic_item)
 
 
 async def _add_upgrade_dynamic_sub_source(user_id: int | str) -> 'SubscriptionSource':
@@ -184,7 +213,7 @@ async def bili_dynamic_monitor_main(user_id: int | str) -> None:
     logger.debug(f'BilibiliDynamicMonitor | Start checking user({user_id}) new dynamics')
     dynamics = await BilibiliDynamic.query_user_space_dynamics(host_mid=user_id)
 
-    new_dynamic_item = await _check_new_dynamic(items=dynamics.data.items)
+    new_dynamic_item = await _check_new_dynamic(user_id=user_id, items=dynamics.data.items)
     if new_dynamic_item:
         logger.info(
             f'BilibiliDynamicMonitor | Confirmed user({user_id}) '
@@ -203,8 +232,7 @@ async def bili_dynamic_monitor_main(user_id: int | str) -> None:
     send_messages = await semaphore_gather(tasks=format_msg_tasks, semaphore_num=3, return_exceptions=False)
 
     # 数据库中插入新动态信息
-    add_artwork_tasks = [_add_upgrade_dynamic_content(item=item) for item in new_dynamic_item]
-    await semaphore_gather(tasks=add_artwork_tasks, semaphore_num=10, return_exceptions=False)
+    await _add_upgrade_dynamic_contents(user_id=user_id, items=new_dynamic_item)
 
     # 向订阅者发送新动态信息
     subscribed_entity = await query_subscribed_entity_by_bili_user(user_id=user_id)
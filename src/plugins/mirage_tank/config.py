@@ -0,0 +1,37 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/6 20:05:41
+@FileName       : config
+@Project        : omega-miya
+@Description    : 幻影坦克插件配置
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from typing import Literal
+
+from nonebot import get_plugin_config, logger
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+class MirageTankPluginConfig(BaseModel):
+    """MirageTank 插件配置"""
+    # 灰度/彩色混合模式的合成实现, numpy 为向量化实现, pillow 为原始的逐通道 ImageMath 实现
+    mirage_tank_plugin_backend: Literal['numpy', 'pillow'] = Field(default='numpy')
+    # numpy 实现分块处理时每块的行数, 用于限制超大图片处理时的内存占用, 为 0 则不分块
+    mirage_tank_plugin_tile_rows: int = Field(default=128, ge=0)
+
+    model_config = ConfigDict(extra='ignore')
+
+
+try:
+    mirage_tank_plugin_config = get_plugin_config(MirageTankPluginConfig)
+except ValidationError as e:
+    import sys
+
+    logger.opt(colors=True).critical(f'<r>MirageTank 插件配置格式验证失败</r>, 错误信息:\n{e}')
+    sys.exit(f'MirageTank 插件配置格式验证失败, {e}')
+
+__all__ = [
+    'mirage_tank_plugin_config',
+]
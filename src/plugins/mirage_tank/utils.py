@@ -10,6 +10,7 @@
 
 from collections.abc import Callable
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from PIL import Image, ImageEnhance, ImageMath, ImageOps
 from nonebot.utils import run_sync
@@ -17,6 +18,14 @@ from nonebot.utils import run_sync
 from src.resource import TemporaryResource
 from src.utils import OmegaRequests
 from src.utils.image_utils import ImageEffectProcessor, ImageLoader
+from src.utils.import_utils import lazy_import
+from .config import mirage_tank_plugin_config
+
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import NDArray
+else:
+    np = lazy_import('numpy')
 
 _TMP_FOLDER: TemporaryResource = TemporaryResource('mirage_tank')
 """缓存路径"""
@@ -124,19 +133,68 @@ async def color_noise(image_url: str) -> TemporaryResource:
     return await generate_mirage_tank(factory=_color_noise, base_image_url=image_url)
 
 
-def _complex_gray(white_image: Image.Image, black_image: Image.Image) -> Image.Image:
-    """生成由两张图合成的灰度幻影坦克
-
-    :param white_image: 白色背景下显示的图片
-    :param black_image: 黑色背景下显示的图片
-    """
-
-    # 调整图片大小
+def _resize_to_same_size(white_image: Image.Image, black_image: Image.Image) -> tuple[Image.Image, Image.Image]:
+    """将两张图片调整为相同大小"""
     width = max(white_image.width, black_image.width)
     height = max(white_image.height, black_image.height)
     size = (width, height)
     white_image = ImageEffectProcessor(image=white_image).resize_with_filling(size=size).image
     black_image = ImageEffectProcessor(image=black_image).resize_with_filling(size=size).image
+    return white_image, black_image
+
+
+def _div255(array: 'NDArray[np.uint32]') -> 'NDArray[np.uint32]':
+    """四舍五入整除 255, 与 Pillow 按蒙版混合图层时的整数运算一致"""
+    array = array + 128
+    return (array + (array >> 8)) >> 8
+
+
+def _luminance(rgb: 'NDArray[np.uint8]') -> 'NDArray[np.uint32]':
+    """计算灰度, 与 Pillow 转换为 L 模式时使用的定点 ITU-R 601-2 公式一致"""
+    luminance = rgb[..., 0].astype(np.uint32)
+    luminance *= 19595
+    channel = rgb[..., 1].astype(np.uint32)
+    channel *= 38470
+    luminance += channel
+    channel = rgb[..., 2].astype(np.uint32)
+    channel *= 7471
+    luminance += channel
+    luminance += 0x8000
+    luminance >>= 16
+    return luminance
+
+
+def _to_uint8(array: 'NDArray[np.float32]') -> 'NDArray[np.uint8]':
+    """截断至 0~255 并向下取整转换为 uint8, 与 Pillow 由 F 模式转换为 L 模式一致"""
+    return np.clip(array, 0, 255, out=array).astype(np.uint8)
+
+
+def _apply_tiled(
+        tile_factory: Callable[['NDArray[np.uint8]', 'NDArray[np.uint8]'], 'NDArray[np.uint8]'],
+        white_image: Image.Image,
+        black_image: Image.Image,
+) -> Image.Image:
+    """按行分块执行合成计算, 浮点中间结果仅按块分配, 避免处理超大图片时占用过多内存"""
+    white_rgb = np.asarray(white_image.convert('RGB'))
+    black_rgb = np.asarray(black_image.convert('RGB'))
+
+    height = white_rgb.shape[0]
+    tile_rows = mirage_tank_plugin_config.mirage_tank_plugin_tile_rows or height
+
+    output = np.empty((*white_rgb.shape[:2], 4), dtype=np.uint8)
+    for top in range(0, height, tile_rows):
+        output[top:top + tile_rows] = tile_factory(white_rgb[top:top + tile_rows], black_rgb[top:top + tile_rows])
+    return Image.fromarray(output)
+
+
+def _complex_gray_pillow(white_image: Image.Image, black_image: Image.Image) -> Image.Image:
+    """生成由两张图合成的灰度幻影坦克, Pillow 逐通道实现
+
+    :param white_image: 白色背景下显示的图片
+    :param black_image: 黑色背景下显示的图片
+    """
+    white_image, black_image = _resize_to_same_size(white_image=white_image, black_image=black_image)
+    size = white_image.size
 
     # 去色, 作用蒙版改变色阶范围
     white_mask = ImageEnhance.Color(white_image).enhance(0)
@@ -159,6 +217,41 @@ def _complex_gray(white_image: Image.Image, black_image: Image.Image) -> Image.I
     return mask
 
 
+def _complex_gray_tile(white_rgb: 'NDArray[np.uint8]', black_rgb: 'NDArray[np.uint8]') -> 'NDArray[np.uint8]':
+    """灰度幻影坦克的单个分块, 与 `_complex_gray_pillow` 的去色、色阶调整及 ImageMath 计算结果一致"""
+    # 去色后分别叠加半透明白色/黑色图层改变色阶范围
+    white_l = _div255(_luminance(white_rgb) * 127 + 255 * 128).astype(np.float32)
+    black_l = _div255(_luminance(black_rgb) * 127).astype(np.float32)
+
+    # alpha = 256 - lw + lb, l = lb / alpha * 256
+    alpha = np.float32(256) - white_l
+    alpha += black_l
+    black_l /= alpha
+    black_l *= np.float32(256)
+
+    output = np.empty((*white_rgb.shape[:2], 4), dtype=np.uint8)
+    output[..., :3] = _to_uint8(black_l)[..., np.newaxis]
+    output[..., 3] = _to_uint8(alpha)
+    return output
+
+
+def _complex_gray_numpy(white_image: Image.Image, black_image: Image.Image) -> Image.Image:
+    """生成由两张图合成的灰度幻影坦克, numpy 向量化实现"""
+    white_image, black_image = _resize_to_same_size(white_image=white_image, black_image=black_image)
+    return _apply_tiled(_complex_gray_tile, white_image=white_image, black_image=black_image)
+
+
+def _complex_gray(white_image: Image.Image, black_image: Image.Image) -> Image.Image:
+    """生成由两张图合成的灰度幻影坦克
+
+    :param white_image: 白色背景下显示的图片
+    :param black_image: 黑色背景下显示的图片
+    """
+    if mirage_tank_plugin_config.mirage_tank_plugin_backend == 'pillow':
+        return _complex_gray_pillow(white_image=white_image, black_image=black_image)
+    return _complex_gray_numpy(white_image=white_image, black_image=black_image)
+
+
 async def complex_gray(white_image_url: str, black_image_url: str) -> TemporaryResource:
     """生成由两张图合成的灰度幻影坦克
 
@@ -168,18 +261,14 @@ async def complex_gray(white_image_url: str, black_image_url: str) -> TemporaryR
     return await generate_mirage_tank(_complex_gray, white_image_url, black_image_url)
 
 
-def _complex_color(white_image: Image.Image, black_image: Image.Image) -> Image.Image:
-    """生成由两张图合成的彩色幻影坦克
+def _complex_color_pillow(white_image: Image.Image, black_image: Image.Image) -> Image.Image:
+    """生成由两张图合成的彩色幻影坦克, Pillow 逐通道实现
 
     :param white_image: 白色背景下显示的图片
     :param black_image: 黑色背景下显示的图片
     """
-    # 调整图片大小
-    width = max(white_image.width, black_image.width)
-    height = max(white_image.height, black_image.height)
-    size = (width, height)
-    white_image = ImageEffectProcessor(image=white_image).resize_with_filling(size=size).image
-    black_image = ImageEffectProcessor(image=black_image).resize_with_filling(size=size).image
+    white_image, black_image = _resize_to_same_size(white_image=white_image, black_image=black_image)
+    size = white_image.size
 
     # 调整饱和度和亮度
     _ = Image.new(mode='RGBA', size=size, color=(255, 255, 255, 64))
@@ -210,6 +299,62 @@ def _complex_color(white_image: Image.Image, black_image: Image.Image) -> Image.
     return make_image
 
 
+def _complex_color_tile(white_rgb: 'NDArray[np.uint8]', black_rgb: 'NDArray[np.uint8]') -> 'NDArray[np.uint8]':
+    """彩色幻影坦克的单个分块, 与 `_complex_color_pillow` 的饱和度、亮度调整及 ImageMath 计算结果一致"""
+    black_l = _luminance(black_rgb).astype(np.float32)
+    alpha = np.zeros(white_rgb.shape[:2], dtype=np.float32)
+    color_max = np.zeros(white_rgb.shape[:2], dtype=np.float32)
+
+    black_channels = []
+    for channel, weight in enumerate((0.222, 0.707, 0.071)):
+        # 黑色图降低饱和度(0.75)及亮度(0.25)
+        black = black_rgb[..., channel].astype(np.float32)
+        black -= black_l
+        black *= np.float32(0.75)
+        black += black_l
+        np.trunc(black, out=black)
+        black *= np.float32(0.25)
+        np.trunc(black, out=black)
+        np.maximum(color_max, black, out=color_max)
+        black_channels.append(black)
+
+        # 白色图叠加半透明白色图层, mask = 256 - w + b
+        mask = _div255(white_rgb[..., channel].astype(np.uint32) * 191 + 255 * 64).astype(np.float32)
+        np.subtract(np.float32(256), mask, out=mask)
+        mask += black
+        mask *= np.float32(weight)
+        alpha += mask
+
+    np.maximum(alpha, color_max, out=alpha)
+    np.minimum(alpha, np.float32(256), out=alpha)
+
+    output = np.empty((*white_rgb.shape[:2], 4), dtype=np.uint8)
+    for channel, black in enumerate(black_channels):
+        black /= alpha
+        np.minimum(black, np.float32(256), out=black)
+        black *= np.float32(256)
+        output[..., channel] = _to_uint8(black)
+    output[..., 3] = _to_uint8(alpha)
+    return output
+
+
+def _complex_color_numpy(white_image: Image.Image, black_image: Image.Image) -> Image.Image:
+    """生成由两张图合成的彩色幻影坦克, numpy 向量化实现"""
+    white_image, black_image = _resize_to_same_size(white_image=white_image, black_image=black_image)
+    return _apply_tiled(_complex_color_tile, white_image=white_image, black_image=black_image)
+
+
+def _complex_color(white_image: Image.Image, black_image: Image.Image) -> Image.Image:
+    """生成由两张图合成的彩色幻影坦克
+
+    :param white_image: 白色背景下显示的图片
+    :param black_image: 黑色背景下显示的图片
+    """
+    if mirage_tank_plugin_config.mirage_tank_plugin_backend == 'pillow':
+        return _complex_color_pillow(white_image=white_image, black_image=black_image)
+    return _complex_color_numpy(white_image=white_image, black_image=black_image)
+
+
 async def complex_color(white_image_url: str, black_image_url: str) -> TemporaryResource:
     """生成由两张图合成的彩色幻影坦克
 
@@ -22,6 +22,9 @@ from nonebot.plugin import CommandGroup, get_loaded_plugins, get_plugin
 from nonebot.typing import T_State
 
 from src.database import PluginDAL
+from src.database.config import database_profiler_config
+from src.database.connector import engine
+from src.database.profiler import advise_composite_indexes, query_profiler
 from src.params.permission import IS_ADMIN
 from src.service import OmegaMatcherInterface as OmMI
 from src.service import enable_processor_state
@@ -358,4 +361,30 @@ async def handle_set_limiting(
         await interface.matcher.send('Omega 设置流控限制失败, 请联系管理员处理')
 
 
+@omega.command('db-profile', aliases={'OmegaDBProfile', 'omega_db_profile'}).handle()
+async def handle_db_profile(matcher: Matcher):
+    if not database_profiler_config.db_profiler_enable:
+        await matcher.finish('未启用数据库查询性能统计, 请在配置中设置 DB_PROFILER_ENABLE=true 后重启')
+
+    report = query_profiler.generate_report(top=10)
+    try:
+        advices = await advise_composite_indexes(query_profiler, engine, top=10)
+    except Exception as e:
+        logger.error(f'Omega 生成数据库索引建议失败, {e!r}')
+        advices = []
+
+    if advices:
+        advice_text = '\n\n'.join(
+            f'{x.table}({", ".join(x.columns)})\n{x.migration}'
+            + (f'\n执行计划: {"; ".join(x.query_plan)}' if x.query_plan else '')
+            for x in advices
+        )
+    else:
+        advice_text = '暂无联合索引建议'
+
+    await matcher.send(
+        f'数据库查询统计(按累计耗时):\n{"-" * 16}\n{report}\n\n\n联合索引建议:\n{"-" * 16}\n{advice_text}'
+    )
+
+
 __all__ = []
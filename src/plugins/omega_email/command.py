@@ -184,7 +184,8 @@ async def handle_receive_email(interface: Annotated[OmMI, Depends(OmMI.depend())
         # 接收邮件内容
         try:
             unseen_mail = await get_unseen_mail_data(
-                address=mailbox.address, server_host=mailbox.server.server_host, password=password
+                address=mailbox.address, server_host=mailbox.server.server_host, password=password,
+                port=mailbox.server.port,
             )
         except Exception as e:
             logger.error(f'ReceiveEmail | 邮箱 {mailbox.address} 收件失败, {e}')
@@ -0,0 +1,36 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/24 10:18:52
+@FileName       : config
+@Project        : omega-miya
+@Description    : 邮箱插件配置
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from nonebot import get_plugin_config, logger
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+class OmegaEmailPluginConfig(BaseModel):
+    """OmegaEmail 插件配置"""
+    # imap 连接、单次读取及写入的超时时间(秒)
+    omega_email_imap_timeout: float = Field(default=30.0, gt=0)
+    # 服务器支持时空闲连接保持 IDLE 接收新邮件推送, 收件时未收到推送则无需再向服务器搜索新邮件
+    omega_email_imap_enable_idle: bool = True
+
+    model_config = ConfigDict(extra='ignore')
+
+
+try:
+    omega_email_plugin_config = get_plugin_config(OmegaEmailPluginConfig)
+except ValidationError as e:
+    import sys
+
+    logger.opt(colors=True).critical(f'<r>OmegaEmail 插件配置格式验证失败</r>, 错误信息:\n{e}')
+    sys.exit(f'OmegaEmail 插件配置格式验证失败, {e}')
+
+
+__all__ = [
+    'omega_email_plugin_config',
+]
@@ -19,6 +19,12 @@ DB_ENTITY_SETTING_PLUGIN_NAME: Literal['omega_email_mailbox_bind'] = 'omega_emai
 """实体对象配置项名称"""
 TMP_FOLDER: TemporaryResource = TemporaryResource('receive_email')
 """已收邮件图片缓存路径"""
+IMAP_CLIENT_POOL_SIZE: int = 16
+"""同时保持连接的 imap 客户端数量上限"""
+IMAP_CLIENT_KEEPALIVE_INTERVAL: float = 5 * 60
+"""imap 客户端空闲超过该时间(秒)后, 使用前先检查连接是否可用"""
+IMAP_IDLE_TIMEOUT: float = 25 * 60
+"""imap IDLE 单次等待时间(秒), RFC 2177 建议不超过 29 分钟"""
 
 
 __all__ = [
@@ -26,4 +32,7 @@ __all__ = [
     'DB_ENTITY_SETTING_MODULE_NAME',
     'DB_ENTITY_SETTING_PLUGIN_NAME',
     'TMP_FOLDER',
+    'IMAP_CLIENT_POOL_SIZE',
+    'IMAP_CLIENT_KEEPALIVE_INTERVAL',
+    'IMAP_IDLE_TIMEOUT',
 ]
@@ -11,6 +11,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
+from nonebot import get_driver
 from nonebot.log import logger
 from nonebot.utils import run_sync
 from pydantic import BaseModel, ConfigDict
@@ -18,13 +19,15 @@ from pydantic import BaseModel, ConfigDict
 from src.database import SystemSettingDAL, begin_db_session
 from src.utils.crypto import AESEncryptor
 from src.utils.image_utils import ImageEffectProcessor, ImageLoader
+from .config import omega_email_plugin_config
 from .consts import (
     DB_ENTITY_SETTING_MODULE_NAME,
     DB_ENTITY_SETTING_PLUGIN_NAME,
     DB_MAILBOX_ACCOUNT_SETTING_NAME,
     TMP_FOLDER,
 )
-from .mailbox import Email, ImapMailbox
+from .imap_client import ImapClientPool
+from .mailbox import Email
 
 if TYPE_CHECKING:
     from src.resource import TemporaryResource
@@ -127,24 +130,34 @@ async def get_entity_bound_mailbox(interface: 'OmMI') -> list[MailboxAccount]:
     ]
 
 
-@run_sync
-def check_mailbox(address: str, server_host: str, password: str) -> bool:
+_IMAP_CLIENT_POOL: ImapClientPool = ImapClientPool(
+    timeout=omega_email_plugin_config.omega_email_imap_timeout,
+    enable_idle=omega_email_plugin_config.omega_email_imap_enable_idle,
+)
+"""imap 客户端连接池, 各邮箱账号复用已登录的连接, 空闲连接保持 IDLE 接收新邮件推送"""
+
+
+@get_driver().on_shutdown
+async def _close_imap_client_pool() -> None:
+    """登出并关闭连接池中的全部客户端"""
+    await _IMAP_CLIENT_POOL.close()
+
+
+async def check_mailbox(address: str, server_host: str, password: str, port: int = 993) -> bool:
     """检查邮箱状态"""
     try:
-        ImapMailbox(host=server_host, address=address, password=password).check()
+        async with _IMAP_CLIENT_POOL.acquire(host=server_host, address=address, password=password, port=port):
+            pass
         return True
     except Exception as e:
         logger.error(f'OmegaEmail | Checking mailbox {address!r} failed, {e}')
         return False
 
 
-@run_sync
-def get_unseen_mail_data(address: str, server_host: str, password: str) -> list[Email]:
-    """获取未读邮件列表"""
-    mail = ImapMailbox(host=server_host, address=address, password=password)
-    unseen_mails = mail.get_mail_list(None, 'UNSEEN')
-    result = list(unseen_mails)
-    return result
+async def get_unseen_mail_data(address: str, server_host: str, password: str, port: int = 993) -> list[Email]:
+    """获取上次收件后新增的未读邮件列表, 连接在上次收件后一直 IDLE 且未收到新邮件推送时不再向服务器搜索"""
+    async with _IMAP_CLIENT_POOL.acquire(host=server_host, address=address, password=password, port=port) as client:
+        return await client.fetch_new_mails('UNSEEN')
 
 
 @run_sync
@@ -0,0 +1,486 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/11 10:42:18
+@FileName       : imap_client.py
+@Project        : omega-miya
+@Description    : 基于 asyncio 的 imap 协议客户端及连接池
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import re
+import ssl
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from nonebot.log import logger
+
+from .consts import IMAP_CLIENT_KEEPALIVE_INTERVAL, IMAP_CLIENT_POOL_SIZE, IMAP_IDLE_TIMEOUT
+from .mailbox import Email, parse_email
+
+_LITERAL_PATTERN = re.compile(rb'\{(\d+)\}\r\n$')
+_UIDVALIDITY_PATTERN = re.compile(rb'\[UIDVALIDITY (\d+)\]', re.IGNORECASE)
+_FETCH_UID_PATTERN = re.compile(rb'UID (\d+)', re.IGNORECASE)
+_EXISTS_PATTERN = re.compile(rb'^\* \d+ (EXISTS|RECENT)', re.IGNORECASE)
+
+
+class ImapClientError(Exception):
+    """Imap 命令执行失败"""
+
+    def __init__(self, command: str, response: str):
+        self.command = command
+        self.response = response
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(command={self.command!r}, response={self.response!r})'
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+
+@dataclass
+class _ResponseLine:
+    """单行服务器响应, 响应中的 literal 内容按顺序单独存放"""
+    text: bytes
+    literals: list[bytes] = field(default_factory=list)
+
+
+class ImapClient:
+    """Imap 邮箱异步客户端
+
+    保持已登录的长连接, 按 UID 增量获取邮件并记录已获取的最大 UID;
+    服务器支持 IDLE 时可通过 `idle` 等待新邮件推送, 否则退化为 NOOP 轮询;
+    自上次获取后持续处于 IDLE 且未收到新邮件通知时, 增量获取直接返回空结果而不再向服务器搜索;
+    连接、每次读取及写入均有超时限制, 超时后关闭连接, 避免服务器无响应时长时间占用连接
+    """
+
+    def __init__(
+            self,
+            host: str,
+            address: str,
+            password: str,
+            port: int = 993,
+            *,
+            use_ssl: bool = True,
+            mailbox: str = 'INBOX',
+            timeout: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.address = address
+        self.password = password
+        self.use_ssl = use_ssl
+        self.mailbox = mailbox
+        self.timeout = timeout
+
+        self.capabilities: set[str] = set()
+        self.uid_validity: int | None = None
+        self.last_seen_uid: int | None = None
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._tag_counter: int = 0
+        self._last_active_time: float = 0.0
+        self._idle_watched: bool = False
+        """上次搜索新邮件后是否一直通过 IDLE 监听邮箱"""
+        self._new_mail_notified: bool = True
+        """上次搜索新邮件后是否收到过新邮件通知, 连接断开等无法确认的情况也视为收到"""
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(host={self.host!r}, port={self.port!r}, address={self.address!r})'
+
+    @property
+    def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def has_new_mail(self) -> bool:
+        """上次搜索新邮件后是否可能有新邮件, 仅在一直通过 IDLE 监听且未收到新邮件通知时为 False"""
+        return not self._idle_watched or self._new_mail_notified
+
+    @staticmethod
+    def _quote(value: str) -> str:
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    def _next_tag(self) -> bytes:
+        self._tag_counter += 1
+        return f'OM{self._tag_counter:04d}'.encode()
+
+    async def _read_line(self, *, wait_forever: bool = False) -> _ResponseLine:
+        """读取一条完整的响应, 包括其中的 literal 内容
+
+        :param wait_forever: 等待响应开始时不限制超时, 用于 IDLE 等待服务器推送
+        """
+        if self._reader is None:
+            raise ConnectionError(f'{self} is not connected')
+
+        line = await asyncio.wait_for(self._reader.readline(), timeout=None if wait_forever else self.timeout)
+        if not line:
+            raise ConnectionError(f'{self} connection closed by server')
+
+        response = _ResponseLine(text=line)
+        while (literal := _LITERAL_PATTERN.search(line)) is not None:
+            response.literals.append(
+                await asyncio.wait_for(self._reader.readexactly(int(literal.group(1))), timeout=self.timeout)
+            )
+            line = await asyncio.wait_for(self._reader.readline(), timeout=self.timeout)
+            response.text += line
+        return response
+
+    async def _write(self, data: bytes) -> None:
+        if self._writer is None:
+            raise ConnectionError(f'{self} is not connected')
+        self._writer.write(data)
+        await asyncio.wait_for(self._writer.drain(), timeout=self.timeout)
+
+    async def _read_until_tagged(self, tag: bytes, command: str) -> list[_ResponseLine]:
+        untagged_responses = []
+        while True:
+            response = await self._read_line()
+            if response.text.startswith(tag + b' '):
+                status = response.text[len(tag) + 1:].split(maxsplit=1)[0].upper()
+                if status != b'OK':
+                    raise ImapClientError(command=command, response=response.text.decode(errors='ignore').strip())
+                return untagged_responses
+            untagged_responses.append(response)
+
+    async def _command(self, command: str, *args: str | bytes) -> list[_ResponseLine]:
+        """发送命令并返回命令完成前收到的全部未标记响应, bytes 参数以 literal 形式发送"""
+        tag = self._next_tag()
+        data = tag + b' ' + command.encode()
+        try:
+            for arg in args:
+                if isinstance(arg, bytes):
+                    await self._write(data + b' {' + str(len(arg)).encode() + b'}\r\n')
+                    while not (await self._read_line()).text.startswith(b'+'):
+                        pass
+                    data = arg
+                else:
+                    data += b' ' + arg.encode()
+            await self._write(data + b'\r\n')
+            responses = await self._read_until_tagged(tag=tag, command=command)
+        except (OSError, asyncio.IncompleteReadError):
+            # 包括读写超时(TimeoutError), 此时连接状态未知, 直接关闭
+            await self.close()
+            raise
+
+        self._last_active_time = time.monotonic()
+        if any(_EXISTS_PATTERN.match(x.text) for x in responses):
+            self._new_mail_notified = True
+        return responses
+
+    async def connect(self) -> None:
+        """连接服务器并登录"""
+        if self.is_connected:
+            return
+
+        ssl_context = ssl.create_default_context() if self.use_ssl else None
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(host=self.host, port=self.port, ssl=ssl_context), timeout=self.timeout
+        )
+        try:
+            greeting = await self._read_line()
+            if not greeting.text.upper().startswith(b'* OK'):
+                raise ImapClientError(command='CONNECT', response=greeting.text.decode(errors='ignore').strip())
+
+            # 非 ASCII 密码以 literal 形式发送
+            password = self._quote(self.password) if self.password.isascii() else self.password.encode()
+            await self._command('LOGIN', self._quote(self.address), password)
+
+            if self.address.endswith('@163.com'):
+                # 添加163邮箱 IMAP ID 验证
+                args = (
+                    'name', 'omega', 'contact', 'omega_miya@163.com', 'version', '1.0.2', 'vendor', 'omegaimapclient'
+                )
+                await self._command('ID', f'({" ".join(self._quote(x) for x in args)})')
+
+            capability_responses = await self._command('CAPABILITY')
+            self.capabilities = {
+                x.upper()
+                for response in capability_responses if response.text.upper().startswith(b'* CAPABILITY')
+                for x in response.text.decode().split()[2:]
+            }
+            await self.select()
+        except BaseException:
+            await self.close()
+            raise
+        logger.debug(f'OmegaEmail | {self} connected, capabilities: {", ".join(sorted(self.capabilities))}')
+
+    async def ensure_connected(self) -> None:
+        """确保连接可用, 连接空闲超过保活间隔时以 NOOP 检查, 失效则重新连接"""
+        if self.is_connected and time.monotonic() - self._last_active_time > IMAP_CLIENT_KEEPALIVE_INTERVAL:
+            try:
+                await self._command('NOOP')
+            except (OSError, asyncio.IncompleteReadError, ImapClientError) as e:
+                logger.debug(f'OmegaEmail | {self} keepalive failed and will reconnect, {e}')
+                await self.close()
+        await self.connect()
+
+    async def close(self) -> None:
+        """关闭连接, 不发送 LOGOUT"""
+        self._new_mail_notified = True
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass
+
+    async def logout(self) -> None:
+        """登出并关闭连接"""
+        if self.is_connected:
+            try:
+                await self._command('LOGOUT')
+            except (OSError, asyncio.IncompleteReadError, ImapClientError):
+                pass
+        await self.close()
+
+    async def select(self) -> None:
+        """选择邮箱文件夹, UIDVALIDITY 变化时重置已记录的 UID"""
+        responses = await self._command('SELECT', self._quote(self.mailbox))
+        self._new_mail_notified = True
+        for response in responses:
+            if (matched := _UIDVALIDITY_PATTERN.search(response.text)) is not None:
+                uid_validity = int(matched.group(1))
+                if self.uid_validity is not None and uid_validity != self.uid_validity:
+                    self.last_seen_uid = None
+                self.uid_validity = uid_validity
+
+    async def search_new_uids(self, *criteria: str) -> list[int]:
+        """搜索上次获取后新增的且满足条件的邮件 UID"""
+        if self.last_seen_uid is not None:
+            criteria = (*criteria, 'UID', f'{self.last_seen_uid + 1}:*')
+        responses = await self._command('UID SEARCH', *(criteria or ('ALL',)))
+        self._idle_watched = False
+        self._new_mail_notified = False
+
+        uids = [
+            int(x)
+            for response in responses if response.text.upper().startswith(b'* SEARCH')
+            for x in response.text.split()[2:]
+        ]
+        # "n:*" 在没有更大 UID 时仍会返回当前最大的 UID, 需要再次过滤
+        return sorted(x for x in uids if self.last_seen_uid is None or x > self.last_seen_uid)
+
+    async def fetch_mails(self, uids: list[int]) -> list[Email]:
+        """按 UID 获取并解析邮件"""
+        if not uids:
+            return []
+
+        responses = await self._command('UID FETCH', ','.join(str(x) for x in uids), '(UID RFC822)')
+        mails: dict[int, Email] = {}
+        for response in responses:
+            if not response.literals or (matched := _FETCH_UID_PATTERN.search(response.text)) is None:
+                continue
+            mails[int(matched.group(1))] = parse_email(response.literals[0])
+
+        self.last_seen_uid = max(uids if self.last_seen_uid is None else [self.last_seen_uid, *uids])
+        return [mails[x] for x in sorted(mails)]
+
+    async def fetch_new_mails(self, *criteria: str) -> list[Email]:
+        """获取上次获取后新增的且满足条件的邮件, 上次获取后一直通过 IDLE 监听且未收到新邮件通知时直接返回空结果"""
+        if not self.has_new_mail:
+            logger.trace(f'OmegaEmail | {self} has no new mail notification, skipped searching')
+            return []
+        return await self.fetch_mails(await self.search_new_uids(*criteria))
+
+    async def _wait_idle_notification(self, timeout: float, interrupt: asyncio.Event | None) -> bool:
+        """IDLE 期间等待新邮件通知, 超时或 `interrupt` 被设置时返回 False"""
+
+        async def _wait_exists() -> None:
+            while not _EXISTS_PATTERN.match((await self._read_line(wait_forever=True)).text):
+                pass
+
+        wait_task = asyncio.create_task(_wait_exists())
+        waiters: set[asyncio.Task] = {wait_task}
+        if interrupt is not None:
+            waiters.add(asyncio.create_task(interrupt.wait()))
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+
+        if wait_task.cancelled():
+            return False
+        wait_task.result()
+        return True
+
+    async def idle(self, timeout: float = IMAP_IDLE_TIMEOUT, *, interrupt: asyncio.Event | None = None) -> bool:
+        """等待新邮件, 超时前收到新邮件通知时返回 True
+
+        服务器不支持 IDLE 时立即发送 NOOP 检查
+
+        :param timeout: 单次 IDLE 的最长等待时间
+        :param interrupt: 该事件被设置时提前结束等待
+        """
+        if 'IDLE' not in self.capabilities:
+            responses = await self._command('NOOP')
+            return any(_EXISTS_PATTERN.match(x.text) for x in responses)
+
+        tag = self._next_tag()
+        has_new_mail = False
+        try:
+            await self._write(tag + b' IDLE\r\n')
+            while not (response := await self._read_line()).text.startswith(b'+'):
+                if response.text.startswith(tag + b' '):
+                    raise ImapClientError(command='IDLE', response=response.text.decode(errors='ignore').strip())
+                has_new_mail = has_new_mail or _EXISTS_PATTERN.match(response.text) is not None
+
+            if not has_new_mail:
+                has_new_mail = await self._wait_idle_notification(timeout=timeout, interrupt=interrupt)
+
+            await self._write(b'DONE\r\n')
+            responses = await self._read_until_tagged(tag=tag, command='IDLE')
+            has_new_mail = has_new_mail or any(_EXISTS_PATTERN.match(x.text) for x in responses)
+        except (OSError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # IDLE 被中断时连接状态未知, 直接关闭
+            await self.close()
+            raise
+
+        self._last_active_time = time.monotonic()
+        self._idle_watched = True
+        if has_new_mail:
+            self._new_mail_notified = True
+        return has_new_mail
+
+
+class ImapClientPool:
+    """Imap 客户端连接池
+
+    每个邮箱账号复用一个已登录的客户端, 同一客户端同时仅供一个调用方使用;
+    客户端数量达到上限时关闭最久未使用的空闲客户端, 全部占用时等待释放;
+    启用 IDLE 时, 服务器支持 IDLE 的空闲客户端在后台持续 IDLE 接收新邮件推送, 获取客户端时结束 IDLE
+    """
+
+    def __init__(self, max_size: int = IMAP_CLIENT_POOL_SIZE, *, timeout: float = 30.0, enable_idle: bool = True):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.enable_idle = enable_idle
+        self._clients: OrderedDict[tuple[str, int, str], ImapClient] = OrderedDict()
+        self._in_use: set[tuple[str, int, str]] = set()
+        self._idle_watchers: dict[tuple[str, int, str], tuple[asyncio.Task[None], asyncio.Event]] = {}
+        self._condition = asyncio.Condition()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(max_size={self.max_size}, size={len(self._clients)})'
+
+    @staticmethod
+    async def _idle_watch(client: ImapClient, stop: asyncio.Event) -> None:
+        """空闲客户端在后台持续 IDLE, 记录新邮件推送并保持连接"""
+        try:
+            while not stop.is_set():
+                if await client.idle(interrupt=stop):
+                    logger.debug(f'OmegaEmail | {client} received new mail notification')
+        except Exception as e:
+            logger.debug(f'OmegaEmail | {client} idle watching stopped, {e}')
+            await client.close()
+
+    def _start_idle_watcher(self, client: ImapClient) -> None:
+        if not (self.enable_idle and client.is_connected and 'IDLE' in client.capabilities):
+            return
+        stop = asyncio.Event()
+        key = (client.host, client.port, client.address)
+        self._idle_watchers[key] = (asyncio.create_task(self._idle_watch(client, stop)), stop)
+
+    @staticmethod
+    async def _stop_idle_watchers(watchers: list[tuple[asyncio.Task[None], asyncio.Event]]) -> None:
+        for _, stop in watchers:
+            stop.set()
+        await asyncio.gather(*(task for task, _ in watchers), return_exceptions=True)
+
+    async def _checkout(
+            self,
+            host: str,
+            address: str,
+            password: str,
+            port: int,
+    ) -> tuple[ImapClient, list[ImapClient], list[tuple[asyncio.Task[None], asyncio.Event]]]:
+        key = (host, port, address)
+        evicted_clients = []
+        stopped_watchers = []
+        async with self._condition:
+            while True:
+                if key in self._in_use:
+                    await self._condition.wait()
+                    continue
+
+                if key not in self._clients and len(self._clients) >= self.max_size:
+                    idle_key = next((x for x in self._clients if x not in self._in_use), None)
+                    if idle_key is None:
+                        await self._condition.wait()
+                        continue
+                    evicted_clients.append(self._clients.pop(idle_key))
+                    if (watcher := self._idle_watchers.pop(idle_key, None)) is not None:
+                        stopped_watchers.append(watcher)
+
+                if key not in self._clients:
+                    self._clients[key] = ImapClient(
+                        host=host, address=address, password=password, port=port, timeout=self.timeout
+                    )
+                client = self._clients[key]
+                self._clients.move_to_end(key)
+                self._in_use.add(key)
+                if (watcher := self._idle_watchers.pop(key, None)) is not None:
+                    stopped_watchers.append(watcher)
+                break
+
+        return client, evicted_clients, stopped_watchers
+
+    async def _checkin(self, client: ImapClient, *, discard: bool = False) -> None:
+        key = (client.host, client.port, client.address)
+        async with self._condition:
+            self._in_use.discard(key)
+            if discard:
+                self._clients.pop(key, None)
+            elif self._clients.get(key) is client:
+                self._start_idle_watcher(client)
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def acquire(self, host: str, address: str, password: str, port: int = 993) -> AsyncIterator[ImapClient]:
+        """获取已连接的邮箱客户端, 使用过程中出现异常时关闭并丢弃该客户端"""
+        client, evicted_clients, stopped_watchers = await self._checkout(
+            host=host, address=address, password=password, port=port
+        )
+
+        try:
+            await self._stop_idle_watchers(stopped_watchers)
+            for evicted_client in evicted_clients:
+                await evicted_client.logout()
+            if client.password != password:
+                client.password = password
+                await client.close()
+            await client.ensure_connected()
+            yield client
+        except BaseException:
+            await client.close()
+            await self._checkin(client, discard=True)
+            raise
+        else:
+            await self._checkin(client)
+
+    async def close(self) -> None:
+        """登出并关闭全部客户端"""
+        async with self._condition:
+            clients = list(self._clients.values())
+            watchers = list(self._idle_watchers.values())
+            self._clients.clear()
+            self._idle_watchers.clear()
+        await self._stop_idle_watchers(watchers)
+        for client in clients:
+            await client.logout()
+
+
+__all__ = [
+    'ImapClient',
+    'ImapClientError',
+    'ImapClientPool',
+]
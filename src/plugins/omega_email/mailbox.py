@@ -27,6 +27,67 @@ class Email(BaseModel):
     html: str = ''
 
 
+def _decode_header(header: Header | str) -> str:
+    """解析邮件 header 为文本"""
+    header_content = email.header.decode_header(header)  # type: ignore
+    output_text = ''
+    for content, charset in header_content:
+        if charset and isinstance(content, bytes):
+            content = str(content, encoding=charset)
+            output_text += content
+        elif isinstance(content, bytes):
+            content = str(content, encoding='utf8')
+            output_text += content
+        else:
+            output_text += content
+    return output_text
+
+
+def parse_email(content: bytes) -> Email:
+    """解析 RFC822 格式的邮件内容"""
+    msg = email.message_from_bytes(content)
+
+    # 日期
+    date = email.header.decode_header(msg.get('Date'))[0][0]  # type: ignore
+    date = str(date)
+    # 标题
+    header = _decode_header(msg.get('subject', ''))
+    # 发件人
+    sender = _decode_header(msg.get('from', ''))
+    # 收件人
+    receiver = _decode_header(msg.get('to', ''))
+
+    body_list = []
+    html_list = []
+    for part in msg.walk():
+        charset = part.get_content_charset()
+        part_content = part.get_payload(decode=True)
+        if not part_content:
+            continue
+        if charset and isinstance(part_content, bytes):
+            content_text = str(part_content, encoding=charset)
+        elif isinstance(part_content, bytes):
+            content_text = str(part_content, encoding='utf8')
+        else:
+            content_text = str(part_content)
+
+        # 根据内容形式进一步解析处理
+        if part.get_content_type() == 'text/plain':
+            content_text = content_text.replace(r'&nbsp;', '\n')
+            body_list.append(content_text)
+        elif part.get_content_type() == 'text/html':
+            content_text = re.sub(re.compile(r'<br\s?/?>', re.IGNORECASE), '\n', content_text)
+            html_ = etree.HTML(content_text)
+            html_list.append(''.join(text for text in html_.itertext()))
+        else:
+            pass
+
+    body = '\n'.join(body_list) if body_list else ''
+    html = '\n'.join(html_list) if html_list else ''
+
+    return Email(date=date, header=header, sender=sender, to=receiver, body=body, html=html)
+
+
 class BaseMailbox(abc.ABC):
     """邮箱客户端基类"""
 
@@ -54,22 +115,6 @@ class ImapMailbox(BaseMailbox):
         self.__address = address
         self.__password = password
 
-    @staticmethod
-    def _decode_header(header: Header | str) -> str:
-        """解析邮件 header 为文本"""
-        header_content = email.header.decode_header(header)  # type: ignore
-        output_text = ''
-        for content, charset in header_content:
-            if charset and isinstance(content, bytes):
-                content = str(content, encoding=charset)
-                output_text += content
-            elif isinstance(content, bytes):
-                content = str(content, encoding='utf8')
-                output_text += content
-            else:
-                output_text += content
-        return output_text
-
     def check(self) -> None:
         self.__mail.login(self.__address, self.__password)
         self.__mail.select()
@@ -102,49 +147,7 @@ class ImapMailbox(BaseMailbox):
             msg_content: bytes | tuple[bytes, bytes] | None = data[0]
             if msg_content is None:
                 continue
-            else:
-                msg = email.message_from_bytes(msg_content[1])  # type: ignore
-
-            # 解析邮件
-            # 日期
-            date = email.header.decode_header(msg.get('Date'))[0][0]  # type: ignore
-            date = str(date)
-            # 标题
-            header = self._decode_header(msg.get('subject', ''))
-            # 发件人
-            sender = self._decode_header(msg.get('from', ''))
-            # 收件人
-            receiver = self._decode_header(msg.get('to', ''))
-
-            body_list = []
-            html_list = []
-            for part in msg.walk():
-                charset = part.get_content_charset()
-                part_content = part.get_payload(decode=True)
-                if not part_content:
-                    continue
-                if charset and isinstance(part_content, bytes):
-                    content_text = str(part_content, encoding=charset)
-                elif isinstance(part_content, bytes):
-                    content_text = str(part_content, encoding='utf8')
-                else:
-                    content_text = str(part_content)
-
-                # 根据内容形式进一步解析处理
-                if part.get_content_type() == 'text/plain':
-                    content_text = content_text.replace(r'&nbsp;', '\n')
-                    body_list.append(content_text)
-                elif part.get_content_type() == 'text/html':
-                    content_text = re.sub(re.compile(r'<br\s?/?>', re.IGNORECASE), '\n', content_text)
-                    html_ = etree.HTML(content_text)
-                    html_list.append(''.join(text for text in html_.itertext()))
-                else:
-                    pass
-
-            body = '\n'.join(body_list) if body_list else ''
-            html = '\n'.join(html_list) if html_list else ''
-
-            result_list.append(Email(date=date, header=header, sender=sender, to=receiver, body=body, html=html))
+            result_list.append(parse_email(msg_content[1]))  # type: ignore
 
         # 断开邮箱连接
         self.__mail.select()
@@ -161,4 +164,5 @@ class ImapMailbox(BaseMailbox):
 __all__ = [
     'Email',
     'ImapMailbox',
+    'parse_email',
 ]
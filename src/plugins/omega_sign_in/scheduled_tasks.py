@@ -0,0 +1,61 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/20 21:48:13
+@FileName       : scheduled_tasks
+@Project        : omega-miya
+@Description    : 签到汇总后台任务
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from datetime import datetime, timedelta
+
+from nonebot.log import logger
+
+from src.database import SignInSummaryDAL, begin_db_session
+from src.service import scheduler
+
+_BACKFILL_BATCH_SIZE: int = 200
+"""每批生成签到汇总的实体数量"""
+
+
+async def backfill_sign_in_summary() -> int:
+    """为已有签到记录但尚未生成签到汇总的实体生成汇总, 返回处理的实体数量, 全部生成后不再有实际操作"""
+    processed_count = 0
+    while True:
+        async with begin_db_session() as session:
+            sign_in_summary_dal = SignInSummaryDAL(session=session)
+            entity_index_ids = await sign_in_summary_dal.query_missing_entity_index_ids(limit=_BACKFILL_BATCH_SIZE)
+            for entity_index_id in entity_index_ids:
+                await sign_in_summary_dal.rebuild(entity_index_id=entity_index_id)
+
+        processed_count += len(entity_index_ids)
+        if len(entity_index_ids) < _BACKFILL_BATCH_SIZE:
+            return processed_count
+
+
+async def sign_in_summary_backfill_task() -> None:
+    """启动后一次性回填签到汇总"""
+    logger.debug('SignIn | Started backfilling sign in summary')
+    try:
+        processed_count = await backfill_sign_in_summary()
+        if processed_count:
+            logger.success(f'SignIn | Backfilled sign in summary for {processed_count} entities')
+    except Exception as e:
+        logger.error(f'SignIn | Backfilling sign in summary failed, {e!r}')
+
+
+scheduler.add_job(
+    sign_in_summary_backfill_task,
+    'date',
+    run_date=datetime.now() + timedelta(minutes=1),
+    id='omega_sign_in_summary_backfill',
+    coalesce=True,
+    max_instances=1,
+    misfire_grace_time=600,
+)
+
+
+__all__ = [
+    'scheduler',
+]
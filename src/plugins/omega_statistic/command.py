@@ -15,10 +15,10 @@ from nonebot.params import Depends
 from nonebot.permission import SUPERUSER
 from nonebot.plugin import CommandGroup
 
-from src.database import StatisticDAL
 from src.service import OmegaMatcherInterface as OmMI
 from src.service import OmegaMessageSegment, enable_processor_state
 from .helpers import draw_statistics
+from .rollup import query_statistic_count
 
 # 注册事件响应器
 statistic = CommandGroup(
@@ -32,10 +32,9 @@ statistic = CommandGroup(
 @statistic.command('event-entity', aliases={'统计信息', '使用统计', '插件统计'}).handle()
 async def handle_event_entity_statistic(
         interface: Annotated[OmMI, Depends(OmMI.depend())],
-        statistic_dal: Annotated[StatisticDAL, Depends(StatisticDAL.dal_dependence)],
 ) -> None:
     try:
-        statistic_data = await statistic_dal.count_by_condition(
+        statistic_data = await query_statistic_count(
             bot_self_id=interface.bot.self_id,
             parent_entity_id=interface.entity.parent_id,
             entity_id=interface.entity.entity_id
@@ -53,10 +52,9 @@ async def handle_event_entity_statistic(
 @statistic.command('bot-all', permission=SUPERUSER).handle()
 async def handle_bot_all_statistic(
         interface: Annotated[OmMI, Depends(OmMI.depend())],
-        statistic_dal: Annotated[StatisticDAL, Depends(StatisticDAL.dal_dependence)],
 ) -> None:
     try:
-        statistic_data = await statistic_dal.count_by_condition(bot_self_id=interface.bot.self_id)
+        statistic_data = await query_statistic_count(bot_self_id=interface.bot.self_id)
         statistic_image = await draw_statistics(
             statistics_data=statistic_data, title=f'{interface.bot.type} Bot {interface.bot.self_id} 插件使用情况统计'
         )
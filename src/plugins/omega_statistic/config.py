@@ -0,0 +1,43 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/4 20:36:52
+@FileName       : config
+@Project        : omega-miya
+@Description    : 统计插件配置
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from nonebot import get_plugin_config, logger
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+
+class OmegaStatisticPluginConfig(BaseModel):
+    """OmegaStatistic 插件配置"""
+    # 启用后台增量汇总, 按小时及日期预先汇总插件调用次数
+    omega_statistic_enable_rollup: bool = True
+    # 后台增量汇总每批处理的统计记录数量
+    omega_statistic_rollup_batch_size: int = 5000
+    # 后台增量汇总每次执行最多处理的批次数量
+    omega_statistic_rollup_max_batches: int = 20
+    # 已汇总的原始统计记录保留天数, 为 0 则永久保留, 启用后超出天数的原始记录将被永久删除, 仅保留汇总结果
+    omega_statistic_raw_retention_days: int = 0
+    # 按小时汇总的统计保留天数, 为 0 则永久保留
+    omega_statistic_hourly_rollup_retention_days: int = 90
+    # 清理过期统计记录时每批删除的记录数量
+    omega_statistic_cleanup_batch_size: int = 5000
+
+    model_config = ConfigDict(extra='ignore')
+
+
+try:
+    omega_statistic_plugin_config = get_plugin_config(OmegaStatisticPluginConfig)
+except ValidationError as e:
+    import sys
+
+    logger.opt(colors=True).critical(f'<r>OmegaStatistic 插件配置格式验证失败</r>, 错误信息:\n{e}')
+    sys.exit(f'OmegaStatistic 插件配置格式验证失败, {e}')
+
+__all__ = [
+    'omega_statistic_plugin_config',
+]
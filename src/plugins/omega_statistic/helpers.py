@@ -12,15 +12,20 @@ from collections.abc import Sequence
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-import matplotlib.cm as cm
-from matplotlib.colors import Normalize
 from nonebot.utils import run_sync
 
+from src.utils.import_utils import lazy_import
 from src.utils.statistics_tools import create_simple_subplots_figure, output_figure
 
 if TYPE_CHECKING:
+    import matplotlib.cm as cm
+    import matplotlib.colors as colors
+
     from src.database.internal.statistic import CountStatisticModel
     from src.resource import TemporaryResource
+else:
+    cm = lazy_import('matplotlib.cm')
+    colors = lazy_import('matplotlib.colors')
 
 
 async def draw_statistics(
@@ -40,7 +45,7 @@ async def draw_statistics(
 
         # 归一化数据以适用于颜色映射
         viridis = cm.get_cmap('plasma')
-        norm = Normalize(vmin=min(x_value), vmax=max(x_value))
+        norm = colors.Normalize(vmin=min(x_value), vmax=max(x_value))
 
         # 绘制条形图
         fig, ax = create_simple_subplots_figure()
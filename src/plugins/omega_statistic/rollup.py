@@ -0,0 +1,215 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/4 20:48:15
+@FileName       : rollup
+@Project        : omega-miya
+@Description    : 统计信息增量汇总及过期清理
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from src.compat import parse_obj_as
+from src.database import StatisticDAL, StatisticRollupDAL, begin_db_session
+from src.database.internal.statistic import CountStatisticModel
+from src.utils.incremental_cursor import CursorPosition, IncrementalCursor
+from .config import omega_statistic_plugin_config
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from src.database.internal.statistic import Statistic
+    from src.database.internal.statistic_rollup import RollupBucketType
+
+_ROLLUP_CURSOR: IncrementalCursor = IncrementalCursor(
+    setting_name='omega_statistic_rollup',
+    setting_key='last_statistic_position',
+    info='插件调用统计增量汇总已处理的统计记录位置',
+    settle_delay=timedelta(seconds=60),
+)
+"""插件调用统计增量汇总处理进度"""
+
+
+def _floor_hour(time: datetime) -> datetime:
+    return time.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(time: datetime) -> datetime:
+    floor_time = _floor_hour(time)
+    return floor_time if floor_time == time else floor_time + timedelta(hours=1)
+
+
+def _floor_day(time: datetime) -> datetime:
+    return time.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil_day(time: datetime) -> datetime:
+    floor_time = _floor_day(time)
+    return floor_time if floor_time == time else floor_time + timedelta(days=1)
+
+
+async def _query_statistic_position() -> CursorPosition | None:
+    """查询增量汇总已处理的统计记录位置"""
+    async with begin_db_session() as session:
+        return await _ROLLUP_CURSOR.query_position(session)
+
+
+def _group_statistics(
+        statistics: Sequence['Statistic'],
+) -> dict[tuple['RollupBucketType', datetime, str, str, str], Counter[str]]:
+    """按汇总粒度、时段及实体分组统计插件调用次数"""
+    grouped_count: dict[tuple[RollupBucketType, datetime, str, str, str], Counter[str]] = defaultdict(Counter)
+    for statistic in statistics:
+        entity_key = (statistic.bot_self_id, statistic.parent_entity_id, statistic.entity_id)
+        grouped_count[('hour', _floor_hour(statistic.call_time), *entity_key)][statistic.plugin_name] += 1
+        grouped_count[('day', _floor_day(statistic.call_time), *entity_key)][statistic.plugin_name] += 1
+    return grouped_count
+
+
+async def _update_statistic_rollup_batch(
+        session: 'AsyncSession',
+        position: CursorPosition | None,
+        end_time: datetime,
+) -> tuple[CursorPosition | None, int]:
+    """处理一批新增的统计记录, 返回处理后的统计记录位置及本批处理的记录数量"""
+    statistics = await StatisticDAL(session).query_records_after(
+        after_key=position, limit=omega_statistic_plugin_config.omega_statistic_rollup_batch_size, end_time=end_time
+    )
+    if not statistics:
+        return position, 0
+
+    rollup_dal = StatisticRollupDAL(session)
+    for (bucket_type, bucket_start, bot_self_id, parent_entity_id, entity_id), plugin_call_count in (
+            _group_statistics(statistics=statistics).items()
+    ):
+        await rollup_dal.increase(
+            bucket_type=bucket_type,
+            bucket_start=bucket_start,
+            bot_self_id=bot_self_id,
+            parent_entity_id=parent_entity_id,
+            entity_id=entity_id,
+            plugin_call_count=plugin_call_count,
+        )
+    return (statistics[-1].call_time, statistics[-1].id), len(statistics)
+
+
+async def update_statistic_rollup() -> int:
+    """增量汇总新增的统计记录, 返回本次处理的记录数量"""
+    return await _ROLLUP_CURSOR.run_batches(
+        _update_statistic_rollup_batch,
+        batch_size=omega_statistic_plugin_config.omega_statistic_rollup_batch_size,
+        max_batches=omega_statistic_plugin_config.omega_statistic_rollup_max_batches,
+    )
+
+
+async def clean_expired_statistic() -> int:
+    """清理超过保留期限的原始统计记录及按小时汇总的统计, 返回清理的原始记录数量
+
+    仅清理已被汇总处理过的原始记录
+    """
+    deleted_count = 0
+    now = datetime.now()
+    position = await _query_statistic_position()
+
+    raw_retention_days = omega_statistic_plugin_config.omega_statistic_raw_retention_days
+    if raw_retention_days > 0 and position is not None:
+        # 调用时间早于游标位置的记录均已被汇总处理
+        delete_before_time = min(now - timedelta(days=raw_retention_days), position[0])
+        batch_size = omega_statistic_plugin_config.omega_statistic_cleanup_batch_size
+        while True:
+            async with begin_db_session() as session:
+                batch_count = await StatisticDAL(session).delete_before(call_time=delete_before_time, limit=batch_size)
+            deleted_count += batch_count
+            if batch_count < batch_size:
+                break
+
+    if (hourly_retention_days := omega_statistic_plugin_config.omega_statistic_hourly_rollup_retention_days) > 0:
+        async with begin_db_session() as session:
+            await StatisticRollupDAL(session).delete_before(
+                bucket_type='hour', bucket_start=_floor_day(now - timedelta(days=hourly_retention_days))
+            )
+
+    return deleted_count
+
+
+def _align_start_time(start_time: datetime) -> datetime:
+    """原始记录或按小时汇总的统计可能已被清理时, 将起始时间向前对齐到仍保留的汇总粒度"""
+    now = datetime.now()
+    raw_retention_days = omega_statistic_plugin_config.omega_statistic_raw_retention_days
+    if raw_retention_days > 0 and start_time < now - timedelta(days=raw_retention_days):
+        start_time = _floor_hour(start_time)
+    hourly_retention_days = omega_statistic_plugin_config.omega_statistic_hourly_rollup_retention_days
+    if hourly_retention_days > 0 and start_time < now - timedelta(days=hourly_retention_days):
+        start_time = _floor_day(start_time)
+    return start_time
+
+
+async def query_statistic_count(
+        *,
+        bot_self_id: str | None = None,
+        parent_entity_id: str | None = None,
+        entity_id: str | None = None,
+        start_time: datetime | None = None,
+) -> list[CountStatisticModel]:
+    """按条件查询各插件调用次数
+
+    完整时段内的调用次数直接使用预先汇总的统计结果,
+    起始时间所在的不完整小时及尚未被后台处理的新增记录则实时查询原始记录后合并
+    """
+    if not omega_statistic_plugin_config.omega_statistic_enable_rollup:
+        async with begin_db_session() as session:
+            return await StatisticDAL(session).count_by_condition(
+                bot_self_id=bot_self_id, parent_entity_id=parent_entity_id, entity_id=entity_id, start_time=start_time
+            )
+
+    call_count: Counter[str] = Counter()
+    async with _ROLLUP_CURSOR.lock:
+        async with begin_db_session() as session:
+            position = await _ROLLUP_CURSOR.query_position(session)
+            statistic_dal = StatisticDAL(session)
+            rollup_dal = StatisticRollupDAL(session)
+
+            if start_time is None:
+                call_count.update(await rollup_dal.count_by_condition(
+                    'day', bot_self_id=bot_self_id, parent_entity_id=parent_entity_id, entity_id=entity_id
+                ))
+            else:
+                start_time = _align_start_time(start_time)
+                hour_start_time = _ceil_hour(start_time)
+                day_start_time = _ceil_day(start_time)
+
+                if start_time < hour_start_time and position is not None:
+                    head_statistics = await statistic_dal.count_by_condition(
+                        bot_self_id=bot_self_id, parent_entity_id=parent_entity_id, entity_id=entity_id,
+                        start_time=start_time, end_time=hour_start_time, max_key=position
+                    )
+                    call_count.update({x.custom_name: x.call_count for x in head_statistics})
+                if hour_start_time < day_start_time:
+                    call_count.update(await rollup_dal.count_by_condition(
+                        'hour', bot_self_id=bot_self_id, parent_entity_id=parent_entity_id, entity_id=entity_id,
+                        start_time=hour_start_time, end_time=day_start_time
+                    ))
+                call_count.update(await rollup_dal.count_by_condition(
+                    'day', bot_self_id=bot_self_id, parent_entity_id=parent_entity_id, entity_id=entity_id,
+                    start_time=day_start_time
+                ))
+
+            tail_statistics = await statistic_dal.count_by_condition(
+                bot_self_id=bot_self_id, parent_entity_id=parent_entity_id, entity_id=entity_id,
+                start_time=start_time, after_key=position
+            )
+            call_count.update({x.custom_name: x.call_count for x in tail_statistics})
+
+    data = [{'custom_name': plugin_name, 'call_count': count} for plugin_name, count in call_count.items()]
+    return parse_obj_as(list[CountStatisticModel], data)
+
+
+__all__ = [
+    'clean_expired_statistic',
+    'query_statistic_count',
+    'update_statistic_rollup',
+]
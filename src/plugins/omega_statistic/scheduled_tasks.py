@@ -0,0 +1,82 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/4 21:20:07
+@FileName       : scheduled_tasks
+@Project        : omega-miya
+@Description    : 统计信息后台汇总及清理任务
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from nonebot.log import logger
+
+from src.service import scheduler
+from .config import omega_statistic_plugin_config
+from .rollup import clean_expired_statistic, update_statistic_rollup
+
+
+async def omega_statistic_rollup_updater() -> None:
+    """增量汇总新增的统计记录"""
+    logger.debug('OmegaStatistic | Started updating statistic rollup')
+    try:
+        processed_count = await update_statistic_rollup()
+        logger.debug(f'OmegaStatistic | Rolled up {processed_count} statistic records')
+    except Exception as e:
+        logger.error(f'OmegaStatistic | Updating statistic rollup failed, {e!r}')
+
+
+async def omega_statistic_expired_cleaner() -> None:
+    """清理超过保留期限的统计记录"""
+    logger.debug('OmegaStatistic | Started cleaning expired statistic')
+    try:
+        deleted_count = await clean_expired_statistic()
+        logger.info(f'OmegaStatistic | Cleaned {deleted_count} expired statistic records')
+    except Exception as e:
+        logger.error(f'OmegaStatistic | Cleaning expired statistic failed, {e!r}')
+
+
+if omega_statistic_plugin_config.omega_statistic_enable_rollup:
+    scheduler.add_job(
+        omega_statistic_rollup_updater,
+        'cron',
+        # year=None,
+        # month=None,
+        # day='*/1',
+        # week=None,
+        # day_of_week=None,
+        # hour=None,
+        minute='*/5',
+        second='23',
+        # start_date=None,
+        # end_date=None,
+        # timezone=None,
+        id='omega_statistic_rollup_updater',
+        coalesce=True,
+        max_instances=1,
+        misfire_grace_time=120,
+    )
+
+    scheduler.add_job(
+        omega_statistic_expired_cleaner,
+        'cron',
+        # year=None,
+        # month=None,
+        # day='*/1',
+        # week=None,
+        # day_of_week=None,
+        hour='4',
+        minute='17',
+        second='37',
+        # start_date=None,
+        # end_date=None,
+        # timezone=None,
+        id='omega_statistic_expired_cleaner',
+        coalesce=True,
+        max_instances=1,
+        misfire_grace_time=600,
+    )
+
+
+__all__ = [
+    'scheduler',
+]
@@ -17,15 +17,19 @@ from nonebot.plugin import on_message
 
 from src.params.rule import event_has_global_permission
 from src.service import enable_processor_state
+from .engine import RepeaterEngine, message_digest
 
-LAST_MSG: dict[int, str] = {}
-"""记录上一条收到的消息"""
-LAST_REPEAT_MSG: dict[int, str] = {}
-"""记录上一条复读过的消息"""
-REPEAT_COUNT: dict[int, int] = {}
-"""记录之前相同消息重复的次数"""
 REPEAT_THRESHOLD: int = 3
 """复读阈值, 重复的消息达到多少条就复读"""
+REPEATER_MAX_GROUPS: int = 2048
+"""保存复读状态的群组数量上限"""
+REPEATER_GROUP_IDLE_EXPIRE: float = 6 * 60 * 60
+"""群组复读状态空闲过期时间(秒)"""
+
+_REPEATER_ENGINE: RepeaterEngine = RepeaterEngine(
+    threshold=REPEAT_THRESHOLD, max_groups=REPEATER_MAX_GROUPS, idle_expire=REPEATER_GROUP_IDLE_EXPIRE
+)
+"""复读判定引擎"""
 
 
 async def handle_ignore_msg(bot: OneBotV11Bot, event: OneBotV11GroupMessageEvent):
@@ -48,34 +52,9 @@ async def handle_ignore_msg(bot: OneBotV11Bot, event: OneBotV11GroupMessageEvent
 ).handle()
 async def handle_repeater(event: OneBotV11GroupMessageEvent, matcher: Matcher):
     """处理复读"""
-    group_id = event.group_id
-    try:
-        LAST_MSG[group_id]
-    except KeyError:
-        LAST_MSG[group_id] = ''
-    try:
-        LAST_REPEAT_MSG[group_id]
-    except KeyError:
-        LAST_REPEAT_MSG[group_id] = ''
-
     message = event.get_message()
-    raw_msg = event.raw_message
-
-    # 如果当前消息与上一条消息不同, 或者与上一次复读的消息相同, 则重置复读计数, 并更新上一条消息LAST_MSG
-    if raw_msg != LAST_MSG[group_id] or raw_msg == LAST_REPEAT_MSG[group_id]:
-        LAST_MSG[group_id] = raw_msg
-        REPEAT_COUNT[group_id] = 0
-        return
-    # 否则这条消息和上条消息一致, 开始复读计数
-    else:
-        REPEAT_COUNT[group_id] += 1
-        LAST_REPEAT_MSG[group_id] = ''
-        # 当复读计数等于2时说明已经有连续3条同样的消息了, 此时触发复读, 更新上次服务消息LAST_REPEAT_MSG, 并重置复读计数
-        if REPEAT_COUNT[group_id] >= REPEAT_THRESHOLD - 1:
-            REPEAT_COUNT[group_id] = 0
-            LAST_MSG[group_id] = ''
-            LAST_REPEAT_MSG[group_id] = raw_msg
-            await matcher.send(message)
+    if _REPEATER_ENGINE.feed(group_id=event.group_id, digest=message_digest(message)):
+        await matcher.send(message)
 
 
 __all__ = []
@@ -0,0 +1,134 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/11 16:05:37
+@FileName       : engine.py
+@Project        : omega-miya
+@Description    : 复读判定引擎
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from nonebot.adapters.onebot.v11 import Message, MessageSegment
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_IGNORED_DATA_KEYS: frozenset[str] = frozenset({'url', 'file_size', 'cache', 'proxy', 'timeout', 'subType', 'sub_type'})
+"""消息段中与内容无关的字段, 同一内容每次发送可能不同, 不参与比较"""
+
+
+def _normalize_image_file(file: str) -> str:
+    """图片文件名一般为图片内容的 md5, 去除扩展名及大小写差异"""
+    return file.rsplit('.', 1)[0].lower() if '.' in file else file.lower()
+
+
+def _normalize_segment(segment: 'MessageSegment') -> str:
+    match segment.type:
+        case 'text':
+            return _WHITESPACE_PATTERN.sub(' ', segment.data.get('text', '')).strip()
+        case 'image':
+            file = segment.data.get('file_unique') or segment.data.get('file') or ''
+            return f'[image:{_normalize_image_file(str(file))}]'
+        case _:
+            data = ','.join(
+                f'{k}={v}' for k, v in sorted(segment.data.items()) if k not in _IGNORED_DATA_KEYS and v is not None
+            )
+            return f'[{segment.type}:{data}]'
+
+
+def normalize_message(message: 'Message') -> str:
+    """将消息转换为规范形式, 图片以文件哈希代替 URL, 文本合并连续空白字符并去除首尾空白"""
+    return ''.join(_normalize_segment(x) for x in message)
+
+
+def message_digest(message: 'Message') -> bytes:
+    """计算消息规范形式的定长摘要"""
+    return hashlib.blake2b(normalize_message(message).encode('utf8'), digest_size=16).digest()
+
+
+class _GroupRepeatState:
+    """单个群组的复读状态"""
+
+    __slots__ = ('last_digest', 'last_repeat_digest', 'repeat_count', 'last_active_time')
+
+    def __init__(self):
+        self.last_digest: bytes | None = None
+        self.last_repeat_digest: bytes | None = None
+        self.repeat_count: int = 0
+        self.last_active_time: float = 0.0
+
+
+class RepeaterEngine:
+    """复读判定引擎
+
+    各群组仅保存上一条消息及上一次复读消息的摘要, 群组状态以 LRU 保存,
+    数量超过上限时淘汰最久未活跃的群组, 超过空闲时间未活跃的群组同样被淘汰
+    """
+
+    def __init__(self, threshold: int, max_groups: int, idle_expire: float):
+        """
+        :param threshold: 复读阈值, 连续相同的消息达到多少条就复读
+        :param max_groups: 保存状态的群组数量上限
+        :param idle_expire: 群组状态空闲过期时间(秒)
+        """
+        self.threshold = threshold
+        self.max_groups = max_groups
+        self.idle_expire = idle_expire
+        self._states: OrderedDict[int, _GroupRepeatState] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(threshold={self.threshold}, groups={len(self._states)})'
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _evict(self, now: float) -> None:
+        while self._states:
+            group_id, state = next(iter(self._states.items()))
+            if len(self._states) > self.max_groups or now - state.last_active_time > self.idle_expire:
+                self._states.pop(group_id)
+            else:
+                break
+
+    def _get_state(self, group_id: int, now: float) -> _GroupRepeatState:
+        state = self._states.get(group_id)
+        if state is None or now - state.last_active_time > self.idle_expire:
+            state = _GroupRepeatState()
+            self._states[group_id] = state
+        self._states.move_to_end(group_id)
+        state.last_active_time = now
+        return state
+
+    def feed(self, group_id: int, digest: bytes) -> bool:
+        """记录群组收到的消息摘要, 返回是否需要复读该消息"""
+        now = time.monotonic()
+        state = self._get_state(group_id=group_id, now=now)
+        self._evict(now=now)
+
+        # 如果当前消息与上一条消息不同, 或者与上一次复读的消息相同, 则重置复读计数
+        if digest != state.last_digest or digest == state.last_repeat_digest:
+            state.last_digest = digest
+            state.repeat_count = 0
+            return False
+
+        # 否则这条消息和上条消息一致, 开始复读计数, 连续相同的消息达到阈值时触发复读并重置计数
+        state.repeat_count += 1
+        state.last_repeat_digest = None
+        if state.repeat_count >= self.threshold - 1:
+            state.repeat_count = 0
+            state.last_digest = None
+            state.last_repeat_digest = digest
+            return True
+        return False
+
+
+__all__ = [
+    'RepeaterEngine',
+    'message_digest',
+    'normalize_message',
+]
@@ -33,6 +33,7 @@ from src.service.artwork_proxy import PixivArtworkProxy
 from src.service.omega_base.internal import OmegaPixivUserSubSource
 from src.utils import semaphore_gather
 from src.utils.pixiv_api import PixivUser
+from src.utils.seen_filter import SeenContentFilter
 from .consts import PIXIV_USER_SUB_TYPE
 
 if TYPE_CHECKING:
@@ -42,6 +43,10 @@ if TYPE_CHECKING:
     from src.utils.pixiv_api.model.ranking import PixivRankingModel
 
 
+_ARTWORK_SEEN_FILTER: SeenContentFilter = SeenContentFilter(window_size=4096)
+"""已知作品过滤器, 仅对不在近期已知窗口中的作品查询数据库"""
+
+
 async def _query_pixiv_user_sub_source(uid: int) -> 'SubscriptionSource':
     """从数据库查询 Pixiv 用户订阅源"""
     async with begin_db_session() as session:
@@ -49,10 +54,30 @@ async def _query_pixiv_user_sub_source(uid: int) -> 'SubscriptionSource':
     return source_res
 
 
+async def _query_pixiv_user_known_aids(pixiv_user: 'PixivUser') -> list[str]:
+    aids = await PixivArtworkCollection.query_user_all_aids(uid=str(pixiv_user.uid))
+    return sorted(aids, key=lambda x: int(x) if x.isdigit() else 0, reverse=True)
+
+
 async def _check_pixiv_user_new_artworks(pixiv_user: 'PixivUser') -> list[str]:
     """检查 Pixiv 用户的新作品(数据库中没有的)"""
     user_data = await pixiv_user.query_user_data()
-    return await PixivArtworkCollection.query_not_exists_aids(aids=[str(pid) for pid in user_data.manga_illusts])
+    return await _ARTWORK_SEEN_FILTER.filter_new(
+        source=PIXIV_USER_SUB_TYPE,
+        uid=str(pixiv_user.uid),
+        ids=[str(pid) for pid in user_data.manga_illusts],
+        load_known=lambda: _query_pixiv_user_known_aids(pixiv_user=pixiv_user),
+        confirm_new=PixivArtworkCollection.query_not_exists_aids,
+    )
+
+
+def _mark_pixiv_user_artworks_seen(pixiv_user: 'PixivUser', pids: Sequence[str], results: Sequence[Any]) -> None:
+    """将成功写入数据库的作品标记为已知"""
+    _ARTWORK_SEEN_FILTER.mark_seen(
+        source=PIXIV_USER_SUB_TYPE,
+        uid=str(pixiv_user.uid),
+        ids=[pid for pid, result in zip(pids, results, strict=True) if not isinstance(result, BaseException)],
+    )
 
 
 async def _add_pixiv_user_new_artworks(pixiv_user: 'PixivUser') -> None:
@@ -66,7 +91,8 @@ async def _add_pixiv_user_new_artworks(pixiv_user: 'PixivUser') -> None:
     while handle_pids:
 
         tasks = [PixivArtworkCollection(pid).add_artwork_into_database_ignore_exists() for pid in handle_pids]
-        await semaphore_gather(tasks=tasks, semaphore_num=10)
+        results = await semaphore_gather(tasks=tasks, semaphore_num=10)
+        _mark_pixiv_user_artworks_seen(pixiv_user=pixiv_user, pids=handle_pids, results=results)
 
         handle_pids.clear()
         handle_pids = remain_pids[:20]
@@ -201,7 +227,8 @@ async def pixiv_user_new_artworks_monitor_main(pixiv_user: 'PixivUser') -> None:
 
     # 数据库中插入新作品信息
     add_artwork_tasks = [PixivArtworkCollection(pid).add_artwork_into_database_ignore_exists() for pid in new_pids]
-    await semaphore_gather(tasks=add_artwork_tasks, semaphore_num=8, return_exceptions=False)
+    results = await semaphore_gather(tasks=add_artwork_tasks, semaphore_num=8, return_exceptions=False)
+    _mark_pixiv_user_artworks_seen(pixiv_user=pixiv_user, pids=new_pids, results=results)
 
     # 向订阅者发送新作品信息
     subscribed_entity = await query_subscribed_entity_by_pixiv_user(pixiv_user=pixiv_user)
@@ -15,6 +15,7 @@ from nonebot import logger
 from nonebot.exception import ActionFailed
 
 from src.database import SocialMediaContentDAL, begin_db_session
+from src.database.internal.social_media_content import SocialMediaContentData
 from src.database.internal.subscription_source import SubscriptionSource, SubscriptionSourceType
 from src.resource import TemporaryResource
 from src.service import (
@@ -33,6 +34,7 @@ from src.service.artwork_proxy import PixivArtworkProxy
 from src.service.omega_base.internal import OmegaPixivisionSubSource
 from src.utils import semaphore_gather
 from src.utils.pixiv_api import Pixivision
+from src.utils.seen_filter import SeenContentFilter
 
 if TYPE_CHECKING:
     from src.database.internal.entity import Entity
@@ -42,6 +44,10 @@ _PIXIVISION_SUB_TYPE: str = SubscriptionSourceType.pixivision.value
 """微博用户订阅类型"""
 _TMP_FOLDER: TemporaryResource = TemporaryResource('pixivision')
 """图片缓存文件夹"""
+_PIXIVISION_UID: str = '-1'
+"""Pixivision 特辑文章不区分用户, 统一记录的用户 ID"""
+_ARTICLE_SEEN_FILTER: SeenContentFilter = SeenContentFilter(window_size=128)
+"""已知特辑文章过滤器, 仅对不在近期已知窗口中的文章查询数据库"""
 
 
 async def _query_pixivision_sub_source() -> 'SubscriptionSource':
@@ -51,35 +57,56 @@ async def _query_pixivision_sub_source() -> 'SubscriptionSource':
     return source_res
 
 
-async def _check_new_article(articles: Sequence['PixivisionIllustration']) -> list['PixivisionIllustration']:
-    """检查新的 pixivision 特辑文章(数据库中没有的)"""
+async def _query_recent_article_aids() -> list[str]:
     async with begin_db_session() as session:
-        new_aids = await SocialMediaContentDAL(session=session).query_source_not_exists_mids(
-            source=_PIXIVISION_SUB_TYPE, mids=[str(x.aid) for x in articles]
+        return await SocialMediaContentDAL(session=session).query_user_recent_mids(
+            source=_PIXIVISION_SUB_TYPE, uid=_PIXIVISION_UID, limit=_ARTICLE_SEEN_FILTER.window_size
         )
-    return [x for x in articles if str(x.aid) in new_aids]
 
 
-async def _add_upgrade_article_content(article: Pixivision) -> None:
-    """在数据库中添加特辑文章信息"""
-    article_data = await article.query_article()
-
+async def _query_not_exists_article_aids(mids: Sequence[str]) -> list[str]:
     async with begin_db_session() as session:
-        await SocialMediaContentDAL(session=session).upsert(
-            source=_PIXIVISION_SUB_TYPE,
-            m_id=str(article.aid),
-            m_type='pixivision_article',
-            m_uid='-1',
-            title=article_data.title_without_mark,
-            content=f'{article_data.description}\n{",".join(x.tag_name for x in article_data.tags_list)}',
-            ref_content=','.join(str(x.artwork_id) for x in article_data.artwork_list),
+        return await SocialMediaContentDAL(session=session).query_source_not_exists_mids(
+            source=_PIXIVISION_SUB_TYPE, mids=mids
         )
 
 
+async def _check_new_article(articles: Sequence['PixivisionIllustration']) -> list['PixivisionIllustration']:
+    """检查新的 pixivision 特辑文章(数据库中没有的)"""
+    new_aids = await _ARTICLE_SEEN_FILTER.filter_new(
+        source=_PIXIVISION_SUB_TYPE,
+        uid=_PIXIVISION_UID,
+        ids=[str(x.aid) for x in articles],
+        load_known=_query_recent_article_aids,
+        confirm_new=_query_not_exists_article_aids,
+    )
+    return [x for x in articles if str(x.aid) in new_aids]
+
+
+async def _query_article_content_data(article: Pixivision) -> SocialMediaContentData:
+    """获取特辑文章信息"""
+    article_data = await article.query_article()
+    return SocialMediaContentData(
+        source=_PIXIVISION_SUB_TYPE,
+        m_id=str(article.aid),
+        m_type='pixivision_article',
+        m_uid=_PIXIVISION_UID,
+        title=article_data.title_without_mark,
+        content=f'{article_data.description}\n{",".join(x.tag_name for x in article_data.tags_list)}',
+        ref_content=','.join(str(x.artwork_id) for x in article_data.artwork_list),
+    )
+
+
 async def _add_new_pixivision_article(articles: Sequence['PixivisionIllustration']) -> None:
     """向数据库中写入 Pixivision 的特辑文章(仅新增不更新)"""
-    tasks = [_add_upgrade_article_content(article=Pixivision(aid=article.aid)) for article in articles]
-    await semaphore_gather(tasks=tasks, semaphore_num=10, return_exceptions=False)
+    tasks = [_query_article_content_data(article=Pixivision(aid=article.aid)) for article in articles]
+    contents = await semaphore_gather(tasks=tasks, semaphore_num=10, return_exceptions=False)
+    if not contents:
+        return
+
+    async with begin_db_session() as session:
+        await SocialMediaContentDAL(session=session).upsert_many(contents=contents)
+    _ARTICLE_SEEN_FILTER.mark_seen(source=_PIXIVISION_SUB_TYPE, uid=_PIXIVISION_UID, ids=[x.m_id for x in contents])
 
 
 async def _add_pixivision_article_artworks_into_database(article_data: 'PixivisionArticle') -> None:
@@ -30,6 +30,10 @@ class RoguelikeStoryPluginConfig(BaseModel):
     roguelike_story_plugin_ai_json_output: Literal['json_schema', 'json_object', None] = Field(default='json_object')
     # 生成掷骰事件时是否使用 SFW 内容安全提示词
     roguelike_story_plugin_ai_safe_roll: bool = Field(default=True)
+    # 续写及掷骰会话的上下文估算 token 上限, 超出时移除最早的对话并将其总结后保留, 为 `None` 则不限制
+    roguelike_story_plugin_ai_max_context_tokens: int | None = Field(default=16384, gt=0)
+    # 续写故事时使用流式响应并分段发送, 若 AI 服务不支持流式输出则需要设置为 `False`
+    roguelike_story_plugin_ai_stream_output: bool = Field(default=True)
 
     model_config = ConfigDict(extra='ignore')
 
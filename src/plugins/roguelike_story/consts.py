@@ -138,6 +138,12 @@ CONTINUE_PROMPT = """# Profile
 }
 ```"""
 
+CONTINUE_STREAM_OUTPUT_PROMPT = """# Output
+
+**忽略**以上示例中的 JSON 输出格式，直接以纯文本输出你编写的内容：先输出后续剧情(next_situation)，然后单独输出一行 `---` 作为分隔，最后输出玩家可能的下一步行动的选择(player_options)，**不要**输出其他任何内容。
+"""
+"""流式续写故事时使用的纯文本输出格式 prompt, 附加在故事续写 prompt 之后"""
+
 ROLL_PROMPT_PREFIX = """# Profile
 
 你是一位经验丰富的游戏主持人，你精通各种游戏规则和场景构建，能够根据不同的情境灵活地调整游戏难度，确保游戏的平衡性和趣味性。你擅长运用丰富的想象力和创造力，为玩家提供沉浸式的游戏体验。你具备出色的逻辑思维能力、丰富的想象力和创造力，以及对游戏规则和机制的深刻理解。能够根据玩家的行动描述，迅速判断其难度和影响，并合理地设定人物属性和掷骰结果对应的事件描述。
@@ -255,6 +261,7 @@ __all__ = [
     'INTRO_TEXT',
     'STORY_CREATE_PROMPT',
     'CONTINUE_PROMPT',
+    'CONTINUE_STREAM_OUTPUT_PROMPT',
     'SAFE_ROLL_PROMPT',
     'UNLIMITED_ROLL_PROMPT',
 ]
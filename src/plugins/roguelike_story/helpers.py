@@ -8,9 +8,11 @@
 @Software       : PyCharm
 """
 
+from contextlib import aclosing
 from random import randint
 from typing import TYPE_CHECKING
 
+from .config import roguelike_story_plugin_config
 from .consts import INTRO_TEXT
 
 if TYPE_CHECKING:
@@ -61,14 +63,23 @@ async def handle_story_continue(story_session: 'StorySession', interface: 'OmMI'
     checking_value = randint(1, 100)
     result_msg = get_roll_result_text(roll_result=roll_result, attr_value=attr_value, checking_value=checking_value)
 
-    # 编写下一步剧情故事
-    continue_story = await story_session.continue_story(player_action=description, roll_result=result_msg)
-
-    await interface.send_reply(
+    roll_result_text = (
         f'你进行了【{roll_result.characteristics}({attr_value})】检定\n1D100=>{checking_value}=>{result_msg}'
     )
-    await interface.send_reply(continue_story.next_situation)
-    await interface.send_reply(continue_story.player_options)
+
+    # 编写下一步剧情故事
+    if roguelike_story_plugin_config.roguelike_story_plugin_ai_stream_output:
+        await interface.send_reply(roll_result_text)
+        async with aclosing(
+                story_session.stream_continue_story(player_action=description, roll_result=result_msg)
+        ) as story_segments:
+            async for segment in story_segments:
+                await interface.send_reply(segment)
+    else:
+        continue_story = await story_session.continue_story(player_action=description, roll_result=result_msg)
+        await interface.send_reply(roll_result_text)
+        await interface.send_reply(continue_story.next_situation)
+        await interface.send_reply(continue_story.player_options)
 
     await interface.reject_arg_reply('description', '你的下一步行动是？')
 
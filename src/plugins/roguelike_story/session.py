@@ -8,21 +8,35 @@
 @Software       : PyCharm
 """
 
+import re
 from asyncio import Lock as AsyncLock
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 from src.utils.openai_api import ChatSession
 from .config import roguelike_story_plugin_config
-from .consts import CONTINUE_PROMPT, SAFE_ROLL_PROMPT, STORY_CREATE_PROMPT, UNLIMITED_ROLL_PROMPT
+from .consts import (
+    CONTINUE_PROMPT,
+    CONTINUE_STREAM_OUTPUT_PROMPT,
+    SAFE_ROLL_PROMPT,
+    STORY_CREATE_PROMPT,
+    UNLIMITED_ROLL_PROMPT,
+)
 from .models import CurrentSituation, NextSituation, RollCondition, RollResults, Story
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator
+
     from src.service import OmegaMatcherInterface as OmMI
 
 _SESSIONS: dict[str, 'StorySession'] = {}
 """全局缓存的所有故事会话, KEY 为各个事件主体 Entity ID"""
 
+_STREAM_SEGMENT_LENGTH: int = 200
+"""流式续写故事时每段发送内容的最小长度"""
+_OPTIONS_SEPARATOR_PATTERN = re.compile(r'^[ \t]*-{3,}[ \t]*$', re.MULTILINE)
+"""流式续写故事时后续剧情与玩家行动选项之间的分隔行"""
+
 
 @dataclass
 class StorySession:
@@ -78,10 +92,14 @@ class StorySession:
 
         # 初始化续写 Session
         current_continue_prompt = f'{CONTINUE_PROMPT}\n\n{story.overview}'
+        if roguelike_story_plugin_config.roguelike_story_plugin_ai_stream_output:
+            current_continue_prompt = f'{current_continue_prompt}\n\n{CONTINUE_STREAM_OUTPUT_PROMPT}'
         self._continued_session = ChatSession.create(
             service_name=roguelike_story_plugin_config.roguelike_story_plugin_ai_service_name,
             model_name=roguelike_story_plugin_config.roguelike_story_plugin_ai_model_name,
             init_system_message=current_continue_prompt,
+            max_context_tokens=roguelike_story_plugin_config.roguelike_story_plugin_ai_max_context_tokens,
+            summarize_evicted_messages=True,
         )
 
         # 初始化掷骰 Session
@@ -93,6 +111,8 @@ class StorySession:
             service_name=roguelike_story_plugin_config.roguelike_story_plugin_ai_service_name,
             model_name=roguelike_story_plugin_config.roguelike_story_plugin_ai_model_name,
             init_system_message=current_roll_prompt,
+            max_context_tokens=roguelike_story_plugin_config.roguelike_story_plugin_ai_max_context_tokens,
+            summarize_evicted_messages=True,
         )
 
         self.current_situation = story.prologue
@@ -170,6 +190,46 @@ class StorySession:
         self.current_situation = continued_result.next_situation
         return continued_result
 
+    async def stream_continue_story(self, player_action: str, roll_result: str) -> 'AsyncGenerator[str, None]':
+        """根据当前故事进度、玩家行为及掷骰结果, 流式生成后续故事, 逐段返回后续剧情及玩家行动选项"""
+        if not self._is_inited:
+            raise RuntimeError('StorySession has not been initialized')
+
+        if self.is_processing:
+            raise RuntimeError('StorySession is processing')
+
+        situation_parts: list[str] = []
+        is_options = False
+        async with self._lock:
+            async for segment in self.continued_session.stream_chat(
+                    CurrentSituation(
+                        current_situation=self.current_situation,
+                        player_action=player_action,
+                        roll_result=roll_result,
+                    ).model_dump_json(),
+                    min_segment_length=_STREAM_SEGMENT_LENGTH,
+                    temperature=roguelike_story_plugin_config.roguelike_story_plugin_ai_temperature,
+                    max_tokens=roguelike_story_plugin_config.roguelike_story_plugin_ai_max_tokens,
+                    timeout=roguelike_story_plugin_config.roguelike_story_plugin_ai_timeout,
+            ):
+                # 分段均在换行处截断, 分隔行不会被拆分到两段中
+                if is_options:
+                    parts = [segment]
+                elif (separator := _OPTIONS_SEPARATOR_PATTERN.search(segment)) is not None:
+                    is_options = True
+                    situation_parts.append(segment[:separator.start()])
+                    parts = [segment[:separator.start()], segment[separator.end():]]
+                else:
+                    situation_parts.append(segment)
+                    parts = [segment]
+
+                for part in parts:
+                    if part := part.strip():
+                        yield part
+
+        if next_situation := ''.join(situation_parts).strip():
+            self.current_situation = next_situation
+
     def delete(self) -> None:
         del self._continued_session
         del self._roll_session
@@ -0,0 +1,47 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/5 19:32:10
+@FileName       : assets
+@Project        : omega-miya
+@Description    : 表情包模板素材缓存
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from PIL import Image, ImageFont
+
+if TYPE_CHECKING:
+    from src.resource import StaticResource
+
+
+@lru_cache(maxsize=256)
+def _load_image(path: str, mtime_ns: int) -> Image.Image:
+    """读取并解码图片, 按路径及修改时间缓存, 文件被修改后自动重新读取"""
+    with Image.open(path) as image:
+        image.load()
+        return image.copy()
+
+
+@lru_cache(maxsize=128)
+def _load_font(path: str, mtime_ns: int, size: int) -> ImageFont.FreeTypeFont:
+    """读取字体, 按路径、修改时间及字号缓存"""
+    return ImageFont.truetype(path, size)
+
+
+def load_static_image(image: 'StaticResource') -> Image.Image:
+    """读取模板图片, 返回缓存图片的副本, 可在表情包制作过程中任意修改"""
+    return _load_image(image.resolve_path, image.path.stat().st_mtime_ns).copy()
+
+
+def load_font(font: 'StaticResource', size: int) -> ImageFont.FreeTypeFont:
+    """读取字体, 字体对象在各表情包制作流程间共享, 不应修改"""
+    return _load_font(font.resolve_path, font.path.stat().st_mtime_ns, size)
+
+
+__all__ = [
+    'load_font',
+    'load_static_image',
+]
@@ -8,6 +8,8 @@
 @Software       : PyCharm
 """
 
+import os
+
 from src.resource import StaticResource, TemporaryResource
 
 FONT_RESOURCE: StaticResource = StaticResource('fonts')
@@ -22,9 +24,25 @@ STICKER_OUTPUT_PATH: TemporaryResource = TemporaryResource('sticker_maker', 'out
 TMP_PATH: TemporaryResource = TemporaryResource('sticker_maker', 'tmp')
 """下载外部资源图片的缓存文件"""
 
+RENDER_FRAME_WORKERS: int = min(4, os.cpu_count() or 1)
+"""动图逐帧并行处理的最大线程数"""
+
+RENDER_PARALLEL_FRAME_THRESHOLD: int = 4
+"""动图帧数不少于该值时才启用逐帧并行处理"""
+
+GIF_PALETTE_SAMPLE_FRAMES: int = 16
+"""计算动图共享调色板时最多采样的帧数"""
+
+GIF_PALETTE_SAMPLE_SIZE: int = 128
+"""计算动图共享调色板时采样帧缩放后的最大边长"""
+
 
 __all__ = [
     'FONT_RESOURCE',
+    'GIF_PALETTE_SAMPLE_FRAMES',
+    'GIF_PALETTE_SAMPLE_SIZE',
+    'RENDER_FRAME_WORKERS',
+    'RENDER_PARALLEL_FRAME_THRESHOLD',
     'STATIC_RESOURCE',
     'STICKER_OUTPUT_PATH',
     'TMP_PATH',
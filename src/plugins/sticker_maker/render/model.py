@@ -9,20 +9,32 @@
 """
 
 import abc
-from collections.abc import Sequence
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import BytesIO
 from typing import TYPE_CHECKING, Literal, Optional
 
-import imageio.v3 as iio
 from PIL import Image
 from nonebot.utils import run_sync
 
-from .consts import STICKER_OUTPUT_PATH
+from .assets import load_static_image
+from .consts import (
+    GIF_PALETTE_SAMPLE_FRAMES,
+    GIF_PALETTE_SAMPLE_SIZE,
+    RENDER_FRAME_WORKERS,
+    RENDER_PARALLEL_FRAME_THRESHOLD,
+    STICKER_OUTPUT_PATH,
+)
 
 if TYPE_CHECKING:
     from src.resource import StaticResource, TemporaryResource
 
+_FRAME_EXECUTOR: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=RENDER_FRAME_WORKERS, thread_name_prefix='sticker_maker_render'
+)
+"""动图逐帧并行处理线程池, Pillow 的大部分图像处理操作会释放 GIL"""
+
 
 class BaseStickerRender(abc.ABC):
     """表情包生成器基类"""
@@ -122,6 +134,38 @@ class BaseStickerRender(abc.ABC):
             content = bf.getvalue()
         return content
 
+    @staticmethod
+    def _map_frames[T](func: Callable[[T], 'Image.Image'], frames: Sequence[T]) -> list['Image.Image']:
+        """逐帧处理动图, 帧数较多时拆分到线程池并行处理, 返回结果保持原有帧顺序"""
+        if RENDER_FRAME_WORKERS <= 1 or len(frames) < RENDER_PARALLEL_FRAME_THRESHOLD:
+            return [func(x) for x in frames]
+        return list(_FRAME_EXECUTOR.map(func, frames))
+
+    @staticmethod
+    def _build_shared_palette(frames: Sequence['Image.Image']) -> 'Image.Image':
+        """采样动图的部分帧计算整个动图共用的调色板, 避免逐帧单独量化"""
+        step = max(len(frames) // GIF_PALETTE_SAMPLE_FRAMES, 1)
+        samples = []
+        for frame in frames[::step][:GIF_PALETTE_SAMPLE_FRAMES]:
+            sample = frame.convert('RGB')
+            sample.thumbnail((GIF_PALETTE_SAMPLE_SIZE, GIF_PALETTE_SAMPLE_SIZE))
+            samples.append(sample)
+
+        mosaic = Image.new(mode='RGB', size=(max(x.width for x in samples), sum(x.height for x in samples)))
+        offset = 0
+        for sample in samples:
+            mosaic.paste(sample, (0, offset))
+            offset += sample.height
+        return mosaic.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+
+    @classmethod
+    def _quantize_frames(cls, frames: Sequence['Image.Image']) -> list['Image.Image']:
+        """使用共享调色板并行量化动图的全部帧"""
+        palette = cls._build_shared_palette(frames=frames)
+        return cls._map_frames(
+            lambda x: x.convert('RGB').quantize(palette=palette, dither=Image.Dither.FLOYDSTEINBERG), frames
+        )
+
     @classmethod
     @abc.abstractmethod
     def _core_render(
@@ -161,12 +205,13 @@ class BaseStickerRender(abc.ABC):
                     return
 
         if external_image is not None and external_image.format == 'GIF':
-            output_images = [
-                cls._core_render(
+            output_images = cls._map_frames(
+                lambda x: cls._core_render(
                     text=text, static_images=static_images, external_image=x,
                     fonts=fonts, output_width=output_width, output_format=output_format
-                ) for x in iter_gif_frame(_image=external_image)
-            ]
+                ),
+                [x.copy() for x in iter_gif_frame(_image=external_image)]
+            )
         else:
             output_images = [
                 cls._core_render(
@@ -184,7 +229,7 @@ class BaseStickerRender(abc.ABC):
 
         output_images = self._main_render(
             text=self.get_text(),
-            static_images=[Image.open(x.path) for x in self.get_static_images()],
+            static_images=[load_static_image(x) for x in self.get_static_images()],
             external_image=external_image,
             fonts=self.get_default_fonts(),
             output_width=self.get_output_width(),
@@ -201,13 +246,14 @@ class BaseStickerRender(abc.ABC):
         save_file = STICKER_OUTPUT_PATH(file_name)
 
         if save_gif:
+            quantized_images = self._quantize_frames(frames=output_images)
             with save_file.open('wb') as f:
-                iio.imwrite(
-                    uri=f,
-                    image=[iio.imread(self._output_pil_image(frame)) for frame in output_images],
-                    extension='.gif',
+                quantized_images[0].save(
+                    f,
+                    format='GIF',
+                    save_all=True,
+                    append_images=quantized_images[1:],
                     duration=60,
-                    quantizer=2,
                     loop=0,
                 )
         else:
@@ -12,17 +12,22 @@ from collections.abc import Sequence
 from datetime import date
 from typing import TYPE_CHECKING, Any, Literal, Optional
 
-import numpy
-from PIL import Image, ImageDraw, ImageEnhance, ImageFont
+from PIL import Image, ImageDraw, ImageEnhance
 
 from src.utils import OmegaRequests
 from src.utils.image_utils import ImageEffectProcessor, ImageTextProcessor
+from src.utils.import_utils import lazy_import
 from src.utils.tencent_cloud_api import TencentTMT
+from .assets import load_font
 from .consts import FONT_RESOURCE, STATIC_RESOURCE, TMP_PATH
 from .model import BaseStickerRender
 
 if TYPE_CHECKING:
+    import numpy
+
     from src.resource import StaticResource, TemporaryResource
+else:
+    numpy = lazy_import('numpy')
 
 
 class TraitorRender(BaseStickerRender):
@@ -72,13 +77,13 @@ class TraitorRender(BaseStickerRender):
         # 处理文字层 字数部分
         text_num_img = Image.new(mode='RGBA', size=image.size, color=(0, 0, 0, 0))
         font_num_size = int(image.width / 16.6)
-        font_num = ImageFont.truetype(fonts[0].resolve_path, font_num_size)
+        font_num = load_font(fonts[0], font_num_size)
         ImageDraw.Draw(text_num_img).text(xy=(0, 0), text=f'{len(text)}/100', font=font_num, fill=(255, 255, 255))
 
         # 处理文字层 主体部分
         text_main_img = Image.new(mode='RGBA', size=image.size, color=(0, 0, 0, 0))
         font_main_size = int(image.width / 15.6)
-        font_main = ImageFont.truetype(fonts[0].resolve_path, font_main_size)
+        font_main = load_font(fonts[0], font_main_size)
 
         # 按长度切分文本
         test_main_fin = ImageTextProcessor.split_multiline_text(
@@ -148,7 +153,7 @@ class JichouRender(BaseStickerRender):
         text = f'今天是{date.today().strftime("%Y年%m月%d日")}\n{text}，这个仇我先记下了'
 
         font_main_size = int(image.width / 12)
-        font = ImageFont.truetype(fonts[0].resolve_path, font_main_size)
+        font = load_font(fonts[0], font_main_size)
 
         # 按长度切分文本
         text_main_fin = ImageTextProcessor.split_multiline_text(text=text, width=(image.width * 7 // 8), font=font)
@@ -218,7 +223,7 @@ class PhLogoRender(BaseStickerRender):
                 white_text = text[:len(text) // 2]
                 yellow_text = text[len(text) // 2:]
 
-        font = ImageFont.truetype(fonts[0].resolve_path, 320)
+        font = load_font(fonts[0], 320)
 
         # 分别确定两边文字的大小
         w_text_width, text_height = ImageTextProcessor.get_text_size(white_text, font)
@@ -309,7 +314,7 @@ class LuxunSayRender(BaseStickerRender):
         text = '我没说过' if text is None else text
         font_size = image.width // 15
         text_stroke_width = int(font_size / 15)
-        font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+        font = load_font(fonts[0], font_size)
         text_width_limit = int(image.width * 0.8125)
 
         sign_text = '—— 鲁迅'
@@ -404,7 +409,7 @@ class JiangzhuangRender(BaseStickerRender):
         # 处理文本主体
         text = ' ' if text is None else text
         font_size = image.width // 22
-        font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+        font = load_font(fonts[0], font_size)
         text_width_limit = int(image.width * 0.65)
 
         # 分割文本
@@ -463,7 +468,7 @@ class XibaoHorizontalRender(BaseStickerRender):
         # 处理文本主体
         text = ' ' if text is None else text
         font_size = image.width // 15
-        font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+        font = load_font(fonts[0], font_size)
         text_stroke_width = int(font_size / 15)
         text_width_limit = int(image.width * 0.75)
 
@@ -527,7 +532,7 @@ class XibaoVerticalRender(BaseStickerRender):
         # 处理文本主体
         text = ' ' if text is None else text
         font_size = image.width // 15
-        font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+        font = load_font(fonts[0], font_size)
         text_stroke_width = int(font_size / 50)
         text_width_limit = int(image.width * 0.75)
 
@@ -594,13 +599,13 @@ class DefaultRender(BaseStickerRender):
         text = ' ' if text is None else text
         font_size = external_image.width // 8
         text_stroke_width = int(font_size / 20)
-        font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+        font = load_font(fonts[0], font_size)
 
         text_w, text_h = ImageTextProcessor.get_text_size(text, font=font, stroke_width=text_stroke_width)
         # 自适应处理文字大小
         while text_w >= int(external_image.width * 0.95):
             font_size -= 1
-            font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+            font = load_font(fonts[0], font_size)
             text_w, text_h = ImageTextProcessor.get_text_size(text, font=font, stroke_width=text_stroke_width)
         # 计算居中文字位置
         text_coordinate = (external_image.width // 2, 9 * (external_image.height - text_h) // 10)
@@ -659,13 +664,13 @@ class LittleAngelRender(BaseStickerRender):
         # 处理文本内容
         text = ' ' if text is None else text
         font_size_up = int(external_image.width / 7)
-        font_up = ImageFont.truetype(fonts[0].resolve_path, font_size_up)
+        font_up = load_font(fonts[0], font_size_up)
         text_up = f'请问你们看到{text}了吗?'
         text_up_w, text_up_h = ImageTextProcessor.get_text_size(text_up, font_up)
         # 自适应处理文字大小
         while text_up_w >= int(external_image.width * 1.14):
             font_size_up -= 1
-            font_up = ImageFont.truetype(fonts[0].resolve_path, font_size_up)
+            font_up = load_font(fonts[0], font_size_up)
             text_up_w, text_up_h = ImageTextProcessor.get_text_size(text_up, font_up)
 
         # 处理图片
@@ -691,14 +696,14 @@ class LittleAngelRender(BaseStickerRender):
         background.paste(external_image, image_coordinate)
 
         # 粘贴底部文字
-        font_down_1 = ImageFont.truetype(fonts[0].resolve_path, int(background.width / 12.75))
+        font_down_1 = load_font(fonts[0], int(background.width / 12.75))
         text_down_1 = r'非常可爱! 简直就是小天使'
         ImageDraw.Draw(background).text(
             xy=(background.width // 2, int(external_image.width * 0.135 + external_image.height + text_up_h)),
             text=text_down_1, anchor='ma', font=font_down_1, fill=(0, 0, 0)
         )
 
-        font_down_2 = ImageFont.truetype(fonts[0].resolve_path, int(background.width / 23.54))
+        font_down_2 = load_font(fonts[0], int(background.width / 23.54))
         text_down_2 = r'她没失踪也没怎么样  我只是觉得你们都该看一下'
         ImageDraw.Draw(background).text(
             xy=(background.width // 2, int(external_image.width * 0.255 + external_image.height + text_up_h)),
@@ -753,12 +758,12 @@ class WhiteBackgroundRender(BaseStickerRender):
 
         text = ' ' if text is None else text
         font_size = external_image.width // 10
-        font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+        font = load_font(fonts[0], font_size)
         text_w, text_h = ImageTextProcessor.get_text_size(text, font=font)
         # 自适应处理文字大小
         while text_w >= int(external_image.width * 8 / 9):
             font_size -= 1
-            font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+            font = load_font(fonts[0], font_size)
             text_w, text_h = ImageTextProcessor.get_text_size(text, font=font)
 
         # 处理图片
@@ -825,12 +830,12 @@ class BlackBackgroundRender(BaseStickerRender):
 
         text = ' ' if text is None else text
         font_size = external_image.width // 8
-        font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+        font = load_font(fonts[0], font_size)
         text_w, text_h = ImageTextProcessor.get_text_size(text, font=font)
         # 自适应处理文字大小
         while text_w >= int(external_image.width * 1.1):
             font_size -= 1
-            font = ImageFont.truetype(fonts[0].resolve_path, font_size)
+            font = load_font(fonts[0], font_size)
             text_w, text_h = ImageTextProcessor.get_text_size(text, font=font)
 
         # 处理图片
@@ -953,7 +958,7 @@ class GunjoRender(BaseStickerRender):
 
         # 写字
         upper_font_size = int(made_image.width / 6)
-        upper_font = ImageFont.truetype(fonts[0].resolve_path, upper_font_size)
+        upper_font = load_font(fonts[0], upper_font_size)
         upper_text_coordinate = (int(made_image.width * 12 / 13), int(made_image.height / 11))
 
         _, upper_text_height = ImageTextProcessor.get_text_size(
@@ -966,7 +971,7 @@ class GunjoRender(BaseStickerRender):
         )
 
         lower_font_size = int(made_image.width / 12)
-        lower_font = ImageFont.truetype(fonts[0].resolve_path, lower_font_size)
+        lower_font = load_font(fonts[0], lower_font_size)
         lower_text_coordinate = (int(made_image.width * 12 / 13), upper_text_coordinate[1] + upper_text_height * 1.1)
         ImageDraw.Draw(background).text(
             xy=lower_text_coordinate, text='YOASOBI', anchor='ra', align='center', font=lower_font,
@@ -1077,8 +1082,8 @@ class GrassJaRender(BaseStickerRender):
 
         # 分割文本
         text = ' ' if text is None else text
-        font_zh = ImageFont.truetype(fonts[0].resolve_path, int(image.width / 13))
-        font_jp = ImageFont.truetype(fonts[0].resolve_path, int(image.width / 24))
+        font_zh = load_font(fonts[0], int(image.width / 13))
+        font_jp = load_font(fonts[0], int(image.width / 24))
 
         text_zh, text_jp = text.split(maxsplit=1)
         text_zh = ImageTextProcessor.split_multiline_text(text=text_zh, width=int(image.width * 0.9), font=font_zh)
@@ -1190,14 +1195,14 @@ class PetPetRender(BaseStickerRender):
         if external_image.format != 'RGBA':
             external_image = external_image.convert('RGBA')
 
-        frames_list = []
-        for index, frame in enumerate(static_images):
+        def _render_frame(indexed_frame: tuple[int, 'Image.Image']) -> 'Image.Image':
+            index, frame = indexed_frame
             background = Image.new(mode='RGBA', size=(112, 112), color=(255, 255, 255))
             background.paste(external_image.resize(resize_paste_loc[index][0]), resize_paste_loc[index][1])
             background.paste(frame, (0, 0), mask=frame)
-            frames_list.append(background)
+            return background
 
-        return frames_list
+        return cls._map_frames(_render_frame, list(enumerate(static_images)))
 
 
 class WorshipRender(BaseStickerRender):
@@ -1288,14 +1293,13 @@ class WorshipRender(BaseStickerRender):
             fill=Image.Resampling.BICUBIC
         )
 
-        frames_list = []
-        for frame in static_images:
+        def _render_frame(frame: 'Image.Image') -> 'Image.Image':
             background = Image.new(mode='RGBA', size=(300, 169), color=(255, 255, 255, 255))
             background.paste(im=p_image, box=(0, 0), mask=p_image)
             background.paste(im=frame, box=(0, 0), mask=frame)
-            frames_list.append(background)
+            return background
 
-        return frames_list
+        return cls._map_frames(_render_frame, static_images)
 
 
 class TwistRender(BaseStickerRender):
@@ -1356,23 +1360,22 @@ class TwistRender(BaseStickerRender):
 
         image = ImageEffectProcessor(image=external_image).resize_with_filling(size=(128, 128)).image
 
-        angle = 0
         paste_coordinate: list[tuple[int, int]] = [
             (35, 101), (37, 101), (37, 101), (37, 101), (37, 99), (35, 101), (37, 101), (37, 101), (37, 101), (37, 99)
         ]
 
-        frames_list = []
-        for index, frame in enumerate(static_images):
+        def _render_frame(indexed_frame: tuple[int, 'Image.Image']) -> 'Image.Image':
+            index, frame = indexed_frame
             background = Image.new(mode='RGBA', size=(256, 256), color=(255, 255, 255, 255))
             frame_image = image.rotate(
-                angle=angle, center=(64, 64), expand=False, resample=Image.Resampling.BICUBIC, fillcolor=(255, 255, 255)
+                angle=36 * index, center=(64, 64), expand=False, resample=Image.Resampling.BICUBIC,
+                fillcolor=(255, 255, 255)
             )
             background.paste(im=frame_image, box=paste_coordinate[index], mask=frame_image)
             background.paste(im=frame, box=(0, 0), mask=frame)
-            frames_list.append(background)
-            angle += 36
+            return background
 
-        return frames_list
+        return cls._map_frames(_render_frame, list(enumerate(static_images)))
 
 
 class WangjingzeRender(BaseStickerRender):
@@ -1433,10 +1436,10 @@ class WangjingzeRender(BaseStickerRender):
         if (text_len := len(text_list)) < 4:
             text_list.extend(['' for _ in range(4 - text_len)])
 
-        font = ImageFont.truetype(fonts[0].resolve_path, 22)
+        font = load_font(fonts[0], 22)
 
-        frames_list = []
-        for index, frame in enumerate(static_images):
+        def _render_frame(indexed_frame: tuple[int, 'Image.Image']) -> 'Image.Image':
+            index, frame = indexed_frame
             if 0 <= index <= 8:
                 ImageDraw.Draw(frame).text(
                     xy=(219, 223), text=text_list[0], font=font, anchor='ma', align='center',
@@ -1457,9 +1460,9 @@ class WangjingzeRender(BaseStickerRender):
                     xy=(219, 223), text=text_list[3], font=font, anchor='ma', align='center',
                     stroke_width=2, stroke_fill=(0, 0, 0)
                 )
-            frames_list.append(frame)
+            return frame
 
-        return frames_list
+        return cls._map_frames(_render_frame, list(enumerate(static_images)))
 
 
 _ALL_Render: dict[str, type[BaseStickerRender]] = {
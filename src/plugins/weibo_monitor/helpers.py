@@ -8,13 +8,14 @@
 @Software       : PyCharm
 """
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from typing import TYPE_CHECKING
 
 from nonebot import logger
 from nonebot.exception import ActionFailed
 
 from src.database import SocialMediaContentDAL, begin_db_session
+from src.database.internal.social_media_content import SocialMediaContentData
 from src.database.internal.subscription_source import SubscriptionSource, SubscriptionSourceType
 from src.service import (
     OmegaEntity,
@@ -29,6 +30,7 @@ from src.service import (
 )
 from src.service.omega_base.internal import OmegaWeiboUserSubSource
 from src.utils import run_async_delay, semaphore_gather
+from src.utils.seen_filter import SeenContentFilter
 from src.utils.weibo_api import Weibo
 
 if TYPE_CHECKING:
@@ -38,6 +40,8 @@ if TYPE_CHECKING:
 
 WEIBO_SUB_TYPE: str = SubscriptionSourceType.weibo_user.value
 """微博用户订阅类型"""
+_WEIBO_SEEN_FILTER: SeenContentFilter = SeenContentFilter()
+"""已知微博过滤器, 仅对不在近期已知窗口中的微博查询数据库"""
 
 
 async def _query_weibo_sub_source(uid: int) -> SubscriptionSource:
@@ -47,43 +51,66 @@ async def _query_weibo_sub_source(uid: int) -> SubscriptionSource:
     return source_res
 
 
-async def _check_new_weibo(cards: Iterable['WeiboCard']) -> list['WeiboCard']:
-    """检查新的微博(数据库中没有的)"""
+async def _query_user_recent_weibo_mids(uid: int) -> list[str]:
+    async with begin_db_session() as session:
+        return await SocialMediaContentDAL(session=session).query_user_recent_mids(
+            source=WEIBO_SUB_TYPE, uid=str(uid), limit=_WEIBO_SEEN_FILTER.window_size
+        )
+
+
+async def _query_not_exists_weibo_mids(mids: Sequence[str]) -> list[str]:
     async with begin_db_session() as session:
-        all_mids = [str(x.mblog.id) for x in cards]
-        new_mids = await SocialMediaContentDAL(session=session).query_source_not_exists_mids(
-            source=WEIBO_SUB_TYPE, mids=all_mids
+        return await SocialMediaContentDAL(session=session).query_source_not_exists_mids(
+            source=WEIBO_SUB_TYPE, mids=mids
         )
+
+
+async def _check_new_weibo(uid: int, cards: Iterable['WeiboCard']) -> list['WeiboCard']:
+    """检查新的微博(数据库中没有的)"""
+    cards = list(cards)
+    new_mids = await _WEIBO_SEEN_FILTER.filter_new(
+        source=WEIBO_SUB_TYPE,
+        uid=str(uid),
+        ids=[str(x.mblog.id) for x in cards],
+        load_known=lambda: _query_user_recent_weibo_mids(uid=uid),
+        confirm_new=_query_not_exists_weibo_mids,
+    )
     return [x for x in cards if str(x.mblog.id) in new_mids]
 
 
-async def _add_upgrade_weibo_content(card: 'WeiboCard') -> None:
-    """在数据库中添加微博内容"""
+def _get_weibo_content_data(card: 'WeiboCard') -> SocialMediaContentData:
     retweeted_content = (
         card.mblog.retweeted_status.text
         if card.mblog.is_retweeted and card.mblog.retweeted_status is not None
         else ''
     )
+    return SocialMediaContentData(
+        source=WEIBO_SUB_TYPE,
+        m_id=str(card.mblog.id),
+        m_type=card.card_type,
+        m_uid=str(card.mblog.user.id),
+        title=f'{card.mblog.user.screen_name}的微博',
+        content=card.mblog.text,
+        ref_content=retweeted_content,
+    )
+
+
+async def _add_upgrade_weibo_contents(uid: int, cards: Iterable['WeiboCard']) -> None:
+    """在数据库中批量添加微博内容"""
+    contents = [_get_weibo_content_data(card=card) for card in cards]
+    if not contents:
+        return
 
     async with begin_db_session() as session:
-        await SocialMediaContentDAL(session=session).upsert(
-            source=WEIBO_SUB_TYPE,
-            m_id=str(card.mblog.id),
-            m_type=card.card_type,
-            m_uid=str(card.mblog.user.id),
-            title=f'{card.mblog.user.screen_name}的微博',
-            content=card.mblog.text,
-            ref_content=retweeted_content,
-        )
+        await SocialMediaContentDAL(session=session).upsert_many(contents=contents)
+    _WEIBO_SEEN_FILTER.mark_seen(source=WEIBO_SUB_TYPE, uid=str(uid), ids=[x.m_id for x in contents])
 
 
 async def _add_user_new_weibo_content(uid: int) -> None:
     """在数据库中更新目标用户的所有微博(仅新增不更新)"""
     user_cards = await Weibo.query_user_weibo_cards(uid=uid)
-    new_weibo_cards = await _check_new_weibo(cards=user_cards)
-
-    tasks = [_add_upgrade_weibo_content(card=card) for card in new_weibo_cards]
-    await semaphore_gather(tasks=tasks, semaphore_num=10, return_exceptions=False)
+    new_weibo_cards = await _check_new_weibo(uid=uid, cards=user_cards)
+    await _add_upgrade_weibo_contents(uid=uid, cards=new_weibo_cards)
 
 
 async def _add_upgrade_weibo_user_sub_source(uid: int) -> SubscriptionSource:
@@ -205,7 +232,7 @@ async def weibo_user_monitor_main(uid: int) -> None:
     logger.debug(f'WeiboMonitor | Start checking user {uid} updated content')
     weibo_user_cards = await Weibo.query_user_weibo_cards(uid=uid)
 
-    new_weibo_cards = await _check_new_weibo(cards=weibo_user_cards)
+    new_weibo_cards = await _check_new_weibo(uid=uid, cards=weibo_user_cards)
     if new_weibo_cards:
         logger.info(
             f'WeiboMonitor | Confirmed user {uid} new weibo: {", ".join(str(x.mblog.mid) for x in new_weibo_cards)}'
@@ -219,8 +246,7 @@ async def weibo_user_monitor_main(uid: int) -> None:
     send_messages = await semaphore_gather(tasks=format_msg_tasks, semaphore_num=3, return_exceptions=False)
 
     # 数据库中插入新微博信息
-    add_artwork_tasks = [_add_upgrade_weibo_content(card=card) for card in new_weibo_cards]
-    await semaphore_gather(tasks=add_artwork_tasks, semaphore_num=10, return_exceptions=False)
+    await _add_upgrade_weibo_contents(uid=uid, cards=new_weibo_cards)
 
     # 向订阅者发送新微博信息
     subscribed_entity = await query_subscribed_entity_by_weibo_user(uid=uid)
@@ -9,7 +9,7 @@
 """
 
 from datetime import datetime, timedelta
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated, Optional
 
 from nonebot.adapters import Bot as BaseBot
 from nonebot.adapters import Event as BaseEvent
@@ -17,12 +17,22 @@ from nonebot.log import logger
 from nonebot.params import ArgStr, Depends
 from nonebot.permission import SUPERUSER
 from nonebot.plugin import CommandGroup
+from nonebot.utils import run_sync
 
 from src.params.handler import get_command_str_single_arg_parser_handler
 from src.service import OmegaMatcherInterface as OmMI
 from src.service import OmegaMessageSegment, enable_processor_state
-from .data_source import add_user_dict, query_entity_message_history, query_profile_image
-from .helpers import draw_message_history_wordcloud
+from .config import wordcloud_plugin_config
+from .data_source import (
+    add_user_dict,
+    query_entity_message_term_frequency,
+    query_entity_message_text,
+    query_profile_image,
+)
+from .helpers import add_jieba_user_word, draw_message_history_wordcloud, draw_wordcloud, weight_term_frequency
+
+if TYPE_CHECKING:
+    from src.resource import TemporaryResource
 
 # 注册事件响应器
 wordcloud = CommandGroup(
@@ -46,6 +56,7 @@ async def handle_add_user_dict(
     content = content.strip()
     try:
         await add_user_dict(content=content)
+        await run_sync(add_jieba_user_word)(word=content)
         await interface.send_reply(f'已添加自定义词典: {content}')
     except Exception as e:
         logger.error(f'WordCloud | 添加自定义词典失败, {e}')
@@ -142,22 +153,23 @@ async def wordcloud_generate_handler(
 ) -> None:
     """词云处理流程 Handler"""
     try:
-        message_history_list = await query_entity_message_history(
-            bot=bot, event=event, start_time=start_time, match_event=match_event, match_user=match_user
-        )
-        if len(message_history_list) < 100 and len([x for x in message_history_list if x.message_text.strip()]) < 10:
+        match wordcloud_plugin_config.wordcloud_plugin_message_analyse_mode:
+            case 'TextRank':
+                wordcloud_image = await _generate_message_history_wordcloud(
+                    bot=bot, event=event, start_time=start_time, desc_text=desc_text,
+                    match_event=match_event, match_user=match_user
+                )
+            case 'TF-IDF' | _:
+                wordcloud_image = await _generate_term_frequency_wordcloud(
+                    bot=bot, event=event, start_time=start_time, desc_text=desc_text,
+                    match_event=match_event, match_user=match_user
+                )
+
+        if wordcloud_image is None:
             logger.info(f'WordCloud | {interface.entity} 没有足够的历史消息记录用于生成词云')
             await interface.send_reply('没有足够的历史消息记录用于生成词云, 请稍后再试')
             return
 
-        profile_image = await query_profile_image(bot, event, match_user=match_user)
-
-        desc_text += f'\n已统计 {len(message_history_list)} 条消息\n生成于: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
-
-        wordcloud_image = await draw_message_history_wordcloud(
-            messages=message_history_list, profile_image_file=profile_image, desc_text=desc_text
-        )
-
         logger.success(f'WordCloud | 生成 {interface.entity} 自 {start_time} 以来的词云成功')
         await interface.send_reply(OmegaMessageSegment.image(wordcloud_image.path))
     except Exception as e:
@@ -165,4 +177,56 @@ async def wordcloud_generate_handler(
         await interface.send_reply('生成词云失败, 请稍后再试或联系管理员处理')
 
 
+async def _generate_message_history_wordcloud(
+        bot: BaseBot,
+        event: BaseEvent,
+        start_time: datetime,
+        desc_text: str,
+        *,
+        match_event: bool = True,
+        match_user: bool = False,
+) -> Optional['TemporaryResource']:
+    """查询全部历史消息记录并分词生成词云, 没有足够的历史消息记录时返回 None"""
+    message_text_list = await query_entity_message_text(
+        bot=bot, event=event, start_time=start_time, match_event=match_event, match_user=match_user
+    )
+    if len(message_text_list) < 100 and len([x for x in message_text_list if x.strip()]) < 10:
+        return None
+
+    profile_image = await query_profile_image(bot, event, match_user=match_user)
+
+    desc_text += f'\n已统计 {len(message_text_list)} 条消息\n生成于: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
+
+    return await draw_message_history_wordcloud(
+        messages=message_text_list, profile_image_file=profile_image, desc_text=desc_text
+    )
+
+
+async def _generate_term_frequency_wordcloud(
+        bot: BaseBot,
+        event: BaseEvent,
+        start_time: datetime,
+        desc_text: str,
+        *,
+        match_event: bool = True,
+        match_user: bool = False,
+) -> Optional['TemporaryResource']:
+    """统计词语出现次数并按 TF-IDF 算法转换为词频权重生成词云, 没有足够的历史消息记录时返回 None"""
+    message_count, term_frequency = await query_entity_message_term_frequency(
+        bot=bot, event=event, start_time=start_time, match_event=match_event, match_user=match_user
+    )
+    if message_count < 100 and len(term_frequency) < 10:
+        return None
+
+    profile_image = await query_profile_image(bot, event, match_user=match_user)
+
+    desc_text += f'\n已统计 {message_count} 条消息\n生成于: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
+
+    return await draw_wordcloud(
+        word_frequency=await run_sync(weight_term_frequency)(term_count=term_frequency),
+        profile_image_file=profile_image,
+        desc_text=desc_text,
+    )
+
+
 __all__ = []
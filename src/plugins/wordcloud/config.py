@@ -26,6 +26,16 @@ class WordcloudPluginConfig(BaseModel):
     wordcloud_plugin_message_analyse_mode: Literal['TF-IDF', 'TextRank'] = 'TF-IDF'
     # 排除机器人自身的消息
     wordcloud_plugin_exclude_bot_self_message: bool = True
+    # 启用后台增量分词, 按实体及日期预先汇总词频, 仅在 TF-IDF 分词模式下生效
+    wordcloud_plugin_enable_term_frequency_aggregation: bool = True
+    # 后台增量分词每批处理的消息记录数量
+    wordcloud_plugin_term_frequency_batch_size: int = 2000
+    # 后台增量分词每次执行最多处理的批次数量
+    wordcloud_plugin_term_frequency_max_batches: int = 20
+    # 词频汇总保留天数, 应大于生成词云的最大统计时长(30天), 为 0 则永久保留
+    wordcloud_plugin_term_frequency_retention_days: int = 90
+    # 分批读取消息历史记录时每批的记录数量
+    wordcloud_plugin_history_query_chunk_size: int = 2000
 
     # 生成词云图片的尺寸
     wordcloud_plugin_generate_default_width: int = 1600
@@ -73,6 +83,14 @@ class WordcloudPluginConfig(BaseModel):
         """头像缓存路径"""
         return TemporaryResource(self.wordcloud_plugin_default_output_folder_name, 'profile_image')
 
+    @property
+    def enable_term_frequency_aggregation(self) -> bool:
+        """是否使用预先汇总的词频统计生成词云, TextRank 分词模式依赖完整文本, 无法使用汇总结果"""
+        return (
+                self.wordcloud_plugin_enable_term_frequency_aggregation
+                and self.wordcloud_plugin_message_analyse_mode == 'TF-IDF'
+        )
+
     @property
     def default_image_size(self) -> tuple[int, int]:
         return self.wordcloud_plugin_generate_default_width, self.wordcloud_plugin_generate_default_height
@@ -8,14 +8,20 @@
 @Software       : PyCharm
 """
 
+from collections import Counter
+from collections.abc import AsyncGenerator
 from os import SEEK_END, SEEK_SET
 from typing import TYPE_CHECKING, Optional
 
+from nonebot.utils import run_sync
+
 from src.database import HistoryDAL, begin_db_session
 from src.service import OmegaEntityInterface as OmEI
 from src.service import OmegaMatcherInterface as OmMI
 from src.utils import OmegaRequests
 from .config import wordcloud_plugin_config
+from .helpers import count_message_terms
+from .term_frequency import query_entity_term_frequency
 
 if TYPE_CHECKING:
     from datetime import datetime
@@ -23,11 +29,36 @@ if TYPE_CHECKING:
     from nonebot.adapters import Bot as BaseBot
     from nonebot.adapters import Event as BaseEvent
 
-    from src.database.internal.history import History
     from src.resource import TemporaryResource
 
 
-async def query_entity_message_history(
+async def _iter_entity_message_text(
+        bot: 'BaseBot',
+        event: 'BaseEvent',
+        *,
+        start_time: Optional['datetime'] = None,
+        end_time: Optional['datetime'] = None,
+        match_event: bool = True,
+        match_user: bool = False,
+) -> AsyncGenerator[list[str], None]:
+    """逐批迭代当前事件的消息历史记录文本内容"""
+    async with begin_db_session() as session:
+        event_entity = OmMI.get_entity(bot, event, session, acquire_type='event')
+        user_entity = OmMI.get_entity(bot, event, session, acquire_type='user')
+        async for rows in HistoryDAL(session).iter_entity_records(
+                bot_self_id=bot.self_id,
+                event_entity_id=event_entity.entity_id if match_event else None,
+                user_entity_id=user_entity.entity_id if match_user else None,
+                columns=('message_text',),
+                chunk_size=wordcloud_plugin_config.wordcloud_plugin_history_query_chunk_size,
+                start_time=start_time,
+                end_time=end_time,
+                exclude_bot_self_message=wordcloud_plugin_config.wordcloud_plugin_exclude_bot_self_message,
+        ):
+            yield [x.message_text for x in rows]
+
+
+async def query_entity_message_text(
         bot: 'BaseBot',
         event: 'BaseEvent',
         *,
@@ -35,20 +66,50 @@ async def query_entity_message_history(
         end_time: Optional['datetime'] = None,
         match_event: bool = True,
         match_user: bool = False,
-) -> list['History']:
-    """查询当前事件的消息历史记录"""
+) -> list[str]:
+    """查询当前事件的消息历史记录文本内容, 仅用于依赖完整文本的 TextRank 分词模式"""
+    message_texts: list[str] = []
+    async for messages in _iter_entity_message_text(
+            bot, event, start_time=start_time, end_time=end_time, match_event=match_event, match_user=match_user
+    ):
+        message_texts.extend(messages)
+    return message_texts
+
+
+async def query_entity_message_term_frequency(
+        bot: 'BaseBot',
+        event: 'BaseEvent',
+        *,
+        start_time: 'datetime',
+        match_event: bool = True,
+        match_user: bool = False,
+) -> tuple[int, dict[str, int]]:
+    """查询当前事件自起始时间以来的消息数量及词语出现次数
+
+    启用后台增量分词时合并预先汇总的词频, 否则逐批读取消息历史记录并分词统计
+    """
+    if not wordcloud_plugin_config.enable_term_frequency_aggregation:
+        message_count = 0
+        term_frequency: Counter[str] = Counter()
+        async for messages in _iter_entity_message_text(
+                bot, event, start_time=start_time, match_event=match_event, match_user=match_user
+        ):
+            term_frequency.update(await run_sync(count_message_terms)(messages=messages))
+            message_count += len(messages)
+        return message_count, dict(term_frequency)
+
     async with begin_db_session() as session:
         event_entity = OmMI.get_entity(bot, event, session, acquire_type='event')
         user_entity = OmMI.get_entity(bot, event, session, acquire_type='user')
-        histories_list = await HistoryDAL(session).query_entity_records(
-            bot_self_id=bot.self_id,
-            event_entity_id=event_entity.entity_id if match_event else None,
-            user_entity_id=user_entity.entity_id if match_user else None,
-            start_time=start_time,
-            end_time=end_time,
-            exclude_bot_self_message=wordcloud_plugin_config.wordcloud_plugin_exclude_bot_self_message,
-        )
-    return histories_list
+        event_entity_id = event_entity.entity_id
+        user_entity_id = user_entity.entity_id
+
+    return await query_entity_term_frequency(
+        bot_self_id=bot.self_id,
+        event_entity_id=event_entity_id if match_event else None,
+        user_entity_id=user_entity_id if match_user else None,
+        start_time=start_time,
+    )
 
 
 async def query_profile_image(bot: 'BaseBot', event: 'BaseEvent', match_user: bool = False) -> 'TemporaryResource':
@@ -75,9 +136,9 @@ async def add_user_dict(content: str) -> None:
             await af.write(f'{content.strip()}\n')
 
 
-
 __all__ = [
-    'query_entity_message_history',
+    'query_entity_message_term_frequency',
+    'query_entity_message_text',
     'query_profile_image',
     'add_user_dict',
 ]
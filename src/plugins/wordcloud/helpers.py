@@ -9,28 +9,63 @@
 """
 
 import re
-from collections.abc import Sequence
+import threading
+from collections import Counter
+from collections.abc import Mapping, Sequence
 from datetime import datetime
 from io import BytesIO
 from typing import TYPE_CHECKING, Optional
 
-import jieba
-import jieba.analyse
-import numpy as np
 from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
 from emoji import replace_emoji
 from nonebot.log import logger
 from nonebot.utils import run_sync
-from wordcloud import WordCloud
 
 from src.service.artwork_collection import get_artwork_collection, get_artwork_collection_type
+from src.utils.import_utils import lazy_import
 from .config import wordcloud_plugin_config
 
 if TYPE_CHECKING:
+    import jieba
+    import jieba.analyse as jieba_analyse
+    import numpy as np
+    import wordcloud as wordcloud_lib
     from numpy.typing import NDArray
 
-    from src.database.internal.history import History
     from src.resource import TemporaryResource
+else:
+    # jieba 词典及 wordcloud 依赖加载较慢, 在首次生成词云时才导入
+    jieba = lazy_import('jieba')
+    jieba_analyse = lazy_import('jieba.analyse')
+    np = lazy_import('numpy')
+    wordcloud_lib = lazy_import('wordcloud')
+
+
+_JIEBA_INITIALIZED: bool = False
+"""jieba 停用词表及用户词典是否已加载"""
+_JIEBA_INIT_LOCK: threading.Lock = threading.Lock()
+"""分词均在线程池中执行, 避免并发初始化"""
+
+
+def init_jieba() -> None:
+    """设置停用词表和加载用户词典, 仅在首次调用时执行, 会阻塞较长时间, 应在线程池中调用"""
+    global _JIEBA_INITIALIZED
+
+    if _JIEBA_INITIALIZED:
+        return
+
+    with _JIEBA_INIT_LOCK:
+        if _JIEBA_INITIALIZED:
+            return
+        jieba_analyse.set_stop_words(wordcloud_plugin_config.default_stop_words_file.resolve_path)
+        if wordcloud_plugin_config.user_dict_file.is_file:
+            jieba.load_userdict(wordcloud_plugin_config.user_dict_file.resolve_path)
+        _JIEBA_INITIALIZED = True
+
+
+def add_jieba_user_word(word: str) -> None:
+    """向已加载的 jieba 词典中添加用户自定义词语"""
+    jieba.add_word(word.strip())
 
 
 def prepare_message(messages: Sequence[str]) -> str:
@@ -56,20 +91,17 @@ def prepare_message(messages: Sequence[str]) -> str:
 
 def _analyse_tf_idf(message_text: str) -> dict[str, float]:
     """基于 TF-IDF 算法的关键词抽取方法统计词频"""
-    return {str(word): freq for word, freq in jieba.analyse.extract_tags(message_text, topK=0, withWeight=True)}
+    return {str(word): freq for word, freq in jieba_analyse.extract_tags(message_text, topK=0, withWeight=True)}
 
 
 def _analyse_textrank(message_text: str) -> dict[str, float]:
     """基于 TextRank 算法的关键词抽取方法统计词频"""
-    return {str(word): freq for word, freq in jieba.analyse.textrank(message_text, topK=0, withWeight=True)}
+    return {str(word): freq for word, freq in jieba_analyse.textrank(message_text, topK=0, withWeight=True)}
 
 
 def analyse_message(message_text: str) -> dict[str, float]:
     """使用 jieba 分词, 并进行关键词抽取和词频统计"""
-    # 设置停用词表和加载用户词典
-    jieba.analyse.set_stop_words(wordcloud_plugin_config.default_stop_words_file.resolve_path)
-    if wordcloud_plugin_config.user_dict_file.is_file:
-        jieba.load_userdict(wordcloud_plugin_config.user_dict_file.resolve_path)
+    init_jieba()
 
     # 分词和统计词频
     match wordcloud_plugin_config.wordcloud_plugin_message_analyse_mode:
@@ -79,6 +111,39 @@ def analyse_message(message_text: str) -> dict[str, float]:
             return _analyse_tf_idf(message_text)
 
 
+def count_message_terms(messages: Sequence[str], *, term_len_limit: int = 64) -> dict[str, int]:
+    """使用 jieba 分词并统计词语出现次数, 词语过滤规则与 TF-IDF 关键词抽取保持一致
+
+    词语去除首尾空白并统一为小写后计数, 避免仅大小写不同的词语在大小写不敏感的数据库排序规则下主键冲突
+    """
+    init_jieba()
+    stop_words = jieba_analyse.default_tfidf.stop_words
+
+    term_count: Counter[str] = Counter()
+    for message_text in messages:
+        prepared_message = prepare_message(messages=[message_text])
+        if not prepared_message.strip():
+            continue
+        for word in jieba.cut(prepared_message):
+            term = word.strip().lower()
+            if len(term) < 2 or term in stop_words or len(term) > term_len_limit:
+                continue
+            term_count[term] += 1
+    return dict(term_count)
+
+
+def weight_term_frequency(term_count: Mapping[str, int]) -> dict[str, float]:
+    """按 TF-IDF 算法将词语出现次数转换为词频权重, 结果与对全部文本直接进行关键词抽取一致"""
+    init_jieba()
+    idf_freq = jieba_analyse.default_tfidf.idf_freq
+    median_idf = jieba_analyse.default_tfidf.median_idf
+
+    total = sum(term_count.values())
+    if total <= 0:
+        return {}
+    return {word: count * idf_freq.get(word, median_idf) / total for word, count in term_count.items()}
+
+
 async def _get_random_background_artwork() -> 'TemporaryResource':
     """从数据库获取作品作为背景图"""
     random_artworks = await get_artwork_collection_type().query_any_origin_by_condition(
@@ -118,27 +183,29 @@ def _draw_wordcloud_mask(width: int, height: int) -> 'NDArray':
     return mask_np
 
 
-def _generate_message_history_wordcloud(messages: Sequence['History'], **wordcloud_options) -> 'Image.Image':
-    """根据查询到的消息历史记录绘制词云"""
-    # 统计历史消息词频
-    prepared_message = prepare_message(messages=[m.message_text for m in messages])
-    word_frequency = analyse_message(message_text=prepared_message)
-
-    # 生成词云
-    wordcloud = WordCloud(**wordcloud_options)
+def _generate_wordcloud(word_frequency: Mapping[str, float], **wordcloud_options) -> 'Image.Image':
+    """根据词频统计绘制词云"""
+    wordcloud = wordcloud_lib.WordCloud(**wordcloud_options)
     wordcloud_image: Image.Image = wordcloud.generate_from_frequencies(word_frequency).to_image()
 
     return wordcloud_image
 
 
 @run_sync
-def _draw_message_history_wordcloud(
-        messages: Sequence['History'],
+def _analyse_message_history(messages: Sequence[str]) -> dict[str, float]:
+    """统计历史消息词频"""
+    prepared_message = prepare_message(messages=messages)
+    return analyse_message(message_text=prepared_message)
+
+
+@run_sync
+def _draw_wordcloud(
+        word_frequency: Mapping[str, float],
         background_file: Optional['TemporaryResource'] = None,
         profile_image_file: Optional['TemporaryResource'] = None,
         desc_text: str | None = None,
 ) -> bytes:
-    """根据查询到的消息历史记录绘制词云"""
+    """根据词频统计绘制词云"""
     if background_file is not None:
         background = Image.open(background_file.resolve_path).convert('RGBA')
         background = Image.blend(background, Image.new('RGBA', background.size, (255, 255, 255, 255)), 0.75)
@@ -161,7 +228,7 @@ def _draw_message_history_wordcloud(
         'width': width,
         'height': height,
     })
-    wordcloud_image = _generate_message_history_wordcloud(messages=messages, **wordcloud_options)
+    wordcloud_image = _generate_wordcloud(word_frequency=word_frequency, **wordcloud_options)
 
     # 放置词云图片
     image_main.paste(
@@ -204,18 +271,18 @@ def _draw_message_history_wordcloud(
     return content
 
 
-async def draw_message_history_wordcloud(
-        messages: Sequence['History'],
+async def draw_wordcloud(
+        word_frequency: Mapping[str, float],
         profile_image_file: Optional['TemporaryResource'] = None,
         desc_text: str | None = None,
 ) -> 'TemporaryResource':
-    """根据查询到的消息历史记录绘制词云"""
+    """根据词频统计绘制词云"""
     background = None
     if wordcloud_plugin_config.wordcloud_plugin_enable_collected_artwork_background:
         background = await _get_random_background_artwork()
 
-    wordcloud_image_content = await _draw_message_history_wordcloud(
-        messages=messages,
+    wordcloud_image_content = await _draw_wordcloud(
+        word_frequency=word_frequency,
         background_file=background,
         profile_image_file=profile_image_file,
         desc_text=desc_text,
@@ -228,6 +295,22 @@ async def draw_message_history_wordcloud(
     return output_file
 
 
+async def draw_message_history_wordcloud(
+        messages: Sequence[str],
+        profile_image_file: Optional['TemporaryResource'] = None,
+        desc_text: str | None = None,
+) -> 'TemporaryResource':
+    """根据查询到的消息历史记录绘制词云"""
+    word_frequency = await _analyse_message_history(messages=messages)
+    return await draw_wordcloud(
+        word_frequency=word_frequency, profile_image_file=profile_image_file, desc_text=desc_text
+    )
+
+
 __all__ = [
+    'add_jieba_user_word',
+    'count_message_terms',
     'draw_message_history_wordcloud',
+    'draw_wordcloud',
+    'weight_term_frequency',
 ]
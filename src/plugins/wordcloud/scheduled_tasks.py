@@ -0,0 +1,82 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/2 16:41:19
+@FileName       : scheduled_tasks
+@Project        : omega-miya
+@Description    : 词云后台增量分词任务
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from nonebot.log import logger
+
+from src.service import scheduler
+from .config import wordcloud_plugin_config
+from .term_frequency import clean_expired_term_frequency, update_history_term_frequency
+
+
+async def wordcloud_term_frequency_updater() -> None:
+    """增量处理新增的消息记录并汇总词频"""
+    logger.debug('WordCloud | Started updating message history term frequency')
+    try:
+        processed_count = await update_history_term_frequency()
+        logger.debug(f'WordCloud | Updated term frequency of {processed_count} message history records')
+    except Exception as e:
+        logger.error(f'WordCloud | Updating message history term frequency failed, {e!r}')
+
+
+async def wordcloud_term_frequency_cleaner() -> None:
+    """清理超过保留期限的词频汇总"""
+    logger.debug('WordCloud | Started cleaning expired term frequency')
+    try:
+        await clean_expired_term_frequency()
+        logger.debug('WordCloud | Cleaned expired term frequency')
+    except Exception as e:
+        logger.error(f'WordCloud | Cleaning expired term frequency failed, {e!r}')
+
+
+if wordcloud_plugin_config.enable_term_frequency_aggregation:
+    scheduler.add_job(
+        wordcloud_term_frequency_updater,
+        'cron',
+        # year=None,
+        # month=None,
+        # day='*/1',
+        # week=None,
+        # day_of_week=None,
+        # hour=None,
+        minute='*/5',
+        second='41',
+        # start_date=None,
+        # end_date=None,
+        # timezone=None,
+        id='wordcloud_term_frequency_updater',
+        coalesce=True,
+        max_instances=1,
+        misfire_grace_time=120,
+    )
+
+    scheduler.add_job(
+        wordcloud_term_frequency_cleaner,
+        'cron',
+        # year=None,
+        # month=None,
+        # day='*/1',
+        # week=None,
+        # day_of_week=None,
+        hour='4',
+        minute='17',
+        second='23',
+        # start_date=None,
+        # end_date=None,
+        # timezone=None,
+        id='wordcloud_term_frequency_cleaner',
+        coalesce=True,
+        max_instances=1,
+        misfire_grace_time=300,
+    )
+
+
+__all__ = [
+    'scheduler',
+]
@@ -0,0 +1,178 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/2 16:08:44
+@FileName       : term_frequency
+@Project        : omega-miya
+@Description    : 消息记录增量分词及词频汇总
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from collections import Counter, defaultdict
+from collections.abc import Sequence
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING
+
+from nonebot.log import logger
+from nonebot.utils import run_sync
+
+from src.database import HistoryDAL, HistoryTermFrequencyDAL, begin_db_session
+from src.utils.incremental_cursor import CursorPosition, IncrementalCursor
+from .config import wordcloud_plugin_config
+from .helpers import count_message_terms
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from src.database.internal.history import History
+
+_TERM_FREQUENCY_CURSOR: IncrementalCursor = IncrementalCursor(
+    setting_name='wordcloud_term_frequency',
+    setting_key='last_history_position',
+    info='词云增量分词已处理的消息记录位置',
+    settle_delay=timedelta(seconds=60),
+)
+"""词云增量分词处理进度"""
+
+
+def _to_history_key(position: CursorPosition | None) -> tuple[int, int] | None:
+    """将游标位置转换为消息历史记录的 (received_time, id) 键"""
+    if position is None:
+        return None
+    record_time, record_id = position
+    return int(record_time.timestamp()), record_id
+
+
+@run_sync
+def _count_history_terms(histories: Sequence['History']) -> dict[tuple[str, str, str, date], dict[str, int]]:
+    """按实体及日期分组统计消息记录词频"""
+    grouped_messages: dict[tuple[str, str, str, date], list[str]] = defaultdict(list)
+    for history in histories:
+        stat_date = datetime.fromtimestamp(history.received_time).date()
+        grouped_key = (history.bot_self_id, history.event_entity_id, history.user_entity_id, stat_date)
+        grouped_messages[grouped_key].append(history.message_text)
+
+    return {key: count_message_terms(messages=messages) for key, messages in grouped_messages.items()}
+
+
+async def _update_history_term_frequency_batch(
+        session: 'AsyncSession',
+        position: CursorPosition | None,
+        end_time: datetime,
+) -> tuple[CursorPosition | None, int]:
+    """处理一批新增的消息记录, 返回处理后的消息记录位置及本批处理的记录数量"""
+    histories = await HistoryDAL(session).query_records_after(
+        after_key=_to_history_key(position),
+        limit=wordcloud_plugin_config.wordcloud_plugin_term_frequency_batch_size,
+        end_time=end_time,
+    )
+    if not histories:
+        return position, 0
+
+    grouped_term_frequency = await _count_history_terms(histories=histories)
+    term_frequency_dal = HistoryTermFrequencyDAL(session)
+    for (bot_self_id, event_entity_id, user_entity_id, stat_date), term_frequency in grouped_term_frequency.items():
+        await term_frequency_dal.increase(
+            bot_self_id=bot_self_id,
+            event_entity_id=event_entity_id,
+            user_entity_id=user_entity_id,
+            stat_date=stat_date,
+            term_frequency=term_frequency,
+        )
+    return (datetime.fromtimestamp(histories[-1].received_time), histories[-1].id), len(histories)
+
+
+async def update_history_term_frequency() -> int:
+    """增量处理新增的消息记录并汇总词频, 返回本次处理的记录数量"""
+    return await _TERM_FREQUENCY_CURSOR.run_batches(
+        _update_history_term_frequency_batch,
+        batch_size=wordcloud_plugin_config.wordcloud_plugin_term_frequency_batch_size,
+        max_batches=wordcloud_plugin_config.wordcloud_plugin_term_frequency_max_batches,
+    )
+
+
+async def clean_expired_term_frequency() -> None:
+    """清理超过保留期限的词频汇总"""
+    if (retention_days := wordcloud_plugin_config.wordcloud_plugin_term_frequency_retention_days) <= 0:
+        return
+
+    async with begin_db_session() as session:
+        await HistoryTermFrequencyDAL(session).delete_before(stat_date=date.today() - timedelta(days=retention_days))
+
+
+async def query_entity_term_frequency(
+        bot_self_id: str,
+        event_entity_id: str | None = None,
+        user_entity_id: str | None = None,
+        *,
+        start_time: datetime,
+) -> tuple[int, dict[str, int]]:
+    """查询某个实体自起始时间以来的消息数量及词语出现次数
+
+    完整日期内的词频直接使用预先汇总的统计结果,
+    起始时间所在的不完整日期及尚未被后台处理的新增消息则实时分词统计后合并
+    """
+    exclude_bot_self_message = wordcloud_plugin_config.wordcloud_plugin_exclude_bot_self_message
+
+    # 起始时间之后的第一个完整日期
+    if start_time.time() == time.min:
+        aggregated_start_date = start_time.date()
+    else:
+        aggregated_start_date = start_time.date() + timedelta(days=1)
+    aggregated_start_time = datetime.combine(aggregated_start_date, time.min)
+
+    async with _TERM_FREQUENCY_CURSOR.lock:
+        async with begin_db_session() as session:
+            position = await _TERM_FREQUENCY_CURSOR.query_position(session)
+            history_dal = HistoryDAL(session)
+            message_count = await history_dal.count_entity_records(
+                bot_self_id=bot_self_id,
+                event_entity_id=event_entity_id,
+                user_entity_id=user_entity_id,
+                start_time=start_time,
+                exclude_bot_self_message=exclude_bot_self_message,
+            )
+            aggregated_term_frequency = await HistoryTermFrequencyDAL(session).query_entity_term_frequency(
+                bot_self_id=bot_self_id,
+                event_entity_id=event_entity_id,
+                user_entity_id=user_entity_id,
+                start_date=aggregated_start_date,
+                exclude_bot_self_message=exclude_bot_self_message,
+            )
+            # 起始时间所在的不完整日期, 及完整日期内尚未被后台处理的新增消息
+            realtime_scans: list[tuple[datetime, datetime | None, tuple[int, int] | None]] = [
+                (aggregated_start_time, None, _to_history_key(position))
+            ]
+            if start_time < aggregated_start_time:
+                realtime_scans.insert(0, (start_time, aggregated_start_time - timedelta(seconds=1), None))
+
+            # 逐批分词统计, 避免将全部消息文本保留在内存中
+            term_frequency = Counter(aggregated_term_frequency)
+            realtime_message_count = 0
+            for scan_start_time, scan_end_time, scan_after_key in realtime_scans:
+                async for rows in history_dal.iter_entity_records(
+                        bot_self_id=bot_self_id,
+                        event_entity_id=event_entity_id,
+                        user_entity_id=user_entity_id,
+                        columns=('message_text',),
+                        chunk_size=wordcloud_plugin_config.wordcloud_plugin_history_query_chunk_size,
+                        start_time=scan_start_time,
+                        end_time=scan_end_time,
+                        exclude_bot_self_message=exclude_bot_self_message,
+                        after_key=scan_after_key,
+                ):
+                    term_frequency.update(await run_sync(count_message_terms)(messages=[x.message_text for x in rows]))
+                    realtime_message_count += len(rows)
+
+    logger.debug(
+        f'WordCloud | Merged term frequency of {len(aggregated_term_frequency)} aggregated terms '
+        f'and {realtime_message_count} realtime messages'
+    )
+    return message_count, dict(term_frequency)
+
+
+__all__ = [
+    'clean_expired_term_frequency',
+    'query_entity_term_frequency',
+    'update_history_term_frequency',
+]
@@ -11,6 +11,7 @@
 from typing import TYPE_CHECKING, Literal, overload
 
 from src.service.artwork_proxy import ALLOW_ARTWORK_ORIGIN
+from .image_hash import ArtworkDuplicateReport, query_artwork_duplicate_report, rebuild_artwork_duplicate_groups
 from .sites import (
     BehoimiArtworkCollection,
     DanbooruArtworkCollection,
@@ -98,6 +99,7 @@ def get_artwork_collection(artwork: 'DBArtworkCollection') -> 'CollectedArtwork'
 
 __all__ = [
     'ALLOW_ARTWORK_ORIGIN',
+    'ArtworkDuplicateReport',
     'DanbooruArtworkCollection',
     'GelbooruArtworkCollection',
     'BehoimiArtworkCollection',
@@ -109,4 +111,6 @@ __all__ = [
     'PixivArtworkCollection',
     'get_artwork_collection',
     'get_artwork_collection_type',
+    'query_artwork_duplicate_report',
+    'rebuild_artwork_duplicate_groups',
 ]
@@ -0,0 +1,42 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/9 15:40:13
+@FileName       : config
+@Project        : omega-miya
+@Description    : Artwork Collection 配置
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from nonebot import get_plugin_config, logger
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+class ArtworkCollectionConfig(BaseModel):
+    """Artwork Collection 配置"""
+    # 收录作品时计算作品首页图片的感知哈希, 用于检测不同来源收录的近似重复作品
+    artwork_collection_enable_image_hash: bool = True
+    # 后台同时计算图片感知哈希的最大作品数量, 收录作品时哈希计算在后台进行, 不阻塞收录流程
+    artwork_collection_image_hash_concurrency: int = Field(default=2, ge=1)
+    # dHash 汉明距离不超过该值的作品视为候选重复, 多索引哈希查询仅在该值不超过 3 时保证无遗漏
+    artwork_collection_dhash_max_distance: int = Field(default=3, ge=0, le=3)
+    # 候选重复作品的 pHash 汉明距离也不超过该值时才视为近似重复
+    artwork_collection_phash_max_distance: int = Field(default=8, ge=0, le=64)
+    # 仅返回不重复作品时的过采样倍数, 按该倍数多查询作品后再按近似重复分组去重
+    artwork_collection_unique_oversampling: int = Field(default=3, ge=1)
+
+    model_config = ConfigDict(extra='ignore')
+
+
+try:
+    artwork_collection_config = get_plugin_config(ArtworkCollectionConfig)
+except ValidationError as e:
+    import sys
+
+    logger.opt(colors=True).critical(f'<r>Artwork Collection 配置格式验证失败</r>, 错误信息:\n{e}')
+    sys.exit(f'Artwork Collection 配置格式验证失败, {e}')
+
+
+__all__ = [
+    'artwork_collection_config',
+]
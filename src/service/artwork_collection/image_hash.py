@@ -0,0 +1,138 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/9 15:52:36
+@FileName       : image_hash
+@Project        : omega-miya
+@Description    : 基于图片感知哈希的近似重复作品检测
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel, ConfigDict
+
+from src.database import ArtworkImageHashDAL, begin_db_session
+from src.database.internal.artwork_image_hash import split_hash_segments
+from src.utils.image_utils import hamming_distance
+from .config import artwork_collection_config
+
+if TYPE_CHECKING:
+    from src.database.internal.artwork_image_hash import ArtworkImageHash
+    from src.utils.image_utils import ImageHash
+
+
+class ArtworkDuplicateGroup(BaseModel):
+    """近似重复作品分组"""
+    group_key: str
+    artworks: list[str]  # 组内作品的 origin:aid, 按收录时间排序
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+
+class ArtworkDuplicateReport(BaseModel):
+    """近似重复作品报告"""
+    groups: list[ArtworkDuplicateGroup]
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+    @property
+    def group_count(self) -> int:
+        """包含多个作品的分组数量"""
+        return len(self.groups)
+
+    @property
+    def duplicate_count(self) -> int:
+        """除各分组首个作品外的重复作品数量"""
+        return sum(len(x.artworks) - 1 for x in self.groups)
+
+
+def _is_near_duplicate(dhash: int, phash: int, other: 'ArtworkImageHash') -> bool:
+    return (
+            hamming_distance(dhash, other.dhash) <= artwork_collection_config.artwork_collection_dhash_max_distance
+            and hamming_distance(phash, other.phash) <= artwork_collection_config.artwork_collection_phash_max_distance
+    )
+
+
+async def add_artwork_image_hash(origin: str, aid: str, image_hash: 'ImageHash') -> str:
+    """写入作品图片感知哈希, 若存在近似重复作品则加入其分组, 返回作品所属的分组"""
+    artwork_key = f'{origin}:{aid}'
+    async with begin_db_session() as session:
+        image_hash_dal = ArtworkImageHashDAL(session)
+        candidates = await image_hash_dal.query_candidates(dhash=image_hash.dhash)
+        matched = sorted(
+            (
+                x for x in candidates
+                if x.artwork_key != artwork_key and _is_near_duplicate(image_hash.dhash, image_hash.phash, x)
+            ),
+            key=lambda x: x.created_at or datetime.min
+        )
+        group_key = matched[0].group_key if matched else artwork_key
+        await image_hash_dal.upsert(
+            origin=origin, aid=aid, dhash=image_hash.dhash, phash=image_hash.phash, group_key=group_key
+        )
+    return group_key
+
+
+async def rebuild_artwork_duplicate_groups() -> int:
+    """按当前阈值重新计算全部作品的近似重复分组, 返回分组发生变化的作品数量
+
+    以 dHash 的 4 个 16 位分段分别建立倒排桶查找候选, 并查集合并近似重复的作品, 每组以最先收录的作品作为分组
+    """
+    async with begin_db_session() as session:
+        all_hashes = await ArtworkImageHashDAL(session).query_all()
+
+    parents = list(range(len(all_hashes)))
+
+    def _find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    segment_buckets: list[dict[int, list[int]]] = [defaultdict(list) for _ in range(4)]
+    for index, item in enumerate(all_hashes):
+        candidates: set[int] = set()
+        for bucket, segment in zip(segment_buckets, split_hash_segments(item.dhash)):
+            candidates.update(bucket[segment])
+            bucket[segment].append(index)
+
+        for candidate in candidates:
+            if _is_near_duplicate(item.dhash, item.phash, all_hashes[candidate]):
+                root, candidate_root = _find(index), _find(candidate)
+                # 总是以先收录的作品作为根
+                parents[max(root, candidate_root)] = min(root, candidate_root)
+
+    changed_group_keys = [
+        (item.origin, item.aid, group_key)
+        for index, item in enumerate(all_hashes)
+        if (group_key := all_hashes[_find(index)].artwork_key) != item.group_key
+    ]
+    if changed_group_keys:
+        async with begin_db_session() as session:
+            await ArtworkImageHashDAL(session).update_group_keys(group_keys=changed_group_keys)
+    return len(changed_group_keys)
+
+
+async def query_artwork_duplicate_report(origin: str | None = None) -> ArtworkDuplicateReport:
+    """查询近似重复作品报告
+
+    :param origin: 仅返回包含该来源作品的分组, 为空则返回全部
+    """
+    async with begin_db_session() as session:
+        duplicate_groups = await ArtworkImageHashDAL(session).query_duplicate_groups(origin=origin)
+
+    return ArtworkDuplicateReport(groups=[
+        ArtworkDuplicateGroup(group_key=group_key, artworks=[x.artwork_key for x in artworks])
+        for group_key, artworks in duplicate_groups.items()
+    ])
+
+
+__all__ = [
+    'ArtworkDuplicateReport',
+    'add_artwork_image_hash',
+    'query_artwork_duplicate_report',
+    'rebuild_artwork_duplicate_groups',
+]
@@ -9,13 +9,18 @@
 """
 
 import abc
+import asyncio
 from collections.abc import Sequence
 from typing import TYPE_CHECKING, Literal
 
+from nonebot import get_driver
+from nonebot.log import logger
 from sqlalchemy.exc import NoResultFound
 
-from src.database import begin_db_session
+from src.database import ArtworkImageHashDAL, begin_db_session
 from src.database.internal.artwork_collection import ArtworkCollectionDAL
+from .config import artwork_collection_config
+from .image_hash import add_artwork_image_hash
 
 if TYPE_CHECKING:
     from src.database.internal.artwork_collection import (
@@ -27,6 +32,20 @@ if TYPE_CHECKING:
     from src.service.artwork_proxy.typing import ArtworkProxyType
 
 
+_IMAGE_HASH_SEMAPHORE = asyncio.Semaphore(artwork_collection_config.artwork_collection_image_hash_concurrency)
+"""限制后台同时计算图片感知哈希的作品数量, 避免批量收录作品时集中下载及计算"""
+_IMAGE_HASH_TASKS: set[asyncio.Task[None]] = set()
+"""后台计算图片感知哈希的任务, 保持任务引用直至完成"""
+
+
+@get_driver().on_shutdown
+async def _cancel_image_hash_tasks() -> None:
+    """关闭时取消尚未完成的后台图片感知哈希计算任务"""
+    for task in _IMAGE_HASH_TASKS:
+        task.cancel()
+    await asyncio.gather(*_IMAGE_HASH_TASKS, return_exceptions=True)
+
+
 class BaseArtworkCollection(abc.ABC):
     """收藏作品合集基类, 封装后用于插件调用的数据库实体操作对象"""
 
@@ -61,8 +80,12 @@ class BaseArtworkCollection(abc.ABC):
             acc_mode: bool = False,
             ratio: int | None = None,
             order_mode: Literal['random', 'latest', 'aid', 'aid_desc'] = 'random',
+            unique_only: bool = False,
     ) -> list['DBArtworkCollection']:
-        """从所有或任意指定来源根据要求查询作品, default classification range: 2-3, default rating range: 0-0"""
+        """从所有或任意指定来源根据要求查询作品, default classification range: 2-3, default rating range: 0-0
+
+        :param unique_only: 是否仅返回不重复的作品, 图片近似重复的作品仅保留一个
+        """
         if isinstance(keywords, str):
             keywords = [keywords]
 
@@ -77,7 +100,8 @@ class BaseArtworkCollection(abc.ABC):
                 origin=origin, keywords=keywords, num=num,
                 classification_min=min(allow_classification_range), classification_max=max(allow_classification_range),
                 rating_min=min(allow_rating_range), rating_max=max(allow_rating_range),
-                acc_mode=acc_mode, ratio=ratio, order_mode=order_mode
+                acc_mode=acc_mode, ratio=ratio, order_mode=order_mode, unique_only=unique_only,
+                unique_oversampling=artwork_collection_config.artwork_collection_unique_oversampling
             )
         return result
 
@@ -109,12 +133,13 @@ class BaseArtworkCollection(abc.ABC):
             acc_mode: bool = False,
             ratio: int | None = None,
             order_mode: Literal['random', 'latest', 'aid', 'aid_desc'] = 'random',
+            unique_only: bool = False,
     ) -> list['DBArtworkCollection']:
         """根据要求查询作品, default classification range: 2-3, default rating range: 0-0"""
         return await cls.query_any_origin_by_condition(
             origin=cls._get_origin_name(), keywords=keywords, num=num,
             allow_classification_range=allow_classification_range, allow_rating_range=allow_rating_range,
-            acc_mode=acc_mode, ratio=ratio, order_mode=order_mode
+            acc_mode=acc_mode, ratio=ratio, order_mode=order_mode, unique_only=unique_only
         )
 
     @classmethod
@@ -124,12 +149,14 @@ class BaseArtworkCollection(abc.ABC):
             *,
             allow_classification_range: tuple[int, int] | None = (2, 3),
             allow_rating_range: tuple[int, int] | None = (0, 0),
-            ratio: int | None = None
+            ratio: int | None = None,
+            unique_only: bool = False,
     ) -> list['DBArtworkCollection']:
         """获取随机作品, default classification range: 2-3, default rating range: 0-0"""
         return await cls.query_by_condition(
             keywords=None, num=num, ratio=ratio,
-            allow_classification_range=allow_classification_range, allow_rating_range=allow_rating_range
+            allow_classification_range=allow_classification_range, allow_rating_range=allow_rating_range,
+            unique_only=unique_only
         )
 
     @classmethod
@@ -256,7 +283,7 @@ class BaseArtworkCollection(abc.ABC):
         :param force_update_mark: 更新时是否强制更新数据库中存在的 classification 及 rating 标签, 若否则仅大于已有值时更新
         :return: None
         """
-        artwork_data = await self.__ap.query(use_cache=use_cache)
+        artwork_data = await self.__ap.query(use_cache=use_cache, allow_partial=False)
         classification = classification if (classification is not None) else artwork_data.classification.value
         rating = rating if (rating is not None) else artwork_data.rating.value
 
@@ -289,6 +316,8 @@ class BaseArtworkCollection(abc.ABC):
                     description=None if not artwork_data.description else artwork_data.description
                 )
 
+        self._schedule_image_hash()
+
     async def add_artwork_into_database_ignore_exists(
             self,
             *,
@@ -308,7 +337,7 @@ class BaseArtworkCollection(abc.ABC):
             try:
                 await artwork_dal.query_unique(origin=self.origin_name, aid=self.__ap.s_aid)
             except NoResultFound:
-                artwork_data = await self.__ap.query(use_cache=use_cache)
+                artwork_data = await self.__ap.query(use_cache=use_cache, allow_partial=False)
 
                 classification = classification if (classification is not None) else artwork_data.classification.value
                 rating = rating if (rating is not None) else artwork_data.rating.value
@@ -323,10 +352,48 @@ class BaseArtworkCollection(abc.ABC):
                     description=None if not artwork_data.description else artwork_data.description
                 )
 
+        self._schedule_image_hash()
+
+    async def add_image_hash_into_database(self, *, force_update: bool = False) -> str:
+        """计算作品首页图片的感知哈希并写入数据库, 返回作品所属的近似重复分组
+
+        :param force_update: 是否强制重新计算已存在的哈希
+        """
+        if not force_update:
+            async with begin_db_session() as session:
+                try:
+                    image_hash = await ArtworkImageHashDAL(session=session).query_unique(
+                        origin=self.origin_name, aid=self.__ap.s_aid
+                    )
+                    return image_hash.group_key
+                except NoResultFound:
+                    pass
+
+        image_hash = await self.__ap.get_page_image_hash()
+        return await add_artwork_image_hash(origin=self.origin_name, aid=self.__ap.s_aid, image_hash=image_hash)
+
+    async def _add_image_hash_ignore_error(self) -> None:
+        """内部方法, 收录作品后计算图片感知哈希, 失败时不影响作品收录"""
+        async with _IMAGE_HASH_SEMAPHORE:
+            try:
+                await self.add_image_hash_into_database()
+            except Exception as e:
+                logger.warning(f'ArtworkCollection | Computing {self} image hash failed, {e!r}')
+
+    def _schedule_image_hash(self) -> None:
+        """内部方法, 收录作品后在后台计算图片感知哈希, 不等待下载图片及计算完成"""
+        if not artwork_collection_config.artwork_collection_enable_image_hash:
+            return
+
+        task = asyncio.create_task(self._add_image_hash_ignore_error())
+        _IMAGE_HASH_TASKS.add(task)
+        task.add_done_callback(_IMAGE_HASH_TASKS.discard)
+
     async def delete_artwork_from_database(self) -> None:
         """从数据库删除该作品信息"""
         async with begin_db_session() as session:
             await ArtworkCollectionDAL(session=session).delete(origin=self.origin_name, aid=self.__ap.s_aid)
+            await ArtworkImageHashDAL(session=session).delete(origin=self.origin_name, aid=self.__ap.s_aid)
 
 
 __all__ = [
@@ -10,6 +10,10 @@
 
 from typing import Literal
 
+from nonebot.log import logger
+
+from src.service.apscheduler import scheduler
+from .config import artwork_proxy_config
 from .sites import (
     BehoimiArtworkProxy,
     DanbooruArtworkProxy,
@@ -34,6 +38,38 @@ type ALLOW_ARTWORK_ORIGIN = Literal[
 ]
 
 
+async def _clean_expired_prewarm_meta() -> None:
+    """定期清理各图库已过期的搜索结果预热元数据缓存文件"""
+    for artwork_proxy in (
+            BehoimiArtworkProxy,
+            DanbooruArtworkProxy,
+            GelbooruArtworkProxy,
+            KonachanArtworkProxy,
+            KonachanSafeArtworkProxy,
+            YandereArtworkProxy,
+    ):
+        try:
+            cleaned_count = await artwork_proxy.clean_expired_prewarm_meta()
+            if cleaned_count:
+                logger.debug(f'ArtworkProxy | Cleaned {cleaned_count} expired {artwork_proxy.__name__} prewarm meta')
+        except Exception as e:
+            logger.warning(f'ArtworkProxy | Cleaning {artwork_proxy.__name__} expired prewarm meta failed, {e!r}')
+
+
+if artwork_proxy_config.artwork_proxy_enable_search_prewarm:
+    scheduler.add_job(
+        _clean_expired_prewarm_meta,
+        'cron',
+        hour='*/1',
+        minute='23',
+        second='37',
+        id='artwork_proxy_prewarm_meta_cleaner',
+        coalesce=True,
+        max_instances=1,
+        misfire_grace_time=600,
+    )
+
+
 __all__ = [
     'ALLOW_ARTWORK_ORIGIN',
     'DanbooruArtworkProxy',
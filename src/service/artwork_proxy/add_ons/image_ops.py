@@ -15,8 +15,14 @@ from typing import TYPE_CHECKING, Literal
 from nonebot.utils import run_sync
 
 from src.utils import semaphore_gather
-from src.utils.image_utils import ImageEffectProcessor, ImageLoader
-from src.utils.image_utils.template import PreviewImageModel, PreviewImageThumbs, generate_thumbs_preview_image
+from src.utils.image_utils import ImageEffectProcessor, ImageLoader, ThumbnailPyramid
+from src.utils.image_utils.template import (
+    PreviewImageModel,
+    PreviewImageThumbs,
+    build_preview_cache_key,
+    generate_thumbs_preview_image,
+    get_cached_preview_image,
+)
 from .typing import ArtworkProxyAddonsMixin
 from ..models import ArtworkPool
 
@@ -125,6 +131,17 @@ class ImageOpsMixin(ArtworkProxyAddonsMixin, abc.ABC):
 
     """预览图生成工具"""
 
+    async def get_page_thumbnail_file(
+            self,
+            page_index: int = 0,
+            *,
+            page_type: 'ArtworkPageParamType' = 'preview',
+            size: tuple[int, int] = (256, 256),
+    ) -> 'TemporaryResource':
+        """获取作品图片最接近指定尺寸的缩略图, 各级缩略图在首次使用时生成"""
+        page_file = await self.get_page_file(page_index=page_index, page_type=page_type)
+        return await ThumbnailPyramid(source=page_file, folder=self.path_config.thumbnail_path).get(size=size)
+
     @classmethod
     async def _get_any_image_preview_thumb_data(cls, url: str, desc_text: str) -> PreviewImageThumbs:
         """获取生成预览图所需要的任意图片的数据"""
@@ -135,12 +152,13 @@ class ImageOpsMixin(ArtworkProxyAddonsMixin, abc.ABC):
             *,
             page_type: 'ArtworkPageParamType' = 'preview',
             no_blur_rating: int = 1,
+            preview_size: tuple[int, int] = (256, 256),
     ) -> PreviewImageThumbs:
         """获取生成预览图所需要的作品数据"""
         max_no_blur_rating = max(0, no_blur_rating)
         artwork_data = await self.query()
 
-        image_file = await self.get_page_file(page_type=page_type)
+        image_file = await self.get_page_thumbnail_file(page_type=page_type, size=preview_size)
         if artwork_data.rating.value <= max_no_blur_rating:
             proceed_image = await self._handle_mark(image=image_file, origin_mark=artwork_data.aid)
         else:
@@ -180,11 +198,14 @@ class ImageOpsMixin(ArtworkProxyAddonsMixin, abc.ABC):
             *,
             page_type: 'ArtworkPageParamType' = 'preview',
             no_blur_rating: int = 1,
+            preview_size: tuple[int, int] = (256, 256),
             limit: int = 100,
     ) -> PreviewImageModel:
         """获取生成预览图所需要的所有作品的数据"""
         tasks = [
-            artwork._get_preview_thumb_data(page_type=page_type, no_blur_rating=no_blur_rating)
+            artwork._get_preview_thumb_data(
+                page_type=page_type, no_blur_rating=no_blur_rating, preview_size=preview_size
+            )
             for artwork in artworks[:limit]
         ]
         requests_data = await semaphore_gather(tasks=tasks, semaphore_num=8, filter_exception=True)
@@ -254,11 +275,21 @@ class ImageOpsMixin(ArtworkProxyAddonsMixin, abc.ABC):
         :param limit: 限制生成时缩略图数量的最大值
         :return: TemporaryResource
         """
+        path_config = cls._generate_path_config()
+
+        # 相同作品列表及布局的预览图在有效期内直接使用缓存
+        cache_key = build_preview_cache_key(
+            *(f'{x.get_base_origin_name()}:{x.s_aid}' for x in artworks[:limit]),  # type: ignore
+            preview_name=preview_name, page_type=page_type, no_blur_rating=no_blur_rating,
+            preview_size=preview_size, edge_scale=edge_scale, num_of_line=num_of_line,
+        )
+        if (cached_preview := get_cached_preview_image(cache_key, output_folder=path_config.preview_path)) is not None:
+            return cached_preview
+
         preview = await cls._get_artworks_preview_data(
             preview_name=preview_name, artworks=artworks,
-            page_type=page_type, no_blur_rating=no_blur_rating, limit=limit
+            page_type=page_type, no_blur_rating=no_blur_rating, preview_size=preview_size, limit=limit
         )
-        path_config = cls._generate_path_config()
 
         return await generate_thumbs_preview_image(
             preview=preview,
@@ -269,7 +300,8 @@ class ImageOpsMixin(ArtworkProxyAddonsMixin, abc.ABC):
             edge_scale=edge_scale,
             num_of_line=num_of_line,
             limit=limit,
-            output_folder=path_config.preview_path
+            output_folder=path_config.preview_path,
+            cache_key=cache_key,
         )
 
 
@@ -8,9 +8,22 @@
 @Software       : PyCharm
 """
 
+from nonebot import get_plugin_config, logger
+from pydantic import BaseModel, ConfigDict, ValidationError
+
 from src.resource import StaticResource, TemporaryResource
 
 
+class ArtworkProxyConfig(BaseModel):
+    """Artwork Proxy 配置"""
+    # 搜索/随机获取作品时直接解析结果中的作品信息并预热元数据缓存, 避免对每个结果再单独请求作品信息
+    artwork_proxy_enable_search_prewarm: bool = True
+    # 由搜索结果预热的元数据缓存有效期(秒), 超时后再次获取作品信息时将重新请求完整作品信息
+    artwork_proxy_search_prewarm_freshness: int = 3600
+
+    model_config = ConfigDict(extra='ignore')
+
+
 class ArtworkProxyPathConfig:
     """作品本地缓存路径配置"""
     _default_text_font_name: str = 'SourceHanSansSC-Regular.otf'
@@ -44,6 +57,11 @@ class ArtworkProxyPathConfig:
         """作品图片缓存文件目录"""
         return self.base_path('artwork')
 
+    @property
+    def thumbnail_path(self) -> TemporaryResource:
+        """作品图片多级缩略图缓存文件目录"""
+        return self.base_path('thumbnail')
+
     @property
     def preview_path(self) -> TemporaryResource:
         """生成预览图缓存文件目录"""
@@ -55,6 +73,16 @@ class ArtworkProxyPathConfig:
         return self.base_path('processed')
 
 
+try:
+    artwork_proxy_config = get_plugin_config(ArtworkProxyConfig)
+except ValidationError as e:
+    import sys
+
+    logger.opt(colors=True).critical(f'<r>Artwork Proxy 配置格式验证失败</r>, 错误信息:\n{e}')
+    sys.exit(f'Artwork Proxy 配置格式验证失败, {e}')
+
+
 __all__ = [
-    'ArtworkProxyPathConfig'
+    'ArtworkProxyPathConfig',
+    'artwork_proxy_config',
 ]
@@ -9,14 +9,17 @@
 """
 
 import abc
+import time
 from pathlib import PurePath
 from typing import TYPE_CHECKING, Self
 from urllib.parse import unquote, urlparse
 
+from nonebot.utils import run_sync
 from pydantic import ValidationError
 
 from src.utils import semaphore_gather
-from .config import ArtworkProxyPathConfig
+from src.utils.image_utils import ImageHash, ImageLoader, compute_image_hash
+from .config import ArtworkProxyPathConfig, artwork_proxy_config
 from .models import ArtworkData
 
 if TYPE_CHECKING:
@@ -34,6 +37,8 @@ class BaseArtworkProxy(abc.ABC):
 
         # 实例缓存
         self.artwork_data: ArtworkData | None = None
+        # 实例缓存是否为由搜索结果预热的不完整作品信息
+        self._artwork_data_partial: bool = False
 
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}(artwork_id={self.s_aid})'
@@ -57,6 +62,15 @@ class BaseArtworkProxy(abc.ABC):
     def meta_file(self) -> 'TemporaryResource':
         return self.path_config.meta_path(self.meta_file_name)
 
+    @property
+    def prewarm_meta_file_name(self) -> str:
+        return f'{self.s_aid}.prewarm.json'
+
+    @property
+    def prewarm_meta_file(self) -> 'TemporaryResource':
+        """由搜索结果预热的不完整元数据缓存文件, 仅在有效期内使用, 需要完整作品信息时不使用"""
+        return self.path_config.meta_path(self.prewarm_meta_file_name)
+
     @property
     def origin_name(self) -> str:
         """对外暴露该作品对应图库的来源名称, 用于数据库收录"""
@@ -107,14 +121,49 @@ class BaseArtworkProxy(abc.ABC):
         """内部方法, 根据关键词搜索作品 ID 列表"""
         raise NotImplementedError
 
+    @classmethod
+    async def _random_with_data(cls, *, limit: int = 20) -> list[ArtworkData]:
+        """内部方法, 随机获取作品并直接解析结果中的作品信息, 图库接口不支持时保持未实现即可"""
+        raise NotImplementedError
+
+    @classmethod
+    async def _search_with_data(cls, keyword: str, *, page: int | None = None, **kwargs) -> list[ArtworkData]:
+        """内部方法, 根据关键词搜索作品并直接解析结果中的作品信息, 图库接口不支持时保持未实现即可"""
+        raise NotImplementedError
+
+    @classmethod
+    async def _prewarm(cls, artworks_data: list[ArtworkData]) -> list[Self]:
+        """内部方法, 使用搜索结果中的作品信息预热实例缓存及元数据缓存, 预热的作品信息均视为不完整的作品信息"""
+
+        async def _prewarm_artwork(artwork_data: ArtworkData) -> Self:
+            artwork = cls(artwork_id=artwork_data.aid)
+            artwork.artwork_data = artwork_data
+            artwork._artwork_data_partial = True
+            if not artwork.meta_file.is_file and not artwork._check_prewarm_meta_fresh():
+                await artwork._dumps_prewarm_meta(artwork_data=artwork_data)
+            return artwork
+
+        tasks = [_prewarm_artwork(artwork_data=x) for x in artworks_data]
+        return list(await semaphore_gather(tasks=tasks, semaphore_num=8, return_exceptions=False))
+
     @classmethod
     async def random(cls, *, limit: int = 20) -> list[Self]:
         """随机获取作品列表"""
+        if artwork_proxy_config.artwork_proxy_enable_search_prewarm:
+            try:
+                return await cls._prewarm(artworks_data=await cls._random_with_data(limit=limit))
+            except NotImplementedError:
+                pass
         return [cls(artwork_id=aid) for aid in await cls._random(limit=limit)]
 
     @classmethod
     async def search(cls, keyword: str, *, page: int | None = None, **kwargs) -> list[Self]:
         """根据关键词搜索作品列表"""
+        if artwork_proxy_config.artwork_proxy_enable_search_prewarm:
+            try:
+                return await cls._prewarm(artworks_data=await cls._search_with_data(keyword, page=page, **kwargs))
+            except NotImplementedError:
+                pass
         return [cls(artwork_id=aid) for aid in await cls._search(keyword=keyword, page=page, **kwargs)]
 
     @abc.abstractmethod
@@ -127,25 +176,76 @@ class BaseArtworkProxy(abc.ABC):
         async with self.meta_file.async_open('w', encoding='utf8') as af:
             await af.write(artwork_data.model_dump_json())
 
-    async def _fast_query(self, *, use_cache: bool = True) -> ArtworkData:
-        """获取作品信息, 优先从本地缓存加载"""
-        if use_cache and self.meta_file.is_file:
+    async def _dumps_prewarm_meta(self, artwork_data: ArtworkData) -> None:
+        """内部方法, 缓存由搜索结果预热的元数据"""
+        async with self.prewarm_meta_file.async_open('w', encoding='utf8') as af:
+            await af.write(artwork_data.model_dump_json())
+
+    def _check_prewarm_meta_fresh(self) -> bool:
+        """内部方法, 检查由搜索结果预热的元数据缓存是否仍在有效期内, 过期的缓存文件将被删除"""
+        try:
+            prewarm_age = time.time() - self.prewarm_meta_file.path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+
+        if prewarm_age <= artwork_proxy_config.artwork_proxy_search_prewarm_freshness:
+            return True
+        self.prewarm_meta_file.path.unlink(missing_ok=True)
+        return False
+
+    @classmethod
+    @run_sync
+    def clean_expired_prewarm_meta(cls) -> int:
+        """清理该图库已过期的预热元数据缓存文件, 返回清理的文件数量"""
+        meta_path = cls._generate_path_config().meta_path.path
+        if not meta_path.is_dir():
+            return 0
+
+        expired_time = time.time() - artwork_proxy_config.artwork_proxy_search_prewarm_freshness
+        cleaned_count = 0
+        for prewarm_file in meta_path.glob('*.prewarm.json'):
             try:
-                async with self.meta_file.async_open('r', encoding='utf8') as af:
-                    artwork_data = ArtworkData.model_validate_json(await af.read())
-            except ValidationError:
-                artwork_data = await self._query()
-                await self._dumps_meta(artwork_data=artwork_data)
-        else:
-            artwork_data = await self._query()
-            await self._dumps_meta(artwork_data=artwork_data)
+                if prewarm_file.stat().st_mtime < expired_time:
+                    prewarm_file.unlink()
+                    cleaned_count += 1
+            except FileNotFoundError:
+                continue
+        return cleaned_count
 
-        return artwork_data
+    @staticmethod
+    async def _loads_meta(meta_file: 'TemporaryResource') -> ArtworkData | None:
+        """内部方法, 读取元数据缓存, 缓存数据无效时返回 None"""
+        try:
+            async with meta_file.async_open('r', encoding='utf8') as af:
+                return ArtworkData.model_validate_json(await af.read())
+        except ValidationError:
+            return None
+
+    async def _fast_query(self, *, use_cache: bool = True, allow_partial: bool = True) -> tuple[ArtworkData, bool]:
+        """获取作品信息, 优先从本地缓存加载, 返回作品信息及其是否为由搜索结果预热的不完整作品信息"""
+        if use_cache and self.meta_file.is_file:
+            if (artwork_data := await self._loads_meta(meta_file=self.meta_file)) is not None:
+                return artwork_data, False
 
-    async def query(self, *, use_cache: bool = True) -> ArtworkData:
-        """获取作品信息"""
-        if not isinstance(self.artwork_data, ArtworkData):
-            self.artwork_data = await self._fast_query(use_cache=use_cache)
+        if use_cache and allow_partial and self._check_prewarm_meta_fresh():
+            if (artwork_data := await self._loads_meta(meta_file=self.prewarm_meta_file)) is not None:
+                return artwork_data, True
+
+        artwork_data = await self._query()
+        await self._dumps_meta(artwork_data=artwork_data)
+        self.prewarm_meta_file.path.unlink(missing_ok=True)
+        return artwork_data, False
+
+    async def query(self, *, use_cache: bool = True, allow_partial: bool = True) -> ArtworkData:
+        """获取作品信息
+
+        :param use_cache: 使用缓存的作品信息
+        :param allow_partial: 允许使用由搜索结果预热的不完整作品信息(可能缺少标题及描述等), 需要持久化作品信息时应禁用
+        """
+        if not isinstance(self.artwork_data, ArtworkData) or (self._artwork_data_partial and not allow_partial):
+            self.artwork_data, self._artwork_data_partial = await self._fast_query(
+                use_cache=use_cache, allow_partial=allow_partial
+            )
 
         if not isinstance(self.artwork_data, ArtworkData):
             raise TypeError('Query artwork data failed')
@@ -265,6 +365,21 @@ class BaseArtworkProxy(abc.ABC):
 
         return list(all_pages_file)
 
+    @staticmethod
+    @run_sync
+    def _compute_page_image_hash(page_file: 'TemporaryResource') -> ImageHash:
+        """内部方法, 计算作品图片的感知哈希"""
+        return compute_image_hash(ImageLoader.init_from_file(file=page_file))
+
+    async def get_page_image_hash(
+            self,
+            page_index: int = 0,
+            page_type: 'ArtworkPageParamType' = 'preview'
+    ) -> ImageHash:
+        """获取作品图片的感知哈希(dHash/pHash), 使用本地缓存, 哈希与图片尺寸无关, 默认使用缩略图计算"""
+        page_file = await self.get_page_file(page_index=page_index, page_type=page_type)
+        return await self._compute_page_image_hash(page_file=page_file)
+
     async def download_page(self, page_index: int = 0) -> 'TemporaryResource':
         """下载作品原图到本地"""
         return await self.get_page_file(page_index=page_index, page_type='original')
@@ -19,7 +19,7 @@ from ..internal import BaseArtworkProxy
 from ..models import ArtworkData, ArtworkPageFile, ArtworkPool
 
 if TYPE_CHECKING:
-    from src.utils.booru_api.models.danbooru import PostMediaAsset, PostVariantTypes
+    from src.utils.booru_api.models.danbooru import Post, PostMediaAsset, PostVariantTypes
 
 
 class BaseDanbooruArtworkProxy(BaseArtworkProxy, abc.ABC):
@@ -79,24 +79,21 @@ class BaseDanbooruArtworkProxy(BaseArtworkProxy, abc.ABC):
 
     @classmethod
     async def _random(cls, *, limit: int = 20) -> list[str | int]:
-        # More likely to timeout due to increased database load.
-        # artworks_data = await cls._get_api().posts_index(tags='order:random', limit=limit, **kwargs)
-
-        # May be less reliable than order:random, but significantly faster.
-        artworks_data = await cls._get_api().posts_index(tags=f'random:{limit}')
-
-        # Return only get one artwork.
-        # artwork_data = await cls._get_api().post_random()
-
-        return [x.id for x in artworks_data]
+        return [x.aid for x in await cls._random_with_data(limit=limit)]
 
     @classmethod
     async def _search(cls, keyword: str, *, page: int | None = None, **kwargs) -> list[str | int]:
-        artworks_data = await cls._get_api().posts_index(tags=keyword, page=page, **kwargs)
-        return [x.id for x in artworks_data]
+        return [x.aid for x in await cls._search_with_data(keyword, page=page, **kwargs)]
 
-    async def _query(self) -> ArtworkData:
-        artwork_data = await self._get_api().post_show(id_=self.i_aid)
+    @classmethod
+    def _parse_artwork_data(
+            cls,
+            artwork_data: 'Post',
+            *,
+            title: str | None = None,
+            description: str | None = None,
+    ) -> ArtworkData:
+        """内部方法, 解析 Post 数据为作品信息, 未提供标题时使用作品版权标签代替"""
 
         """Danbooru 图站收录作品默认分类分级
         (classification, rating)
@@ -141,18 +138,10 @@ class BaseDanbooruArtworkProxy(BaseArtworkProxy, abc.ABC):
             case _:
                 rating = -1
 
-        try:
-            commentary_data = await self._get_api().post_show_artist_commentary(id_=self.i_aid)
-            title = commentary_data.original_title or commentary_data.translated_title
-            description = commentary_data.original_description or commentary_data.translated_description
-        except WebSourceException:
-            title = artwork_data.tag_string_copyright
-            description = None
-
         return ArtworkData.model_validate({
-            'origin': self.get_base_origin_name(),
+            'origin': cls.get_base_origin_name(),
             'aid': artwork_data.id,
-            'title': title,
+            'title': artwork_data.tag_string_copyright if title is None else title,
             'uid': artwork_data.uploader_id,
             'uname': artwork_data.tag_string_artist,
             'classification': classification,
@@ -164,12 +153,44 @@ class BaseDanbooruArtworkProxy(BaseArtworkProxy, abc.ABC):
             'like_count': artwork_data.score,
             'source': artwork_data.source,
             'pages': [{
-                'preview_file': self._get_preview_file(media_asset=artwork_data.media_asset),
-                'regular_file': self._get_regular_file(media_asset=artwork_data.media_asset),
-                'original_file': self._get_original_file(media_asset=artwork_data.media_asset)
+                'preview_file': cls._get_preview_file(media_asset=artwork_data.media_asset),
+                'regular_file': cls._get_regular_file(media_asset=artwork_data.media_asset),
+                'original_file': cls._get_original_file(media_asset=artwork_data.media_asset)
             }]
         })
 
+    @classmethod
+    async def _random_with_data(cls, *, limit: int = 20) -> list[ArtworkData]:
+        # More likely to timeout due to increased database load.
+        # artworks_data = await cls._get_api().posts_index(tags='order:random', limit=limit, **kwargs)
+
+        # May be less reliable than order:random, but significantly faster.
+        artworks_data = await cls._get_api().posts_index(tags=f'random:{limit}')
+
+        # Return only get one artwork.
+        # artwork_data = await cls._get_api().post_random()
+
+        return [cls._parse_artwork_data(artwork_data=x) for x in artworks_data]
+
+    @classmethod
+    async def _search_with_data(cls, keyword: str, *, page: int | None = None, **kwargs) -> list[ArtworkData]:
+        # 搜索结果中不包含作者评论信息, 预热的作品信息以版权标签作为标题且缺少描述, 仅作为不完整的作品信息使用
+        artworks_data = await cls._get_api().posts_index(tags=keyword, page=page, **kwargs)
+        return [cls._parse_artwork_data(artwork_data=x) for x in artworks_data]
+
+    async def _query(self) -> ArtworkData:
+        artwork_data = await self._get_api().post_show(id_=self.i_aid)
+
+        try:
+            commentary_data = await self._get_api().post_show_artist_commentary(id_=self.i_aid)
+            title = commentary_data.original_title or commentary_data.translated_title
+            description = commentary_data.original_description or commentary_data.translated_description
+        except WebSourceException:
+            title = artwork_data.tag_string_copyright
+            description = None
+
+        return self._parse_artwork_data(artwork_data=artwork_data, title=title, description=description)
+
     async def get_std_desc(self, *, desc_len_limit: int = 128) -> str:
         artwork_data = await self.query()
 
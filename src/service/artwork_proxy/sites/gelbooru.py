@@ -9,6 +9,7 @@
 """
 
 import abc
+from typing import TYPE_CHECKING
 
 from src.utils.booru_api import gelbooru_api
 from src.utils.booru_api.gelbooru import BaseGelbooruAPI, GelbooruAPI
@@ -16,6 +17,9 @@ from ..add_ons import ImageOpsMixin
 from ..internal import BaseArtworkProxy
 from ..models import ArtworkData
 
+if TYPE_CHECKING:
+    from src.utils.booru_api.models.gelbooru import Post
+
 
 class BaseGelbooruArtworkProxy(BaseArtworkProxy, abc.ABC):
     """Gelbooru 图库统一接口实现"""
@@ -36,16 +40,15 @@ class BaseGelbooruArtworkProxy(BaseArtworkProxy, abc.ABC):
 
     @classmethod
     async def _random(cls, *, limit: int = 20) -> list[str | int]:
-        artworks_data = await cls._get_api().posts_index(tags='sort:random', limit=limit)
-        return [x.id for x in artworks_data.post]
+        return [x.aid for x in await cls._random_with_data(limit=limit)]
 
     @classmethod
     async def _search(cls, keyword: str, *, page: int | None = None, **kwargs) -> list[str | int]:
-        artworks_data = await cls._get_api().posts_index(tags=keyword, page=page, **kwargs)
-        return [x.id for x in artworks_data.post]
+        return [x.aid for x in await cls._search_with_data(keyword, page=page, **kwargs)]
 
-    async def _query(self) -> ArtworkData:
-        artwork_data = await self._get_api().post_show(id_=self.i_aid)
+    @classmethod
+    def _parse_artwork_data(cls, artwork_data: 'Post') -> ArtworkData:
+        """内部方法, 解析 Post 数据为作品信息"""
 
         """Gelbooru 图站收录作品默认分类分级
         (classification, rating)
@@ -90,7 +93,7 @@ class BaseGelbooruArtworkProxy(BaseArtworkProxy, abc.ABC):
         preview_url = regular_url if not artwork_data.preview_url else artwork_data.preview_url
 
         return ArtworkData.model_validate({
-            'origin': self.get_base_origin_name(),
+            'origin': cls.get_base_origin_name(),
             'aid': artwork_data.id,
             'title': artwork_data.title,
             'uid': artwork_data.creator_id,
@@ -106,25 +109,39 @@ class BaseGelbooruArtworkProxy(BaseArtworkProxy, abc.ABC):
             'pages': [{
                 'preview_file': {
                     'url': preview_url,
-                    'file_ext': self.parse_url_file_suffix(preview_url),
+                    'file_ext': cls.parse_url_file_suffix(preview_url),
                     'width': artwork_data.preview_width,
                     'height': artwork_data.preview_height,
                 },
                 'regular_file': {
                     'url': regular_url,
-                    'file_ext': self.parse_url_file_suffix(regular_url),
+                    'file_ext': cls.parse_url_file_suffix(regular_url),
                     'width': artwork_data.sample_width,
                     'height': artwork_data.sample_height,
                 },
                 'original_file': {
                     'url': original_url,
-                    'file_ext': self.parse_url_file_suffix(original_url),
+                    'file_ext': cls.parse_url_file_suffix(original_url),
                     'width': artwork_data.width,
                     'height': artwork_data.height,
                 },
             }]
         })
 
+    @classmethod
+    async def _random_with_data(cls, *, limit: int = 20) -> list[ArtworkData]:
+        artworks_data = await cls._get_api().posts_index(tags='sort:random', limit=limit)
+        return [cls._parse_artwork_data(artwork_data=x) for x in artworks_data.post]
+
+    @classmethod
+    async def _search_with_data(cls, keyword: str, *, page: int | None = None, **kwargs) -> list[ArtworkData]:
+        artworks_data = await cls._get_api().posts_index(tags=keyword, page=page, **kwargs)
+        return [cls._parse_artwork_data(artwork_data=x) for x in artworks_data.post]
+
+    async def _query(self) -> ArtworkData:
+        artwork_data = await self._get_api().post_show(id_=self.i_aid)
+        return self._parse_artwork_data(artwork_data=artwork_data)
+
     async def get_std_desc(self, *, desc_len_limit: int = 128) -> str:
         artwork_data = await self.query()
 
@@ -20,6 +20,7 @@ from src.database.internal.cooldown import CoolDown, CoolDownDAL
 from src.database.internal.entity import Entity, EntityDAL, EntityType
 from src.database.internal.friendship import Friendship, FriendshipDAL
 from src.database.internal.sign_in import SignInDAL
+from src.database.internal.sign_in_summary import SignInSummary, SignInSummaryDAL
 from src.database.internal.subscription import SubscriptionDAL
 from src.database.internal.subscription_source import SubscriptionSource, SubscriptionSourceDAL
 from .consts import (
@@ -288,6 +289,9 @@ class InternalEntity:
         except NoResultFound:
             sign_in_info = 'Normal Sign In' if sign_in_info is None else sign_in_info
             await sign_in_dal.add(entity_index_id=entity.id, sign_in_date=sign_in_date, sign_in_info=sign_in_info)
+            await SignInSummaryDAL(session=self.db_session).increase(
+                entity_index_id=entity.id, sign_in_date=sign_in_date
+            )
 
     async def check_today_sign_in(self) -> bool:
         """检查今日是否已经签到"""
@@ -305,57 +309,43 @@ class InternalEntity:
         entity = await self.query_entity_self()
         return await SignInDAL(session=self.db_session).query_entity_sign_in_days(entity_index_id=entity.id)
 
+    async def query_sign_in_summary(self) -> SignInSummary | None:
+        """查询签到汇总, 尚未生成汇总时由签到记录生成, 没有签到记录则返回 None"""
+        entity = await self.query_entity_self()
+        sign_in_summary_dal = SignInSummaryDAL(session=self.db_session)
+        try:
+            return await sign_in_summary_dal.query_unique(entity_index_id=entity.id)
+        except NoResultFound:
+            await sign_in_summary_dal.rebuild(entity_index_id=entity.id)
+
+        try:
+            return await sign_in_summary_dal.query_unique(entity_index_id=entity.id)
+        except NoResultFound:
+            return None
+
     async def query_total_sign_in_days(self) -> int:
         """查询总共签到的日期数"""
-        return len(await self.query_sign_in_days())
+        sign_in_summary = await self.query_sign_in_summary()
+        return 0 if sign_in_summary is None else sign_in_summary.total_days
 
     async def query_continuous_sign_in_day(self) -> int:
         """查询到现在为止最长连续签到日数"""
-        sign_in_history = await self.query_sign_in_days()
-        if not sign_in_history:
-            return 0
-
-        date_now_ordinal = datetime.now().date().toordinal()
-        # 先将签到记录中的日期转化为整数便于比较, 去重后由大到小排序
-        all_sign_in_list = sorted({x.toordinal() for x in sign_in_history}, reverse=True)
+        sign_in_summary = await self.query_sign_in_summary()
 
-        # 如果今日日期不等于已签到日期最大值, 说明今日没有签到, 则连签日数为0
-        if date_now_ordinal != all_sign_in_list[0]:
+        # 如果今日没有签到, 则连签日数为0
+        if sign_in_summary is None or sign_in_summary.last_sign_in_date != datetime.now().date():
             return 0
+        return sign_in_summary.current_streak
 
-        # 从大到小检查(即日期从后向前检查), 如果当日序号大小大于与今日日期之差, 说明在这里断签了
-        for index, value in enumerate(all_sign_in_list):
-            if index != date_now_ordinal - value:
-                return index
-
-        # 如果全部遍历完了那就说明全部没有断签
-        return len(all_sign_in_list)
+    async def query_longest_sign_in_streak(self) -> int:
+        """查询历史最长连续签到日数"""
+        sign_in_summary = await self.query_sign_in_summary()
+        return 0 if sign_in_summary is None else sign_in_summary.longest_streak
 
     async def query_last_missing_sign_in_day(self) -> int:
         """查询上一次断签的时间, 返回 ordinal datetime"""
-        sign_in_history = await self.query_sign_in_days()
-        date_now_ordinal = datetime.now().date().toordinal()
-
-        # 还没有签到过, 对应断签日期就是今天
-        if not sign_in_history:
-            return date_now_ordinal
-
-        # 有签到记录则处理签到记录
-        # 先将签到记录中的日期转化为整数便于比较, 去重后由大到小排序
-        all_sign_in_list = sorted({x.toordinal() for x in sign_in_history}, reverse=True)
-
-        # 如果今日日期不等于已签到日期最大值, 说明今日没有签到, 断签日为今日
-        if date_now_ordinal != all_sign_in_list[0]:
-            return date_now_ordinal
-
-        # 从大到小检查(即日期从后向前检查), 如果当日序号大小大于与今日日期之差, 说明在这里断签了
-        # 这里要返回对应最早连签前一天的 ordinal datetime
-        for index, value in enumerate(all_sign_in_list):
-            if index != date_now_ordinal - value:
-                return all_sign_in_list[index - 1] - 1
-
-        # 如果全部遍历完了那就说明全部没有返回开始签到的前一天
-        return date_now_ordinal - len(all_sign_in_list)
+        # 今日未签到则断签日为今日, 否则为最早连签日期的前一天
+        return datetime.now().date().toordinal() - await self.query_continuous_sign_in_day()
 
     async def query_all_auth_setting(self) -> list[AuthSetting]:
         """查询 Entity 全部的权限配置"""
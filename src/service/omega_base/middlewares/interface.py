@@ -24,6 +24,7 @@ from nonebot.params import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database import begin_db_session, get_db_session
+from src.service.omega_dispatcher import outbound_dispatcher
 from .const import SupportedPlatform, SupportedTarget
 from .exception import AdapterNotSupported, TargetNotSupported
 from .platform_interface import entity_target_register, event_depend_register, message_builder_register
@@ -32,6 +33,7 @@ from .typing import BaseSentMessageType, EntityAcquireType
 if TYPE_CHECKING:
     from pathlib import Path
 
+    from src.service.omega_dispatcher import OutboundLane
     from ..internal import OmegaEntity
     from ..message import Message as OmegaMessage
     from .platform_interface.entity_target import BaseEntityTarget
@@ -90,8 +92,18 @@ class OmegaEntityInterface:
     """在 Event/Matcher 之外向目标 Entity 直接发送消息的相关方法"""
 
     @check_target_implemented
-    async def send_entity_message(self, message: 'SentOmegaMessage', **kwargs) -> Any:
-        """向 Entity 直接发送消息"""
+    async def send_entity_message(
+            self,
+            message: 'SentOmegaMessage',
+            *,
+            lane: 'OutboundLane | None' = None,
+            **kwargs
+    ) -> Any:
+        """向 Entity 直接发送消息
+
+        :param message: 发送的消息
+        :param lane: 发送通道, 未指定时在事件响应流程中使用 interactive 通道, 否则使用 broadcast 通道
+        """
         bot = await self.get_bot()
         message_builder = await self.get_message_builder()
 
@@ -99,7 +111,14 @@ class OmegaEntityInterface:
         send_message = message_builder(message=message).message
 
         bot_api_params = {send_params.message_param_name: send_message, **send_params.params}
-        return await getattr(bot, send_params.api)(**bot_api_params)
+        if lane is None:
+            lane = 'broadcast' if current_matcher.get(None) is None else 'interactive'
+        return await outbound_dispatcher.submit(
+            bot_id=bot.self_id,
+            target=self._entity.tid,
+            send=lambda: getattr(bot, send_params.api)(**bot_api_params),
+            lane=lane,
+        )
 
     @check_target_implemented
     async def send_entity_message_auto_revoke(
@@ -282,15 +301,33 @@ class OmegaMatcherInterface:
 
     @check_adapter_implemented
     async def send(self, message: 'SentOmegaMessage', **kwargs) -> Any:
-        return await self.get_event_depend().send(message=message, **kwargs)
+        event_depend = self.get_event_depend()
+        return await outbound_dispatcher.submit(
+            bot_id=self.bot.self_id,
+            target=self.entity.tid,
+            send=lambda: event_depend.send(message=message, **kwargs),
+            lane='interactive',
+        )
 
     @check_adapter_implemented
     async def send_at_sender(self, message: 'SentOmegaMessage', **kwargs) -> Any:
-        return await self.get_event_depend().send_at_sender(message=message, **kwargs)
+        event_depend = self.get_event_depend()
+        return await outbound_dispatcher.submit(
+            bot_id=self.bot.self_id,
+            target=self.entity.tid,
+            send=lambda: event_depend.send_at_sender(message=message, **kwargs),
+            lane='interactive',
+        )
 
     @check_adapter_implemented
     async def send_reply(self, message: 'SentOmegaMessage', **kwargs) -> Any:
-        return await self.get_event_depend().send_reply(message=message, **kwargs)
+        event_depend = self.get_event_depend()
+        return await outbound_dispatcher.submit(
+            bot_id=self.bot.self_id,
+            target=self.entity.tid,
+            send=lambda: event_depend.send_reply(message=message, **kwargs),
+            lane='interactive',
+        )
 
     @check_adapter_implemented
     async def send_auto_revoke(
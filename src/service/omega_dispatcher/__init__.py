@@ -0,0 +1,39 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/19 20:31:26
+@FileName       : omega_dispatcher
+@Project        : omega-miya
+@Description    : Omega 统一消息发送调度, 按 Bot 及发送对象限流, 交互回复优先于订阅推送发送
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from nonebot import get_driver
+
+from .config import dispatcher_config
+from .dispatcher import OutboundDispatcher, OutboundLane, TokenBucket
+
+outbound_dispatcher: OutboundDispatcher = OutboundDispatcher(
+    enable=dispatcher_config.omega_dispatcher_enable,
+    bot_rate=dispatcher_config.omega_dispatcher_bot_rate,
+    bot_burst=dispatcher_config.omega_dispatcher_bot_burst,
+    target_rate=dispatcher_config.omega_dispatcher_target_rate,
+    target_burst=dispatcher_config.omega_dispatcher_target_burst,
+    bot_concurrency=dispatcher_config.omega_dispatcher_bot_concurrency,
+    retry_times=dispatcher_config.omega_dispatcher_retry_times,
+    retry_base_delay=dispatcher_config.omega_dispatcher_retry_base_delay,
+)
+"""全局消息发送调度器"""
+
+
+@get_driver().on_shutdown
+async def _close_outbound_dispatcher() -> None:
+    await outbound_dispatcher.close()
+
+
+__all__ = [
+    'OutboundDispatcher',
+    'OutboundLane',
+    'TokenBucket',
+    'outbound_dispatcher',
+]
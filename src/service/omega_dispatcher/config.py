@@ -0,0 +1,48 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/19 20:37:15
+@FileName       : config.py
+@Project        : omega-miya
+@Description    : Omega 消息发送调度配置
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from nonebot import get_plugin_config, logger
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+class OmegaDispatcherConfig(BaseModel):
+    """Omega 消息发送调度配置"""
+    # 启用统一消息发送调度, 关闭时消息将直接调用 Bot API 发送
+    omega_dispatcher_enable: bool = True
+    # 单个 Bot 平均每秒最多发送的消息数量
+    omega_dispatcher_bot_rate: float = Field(default=2.0, gt=0)
+    # 单个 Bot 允许的突发消息数量
+    omega_dispatcher_bot_burst: int = Field(default=5, ge=1)
+    # 单个发送对象平均每秒最多接收的 broadcast 通道消息数量, interactive 通道的回复消息不受此限制
+    omega_dispatcher_target_rate: float = Field(default=0.5, gt=0)
+    # 单个发送对象允许的 broadcast 通道突发消息数量
+    omega_dispatcher_target_burst: int = Field(default=3, ge=1)
+    # 单个 Bot 同时进行中的发送请求数量
+    omega_dispatcher_bot_concurrency: int = Field(default=2, ge=1)
+    # 触发平台限流时的最大重试次数
+    omega_dispatcher_retry_times: int = Field(default=3, ge=0)
+    # 触发平台限流时的初始重试等待时间(秒), 此后每次重试翻倍
+    omega_dispatcher_retry_base_delay: float = Field(default=2.0, gt=0)
+
+    model_config = ConfigDict(extra='ignore')
+
+
+try:
+    dispatcher_config = get_plugin_config(OmegaDispatcherConfig)
+except (ValidationError, ValueError) as e:
+    import sys
+
+    logger.opt(colors=True).critical(f'<lc>Omega Dispatcher</lc> | <lr>配置异常</lr>, 错误信息:\n{e}')
+    sys.exit(f'Omega Dispatcher 配置格式验证失败, {e}')
+
+
+__all__ = [
+    'dispatcher_config',
+]
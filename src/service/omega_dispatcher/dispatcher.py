@@ -0,0 +1,318 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/19 20:52:40
+@FileName       : dispatcher.py
+@Project        : omega-miya
+@Description    : 统一消息发送调度器
+
+每个 Bot 维护一个按通道优先级排序的发送队列, 由固定数量的 worker 依次取出发送,
+发送前需获取 Bot 的令牌桶令牌, broadcast 通道的消息还需获取发送对象的令牌桶令牌,
+平台返回限流错误时按指数退避重新入队
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import contextvars
+import itertools
+import random
+import re
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Literal
+
+from nonebot.exception import ActionFailed
+from nonebot.log import logger
+
+from src.service.omega_metrics import metrics_registry
+from src.service.omega_metrics.metrics import Gauge, Histogram
+
+type OutboundLane = Literal['interactive', 'broadcast']
+"""发送通道, interactive 为响应用户交互的回复消息, broadcast 为订阅推送等主动发送的消息"""
+
+_LANE_PRIORITY: dict[OutboundLane, int] = {'interactive': 0, 'broadcast': 1}
+"""各发送通道优先级, 数值越小越优先"""
+
+_RATE_LIMITED_PATTERN = re.compile(r'\b429\b|too many requests|rate.?limit|retry after|频率|频繁', re.IGNORECASE)
+"""判断平台返回的 ActionFailed 是否为限流错误"""
+_RETRY_AFTER_PATTERN = re.compile(r'retry after (\d+(?:\.\d+)?)', re.IGNORECASE)
+"""提取平台要求的重试等待时间"""
+
+_TARGET_BUCKET_PRUNE_SIZE: int = 1024
+"""单个 Bot 的发送对象令牌桶数量超过该值时清理已回满的令牌桶"""
+
+OUTBOUND_QUEUE_DEPTH = metrics_registry.register(Gauge(
+    'omega_outbound_queue_depth',
+    'Outbound messages submitted but not yet sent, including those waiting for retry',
+    label_names=('bot', 'lane'),
+))
+OUTBOUND_QUEUE_WAIT_SECONDS = metrics_registry.register(Histogram(
+    'omega_outbound_queue_wait_seconds',
+    'Time outbound messages wait in the dispatcher before the first send attempt',
+    label_names=('lane',),
+))
+OUTBOUND_SEND_SECONDS = metrics_registry.register(Histogram(
+    'omega_outbound_send_seconds',
+    'Time spent calling the bot API to send outbound messages',
+    label_names=('lane', 'result'),
+))
+
+
+class TokenBucket:
+    """令牌桶, 以预约方式获取令牌, 令牌不足时返回需要等待的时间"""
+
+    __slots__ = ('_clock', '_tokens', '_updated_at', 'capacity', 'rate')
+
+    def __init__(self, rate: float, capacity: int, *, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens: float = float(capacity)
+        self._updated_at: float = clock()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(rate={self.rate}, capacity={self.capacity}, tokens={self._tokens:.2f})'
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    @property
+    def is_full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+    def reserve(self) -> float:
+        """预约一个令牌, 返回可使用该令牌前需要等待的时间(秒)"""
+        self._refill()
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def pause(self, delay: float) -> None:
+        """清空令牌, 使之后的预约至少等待 delay 秒"""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - delay * self.rate
+
+
+class _OutboundJob:
+    """待发送的消息"""
+
+    __slots__ = ('attempt', 'context', 'enqueued_at', 'future', 'lane', 'send', 'target', 'target_reserved')
+
+    def __init__(
+            self,
+            lane: OutboundLane,
+            target: str,
+            send: Callable[[], Awaitable[Any]],
+            future: asyncio.Future[Any],
+            enqueued_at: float,
+    ):
+        self.lane = lane
+        self.target = target
+        self.send = send
+        self.future = future
+        self.enqueued_at = enqueued_at
+        self.context = contextvars.copy_context()
+        self.attempt: int = 0
+        self.target_reserved: bool = False
+
+
+class _BotOutbound:
+    """单个 Bot 的发送队列及令牌桶"""
+
+    __slots__ = ('bot_id', 'bucket', 'delayed', 'pending', 'queue', 'target_buckets', 'workers')
+
+    def __init__(self, bot_id: str, bucket: TokenBucket):
+        self.bot_id = bot_id
+        self.bucket = bucket
+        self.queue: asyncio.PriorityQueue[tuple[int, int, _OutboundJob]] = asyncio.PriorityQueue()
+        self.target_buckets: dict[str, TokenBucket] = {}
+        self.pending: dict[OutboundLane, int] = dict.fromkeys(_LANE_PRIORITY, 0)
+        self.workers: list[asyncio.Task[None]] = []
+        self.delayed: dict[_OutboundJob, asyncio.TimerHandle] = {}
+
+
+class OutboundDispatcher:
+    """统一消息发送调度器
+
+    send 为实际调用 Bot API 发送消息的无参异步函数, 触发限流重试时会被再次调用,
+    因此可直接传入模拟的 Bot 方法进行测试
+    """
+
+    def __init__(
+            self,
+            *,
+            enable: bool = True,
+            bot_rate: float = 2.0,
+            bot_burst: int = 5,
+            target_rate: float = 0.5,
+            target_burst: int = 3,
+            bot_concurrency: int = 2,
+            retry_times: int = 3,
+            retry_base_delay: float = 2.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.enable = enable
+        self.bot_rate = bot_rate
+        self.bot_burst = bot_burst
+        self.target_rate = target_rate
+        self.target_burst = target_burst
+        self.bot_concurrency = bot_concurrency
+        self.retry_times = retry_times
+        self.retry_base_delay = retry_base_delay
+        self._clock = clock
+        self._bots: dict[str, _BotOutbound] = {}
+        self._sequence = itertools.count()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(enable={self.enable}, bots={len(self._bots)})'
+
+    def _get_bot_outbound(self, bot_id: str) -> _BotOutbound:
+        if (bot_outbound := self._bots.get(bot_id)) is None:
+            bucket = TokenBucket(rate=self.bot_rate, capacity=self.bot_burst, clock=self._clock)
+            bot_outbound = self._bots[bot_id] = _BotOutbound(bot_id=bot_id, bucket=bucket)
+            bot_outbound.workers.extend(
+                asyncio.create_task(self._worker(bot_outbound)) for _ in range(self.bot_concurrency)
+            )
+        return bot_outbound
+
+    def _get_target_bucket(self, bot_outbound: _BotOutbound, target: str) -> TokenBucket:
+        if (bucket := bot_outbound.target_buckets.get(target)) is None:
+            if len(bot_outbound.target_buckets) >= _TARGET_BUCKET_PRUNE_SIZE:
+                bot_outbound.target_buckets = {k: v for k, v in bot_outbound.target_buckets.items() if not v.is_full}
+            bucket = TokenBucket(rate=self.target_rate, capacity=self.target_burst, clock=self._clock)
+            bot_outbound.target_buckets[target] = bucket
+        return bucket
+
+    @staticmethod
+    def _update_queue_depth(bot_outbound: _BotOutbound, lane: OutboundLane, change: int) -> None:
+        bot_outbound.pending[lane] += change
+        OUTBOUND_QUEUE_DEPTH.set(bot_outbound.pending[lane], bot_outbound.bot_id, lane)
+
+    def _put(self, bot_outbound: _BotOutbound, job: _OutboundJob) -> None:
+        bot_outbound.queue.put_nowait((_LANE_PRIORITY[job.lane], next(self._sequence), job))
+
+    def _put_delayed(self, bot_outbound: _BotOutbound, job: _OutboundJob) -> None:
+        bot_outbound.delayed.pop(job, None)
+        self._put(bot_outbound, job)
+
+    def _put_later(self, bot_outbound: _BotOutbound, job: _OutboundJob, delay: float) -> None:
+        bot_outbound.delayed[job] = asyncio.get_running_loop().call_later(
+            delay, self._put_delayed, bot_outbound, job
+        )
+
+    def _get_retry_delay(self, error: ActionFailed, attempt: int) -> float | None:
+        """判断是否为平台限流错误, 是则返回重试前需要等待的时间"""
+        error_info = repr(error)
+        if not _RATE_LIMITED_PATTERN.search(error_info):
+            return None
+        if (retry_after := _RETRY_AFTER_PATTERN.search(error_info)) is not None:
+            return float(retry_after.group(1))
+        return self.retry_base_delay * 2 ** attempt * random.uniform(1.0, 1.2)
+
+    async def _send(self, bot_outbound: _BotOutbound, job: _OutboundJob) -> None:
+        start_time = self._clock()
+        if job.attempt == 0:
+            OUTBOUND_QUEUE_WAIT_SECONDS.observe(start_time - job.enqueued_at, job.lane)
+
+        try:
+            result = await asyncio.create_task(job.send(), context=job.context)
+        except ActionFailed as e:
+            if job.attempt < self.retry_times and (delay := self._get_retry_delay(e, job.attempt)) is not None:
+                OUTBOUND_SEND_SECONDS.observe(self._clock() - start_time, job.lane, 'retry')
+                logger.warning(
+                    f'OutboundDispatcher | Bot({bot_outbound.bot_id}) rate limited sending to {job.target}, '
+                    f'retry in {delay:.1f}s ({job.attempt + 1}/{self.retry_times}), {e!r}'
+                )
+                job.attempt += 1
+                job.target_reserved = False
+                bot_outbound.bucket.pause(delay)
+                self._put_later(bot_outbound, job, delay)
+                return
+            OUTBOUND_SEND_SECONDS.observe(self._clock() - start_time, job.lane, 'failed')
+            if not job.future.done():
+                job.future.set_exception(e)
+        except Exception as e:
+            OUTBOUND_SEND_SECONDS.observe(self._clock() - start_time, job.lane, 'failed')
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            OUTBOUND_SEND_SECONDS.observe(self._clock() - start_time, job.lane, 'success')
+            if not job.future.done():
+                job.future.set_result(result)
+        self._update_queue_depth(bot_outbound, job.lane, -1)
+
+    async def _worker(self, bot_outbound: _BotOutbound) -> None:
+        while True:
+            _, _, job = await bot_outbound.queue.get()
+            if job.future.done():
+                # 调用方已取消等待
+                self._update_queue_depth(bot_outbound, job.lane, -1)
+                continue
+
+            # interactive 通道为响应用户的回复消息, 不受发送对象限流, 仅受 Bot 令牌桶限制
+            if job.lane != 'interactive' and not job.target_reserved:
+                job.target_reserved = True
+                if (delay := self._get_target_bucket(bot_outbound, job.target).reserve()) > 0:
+                    # 发送对象限流时先处理队列中其他对象的消息
+                    self._put_later(bot_outbound, job, delay)
+                    continue
+
+            if (delay := bot_outbound.bucket.reserve()) > 0:
+                await asyncio.sleep(delay)
+            await self._send(bot_outbound, job)
+
+    async def submit[R](
+            self,
+            bot_id: str,
+            target: str,
+            send: Callable[[], Awaitable[R]],
+            *,
+            lane: OutboundLane = 'broadcast',
+    ) -> R:
+        """提交发送请求并等待发送完成, 返回 send 的结果
+
+        :param bot_id: 发送消息的 Bot ID
+        :param target: 发送对象标识, 用于 broadcast 通道的对象级限流
+        :param send: 调用 Bot API 发送消息的无参异步函数
+        :param lane: 发送通道, interactive 通道的消息优先发送
+        """
+        if not self.enable:
+            return await send()
+
+        bot_outbound = self._get_bot_outbound(bot_id=bot_id)
+        job = _OutboundJob(
+            lane=lane,
+            target=target,
+            send=send,
+            future=asyncio.get_running_loop().create_future(),
+            enqueued_at=self._clock(),
+        )
+        self._update_queue_depth(bot_outbound, lane, 1)
+        self._put(bot_outbound, job)
+        return await job.future
+
+    async def close(self) -> None:
+        """停止全部 worker 并取消尚未发送及等待重新入队的请求"""
+        for bot_outbound in self._bots.values():
+            for worker in bot_outbound.workers:
+                worker.cancel()
+            await asyncio.gather(*bot_outbound.workers, return_exceptions=True)
+            for job, handle in bot_outbound.delayed.items():
+                handle.cancel()
+                job.future.cancel()
+            bot_outbound.delayed.clear()
+            while not bot_outbound.queue.empty():
+                _, _, job = bot_outbound.queue.get_nowait()
+                job.future.cancel()
+            for lane in bot_outbound.pending:
+                OUTBOUND_QUEUE_DEPTH.set(0, bot_outbound.bot_id, lane)
+        self._bots.clear()
+
+
+__all__ = [
+    'OutboundDispatcher',
+    'OutboundLane',
+    'TokenBucket',
+]
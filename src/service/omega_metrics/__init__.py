@@ -0,0 +1,48 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/15 10:08:52
+@FileName       : omega_metrics
+@Project        : omega-miya
+@Description    : Omega 运行指标统计, 以 Prometheus 文本格式通过 Omega API 输出
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from fastapi.responses import PlainTextResponse
+from nonebot import get_driver, logger
+
+from src.service.omega_api import OmegaAPI
+from .config import metrics_config
+from .instrument import EventLoopLagSampler, instrument_thread_pool, measure_matcher_stage, metrics_registry
+
+_PROMETHEUS_CONTENT_TYPE: str = 'text/plain; version=0.0.4; charset=utf-8'
+
+if metrics_config.omega_metrics_enable:
+    driver = get_driver()
+    _loop_lag_sampler = EventLoopLagSampler(interval=metrics_config.omega_metrics_loop_lag_interval)
+
+    @driver.on_startup
+    async def _start_metrics_instrument() -> None:
+        instrument_thread_pool()
+        _loop_lag_sampler.start()
+        logger.opt(colors=True).info('<lc>Omega Metrics</lc> | 已启用运行指标统计')
+
+    @driver.on_shutdown
+    async def _stop_metrics_instrument() -> None:
+        await _loop_lag_sampler.stop()
+
+    try:
+        _metrics_api = OmegaAPI('omega_metrics', enable_token_verify=metrics_config.omega_metrics_enable_token_verify)
+
+        @_metrics_api.register_get_route('/metrics')
+        async def _export_metrics() -> PlainTextResponse:
+            return PlainTextResponse(metrics_registry.render(), media_type=_PROMETHEUS_CONTENT_TYPE)
+
+    except RuntimeError as e:
+        logger.opt(colors=True).warning(f'<lc>Omega Metrics</lc> | 无法注册指标接口, {e}')
+
+
+__all__ = [
+    'measure_matcher_stage',
+    'metrics_registry',
+]
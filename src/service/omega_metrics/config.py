@@ -0,0 +1,40 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/15 10:12:47
+@FileName       : config.py
+@Project        : omega-miya
+@Description    : Omega 运行指标统计配置
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from nonebot import get_plugin_config, logger
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+
+class OmegaMetricsConfig(BaseModel):
+    """Omega 运行指标统计配置"""
+    # 启用运行指标统计
+    omega_metrics_enable: bool = False
+    # 事件循环延迟采样间隔(秒)
+    omega_metrics_loop_lag_interval: float = 0.5
+    # 单个指标最多记录的标签组合数量, 超出的标签组合将被合并记录
+    omega_metrics_max_series: int = 512
+    # 指标接口是否启用 Omega API Token 校验
+    omega_metrics_enable_token_verify: bool = True
+
+    model_config = ConfigDict(extra='ignore')
+
+
+try:
+    metrics_config = get_plugin_config(OmegaMetricsConfig)
+except (ValidationError, ValueError) as e:
+    import sys
+
+    logger.opt(colors=True).critical(f'<lc>Omega Metrics</lc> | <lr>配置异常</lr>, 错误信息:\n{e}')
+    sys.exit(f'Omega Metrics 配置格式验证失败, {e}')
+
+
+__all__ = [
+    'metrics_config',
+]
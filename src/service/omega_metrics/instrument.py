@@ -0,0 +1,155 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/15 11:03:18
+@FileName       : instrument.py
+@Project        : omega-miya
+@Description    : 事件循环延迟, 事件响应器各阶段耗时及线程池排队时间采集
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import time
+from collections.abc import Callable, Generator
+from contextlib import AbstractContextManager, contextmanager, nullcontext, suppress
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Literal
+
+import anyio.to_thread
+from nonebot.log import logger
+
+from .config import metrics_config
+from .metrics import Gauge, Histogram, MetricsRegistry
+
+if TYPE_CHECKING:
+    from nonebot.matcher import Matcher
+
+
+_HANDLER_START_STATE_KEY: Literal['_omega_metrics_handler_start'] = '_omega_metrics_handler_start'
+"""在 matcher state 中记录预处理结束时间的键"""
+
+metrics_registry: MetricsRegistry = MetricsRegistry()
+"""全局指标注册表"""
+
+EVENT_LOOP_LAG_SECONDS = metrics_registry.register(Histogram(
+    'omega_event_loop_lag_seconds',
+    'Delay between scheduled and actual event loop wakeup',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+))
+EVENT_LOOP_LAG_LAST_SECONDS = metrics_registry.register(Gauge(
+    'omega_event_loop_lag_last_seconds',
+    'Last sampled event loop wakeup delay',
+))
+MATCHER_STAGE_SECONDS = metrics_registry.register(Histogram(
+    'omega_matcher_stage_seconds',
+    'Time spent in each matcher stage (preprocessor, handler, postprocessor)',
+    label_names=('plugin', 'module', 'stage'),
+    max_series=metrics_config.omega_metrics_max_series,
+))
+THREAD_POOL_WAIT_SECONDS = metrics_registry.register(Histogram(
+    'omega_thread_pool_wait_seconds',
+    'Time run_sync calls wait in the worker thread pool queue before running',
+))
+THREAD_POOL_RUN_SECONDS = metrics_registry.register(Histogram(
+    'omega_thread_pool_run_seconds',
+    'Time run_sync calls spend running in worker threads',
+))
+
+
+async def _sample_event_loop_lag(interval: float) -> None:
+    """按固定间隔休眠, 记录实际唤醒时间与预定唤醒时间之差"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected_wakeup = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - expected_wakeup, 0.0)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_LAST_SECONDS.set(lag)
+
+
+class EventLoopLagSampler:
+    """事件循环延迟采样器"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(_sample_event_loop_lag(self.interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+def instrument_thread_pool() -> None:
+    """包装 anyio 线程池调用入口, 记录 run_sync 在线程池中的排队及运行时间
+
+    nonebot.utils.run_sync 在调用时才查找 `anyio.to_thread.run_sync`, 因此包装后对已导入的模块同样生效
+    """
+    original_run_sync = anyio.to_thread.run_sync
+    if getattr(original_run_sync, '__omega_instrumented__', False):
+        return
+
+    @wraps(original_run_sync)
+    async def _instrumented_run_sync(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        submitted_at = time.perf_counter()
+
+        def _timed_call(*call_args: Any) -> Any:
+            started_at = time.perf_counter()
+            THREAD_POOL_WAIT_SECONDS.observe(started_at - submitted_at)
+            try:
+                return func(*call_args)
+            finally:
+                THREAD_POOL_RUN_SECONDS.observe(time.perf_counter() - started_at)
+
+        return await original_run_sync(_timed_call, *args, **kwargs)
+
+    setattr(_instrumented_run_sync, '__omega_instrumented__', True)
+    anyio.to_thread.run_sync = _instrumented_run_sync
+    logger.opt(colors=True).debug('<lc>Omega Metrics</lc> | Instrumented thread pool run_sync')
+
+
+@contextmanager
+def _measure_matcher_stage(
+        matcher: 'Matcher',
+        stage: Literal['preprocessor', 'postprocessor'],
+) -> Generator[None, None, None]:
+    plugin = matcher.plugin_id or 'unknown'
+    module = matcher.module_name or 'unknown'
+    start_time = time.perf_counter()
+    if stage == 'postprocessor' and (handler_start := matcher.state.pop(_HANDLER_START_STATE_KEY, None)) is not None:
+        MATCHER_STAGE_SECONDS.observe(start_time - handler_start, plugin, module, 'handler')
+
+    try:
+        yield
+    finally:
+        end_time = time.perf_counter()
+        MATCHER_STAGE_SECONDS.observe(end_time - start_time, plugin, module, stage)
+        if stage == 'preprocessor':
+            matcher.state[_HANDLER_START_STATE_KEY] = end_time
+
+
+_NULL_CONTEXT: AbstractContextManager[None] = nullcontext()
+
+
+def measure_matcher_stage(
+        matcher: 'Matcher',
+        stage: Literal['preprocessor', 'postprocessor'],
+) -> AbstractContextManager[None]:
+    """统计事件响应器预处理/后处理耗时, 两者之间的时间计为 handler 耗时, 未启用时返回空上下文"""
+    if not metrics_config.omega_metrics_enable:
+        return _NULL_CONTEXT
+    return _measure_matcher_stage(matcher=matcher, stage=stage)
+
+
+__all__ = [
+    'EventLoopLagSampler',
+    'instrument_thread_pool',
+    'measure_matcher_stage',
+    'metrics_registry',
+]
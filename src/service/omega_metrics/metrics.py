@@ -0,0 +1,184 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/15 10:26:03
+@FileName       : metrics.py
+@Project        : omega-miya
+@Description    : 固定分桶直方图及 Prometheus 文本格式输出
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import bisect
+import threading
+from collections.abc import Sequence
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+"""默认耗时分桶上界(秒)"""
+
+_OVERFLOW_LABEL_VALUE: str = '__overflow__'
+"""标签组合数量超出上限时使用的标签值"""
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str], **extra: str) -> str:
+    labels = [f'{k}="{_escape_label_value(v)}"' for k, v in zip(label_names, label_values)]
+    labels.extend(f'{k}="{_escape_label_value(v)}"' for k, v in extra.items())
+    return f'{{{",".join(labels)}}}' if labels else ''
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _HistogramSeries:
+    """单个标签组合的直方图数据, 各分桶仅记录落入该桶的数量"""
+
+    __slots__ = ('bucket_counts', 'sum', 'count')
+
+    def __init__(self, bucket_num: int):
+        self.bucket_counts: list[int] = [0] * (bucket_num + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+
+class Histogram:
+    """固定分桶直方图, 内存占用仅与分桶数及标签组合数量有关"""
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            *,
+            label_names: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+            max_series: int = 512,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self.max_series = max_series
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(name={self.name!r}, series={len(self._series)})'
+
+    def _get_series(self, label_values: tuple[str, ...]) -> _HistogramSeries:
+        series = self._series.get(label_values)
+        if series is None:
+            if len(self._series) >= self.max_series:
+                label_values = tuple(_OVERFLOW_LABEL_VALUE for _ in self.label_names)
+                series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = _HistogramSeries(len(self.buckets))
+        return series
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """记录一次观测值, 可在线程池中调用"""
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f'{self.name} expected {len(self.label_names)} label(s), got {len(label_values)}')
+
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._get_series(label_values)
+            series.bucket_counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def render(self) -> str:
+        """输出 Prometheus 文本格式"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series_items = [
+                (k, list(v.bucket_counts), v.sum, v.count) for k, v in sorted(self._series.items())
+            ]
+
+        for label_values, bucket_counts, total, count in series_items:
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, label_values, le=_format_value(upper_bound))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.label_names, label_values, le='+Inf')
+            lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = _format_labels(self.label_names, label_values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return '\n'.join(lines)
+
+
+class Gauge:
+    """瞬时值指标"""
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            *,
+            label_names: Sequence[str] = (),
+            max_series: int = 512,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.max_series = max_series
+        self._values: dict[tuple[str, ...], float] = {} if self.label_names else {(): 0.0}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(name={self.name!r}, series={len(self._values)})'
+
+    @property
+    def value(self) -> float:
+        """无标签指标的当前值"""
+        return self._values.get((), 0.0)
+
+    def set(self, value: float, *label_values: str) -> None:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f'{self.name} expected {len(self.label_names)} label(s), got {len(label_values)}')
+
+        with self._lock:
+            if label_values not in self._values and len(self._values) >= self.max_series:
+                label_values = tuple(_OVERFLOW_LABEL_VALUE for _ in self.label_names)
+            self._values[label_values] = value
+
+    def render(self) -> str:
+        """输出 Prometheus 文本格式"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        with self._lock:
+            series_items = sorted(self._values.items())
+
+        for label_values, value in series_items:
+            lines.append(f'{self.name}{_format_labels(self.label_names, label_values)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: dict[str, Histogram | Gauge] = {}
+
+    def register[T: Histogram | Gauge](self, metric: T) -> T:
+        if metric.name in self._metrics:
+            raise ValueError(f'metric {metric.name!r} already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """输出全部指标的 Prometheus 文本格式"""
+        return '\n'.join(x.render() for x in self._metrics.values()) + '\n'
+
+
+__all__ = [
+    'DEFAULT_LATENCY_BUCKETS',
+    'Gauge',
+    'Histogram',
+    'MetricsRegistry',
+]
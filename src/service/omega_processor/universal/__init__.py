@@ -14,11 +14,14 @@ from nonebot.adapters import Event as BaseEvent
 from nonebot.matcher import Matcher
 from nonebot.message import event_postprocessor, event_preprocessor, run_postprocessor, run_preprocessor
 
+from src.database.config import database_history_archive_config
+from src.service.apscheduler import scheduler
+from src.service.omega_metrics import measure_matcher_stage
 from .cancellation import preprocessor_cancellation
 from .cooldown import preprocessor_global_cooldown, preprocessor_plugin_cooldown
 from .cost import preprocessor_plugin_cost
 from .friendship import postprocessor_friendship
-from .history import postprocessor_history
+from .history import postprocessor_history, scheduled_archive_expired_history
 from .permission import preprocessor_global_permission, preprocessor_plugin_permission
 from .plugin import preprocessor_plugin_manager, startup_init_plugins
 from .rate_limiting import preprocessor_rate_limiting
@@ -26,6 +29,19 @@ from .statistic import postprocessor_statistic
 
 driver = get_driver()
 
+if database_history_archive_config.is_enabled:
+    scheduler.add_job(
+        scheduled_archive_expired_history,
+        'cron',
+        hour='*/1',
+        minute='41',
+        second='13',
+        id='omega_message_history_archiver',
+        coalesce=True,
+        max_instances=1,
+        misfire_grace_time=600,
+    )
+
 
 @driver.on_startup
 async def handle_universal_on_startup():
@@ -44,30 +60,32 @@ async def handle_universal_event_preprocessor(bot: BaseBot, event: BaseEvent):
 @run_preprocessor
 async def handle_universal_run_preprocessor(matcher: Matcher, bot: BaseBot, event: BaseEvent):
     """运行预处理"""
-    # 处理插件管理
-    await preprocessor_plugin_manager(matcher=matcher, event=event)
-    # 处理消息事件
-    try:
-        message = event.get_message()
-        # 处理用户取消
-        await preprocessor_cancellation(matcher=matcher, message=message)
-        # 处理权限
-        await preprocessor_global_permission(matcher=matcher, bot=bot, event=event)
-        await preprocessor_plugin_permission(matcher=matcher, bot=bot, event=event)
-        # 处理冷却
-        await preprocessor_global_cooldown(matcher=matcher, bot=bot, event=event)
-        await preprocessor_plugin_cooldown(matcher=matcher, bot=bot, event=event)
-        # 处理消耗
-        await preprocessor_plugin_cost(matcher=matcher, bot=bot, event=event)
-    except ValueError as e:
-        logger.debug(f'UniversalRunPreprocessor ignored {event!r} without message, {e}')
+    with measure_matcher_stage(matcher=matcher, stage='preprocessor'):
+        # 处理插件管理
+        await preprocessor_plugin_manager(matcher=matcher, event=event)
+        # 处理消息事件
+        try:
+            message = event.get_message()
+            # 处理用户取消
+            await preprocessor_cancellation(matcher=matcher, message=message)
+            # 处理权限
+            await preprocessor_global_permission(matcher=matcher, bot=bot, event=event)
+            await preprocessor_plugin_permission(matcher=matcher, bot=bot, event=event)
+            # 处理冷却
+            await preprocessor_global_cooldown(matcher=matcher, bot=bot, event=event)
+            await preprocessor_plugin_cooldown(matcher=matcher, bot=bot, event=event)
+            # 处理消耗
+            await preprocessor_plugin_cost(matcher=matcher, bot=bot, event=event)
+        except ValueError as e:
+            logger.debug(f'UniversalRunPreprocessor ignored {event!r} without message, {e}')
 
 
 @run_postprocessor
 async def handle_universal_run_postprocessor(matcher: Matcher, bot: BaseBot, event: BaseEvent):
     """运行后处理"""
-    # 处理插件统计
-    await postprocessor_statistic(matcher=matcher, bot=bot, event=event)
+    with measure_matcher_stage(matcher=matcher, stage='postprocessor'):
+        # 处理插件统计
+        await postprocessor_statistic(matcher=matcher, bot=bot, event=event)
 
 
 @event_postprocessor
@@ -8,15 +8,18 @@
 @Software       : PyCharm
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from nonebot import logger
 from nonebot.adapters import Bot as BaseBot
 from nonebot.adapters import Event as BaseEvent
 from nonebot.adapters import Message as BaseMessage
+from nonebot.utils import run_sync
 
 from src.compat import dump_json_as
 from src.database import HistoryDAL, begin_db_session
+from src.database.config import database_history_archive_config
+from src.database.history_archive import history_archive
 from src.service import OmegaMatcherInterface
 
 LOG_PREFIX: str = '<lc>Message History</lc> | '
@@ -59,6 +62,41 @@ async def postprocessor_history(bot: BaseBot, event: BaseEvent, message: BaseMes
         logger.opt(colors=True).error(f'{LOG_PREFIX}Recording message failed, {e!r}, {message_raw!r}')
 
 
+async def archive_expired_history() -> int:
+    """将超出保留期限的消息历史记录分批移动至归档文件, 返回归档的记录数量"""
+    config = database_history_archive_config
+    received_time = int((datetime.now() - timedelta(days=config.db_history_retention_days)).timestamp())
+
+    archived_count = 0
+    for _ in range(config.db_history_archive_max_batches):
+        async with begin_db_session() as session:
+            dal = HistoryDAL(session=session)
+            records = await dal.query_before(received_time=received_time, limit=config.db_history_archive_batch_size)
+            if not records:
+                break
+
+            # 归档文件落盘后再删除数据库中的记录
+            await run_sync(history_archive.write)([x.model_dump() for x in records])
+            await dal.delete_before(received_time=received_time, min_id=records[0].id, max_id=records[-1].id)
+
+        archived_count += len(records)
+        if len(records) < config.db_history_archive_batch_size:
+            break
+    return archived_count
+
+
+async def scheduled_archive_expired_history() -> None:
+    """定时归档过期的消息历史记录"""
+    logger.opt(colors=True).debug(f'{LOG_PREFIX}Started archiving expired message history')
+    try:
+        archived_count = await archive_expired_history()
+        logger.opt(colors=True).info(f'{LOG_PREFIX}Archived {archived_count} expired message history records')
+    except Exception as e:
+        logger.opt(colors=True).error(f'{LOG_PREFIX}Archiving expired message history failed, {e!r}')
+
+
 __all__ = [
+    'archive_expired_history',
     'postprocessor_history',
+    'scheduled_archive_expired_history',
 ]
@@ -8,30 +8,199 @@
 @Software       : PyCharm
 """
 
+import heapq
 import time
 from datetime import datetime, timedelta
 
-from nonebot import get_driver, logger
+from nonebot import get_driver, get_plugin_config, logger
 from nonebot.adapters import Bot as BaseBot
 from nonebot.adapters import Event as BaseEvent
 from nonebot.exception import IgnoredException
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.service.omega_metrics import metrics_registry
+from src.service.omega_metrics.metrics import Gauge
 
 SUPERUSERS = get_driver().config.superusers
 LOG_PREFIX: str = '<lc>Rate Limiting</lc> | '
 
 
-# 速率限制次数阈值, 触发超过该次数后启用限制
-RATE_LIMITING_THRESHOLD: int = 10
-# 速率限制时间阈值, 判断连续消息触发的时间间隔小于该值, 单位为秒, 判断依据时间戳为标准
-RATE_LIMITING_TIME: float = 1.0
-# 触发速率限制时为用户设置的流控冷却时间, 单位秒
-RATE_LIMITING_COOL_DOWN: int = 1800
-# 记录用户上次消息的时间戳, 作为对比依据
-USER_LAST_MSG_TIME: dict[str, int | float] = {}
-# 记录用户消息在速率限制时间阈值内触发的次数
-RATE_LIMITING_COUNT: dict[str, int] = {}
-# 已被限制的用户id及到期时间
-RATE_LIMITING_USER_TEMP: dict[str, datetime] = {}
+class RateLimitingRule(BaseModel):
+    """速率限制规则"""
+    # 令牌桶容量, 即允许连续触发的消息数量, 超过该次数后启用限制
+    capacity: int = Field(default=10, ge=1)
+    # 令牌恢复间隔, 每经过该时间恢复一次可触发次数, 单位秒
+    refill_interval: float = Field(default=1.0, gt=0)
+    # 触发速率限制时为用户设置的流控冷却时间, 单位秒
+    cool_down: int = 1800
+    # 是否豁免速率限制
+    exempt: bool = False
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+
+class OmegaProcessorRateLimitingConfig(BaseModel):
+    """OmegaProcessor-RateLimiting 配置"""
+    # 默认速率限制规则
+    omega_rate_limiting_default_rule: RateLimitingRule = RateLimitingRule()
+    # 针对特定用户的速率限制规则, 键为用户ID或 `{bot_type}_{bot_self_id}_{user_id}` 形式的用户标识符
+    omega_rate_limiting_overrides: dict[str, RateLimitingRule] = {}
+    # 用户无消息超过该时间且不在限制中时清除其记录, 单位秒
+    omega_rate_limiting_idle_timeout: float = 600.0
+    # 同时记录的最大用户数量, 超过后优先清除最久未活动的用户记录
+    omega_rate_limiting_max_keys: int = 65536
+
+    model_config = ConfigDict(extra='ignore')
+
+
+_plugin_config = get_plugin_config(OmegaProcessorRateLimitingConfig)
+
+
+class _TokenBucket:
+    """单个用户的令牌桶状态"""
+
+    __slots__ = ('tokens', 'updated_at', 'blocked_until', 'throttled_count')
+
+    def __init__(self, capacity: int, now: float):
+        self.tokens: float = capacity
+        self.updated_at: float = now
+        self.blocked_until: float = 0.0
+        self.throttled_count: int = 0
+
+    def expire_at(self, idle_timeout: float) -> float:
+        """记录可被清除的时间"""
+        return max(self.updated_at + idle_timeout, self.blocked_until)
+
+
+class RateLimiter:
+    """基于令牌桶的速率限制器
+
+    每个用户仅占用一个令牌桶, 检查为 O(1);
+    空闲记录通过按过期时间排序的最小堆惰性清除, 每个用户在堆中仅保留一项, 检查时发现过期时间已推后则重新入堆;
+    记录数量达到上限时强制清除堆顶(最早过期)的记录
+    """
+
+    def __init__(self, *, idle_timeout: float, max_keys: int):
+        self.idle_timeout = idle_timeout
+        self.max_keys = max_keys
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._expire_heap: list[tuple[float, str]] = []
+
+        self.checked_count: int = 0
+        self.triggered_count: int = 0
+        self.throttled_count: int = 0
+        self.evicted_count: int = 0
+
+    def _evict_expired(self, now: float) -> None:
+        while self._expire_heap and self._expire_heap[0][0] <= now:
+            _, key = heapq.heappop(self._expire_heap)
+            if (bucket := self._buckets.get(key)) is None:
+                continue
+
+            if (expire_at := bucket.expire_at(self.idle_timeout)) <= now:
+                del self._buckets[key]
+                self.evicted_count += 1
+            else:
+                heapq.heappush(self._expire_heap, (expire_at, key))
+
+    def _evict_oldest(self) -> None:
+        while self._expire_heap:
+            heap_expire_at, key = heapq.heappop(self._expire_heap)
+            if (bucket := self._buckets.get(key)) is None:
+                continue
+
+            # 堆中的过期时间可能已落后于记录的实际过期时间, 需按实际过期时间重新入堆后再比较
+            if (expire_at := bucket.expire_at(self.idle_timeout)) != heap_expire_at:
+                heapq.heappush(self._expire_heap, (expire_at, key))
+                continue
+
+            del self._buckets[key]
+            self.evicted_count += 1
+            return
+
+    def _get_bucket(self, key: str, rule: RateLimitingRule, now: float) -> _TokenBucket:
+        if (bucket := self._buckets.get(key)) is not None:
+            return bucket
+
+        self._evict_expired(now)
+        while len(self._buckets) >= self.max_keys and self._expire_heap:
+            self._evict_oldest()
+
+        bucket = self._buckets[key] = _TokenBucket(capacity=rule.capacity, now=now)
+        heapq.heappush(self._expire_heap, (bucket.expire_at(self.idle_timeout), key))
+        return bucket
+
+    def blocked_remaining(self, key: str) -> float:
+        """用户仍处于限制中的剩余时间, 未被限制则返回 0"""
+        if (bucket := self._buckets.get(key)) is None:
+            return 0.0
+        return max(bucket.blocked_until - time.monotonic(), 0.0)
+
+    def acquire(self, key: str, rule: RateLimitingRule) -> float:
+        """消耗一次触发次数, 返回触发限制后的剩余冷却时间, 未被限制则返回 0"""
+        now = time.monotonic()
+        self.checked_count += 1
+        bucket = self._get_bucket(key=key, rule=rule, now=now)
+
+        if bucket.blocked_until > now:
+            bucket.throttled_count += 1
+            self.throttled_count += 1
+            return bucket.blocked_until - now
+
+        bucket.tokens = min(rule.capacity, bucket.tokens + (now - bucket.updated_at) / rule.refill_interval)
+        bucket.updated_at = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+
+        # 触发限制, 设置流控冷却并重置令牌
+        bucket.tokens = rule.capacity
+        bucket.blocked_until = now + rule.cool_down
+        bucket.throttled_count += 1
+        self.triggered_count += 1
+        self.throttled_count += 1
+        return float(rule.cool_down)
+
+    @property
+    def statistics(self) -> dict[str, int]:
+        """速率限制器运行统计"""
+        return {
+            'tracked_keys': len(self._buckets),
+            'checked_count': self.checked_count,
+            'triggered_count': self.triggered_count,
+            'throttled_count': self.throttled_count,
+            'evicted_count': self.evicted_count,
+        }
+
+
+rate_limiter = RateLimiter(
+    idle_timeout=_plugin_config.omega_rate_limiting_idle_timeout,
+    max_keys=_plugin_config.omega_rate_limiting_max_keys,
+)
+
+
+RATE_LIMITING_STATISTICS = metrics_registry.register(Gauge(
+    'omega_rate_limiting_statistics',
+    'Rate limiter tracked keys and cumulative checked, triggered, throttled and evicted counts',
+    label_names=('kind',),
+))
+
+
+def _export_statistics() -> None:
+    """将速率限制器运行统计输出至运行指标"""
+    for kind, value in rate_limiter.statistics.items():
+        RATE_LIMITING_STATISTICS.set(value, kind)
+
+
+def _get_rule(user_flag: str, user_id: str) -> RateLimitingRule:
+    """获取用户适用的速率限制规则, 用户标识符优先于用户ID"""
+    overrides = _plugin_config.omega_rate_limiting_overrides
+    if (rule := overrides.get(user_flag)) is not None:
+        return rule
+    if (rule := overrides.get(user_id)) is not None:
+        return rule
+    return _plugin_config.omega_rate_limiting_default_rule
 
 
 async def preprocessor_rate_limiting(bot: BaseBot, event: BaseEvent):
@@ -59,55 +228,32 @@ async def preprocessor_rate_limiting(bot: BaseBot, event: BaseEvent):
     # 用户标识符根据 bot 生成
     user_flag = f'{bot.type}_{bot.self_id}_{user_id}'
 
+    rule = _get_rule(user_flag=user_flag, user_id=user_id)
+    if rule.exempt:
+        logger.opt(colors=True).trace(f'{LOG_PREFIX}Ignored with exempt <ly>User({user_flag})</ly>')
+        return
+
     # 检测该用户是否已经被速率限制
-    if RATE_LIMITING_USER_TEMP.get(user_flag, datetime.now()) > datetime.now():
+    if (remaining := rate_limiter.blocked_remaining(user_flag)) > 0:
+        rate_limiter.acquire(key=user_flag, rule=rule)
+        _export_statistics()
         logger.opt(colors=True).info(
-            f'{LOG_PREFIX}User({user_flag}) 仍在速率限制中, 到期时间 {RATE_LIMITING_USER_TEMP.get(user_flag)}'
+            f'{LOG_PREFIX}User({user_flag}) 仍在速率限制中, 到期时间 {datetime.now() + timedelta(seconds=remaining)}'
         )
         raise IgnoredException('速率限制中')
 
-    # 获取上条消息的时间戳
-    last_msg_timestamp = USER_LAST_MSG_TIME.get(user_flag, None)
-    # 获取当前时间戳
-    this_msg_timestamp = time.time()
-    # 更新上次消息时间戳为本次消息时间戳
-    if last_msg_timestamp is None:
-        USER_LAST_MSG_TIME.update({user_flag: this_msg_timestamp})
-        # 上次消息时间戳为空则这是第一条消息
-        return
-    else:
-        USER_LAST_MSG_TIME.update({user_flag: this_msg_timestamp})
-
-    # 获取速录限制触发计数
-    over_limiting_count = RATE_LIMITING_COUNT.get(user_flag, 0)
-
-    # 进行速率判断
-    if this_msg_timestamp - last_msg_timestamp <= RATE_LIMITING_TIME:
-        # 小于等于时间阈值则计数 +1
-        over_limiting_count += 1
-        logger.opt(colors=True).debug(
-            f'{LOG_PREFIX}User({user_flag}) over rate limiting, count {over_limiting_count}/{RATE_LIMITING_THRESHOLD}'
-        )
-    else:
-        # 否则重置计数
-        over_limiting_count = 0
-        logger.opt(colors=True).trace(
-            f'{LOG_PREFIX}User({user_flag}) under rate limiting, last: {last_msg_timestamp}, now: {this_msg_timestamp}'
-        )
-
-    # 更新计数
-    RATE_LIMITING_COUNT.update({user_flag: over_limiting_count})
-
-    # 判断计数大于阈值则触发限制, 为用户设置限流冷却并重置计数
-    if over_limiting_count > RATE_LIMITING_THRESHOLD:
-        RATE_LIMITING_USER_TEMP.update({user_flag: datetime.now() + timedelta(seconds=RATE_LIMITING_COOL_DOWN)})
+    # 判断计数大于阈值则触发限制, 为用户设置限流冷却
+    cool_down = rate_limiter.acquire(key=user_flag, rule=rule)
+    _export_statistics()
+    if cool_down > 0:
         logger.opt(colors=True).info(
-            f'{LOG_PREFIX}User({user_flag}) 触发速率限制, 已设置用户限制 {RATE_LIMITING_COOL_DOWN} 秒'
+            f'{LOG_PREFIX}User({user_flag}) 触发速率限制, 已设置用户限制 {rule.cool_down} 秒'
         )
-        RATE_LIMITING_COUNT.update({user_flag: 0})
         raise IgnoredException('触发速率限制')
 
 
 __all__ = [
+    'RateLimiter',
     'preprocessor_rate_limiting',
+    'rate_limiter',
 ]
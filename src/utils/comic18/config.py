@@ -8,10 +8,11 @@
 @Software       : PyCharm
 """
 
+import os
 from typing import Literal
 
 from nonebot import get_plugin_config, logger
-from pydantic import BaseModel, ConfigDict, ValidationError
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from src.resource import StaticResource, TemporaryResource
 
@@ -25,6 +26,16 @@ class Comic18Config(BaseModel):
     # 默认缓存资源保存路径
     comic18_default_tmp_folder_name: Literal['comic18'] = 'comic18'
 
+    # 漫画下载配置
+    # 同时下载的图片数量
+    comic18_download_concurrency: int = Field(default=10, ge=1)
+    # 图片解码、重排及编码的工作线程数量
+    comic18_process_workers: int = Field(default=min(4, os.cpu_count() or 1), ge=1)
+    # 下载图片的输出格式
+    comic18_output_format: Literal['JPEG', 'WEBP', 'PNG'] = 'JPEG'
+    # 下载图片的输出质量, 仅对 JPEG 及 WEBP 格式有效
+    comic18_output_quality: int = Field(default=90, ge=1, le=100)
+
     model_config = ConfigDict(extra='ignore')
 
     @property
@@ -258,8 +258,7 @@ class Comic18ImgOps(ImageEffectProcessor):
     async def async_init_from_file(cls, file: 'BaseResource') -> Self:
         return cls(await ImageLoader.async_init_from_file(file=file))
 
-    @run_sync
-    def reverse_segmental_image(self, album_id: int, page_id: str) -> 'Comic18ImgOps':
+    def reverse_segmental(self, album_id: int, page_id: str) -> Self:
         """对被分割图片进行重新排序"""
         split_num = self.get_split_num(album_id=album_id, page_id=page_id)
         if split_num <= 1:
@@ -11,8 +11,8 @@
 import random
 import string
 from asyncio import sleep as async_sleep
-from collections.abc import Sequence
-from typing import TYPE_CHECKING, Literal
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any, Literal
 
 from nonebot.log import logger
 
@@ -21,7 +21,7 @@ from src.utils import BaseCommonAPI, semaphore_gather
 from src.utils.image_utils.template import PreviewImageModel, PreviewImageThumbs, generate_thumbs_preview_image
 from src.utils.zip_utils import ZipUtils
 from .config import comic18_config
-from .helper import Comic18ImgOps, Comic18Parser
+from .helper import Comic18Parser
 from .model import (
     AlbumData,
     AlbumPackResult,
@@ -30,6 +30,7 @@ from .model import (
     AlbumsResult,
     Comic18PreviewRequestModel,
 )
+from .pipeline import Comic18AlbumPipeline
 
 if TYPE_CHECKING:
     from src.resource import TemporaryResource
@@ -364,53 +365,36 @@ class Comic18(_BaseComic18):
 
         return data
 
-    async def _reverse_image(
+    async def download_album(
             self,
-            page_id: str,
-            file: 'TemporaryResource',
-            save_folder: 'TemporaryResource'
-    ) -> 'TemporaryResource':
-        """恢复被分割的图片"""
-        image: Comic18ImgOps = await Comic18ImgOps.async_init_from_file(file=file)
-        output_image = await image.reverse_segmental_image(album_id=self.aid, page_id=page_id)
-        return await output_image.save(save_folder(f'{page_id}.jpg'))
+            *,
+            ignore_exist_file: bool = True,
+            on_page_completed: Callable[['TemporaryResource'], Any] | None = None,
+    ) -> list['TemporaryResource']:
+        """下载漫画
 
-    async def download_album(self, *, ignore_exist_file: bool = True) -> list['TemporaryResource']:
-        """下载漫画"""
+        :param ignore_exist_file: 是否跳过已完成的页面
+        :param on_page_completed: 每个页面完成时调用
+        """
         album_pages = await self.query_all_pages()
 
-        # 下载目标文件夹
-        folder_name = f'album_{self.aid}'
-        download_folder = comic18_config.download_folder(folder_name)
-
-        # 生成下载任务序列
-        download_tasks = [
-            self.download_resource(url=page.url, folder_name=folder_name, ignore_exist_file=ignore_exist_file)
-            for page in album_pages
-        ]
-
-        # 执行下载任务
-        logger.info(f'Comic18 | Start downloading album(id={self.aid})')
-        download_result = await semaphore_gather(tasks=download_tasks, semaphore_num=10, return_exceptions=False)
-        logger.info(f'Comic18 | Downloaded album(id={self.aid}) original image completed, staring reversing')
-
-        # 执行图片恢复
-        reverse_tasks = [
-            self._reverse_image(page_id=file.path.name, file=file, save_folder=download_folder)
-            for file in download_result
-        ]
-        reverse_result = await semaphore_gather(tasks=reverse_tasks, semaphore_num=10, return_exceptions=False)
+        pipeline = Comic18AlbumPipeline(
+            album_id=self.aid,
+            download_folder=comic18_config.download_folder(f'album_{self.aid}'),
+            request_bytes=self.request_resource_as_bytes,
+        )
+        result = await pipeline.run(
+            pages=album_pages, ignore_exist_file=ignore_exist_file, on_page_completed=on_page_completed
+        )
         logger.success(f'Comic18 | Downloaded and reversed album(id={self.aid}) succeed')
 
-        return [x for x in reverse_result if not isinstance(x, Exception)]
+        return result
 
     async def download_and_pack_album(self, *, ignore_exist_file: bool = True) -> AlbumPackResult:
         """下载并打包漫画"""
         album_data = await self.query_album()
 
-        # 执行下载任务
         download_folder = comic18_config.download_folder(f'album_{self.aid}')
-        download_result = await self.download_album(ignore_exist_file=ignore_exist_file)
 
         # 归档元数据
         metadata_file = download_folder('metadata.json')
@@ -429,11 +413,14 @@ class Comic18(_BaseComic18):
         async with password_file.async_open('w', encoding='utf8') as af:
             await af.write(password_str)
 
-        # 打包
-        logger.info(f'Comic18 | Packing album(id={self.aid}) content, password: {password_str}')
+        # 下载的同时打包, 图片本身已经过压缩, 仅存储不再压缩
+        logger.info(f'Comic18 | Downloading and packing album(id={self.aid}) content, password: {password_str}')
         zip_file = ZipUtils(file_name=f'Comic18_album_{self.aid}.7z', folder=download_folder)
-        file_list = [metadata_file, rand_file, password_file, *download_result]
-        zip_result = await zip_file.create_7z(files=file_list, password=password_str)
+        async with zip_file.create_stream_writer(password=password_str, store_only=True) as writer:
+            for file in (metadata_file, rand_file, password_file):
+                writer.add(file)
+            await self.download_album(ignore_exist_file=ignore_exist_file, on_page_completed=writer.add)
+        zip_result = writer.file
         logger.success(f'Comic18 | Packed album(id={self.aid}) succeed')
 
         return AlbumPackResult(file_path=zip_result.path, password=password_str)
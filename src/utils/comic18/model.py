@@ -87,6 +87,16 @@ class AlbumPackResult(BaseComic18Model):
         return AnyResource(self.file_path)
 
 
+class AlbumDownloadManifest(BaseModel):
+    """漫画下载进度清单, 用于中断后继续下载"""
+    aid: int
+    output_format: str
+    output_quality: int
+    pages: dict[str, str] = {}  # 已完成的 page_id 及其输出文件名
+
+    model_config = ConfigDict(extra='ignore')
+
+
 class Comic18PreviewRequestModel(BaseComic18Model):
     """请求 Comic18PreviewModel 的入参"""
     desc_text: str
@@ -96,6 +106,7 @@ class Comic18PreviewRequestModel(BaseComic18Model):
 __all__ = [
     'AlbumChapter',
     'AlbumData',
+    'AlbumDownloadManifest',
     'AlbumPage',
     'AlbumPageContent',
     'AlbumsResult',
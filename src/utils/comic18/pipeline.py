@@ -0,0 +1,232 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/7 20:16:42
+@FileName       : pipeline
+@Project        : omega-miya
+@Description    : 18Comic 漫画批量下载处理流水线
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import TYPE_CHECKING, Any
+
+from PIL import Image
+from nonebot.log import logger
+from pydantic import ValidationError
+
+from src.utils import semaphore_gather
+from .config import comic18_config
+from .helper import Comic18ImgOps
+from .model import AlbumDownloadManifest
+
+if TYPE_CHECKING:
+    from src.resource import TemporaryResource
+    from .model import AlbumPageContent
+
+_PROCESS_EXECUTOR: ThreadPoolExecutor = ThreadPoolExecutor(
+    max_workers=comic18_config.comic18_process_workers, thread_name_prefix='comic18_process'
+)
+"""图片解码、重排及编码线程池, Pillow 的解码及编码操作会释放 GIL"""
+
+_OUTPUT_SUFFIX: dict[str, str] = {'JPEG': 'jpg', 'WEBP': 'webp', 'PNG': 'png'}
+"""输出格式对应的文件扩展名"""
+
+
+class _StageMetric:
+    """流水线单个阶段的吞吐统计"""
+
+    __slots__ = ('name', 'count', 'seconds', 'size')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count: int = 0
+        self.seconds: float = 0.0
+        self.size: int = 0
+
+    def record(self, seconds: float, size: int) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.size += size
+
+    def __str__(self) -> str:
+        if self.count == 0 or self.seconds <= 0:
+            return f'{self.name}: {self.count} pages'
+        return (
+            f'{self.name}: {self.count} pages, {self.seconds:.2f}s busy, '
+            f'{self.seconds / self.count * 1000:.1f}ms/page, {self.size / self.seconds / 1024 / 1024:.2f}MB/s'
+        )
+
+
+class Comic18AlbumPipeline:
+    """漫画批量下载处理流水线
+
+    每页图片独立完成 下载 -> 解码 -> 重排 -> 编码 -> 写入, 下载并发与解码编码线程数量分别限制,
+    原始图片仅在内存中处理, 直接编码为最终格式写入文件;
+    已完成的页面记录在下载目录的进度清单中, 中断后再次下载时跳过
+    """
+
+    def __init__(
+            self,
+            album_id: int,
+            download_folder: 'TemporaryResource',
+            request_bytes: Callable[[str], Awaitable[bytes]],
+            *,
+            output_format: str = comic18_config.comic18_output_format,
+            output_quality: int = comic18_config.comic18_output_quality,
+            concurrency: int = comic18_config.comic18_download_concurrency,
+    ):
+        self.album_id = album_id
+        self.download_folder = download_folder
+        self.request_bytes = request_bytes
+        self.output_format = output_format
+        self.output_quality = output_quality
+        self.concurrency = concurrency
+
+        self._manifest_file = download_folder('manifest.json')
+        self._manifest = AlbumDownloadManifest(aid=album_id, output_format=output_format, output_quality=output_quality)
+
+        self.metrics: dict[str, _StageMetric] = {
+            x: _StageMetric(name=x) for x in ('download', 'decode', 'reverse', 'encode', 'write')
+        }
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(album_id={self.album_id})'
+
+    def _get_output_file(self, page_id: str) -> 'TemporaryResource':
+        return self.download_folder(f'{page_id}.{_OUTPUT_SUFFIX.get(self.output_format, self.output_format.lower())}')
+
+    async def _load_manifest(self) -> None:
+        """载入已有的进度清单, 输出格式或质量不一致时忽略"""
+        if not self._manifest_file.is_file:
+            return
+
+        try:
+            async with self._manifest_file.async_open('r', encoding='utf8') as af:
+                manifest = AlbumDownloadManifest.model_validate_json(await af.read())
+        except (OSError, ValidationError) as e:
+            logger.warning(f'Comic18 | Loading {self} manifest failed, {e}')
+            return
+
+        if (manifest.aid, manifest.output_format, manifest.output_quality) == (
+                self.album_id, self.output_format, self.output_quality
+        ):
+            self._manifest = manifest
+
+    async def _save_manifest(self) -> None:
+        """先写入同目录下的临时文件再替换, 避免中断时留下不完整的进度清单"""
+        temp_file = self.download_folder(f'{self._manifest_file.path.name}.tmp')
+        async with temp_file.async_open('w', encoding='utf8') as af:
+            await af.write(self._manifest.model_dump_json())
+        os.replace(temp_file.path, self._manifest_file.path)
+
+    def _process_image(self, content: bytes, page_id: str) -> tuple[bytes, tuple[float, float, float]]:
+        """在线程池中解码、重排并编码图片, 返回输出内容及各阶段耗时"""
+        start_time = time.perf_counter()
+        with BytesIO(content) as bf:
+            image = Image.open(bf)
+            image.load()
+        decode_time = time.perf_counter()
+
+        image_ops = Comic18ImgOps(image).reverse_segmental(album_id=self.album_id, page_id=page_id)
+        reverse_time = time.perf_counter()
+
+        if self.output_format == 'JPEG' and image_ops.image.mode not in ('RGB', 'L'):
+            image_ops.convert('RGB')
+        with BytesIO() as bf:
+            image_ops.image.save(bf, format=self.output_format, quality=self.output_quality)
+            output = bf.getvalue()
+        encode_time = time.perf_counter()
+
+        return output, (decode_time - start_time, reverse_time - decode_time, encode_time - reverse_time)
+
+    async def _process_page(
+            self,
+            page: 'AlbumPageContent',
+            on_page_completed: Callable[['TemporaryResource'], Any] | None = None,
+    ) -> 'TemporaryResource':
+        start_time = time.perf_counter()
+        content = await self.request_bytes(page.url)
+        self.metrics['download'].record(time.perf_counter() - start_time, len(content))
+
+        output, (decode_seconds, reverse_seconds, encode_seconds) = await asyncio.get_running_loop().run_in_executor(
+            _PROCESS_EXECUTOR, self._process_image, content, page.page_id
+        )
+        self.metrics['decode'].record(decode_seconds, len(content))
+        self.metrics['reverse'].record(reverse_seconds, len(output))
+        self.metrics['encode'].record(encode_seconds, len(output))
+
+        start_time = time.perf_counter()
+        output_file = self._get_output_file(page_id=page.page_id)
+        async with output_file.async_open('wb') as af:
+            await af.write(output)
+        self.metrics['write'].record(time.perf_counter() - start_time, len(output))
+
+        self._manifest.pages[page.page_id] = output_file.path.name
+
+        if on_page_completed is not None:
+            on_page_completed(output_file)
+        return output_file
+
+    async def run(
+            self,
+            pages: Sequence['AlbumPageContent'],
+            *,
+            ignore_exist_file: bool = True,
+            on_page_completed: Callable[['TemporaryResource'], Any] | None = None,
+    ) -> list['TemporaryResource']:
+        """下载并处理全部页面, 按页面顺序返回输出文件
+
+        :param pages: 漫画全部页面
+        :param ignore_exist_file: 是否跳过进度清单中已完成的页面
+        :param on_page_completed: 每个页面完成(或从进度清单中跳过)时调用, 可用于流式打包
+        """
+        if ignore_exist_file:
+            await self._load_manifest()
+
+        results: dict[str, TemporaryResource] = {}
+        pending_pages = []
+        for page in pages:
+            if (
+                    (file_name := self._manifest.pages.get(page.page_id)) is not None
+                    and (exist_file := self.download_folder(file_name)).is_file
+            ):
+                results[page.page_id] = exist_file
+                if on_page_completed is not None:
+                    on_page_completed(exist_file)
+            else:
+                pending_pages.append(page)
+
+        logger.info(
+            f'Comic18 | Start downloading album(id={self.album_id}), '
+            f'{len(pending_pages)} pending, {len(results)} skipped with manifest'
+        )
+        start_time = time.perf_counter()
+        try:
+            processed_files = await semaphore_gather(
+                tasks=[self._process_page(page=page, on_page_completed=on_page_completed) for page in pending_pages],
+                semaphore_num=self.concurrency,
+                return_exceptions=False,
+            )
+        finally:
+            # 全部页面处理结束或中断时统一写入进度清单
+            if pending_pages:
+                await self._save_manifest()
+        elapsed_time = time.perf_counter() - start_time
+        results.update((page.page_id, file) for page, file in zip(pending_pages, processed_files))
+
+        logger.debug(
+            f'Comic18 | Album(id={self.album_id}) pipeline metrics, {len(pending_pages)} pages in {elapsed_time:.2f}s\n'
+            + '\n'.join(str(x) for x in self.metrics.values())
+        )
+        return [results[page.page_id] for page in pages]
+
+
+__all__ = [
+    'Comic18AlbumPipeline',
+]
@@ -11,12 +11,17 @@
 from collections.abc import Iterable
 from typing import TYPE_CHECKING, Any, Self
 
-import pandas as pd
 from nonebot.utils import run_sync
 from pydantic import BaseModel, ConfigDict, create_model
 
+from src.utils.import_utils import lazy_import
+
 if TYPE_CHECKING:
+    import pandas as pd
+
     from src.resource import BaseResource
+else:
+    pd = lazy_import('pandas')
 
 
 class ExcelTools[DataModel_T: BaseModel]:
@@ -8,10 +8,14 @@
 @Software       : PyCharm
 """
 
+import time
 from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
+from nonebot.log import logger
+
 from src.utils import semaphore_gather
+from .cache import CachedSearcherResults, ImageSearchingCacheKey, image_searching_cache
 from .config import image_searcher_config
 from .model import SearchableImage
 from .seachers import AVAILABLE_SEARCHERS
@@ -42,7 +46,7 @@ class ComplexImageSearcher:
                and ((exclude_searcher is None) or (x.get_searcher_name() not in exclude_searcher))
         ]
 
-    async def search(self) -> list['ImageSearchingResult']:
+    async def _search_without_cache(self) -> list['ImageSearchingResult']:
         searching_tasks = [
             searcher(image=self.image).search()
             for searcher in self.searcher
@@ -51,6 +55,62 @@ class ComplexImageSearcher:
 
         return [x for searcher_results in all_results for x in searcher_results]
 
+    async def _search_with_cache(self, key: ImageSearchingCacheKey) -> list['ImageSearchingResult']:
+        matched_key = await image_searching_cache.match(key)
+        if matched_key is not None:
+            key = matched_key
+        record = await image_searching_cache.load(key)
+
+        searcher_results: dict[str, list[ImageSearchingResult]] = {}
+        pending_searchers = []
+        for searcher in self.searcher:
+            if (cached_results := record.get_results(searcher.get_searcher_name())) is not None:
+                searcher_results[searcher.get_searcher_name()] = cached_results
+            else:
+                pending_searchers.append(searcher)
+
+        if pending_searchers:
+            logger.debug(
+                f'ImageSearcher | Searching cache {"hit" if matched_key else "miss"}, '
+                f'{len(searcher_results)} searcher(s) cached, {len(pending_searchers)} searcher(s) pending'
+            )
+            searching_results = await semaphore_gather(
+                tasks=[searcher(image=self.image).search() for searcher in pending_searchers], semaphore_num=4
+            )
+
+            cached_at = time.time()
+            for searcher, results in zip(pending_searchers, searching_results):
+                if isinstance(results, BaseException):
+                    logger.warning(f'ImageSearcher | {searcher.get_searcher_name()} searching failed, {results}')
+                    continue
+                searcher_results[searcher.get_searcher_name()] = results
+                record.searchers[searcher.get_searcher_name()] = CachedSearcherResults(
+                    cached_at=cached_at, results=results
+                )
+            await image_searching_cache.save(key, record)
+
+        return [
+            x
+            for searcher in self.searcher
+            for x in searcher_results.get(searcher.get_searcher_name(), [])
+        ]
+
+    async def search(self, *, use_cache: bool = True) -> list['ImageSearchingResult']:
+        """搜索图片, 启用缓存时相同或近似图片在有效期内直接返回已缓存的识图结果
+
+        :param use_cache: 是否使用识图结果缓存
+        """
+        if not (use_cache and image_searcher_config.image_searcher_enable_cache):
+            return await self._search_without_cache()
+
+        try:
+            key = await ImageSearchingCacheKey.from_image(self.image)
+        except Exception as e:
+            logger.warning(f'ImageSearcher | Computing searching cache key failed, {e}')
+            return await self._search_without_cache()
+
+        return await self._search_with_cache(key=key)
+
 
 __all__ = [
     'ComplexImageSearcher',
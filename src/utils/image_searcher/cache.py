@@ -0,0 +1,193 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/10 14:21:05
+@FileName       : cache.py
+@Project        : omega-miya
+@Description    : 识图结果本地缓存
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import hashlib
+import time
+from io import BytesIO
+
+from PIL import Image
+from nonebot.log import logger
+from nonebot.utils import run_sync
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from src.resource import BaseResource, TemporaryResource
+from src.utils import OmegaRequests
+from src.utils.image_utils import ImageHash, compute_image_hash, hamming_distance
+from .config import image_searcher_config
+from .model import ImageSearchingResult, SearchableImage
+
+_CACHE_FOLDER: TemporaryResource = TemporaryResource('image_searcher', 'cache')
+"""识图结果缓存文件夹, 文件名为 {sha256}_{dhash}_{phash}.json"""
+_PRUNE_INTERVAL: float = 60 * 60
+"""写入缓存时重新扫描缓存文件夹并清理过期缓存文件的最短间隔(秒)"""
+
+
+class ImageSearchingCacheKey(BaseModel):
+    """识图缓存索引, 图片内容 SHA256 及感知哈希"""
+    sha256: str
+    dhash: int
+    phash: int
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+    @property
+    def file_name(self) -> str:
+        return f'{self.sha256}_{self.dhash:016x}_{self.phash:016x}.json'
+
+    @classmethod
+    def parse_file_name(cls, file_name: str) -> 'ImageSearchingCacheKey':
+        sha256, dhash, phash = file_name.removesuffix('.json').split('_')
+        return cls(sha256=sha256, dhash=int(dhash, 16), phash=int(phash, 16))
+
+    def is_near_duplicate(self, other: 'ImageSearchingCacheKey') -> bool:
+        dhash_max_distance = image_searcher_config.image_searcher_cache_dhash_max_distance
+        phash_max_distance = image_searcher_config.image_searcher_cache_phash_max_distance
+        return (
+                hamming_distance(self.dhash, other.dhash) <= dhash_max_distance
+                and hamming_distance(self.phash, other.phash) <= phash_max_distance
+        )
+
+    @staticmethod
+    @run_sync
+    def _compute(content: bytes) -> 'ImageSearchingCacheKey':
+        with BytesIO(content) as bf:
+            image_hash: ImageHash = compute_image_hash(Image.open(bf))
+        return ImageSearchingCacheKey(
+            sha256=hashlib.sha256(content).hexdigest(), dhash=image_hash.dhash, phash=image_hash.phash
+        )
+
+    @classmethod
+    async def from_image(cls, image: SearchableImage) -> 'ImageSearchingCacheKey':
+        """获取待识别图片内容并计算索引, 图片 url 将被下载"""
+        if isinstance(image, BaseResource):
+            async with image.async_open('rb') as af:
+                content = await af.read()
+        elif isinstance(image, bytes):
+            content = image
+        else:
+            requests = OmegaRequests(timeout=30)
+            content = requests.parse_content_as_bytes(response=await requests.get(url=image))
+        return await cls._compute(content)
+
+
+class CachedSearcherResults(BaseModel):
+    """单个识图引擎的缓存结果"""
+    cached_at: float
+    results: list[ImageSearchingResult] = Field(default_factory=list)
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+    def is_expired(self, searcher_name: str) -> bool:
+        return time.time() - self.cached_at > image_searcher_config.get_cache_ttl(searcher_name)
+
+
+class ImageSearchingCacheRecord(BaseModel):
+    """单张图片的识图结果缓存"""
+    searchers: dict[str, CachedSearcherResults] = Field(default_factory=dict)
+
+    model_config = ConfigDict(extra='ignore')
+
+    def get_results(self, searcher_name: str) -> list[ImageSearchingResult] | None:
+        """获取未过期的识图结果, 不存在或已过期时返回 None"""
+        cached = self.searchers.get(searcher_name)
+        if cached is None or cached.is_expired(searcher_name):
+            return None
+        return cached.results
+
+
+class ImageSearchingCache:
+    """识图结果缓存
+
+    以图片内容 SHA256 精确匹配, 未命中时以 dHash 及 pHash 查找近似图片, 重新压缩或缩放的图片共用同一缓存;
+    缓存索引仅由文件名构成, 首次使用时扫描缓存文件夹载入内存, 同时清理超过最长有效期的缓存文件;
+    此后写入缓存时每隔 `_PRUNE_INTERVAL` 重新扫描一次, 持续清理过期的缓存文件
+    """
+
+    def __init__(self, folder: TemporaryResource = _CACHE_FOLDER):
+        self.folder = folder
+        self._keys: dict[str, ImageSearchingCacheKey] | None = None
+        self._scanned_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(folder={self.folder})'
+
+    @run_sync
+    def _scan_folder(self) -> dict[str, ImageSearchingCacheKey]:
+        keys: dict[str, ImageSearchingCacheKey] = {}
+        if not self.folder.is_dir:
+            return keys
+
+        expired_time = time.time() - image_searcher_config.max_cache_ttl
+        for file in self.folder.iter_current_files():
+            try:
+                if file.path.stat().st_mtime < expired_time:
+                    file.path.unlink(missing_ok=True)
+                    continue
+                key = ImageSearchingCacheKey.parse_file_name(file.path.name)
+            except (OSError, ValueError) as e:
+                logger.warning(f'ImageSearcher | Loading searching cache {file.path.name!r} failed, {e}')
+                continue
+            keys[key.sha256] = key
+        return keys
+
+    async def _get_keys(self, *, rescan_expired: bool = False) -> dict[str, ImageSearchingCacheKey]:
+        if self._keys is None or (rescan_expired and time.monotonic() - self._scanned_at > _PRUNE_INTERVAL):
+            self._keys = await self._scan_folder()
+            self._scanned_at = time.monotonic()
+            logger.debug(f'ImageSearcher | Loaded {len(self._keys)} searching cache record(s)')
+        return self._keys
+
+    async def match(self, key: ImageSearchingCacheKey) -> ImageSearchingCacheKey | None:
+        """查找缓存中相同或近似的图片"""
+        async with self._lock:
+            keys = await self._get_keys()
+
+        if (exact_key := keys.get(key.sha256)) is not None:
+            return exact_key
+
+        near_keys = [x for x in keys.values() if key.is_near_duplicate(x)]
+        if not near_keys:
+            return None
+        return min(near_keys, key=lambda x: hamming_distance(key.dhash, x.dhash) + hamming_distance(key.phash, x.phash))
+
+    async def load(self, key: ImageSearchingCacheKey) -> ImageSearchingCacheRecord:
+        """读取缓存记录, 不存在或读取失败时返回空记录"""
+        file = self.folder(key.file_name)
+        if not file.is_file:
+            return ImageSearchingCacheRecord()
+
+        try:
+            async with file.async_open('r', encoding='utf8') as af:
+                return ImageSearchingCacheRecord.model_validate_json(await af.read())
+        except (OSError, ValidationError) as e:
+            logger.warning(f'ImageSearcher | Loading searching cache {key.file_name!r} failed, {e}')
+            return ImageSearchingCacheRecord()
+
+    async def save(self, key: ImageSearchingCacheKey, record: ImageSearchingCacheRecord) -> None:
+        """写入缓存记录"""
+        async with self._lock:
+            keys = await self._get_keys(rescan_expired=True)
+            async with self.folder(key.file_name).async_open('w', encoding='utf8') as af:
+                await af.write(record.model_dump_json())
+            keys[key.sha256] = key
+
+
+image_searching_cache: ImageSearchingCache = ImageSearchingCache()
+"""识图结果缓存实例"""
+
+
+__all__ = [
+    'CachedSearcherResults',
+    'ImageSearchingCacheKey',
+    'ImageSearchingCacheRecord',
+    'image_searching_cache',
+]
@@ -34,9 +34,30 @@ class ImageSearcherConfig(BaseModel):
     ] = Field(default='anime_model_lovelive')
     # Saucenao
     image_searcher_saucenao_api_key: str | None = Field(default=None)
+    # 识图结果缓存配置
+    image_searcher_enable_cache: bool = Field(default=True)
+    # 各识图引擎结果缓存有效期(秒), 未配置的识图引擎使用默认有效期
+    image_searcher_cache_default_ttl: int = Field(default=3 * 24 * 60 * 60, ge=0)
+    image_searcher_cache_ttl: dict[str, int] = Field(default={
+        'saucenao': 7 * 24 * 60 * 60,
+        'ascii2d': 3 * 24 * 60 * 60,
+        'iqdb': 7 * 24 * 60 * 60,
+        'tracemoe': 30 * 24 * 60 * 60,
+        'animetrace': 24 * 60 * 60,
+    })
+    # 近似图片判定阈值, 感知哈希汉明距离均不超过阈值的图片视为同一图片
+    image_searcher_cache_dhash_max_distance: int = Field(default=3, ge=0, le=64)
+    image_searcher_cache_phash_max_distance: int = Field(default=6, ge=0, le=64)
 
     model_config = ConfigDict(extra='ignore')
 
+    def get_cache_ttl(self, searcher_name: str) -> int:
+        return self.image_searcher_cache_ttl.get(searcher_name, self.image_searcher_cache_default_ttl)
+
+    @property
+    def max_cache_ttl(self) -> int:
+        return max([self.image_searcher_cache_default_ttl, *self.image_searcher_cache_ttl.values()])
+
 
 try:
     image_searcher_config = get_plugin_config(ImageSearcherConfig)
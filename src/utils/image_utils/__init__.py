@@ -8,10 +8,16 @@
 @Software       : PyCharm
 """
 
+from .image_hash import ImageHash, compute_image_hash, hamming_distance
 from .image_util import ImageEffectProcessor, ImageLoader, ImageTextProcessor
+from .thumbnail import ThumbnailPyramid
 
 __all__ = [
     'ImageEffectProcessor',
+    'ImageHash',
     'ImageLoader',
     'ImageTextProcessor',
+    'ThumbnailPyramid',
+    'compute_image_hash',
+    'hamming_distance',
 ]
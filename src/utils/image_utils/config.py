@@ -27,6 +27,11 @@ class ImageUtilsConfig(BaseModel):
     # 默认缓存资源保存路径
     image_utils_tmp_folder_name: Literal['image_utils'] = 'image_utils'
 
+    # 多级缩略图等级(长边像素)
+    image_utils_thumbnail_pyramid_levels: tuple[int, ...] = (128, 256, 512)
+    # 预览图缓存有效期(秒), 为 0 则不使用缓存
+    image_utils_preview_cache_ttl: int = 6 * 60 * 60
+
     model_config = ConfigDict(extra='ignore')
 
     @property
@@ -0,0 +1,89 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/9 14:37:52
+@FileName       : image_hash
+@Project        : omega-miya
+@Description    : 图片感知哈希计算工具
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from functools import cache
+from typing import TYPE_CHECKING
+
+from PIL import Image
+from pydantic import BaseModel, ConfigDict
+
+from src.utils.import_utils import lazy_import
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    np = lazy_import('numpy')
+
+
+class ImageHash(BaseModel):
+    """图片感知哈希, 均为 64 位无符号整数"""
+    dhash: int
+    phash: int
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """计算两个哈希值的汉明距离"""
+    return (a ^ b).bit_count()
+
+
+def _bits_to_int(bits: 'np.ndarray') -> int:
+    return int.from_bytes(np.packbits(bits.astype(np.uint8).flatten()).tobytes(), byteorder='big')
+
+
+@cache
+def _get_dct_matrix(size: int) -> 'np.ndarray':
+    """DCT-II 变换矩阵"""
+    k = np.arange(size, dtype=np.float64)[:, np.newaxis]
+    n = np.arange(size, dtype=np.float64)[np.newaxis, :]
+    return np.cos(np.pi * (2 * n + 1) * k / (2 * size))
+
+
+def _to_gray(image: Image.Image) -> Image.Image:
+    """透明背景以白色填充后转换为灰度图, 避免透明区域的随机底色影响哈希"""
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+    return image.convert('L')
+
+
+def compute_dhash(image: Image.Image, *, hash_size: int = 8) -> int:
+    """计算差异哈希(dHash), 比较缩小后灰度图中每行相邻像素的亮度变化"""
+    pixels = np.asarray(
+        _to_gray(image).resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS), dtype=np.int16
+    )
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def compute_phash(image: Image.Image, *, hash_size: int = 8, highfreq_factor: int = 4) -> int:
+    """计算感知哈希(pHash), 比较缩小后灰度图 DCT 低频分量与其中位数的大小"""
+    image_size = hash_size * highfreq_factor
+    pixels = np.asarray(
+        _to_gray(image).resize((image_size, image_size), Image.Resampling.LANCZOS), dtype=np.float64
+    )
+    dct_matrix = _get_dct_matrix(image_size)
+    low_freq = (dct_matrix @ pixels @ dct_matrix.T)[:hash_size, :hash_size]
+    return _bits_to_int(low_freq > np.median(low_freq))
+
+
+def compute_image_hash(image: Image.Image) -> ImageHash:
+    """计算图片的 64 位 dHash 及 pHash"""
+    return ImageHash(dhash=compute_dhash(image), phash=compute_phash(image))
+
+
+__all__ = [
+    'ImageHash',
+    'compute_dhash',
+    'compute_image_hash',
+    'compute_phash',
+    'hamming_distance',
+]
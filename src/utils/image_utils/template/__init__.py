@@ -9,10 +9,12 @@
 """
 
 from .model import PreviewImageModel, PreviewImageThumbs
-from .template_preview import generate_thumbs_preview_image
+from .template_preview import build_preview_cache_key, generate_thumbs_preview_image, get_cached_preview_image
 
 __all__ = [
     'PreviewImageThumbs',
     'PreviewImageModel',
-    'generate_thumbs_preview_image'
+    'build_preview_cache_key',
+    'generate_thumbs_preview_image',
+    'get_cached_preview_image',
 ]
@@ -8,12 +8,16 @@
 @Software       : PyCharm
 """
 
+import hashlib
+import os
+import time
+import uuid
 from datetime import datetime
 from io import BytesIO
 from math import ceil
 from typing import TYPE_CHECKING
 
-from PIL import Image, ImageDraw, ImageFont, UnidentifiedImageError
+from PIL import Image, ImageDraw, ImageFont
 from nonebot.utils import run_sync
 
 from ..config import image_utils_config
@@ -25,6 +29,37 @@ if TYPE_CHECKING:
     from .model import PreviewImageModel
 
 
+def build_preview_cache_key(*keys: str, **layout: object) -> str:
+    """根据有序的预览内容标识及布局参数生成预览图缓存标识
+
+    :param keys: 按顺序排列的预览内容标识, 如作品的 origin:aid
+    :param layout: 影响预览图结果的布局参数
+    """
+    content = '\n'.join((*keys, *(f'{k}={v!r}' for k, v in sorted(layout.items()))))
+    return hashlib.sha256(content.encode('utf8')).hexdigest()[:32]
+
+
+def _get_preview_cache_file(cache_key: str, output_folder: 'TemporaryResource') -> 'TemporaryResource':
+    return output_folder(f'preview_cache_{cache_key}.jpg')
+
+
+def get_cached_preview_image(
+        cache_key: str,
+        *,
+        output_folder: 'TemporaryResource' = image_utils_config.default_preview_output_folder,
+) -> 'TemporaryResource | None':
+    """获取有效期内已缓存的预览图, 不存在或已过期时返回 None"""
+    if image_utils_config.image_utils_preview_cache_ttl <= 0:
+        return None
+
+    cache_file = _get_preview_cache_file(cache_key=cache_key, output_folder=output_folder)
+    if not cache_file.is_file:
+        return None
+    if time.time() - cache_file.path.stat().st_mtime > image_utils_config.image_utils_preview_cache_ttl:
+        return None
+    return cache_file
+
+
 async def generate_thumbs_preview_image(
         preview: 'PreviewImageModel',
         preview_size: tuple[int, int],
@@ -36,6 +71,7 @@ async def generate_thumbs_preview_image(
         num_of_line: int = 6,
         limit: int = 1000,
         output_folder: 'TemporaryResource' = image_utils_config.default_preview_output_folder,
+        cache_key: str | None = None,
 ) -> 'TemporaryResource':
     """生成多个带说明的缩略图的预览图
 
@@ -48,6 +84,7 @@ async def generate_thumbs_preview_image(
     :param num_of_line: 生成预览每一行的预览图数
     :param limit: 限制生成时加载 preview 中图片的最大值
     :param output_folder: 输出文件夹
+    :param cache_key: 预览图缓存标识, 由 `build_preview_cache_key` 生成, 提供时结果将作为缓存保存以供再次使用
     """
     preview_name = preview.preview_name
     previews = preview.previews[:limit]
@@ -108,8 +145,11 @@ async def generate_thumbs_preview_image(
             try:
                 with BytesIO(_preview.preview_thumb) as bf:
                     _thumb_img: Image.Image = Image.open(bf)
+                    # JPEG 等格式可直接以接近缩略图的分辨率解码
+                    _thumb_img.draft('RGB', preview_size)
                     _thumb_img.load()
-            except UnidentifiedImageError:
+            except (OSError, Image.DecompressionBombError):
+                # 无法识别、内容截断或尺寸异常的图片均以占位图代替
                 _thumb_img = Image.new(mode='RGB', size=preview_size, color=(127, 127, 127))
 
             # 调整图片大小
@@ -150,13 +190,25 @@ async def generate_thumbs_preview_image(
         return _content
 
     image_content = await _handle_preview_image()
-    image_file_name = f"preview_{hash(preview_name)}_{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}.jpg"
-    save_file = output_folder(image_file_name)
-    async with save_file.async_open('wb') as af:
-        await af.write(image_content)
+    if cache_key is not None:
+        save_file = _get_preview_cache_file(cache_key=cache_key, output_folder=output_folder)
+    else:
+        image_file_name = f"preview_{hash(preview_name)}_{datetime.now().strftime('%Y-%m-%d-%H-%M-%S')}.jpg"
+        save_file = output_folder(image_file_name)
+
+    # 先写入临时文件再替换, 避免并发读取缓存时得到写入中的文件
+    temp_file = output_folder(f'{save_file.path.name}.{uuid.uuid4().hex}.tmp')
+    try:
+        async with temp_file.async_open('wb') as af:
+            await af.write(image_content)
+        os.replace(temp_file.path, save_file.path)
+    finally:
+        temp_file.path.unlink(missing_ok=True)
     return save_file
 
 
 __all__ = [
-    'generate_thumbs_preview_image'
+    'build_preview_cache_key',
+    'generate_thumbs_preview_image',
+    'get_cached_preview_image',
 ]
@@ -0,0 +1,132 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/12 11:26:40
+@FileName       : thumbnail.py
+@Project        : omega-miya
+@Description    : 多级缩略图生成及缓存工具
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import os
+import uuid
+import weakref
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+
+from PIL import Image
+from nonebot.utils import run_sync
+
+from .config import image_utils_config
+
+if TYPE_CHECKING:
+    from src.resource import BaseResource, TemporaryResource
+
+
+def select_pyramid_level(size: tuple[int, int], levels: Sequence[int]) -> int:
+    """选择能覆盖目标尺寸的最小缩略图等级, 均无法覆盖时选择最大等级"""
+    target = max(size)
+    sorted_levels = sorted(levels)
+    return next((x for x in sorted_levels if x >= target), sorted_levels[-1])
+
+
+def build_thumbnail_pyramid(image: Image.Image, levels: Sequence[int]) -> dict[int, Image.Image]:
+    """生成多级缩略图, 缩略图长边不超过对应等级且不放大原图
+
+    先由原图缩放至最大等级, 较小等级再依次由上一级缩放, 避免对大图重复缩放
+    """
+    # JPEG 等格式可直接以较低分辨率解码
+    image.draft('RGB', (max(levels), max(levels)))
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGBA')
+        background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+    current = image.convert('RGB')
+
+    thumbnails: dict[int, Image.Image] = {}
+    for level in sorted(levels, reverse=True):
+        current = current.copy()
+        current.thumbnail((level, level), Image.Resampling.LANCZOS)
+        thumbnails[level] = current
+    return thumbnails
+
+
+class ThumbnailPyramid:
+    """单张图片的多级缩略图
+
+    缩略图在首次使用时一次性生成全部等级并保存在指定文件夹中, 之后直接读取最接近所需尺寸的等级;
+    各等级先写入临时文件再替换, 读取时不会得到写入中的文件
+    """
+
+    _build_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+    """同一原图的生成锁, 在仍有生成任务持有或等待时保留"""
+
+    def __init__(
+            self,
+            source: 'BaseResource',
+            folder: 'TemporaryResource',
+            *,
+            levels: Sequence[int] | None = None,
+            quality: int = 90,
+    ):
+        """
+        :param source: 原图文件
+        :param folder: 缩略图保存文件夹
+        :param levels: 缩略图等级(长边像素), 为空则使用默认配置
+        :param quality: 缩略图 JPEG 质量
+        """
+        self.source = source
+        self.folder = folder
+        if levels is None:
+            levels = image_utils_config.image_utils_thumbnail_pyramid_levels
+        self.levels = tuple(sorted(levels))
+        self.quality = quality
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(source={self.source.path.name!r}, levels={self.levels})'
+
+    def get_level_file(self, level: int) -> 'TemporaryResource':
+        return self.folder(f'{self.source.path.stem}_thumb{level}.jpg')
+
+    @property
+    def is_built(self) -> bool:
+        return all(self.get_level_file(x).is_file for x in self.levels)
+
+    @run_sync
+    def _build(self) -> None:
+        with self.source.open('rb') as f:
+            image = Image.open(f)
+            thumbnails = build_thumbnail_pyramid(image, levels=self.levels)
+
+        for level, thumbnail in thumbnails.items():
+            level_file = self.get_level_file(level)
+            temp_file = self.folder(f'{level_file.path.name}.{uuid.uuid4().hex}.tmp')
+            try:
+                with temp_file.open('wb') as f:
+                    thumbnail.save(f, format='JPEG', quality=self.quality)
+                os.replace(temp_file.path, level_file.path)
+            finally:
+                temp_file.path.unlink(missing_ok=True)
+
+    async def build(self) -> None:
+        """生成全部等级的缩略图, 已生成时直接返回"""
+        if (lock := self._build_locks.get(self.source.resolve_path)) is None:
+            lock = self._build_locks[self.source.resolve_path] = asyncio.Lock()
+        async with lock:
+            if not self.is_built:
+                await self._build()
+
+    async def get(self, size: tuple[int, int]) -> 'TemporaryResource':
+        """获取最接近目标尺寸的缩略图文件"""
+        level_file = self.get_level_file(select_pyramid_level(size=size, levels=self.levels))
+        if not level_file.is_file:
+            await self.build()
+        return level_file
+
+
+__all__ = [
+    'ThumbnailPyramid',
+    'build_thumbnail_pyramid',
+    'select_pyramid_level',
+]
@@ -0,0 +1,143 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/13 10:18:22
+@FileName       : import_utils
+@Project        : omega-miya
+@Description    : 模块延迟导入及插件加载性能分析工具
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import importlib
+import os
+import pkgutil
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+import nonebot
+import psutil
+from nonebot.log import logger
+from pydantic import BaseModel, ConfigDict
+
+
+class LazyModule(ModuleType):
+    """延迟导入的模块代理, 首次访问模块属性时才真正导入模块"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._load(), item)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.__name__!r} ({"loaded" if self.is_loaded else "not loaded"})>'
+
+
+def lazy_import(name: str) -> ModuleType:
+    """延迟导入模块, 模块已导入时直接返回该模块
+
+    :param name: 模块完整名称, 子模块需使用完整名称, 如 `jieba.analyse`
+    """
+    if (module := sys.modules.get(name)) is not None:
+        return module
+    return LazyModule(name)
+
+
+class PluginLoadProfile(BaseModel):
+    """插件加载性能统计"""
+    name: str
+    module_path: str
+    elapsed_time: float
+    rss_delta: int
+    new_modules: list[str]
+    success: bool
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+
+def _get_rss() -> int:
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+def _iter_plugin_module_paths(plugin_dir: str) -> list[str]:
+    """按 nonebot.load_plugins 的规则列出文件夹中的插件模块路径"""
+    path = Path(plugin_dir)
+    module_prefix = '.'.join(path.resolve().relative_to(Path.cwd().resolve()).parts)
+    return [
+        f'{module_prefix}.{module_info.name}'
+        for module_info in sorted(pkgutil.iter_modules([str(path)]), key=lambda x: x.name)
+        if not module_info.name.startswith('_')
+    ]
+
+
+def _load_plugin_with_profile(module_path: str) -> PluginLoadProfile:
+    loaded_modules = {x.split('.', 1)[0] for x in sys.modules}
+    start_rss = _get_rss()
+    start_time = time.perf_counter()
+
+    plugin = nonebot.load_plugin(module_path)
+
+    elapsed_time = time.perf_counter() - start_time
+    rss_delta = _get_rss() - start_rss
+    new_modules = sorted({x.split('.', 1)[0] for x in sys.modules} - loaded_modules - {'src'})
+
+    return PluginLoadProfile(
+        name=module_path.rsplit('.', 1)[-1],
+        module_path=module_path,
+        elapsed_time=elapsed_time,
+        rss_delta=rss_delta,
+        new_modules=new_modules,
+        success=plugin is not None,
+    )
+
+
+def load_plugins_with_profile(*plugin_dirs: str) -> list[PluginLoadProfile]:
+    """逐个加载文件夹中的插件, 统计每个插件的导入耗时及内存占用增量并输出报告
+
+    插件按名称顺序依次加载, 先加载的插件所导入的公共依赖计入该插件, 报告结果仅供参考
+    """
+    profiles = [
+        _load_plugin_with_profile(module_path)
+        for plugin_dir in plugin_dirs
+        for module_path in _iter_plugin_module_paths(plugin_dir)
+    ]
+
+    total_time = sum(x.elapsed_time for x in profiles)
+    total_rss = sum(x.rss_delta for x in profiles)
+    report = '\n'.join(
+        f'{x.elapsed_time * 1000:>9.1f} ms {x.rss_delta / 1024 / 1024:>8.1f} MiB  {x.module_path}'
+        + ('' if x.success else ' (failed)')
+        + (f'  [{", ".join(x.new_modules)}]' if x.new_modules else '')
+        for x in sorted(profiles, key=lambda p: p.elapsed_time, reverse=True)
+    )
+    logger.info(
+        f'Startup Profile | Loaded {len(profiles)} plugin(s) in {total_time:.2f}s, '
+        f'RSS +{total_rss / 1024 / 1024:.1f} MiB\n{report}'
+    )
+    return profiles
+
+
+__all__ = [
+    'LazyModule',
+    'PluginLoadProfile',
+    'lazy_import',
+    'load_plugins_with_profile',
+]
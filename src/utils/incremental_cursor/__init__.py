@@ -0,0 +1,95 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/23 14:05:27
+@FileName       : incremental_cursor
+@Project        : omega-miya
+@Description    : 基于系统参数持久化的增量处理游标, 按 (记录时间, 记录 ID) 键集顺序分批处理新增记录
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from sqlalchemy.exc import NoResultFound
+
+from src.database import SystemSettingDAL, begin_db_session
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+type CursorPosition = tuple[datetime, int]
+"""游标位置, 即已处理的最后一条记录的 (记录时间, 记录 ID)"""
+type BatchProcessor = Callable[
+    ['AsyncSession', CursorPosition | None, datetime], Awaitable[tuple[CursorPosition | None, int]]
+]
+"""处理一批记录的函数, 传入数据库会话、当前游标位置及记录时间上限, 返回本批处理后的游标位置及处理的记录数量"""
+
+
+class IncrementalCursor:
+    """增量处理游标
+
+    按 (记录时间, 记录 ID) 的键集顺序处理记录, 不依赖记录 ID 的提交顺序,
+    仅处理记录时间早于 `settle_delay` 的记录, 避免写入延迟的记录落在游标之前而被遗漏;
+    每批记录的处理结果与游标位置在同一事务中提交, 批次之间释放锁, 以免长时间阻塞依赖游标的查询
+    """
+
+    def __init__(self, setting_name: str, setting_key: str, *, info: str, settle_delay: timedelta):
+        self.setting_name = setting_name
+        self.setting_key = setting_key
+        self.info = info
+        self.settle_delay = settle_delay
+        self.lock = asyncio.Lock()
+        """增量处理与依赖游标位置的查询互斥, 避免游标位置变化期间查询结果重复统计"""
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(setting_name={self.setting_name!r}, setting_key={self.setting_key!r})'
+
+    @staticmethod
+    def dump_position(position: CursorPosition) -> str:
+        record_time, record_id = position
+        return f'{record_time.isoformat()}|{record_id}'
+
+    @staticmethod
+    def load_position(value: str) -> CursorPosition:
+        record_time, record_id = value.rsplit('|', maxsplit=1)
+        return datetime.fromisoformat(record_time), int(record_id)
+
+    async def query_position(self, session: 'AsyncSession') -> CursorPosition | None:
+        """查询游标位置, 尚未处理过任何记录时返回 None"""
+        try:
+            setting = await SystemSettingDAL(session).query_unique(
+                setting_name=self.setting_name, setting_key=self.setting_key
+            )
+        except NoResultFound:
+            return None
+        return self.load_position(setting.setting_value)
+
+    async def save_position(self, session: 'AsyncSession', position: CursorPosition) -> None:
+        await SystemSettingDAL(session).upsert(
+            setting_name=self.setting_name, setting_key=self.setting_key,
+            setting_value=self.dump_position(position), info=self.info
+        )
+
+    async def run_batches(self, processor: BatchProcessor, *, batch_size: int, max_batches: int) -> int:
+        """分批处理游标之后的新增记录, 每批单独持锁并提交, 返回本次处理的记录数量"""
+        processed_count = 0
+        end_time = datetime.now() - self.settle_delay
+        for _ in range(max_batches):
+            async with self.lock:
+                async with begin_db_session() as session:
+                    position, batch_count = await processor(session, await self.query_position(session), end_time)
+                    if batch_count > 0 and position is not None:
+                        await self.save_position(session, position)
+            processed_count += batch_count
+            if batch_count < batch_size:
+                break
+        return processed_count
+
+
+__all__ = [
+    'CursorPosition',
+    'IncrementalCursor',
+]
@@ -250,23 +250,6 @@ class NhentaiGallery(Nhentai):
         folder_name = f'gallery_{gallery_model.id}'
         download_folder = nhentai_config.default_download_folder(folder_name)
 
-        # 生成下载任务序列
-        download_tasks = []
-        for index, page in enumerate(gallery_model.images.pages):
-            page_download_url = f'{self.get_page_resource_url()}/{gallery_model.media_id}/{index + 1}.{page.ft}'
-            # 添加下载任务
-            download_tasks.append(self.download_resource(
-                url=page_download_url, folder_name=folder_name, ignore_exist_file=ignore_exist_file
-            ))
-
-        # 执行下载任务
-        download_result = await semaphore_gather(tasks=download_tasks, semaphore_num=10)
-        for result in download_result:
-            if isinstance(result, WebSourceException):
-                raise WebSourceException(result.status_code, 'Some page(s) download failed') from result
-            elif isinstance(result, Exception):
-                raise WebSourceException(404, f'Some page(s) download failed, {result}') from result
-
         # 生成包含本子原始信息的文件
         manifest_path = download_folder('manifest.json')
         async with manifest_path.async_open('w', encoding='utf8') as af:
@@ -284,10 +267,33 @@ class NhentaiGallery(Nhentai):
         async with password_file.async_open('w', encoding='utf8') as af:
             await af.write(password_str)
 
-        # 打包
+        # 下载的同时打包, 图片本身已经过压缩, 仅存储不再压缩
         zip_file = ZipUtils(file_name=f'nhentai_gallery_{gallery_model.id}.7z', folder=download_folder)
-        file_list = download_folder.list_all_files()
-        zip_result = await zip_file.create_7z(files=file_list, password=password_str)
+        async with zip_file.create_stream_writer(password=password_str, store_only=True) as writer:
+            for file in (manifest_path, rand_file, password_file):
+                writer.add(file)
+
+            async def _download_and_pack(url: str) -> 'TemporaryResource':
+                page_file = await self.download_resource(
+                    url=url, folder_name=folder_name, ignore_exist_file=ignore_exist_file
+                )
+                writer.add(page_file)
+                return page_file
+
+            # 生成下载任务序列
+            download_tasks = [
+                _download_and_pack(url=f'{self.get_page_resource_url()}/{gallery_model.media_id}/{index + 1}.{page.ft}')
+                for index, page in enumerate(gallery_model.images.pages)
+            ]
+
+            # 执行下载任务
+            download_result = await semaphore_gather(tasks=download_tasks, semaphore_num=10)
+            for result in download_result:
+                if isinstance(result, WebSourceException):
+                    raise WebSourceException(result.status_code, 'Some page(s) download failed') from result
+                elif isinstance(result, Exception):
+                    raise WebSourceException(404, f'Some page(s) download failed, {result}') from result
+        zip_result = writer.file
 
         return NhentaiDownloadResult(file_path=zip_result.path, password=password_str)
 
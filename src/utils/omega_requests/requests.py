@@ -18,6 +18,7 @@ from copy import deepcopy
 from typing import TYPE_CHECKING, Any, Optional
 from urllib.parse import unquote, urlparse
 
+import httpx
 import ujson
 from nonebot import get_driver, logger
 from nonebot.drivers import (
@@ -244,6 +245,64 @@ class OmegaRequests:
         async with self.driver.websocket(setup=setup) as ws:
             yield ws
 
+    @asynccontextmanager
+    async def stream(
+            self,
+            method: str,
+            url: str,
+            *,
+            params: 'QueryTypes' = None,
+            headers: 'HeaderTypes' = None,
+            cookies: 'CookieTypes' = None,
+            content: 'ContentTypes' = None,
+            data: 'DataTypes' = None,
+            json: Any = None,
+            files: 'FilesTypes' = None,
+            timeout: float | None = None,
+            use_proxy: bool = True
+    ) -> AsyncGenerator['httpx.Response', None]:
+        """以流式读取响应内容的方式发起请求, 不会自动重试
+
+        ForwardDriver 不支持流式读取响应, 此处直接使用 httpx 发起请求
+        """
+        setup = Request(
+            method=method,
+            url=url,
+            params=params,
+            headers=self.headers if headers is None else headers,
+            cookies=self.cookies if cookies is None else cookies,
+            content=content,
+            data=data,
+            json=json,
+            files=files,
+            timeout=self.timeout if timeout is None else timeout,
+            proxy=http_proxy_config.proxy_url if use_proxy else None
+        )
+
+        if self.load_cloudflare_clearance:
+            domain_cloudflare_clearance = cloudflare_clearance_config.get_url_config(url=str(setup.url))
+            if domain_cloudflare_clearance is not None:
+                setup.headers.update(domain_cloudflare_clearance.get_headers())
+                setup.cookies.update(domain_cloudflare_clearance.get_cookies())
+
+        logger.opt(colors=True).trace(f'<lc>Omega Requests</lc> | Starting stream request <ly>{setup!r}</ly>')
+        async with httpx.AsyncClient(
+                cookies=setup.cookies.jar,
+                proxy=setup.proxy,
+                timeout=setup.timeout,
+                follow_redirects=True,
+        ) as client:
+            async with client.stream(
+                    method=setup.method,
+                    url=str(setup.url),
+                    content=setup.content,
+                    data=setup.data,
+                    files=setup.files,
+                    json=setup.json,
+                    headers=tuple(setup.headers.items()),
+            ) as response:
+                yield response
+
     async def get(
             self,
             url: str,
@@ -11,10 +11,13 @@
 from typing import TYPE_CHECKING, Literal, Self
 
 from src.compat import dump_obj_as
+from src.exception import WebSourceException
 from src.utils import BaseCommonAPI
+from .cache import chat_response_cache
 from .config import openai_service_config
 from .models import (
     ChatCompletion,
+    ChatCompletionChunk,
     Embeddings,
     File,
     FileContent,
@@ -26,7 +29,7 @@ from .models import (
 )
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import AsyncGenerator, Iterable
 
     from src.resource import BaseResource
     from src.utils.omega_requests.types import CookieTypes, HeaderTypes, QueryTypes
@@ -151,8 +154,59 @@ class BaseOpenAIClient(BaseCommonAPI):
             ),
             **kwargs,
         }
+
+        # temperature 为 0 的确定性请求直接使用缓存的响应
+        if use_cache := chat_response_cache.is_cacheable(data):
+            cache_key = chat_response_cache.build_key(self.base_url, data)
+            if (cached_response := chat_response_cache.get(cache_key)) is not None:
+                return ChatCompletion.model_validate(cached_response)
+
         response = await self._post_json(url=url, json=data, headers=self.request_headers, timeout=timeout)
-        return ChatCompletion.model_validate(response)
+        result = ChatCompletion.model_validate(response)
+
+        if use_cache:
+            chat_response_cache.set(cache_key, response)
+        return result
+
+    async def create_chat_completion_stream(
+            self,
+            model: str,
+            message: 'ChatMessage',
+            *,
+            timeout: int = 60,
+            **kwargs,
+    ) -> 'AsyncGenerator[ChatCompletionChunk, None]':
+        """Creates a model response for the given chat conversation, streamed back as chunks.
+
+        :param model: ID of the model to use.
+        :param message: A list of messages comprising the conversation so far.
+        :param timeout: Request timeout period, for connecting and between each received chunks.
+        """
+        url = f'{self.base_url}/chat/completions'
+        data = {
+            'model': model,
+            'messages': dump_obj_as(
+                list[MessageContent],
+                message.messages if isinstance(message, Message) else message,
+                mode='json',
+                exclude_none=True,
+            ),
+            **kwargs,
+            'stream': True,
+        }
+
+        requests = self._init_omega_requests(headers=self.request_headers, timeout=timeout)
+        async with requests.stream('POST', url, json=data) as response:
+            if response.status_code != 200:
+                raise WebSourceException(response.status_code, str(response.request), await response.aread())
+
+            # Server-sent events, 每个事件的数据为一个 chunk, 以 [DONE] 结束
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                if (chunk_data := line.removeprefix('data:').strip()) == '[DONE]':
+                    break
+                yield ChatCompletionChunk.model_validate_json(chunk_data)
 
     async def create_embeddings(
             self,
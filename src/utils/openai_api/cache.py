@@ -0,0 +1,130 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/21 10:12:35
+@FileName       : cache.py
+@Project        : omega-miya
+@Description    : openai 附件编码及响应内存缓存
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import ujson as json
+
+from .config import openai_service_config
+
+
+class AttachmentCache:
+    """已编码附件缓存, 以附件原始内容的 sha256 及编码方式为键, 按总字符数限制容量"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._size: int = 0
+        self._items: OrderedDict[str, str] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(items={len(self._items)}, size={self._size}, max_size={self.max_size})'
+
+    @staticmethod
+    def build_key(content: bytes, *variant: str) -> str:
+        """由附件原始内容及编码方式生成缓存键"""
+        return ':'.join((hashlib.sha256(content).hexdigest(), *variant))
+
+    def get(self, key: str) -> str | None:
+        if (value := self._items.get(key)) is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        if len(value) > self.max_size:
+            return
+
+        if (exists_value := self._items.pop(key, None)) is not None:
+            self._size -= len(exists_value)
+        self._items[key] = value
+        self._size += len(value)
+
+        while self._size > self.max_size:
+            _, evicted_value = self._items.popitem(last=False)
+            self._size -= len(evicted_value)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._size = 0
+
+
+class ChatResponseCache:
+    """确定性对话请求(temperature 为 0)的响应缓存, 以服务地址及完整请求内容为键, 按条目数量及过期时间限制"""
+
+    def __init__(self, max_items: int, ttl: float, *, clock: Callable[[], float] = time.monotonic):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._clock = clock
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(items={len(self._items)}, max_items={self.max_items}, ttl={self.ttl})'
+
+    @staticmethod
+    def is_cacheable(request_data: dict[str, Any]) -> bool:
+        """仅缓存 temperature 为 0 且只生成一个结果的非流式请求"""
+        return (
+                request_data.get('temperature') == 0
+                and request_data.get('n', 1) == 1
+                and not request_data.get('stream', False)
+        )
+
+    @staticmethod
+    def build_key(base_url: str, request_data: dict[str, Any]) -> str:
+        """由服务地址及请求内容生成缓存键"""
+        request_content = json.dumps(request_data, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(f'{base_url}\n{request_content}'.encode()).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        if (item := self._items.get(key)) is None:
+            return None
+
+        expired_at, response = item
+        if expired_at < self._clock():
+            del self._items[key]
+            return None
+
+        self._items.move_to_end(key)
+        return response
+
+    def set(self, key: str, response: Any) -> None:
+        if self.max_items <= 0:
+            return
+
+        self._items.pop(key, None)
+        self._items[key] = (self._clock() + self.ttl, response)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+attachment_cache: AttachmentCache = AttachmentCache(
+    max_size=openai_service_config.openai_attachment_cache_size * 1024 * 1024
+)
+"""全局附件编码缓存"""
+
+chat_response_cache: ChatResponseCache = ChatResponseCache(
+    max_items=openai_service_config.openai_response_cache_size,
+    ttl=openai_service_config.openai_response_cache_ttl,
+)
+"""全局确定性对话响应缓存"""
+
+
+__all__ = [
+    'AttachmentCache',
+    'ChatResponseCache',
+    'attachment_cache',
+    'chat_response_cache',
+]
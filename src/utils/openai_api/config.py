@@ -27,6 +27,11 @@ class Service(BaseModel):
 class OpenaiServiceConfig(BaseModel):
     """LLM Service 配置"""
     openai_service_config: list[Service] = Field(default_factory=list)
+    # 已编码附件缓存容量(MB)
+    openai_attachment_cache_size: int = Field(default=64, ge=0)
+    # temperature 为 0 的对话请求响应缓存条目数量及过期时间(秒), 条目数量为 0 则不缓存
+    openai_response_cache_size: int = Field(default=256, ge=0)
+    openai_response_cache_ttl: int = Field(default=3600, ge=0)
 
     model_config = ConfigDict(extra='ignore')
 
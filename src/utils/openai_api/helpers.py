@@ -16,6 +16,8 @@ import ujson as json
 from PIL import Image
 from nonebot.utils import run_sync
 
+from .cache import attachment_cache
+
 if TYPE_CHECKING:
     from src.resource import BaseResource
 
@@ -35,18 +37,33 @@ def _convert_image_format(input_image: bytes, format_: str = 'webp') -> bytes:
     return content
 
 
+async def _encode_content_with_cache(content: bytes, *, convert_format: str | None = None) -> str:
+    """将内容编码成 base64 格式文本, 相同内容及编码方式直接使用缓存的编码结果"""
+    cache_key = attachment_cache.build_key(content, convert_format or 'raw')
+    if (encoded_content := attachment_cache.get(cache_key)) is not None:
+        return encoded_content
+
+    if convert_format is not None:
+        encoded_content = await _base64_encode(await _convert_image_format(content, format_=convert_format))
+    else:
+        encoded_content = await _base64_encode(content)
+
+    attachment_cache.set(cache_key, encoded_content)
+    return encoded_content
+
+
 async def encode_local_audio(audio: 'BaseResource') -> tuple[str, str]:
     """将本地音频文件编码成 base64 格式的 input_audio, 返回 (data, format) 的数组"""
     async with audio.async_open('rb') as af:
         content = await af.read()
-    return await _base64_encode(content), audio.path.suffix.removeprefix('.')
+    return await _encode_content_with_cache(content), audio.path.suffix.removeprefix('.')
 
 
 async def encode_local_file(file: 'BaseResource') -> str:
     """将本地文件编码成 base64 格式文本"""
     async with file.async_open('rb') as af:
         content = await af.read()
-    return await _base64_encode(content)
+    return await _encode_content_with_cache(content)
 
 
 async def encode_local_image(image: 'BaseResource', *, convert_format: str | None = None) -> str:
@@ -54,19 +71,15 @@ async def encode_local_image(image: 'BaseResource', *, convert_format: str | Non
     async with image.async_open('rb') as af:
         content = await af.read()
 
-    if convert_format is not None:
-        content = await _convert_image_format(content, format_=convert_format)
-        format_suffix = convert_format
-    else:
-        format_suffix = image.path.suffix.removeprefix('.')
-
-    return f'data:image/{format_suffix};base64,{await _base64_encode(content)}'
+    format_suffix = convert_format if convert_format is not None else image.path.suffix.removeprefix('.')
+    encoded_content = await _encode_content_with_cache(content, convert_format=convert_format)
+    return f'data:image/{format_suffix};base64,{encoded_content}'
 
 
 async def encode_bytes_image(image_content: bytes, *, convert_format: str = 'webp') -> str:
     """将图片编码成 base64 格式的 image_url"""
-    content = await _convert_image_format(image_content, format_=convert_format)
-    return f'data:image/{convert_format};base64,{await _base64_encode(content)}'
+    encoded_content = await _encode_content_with_cache(image_content, convert_format=convert_format)
+    return f'data:image/{convert_format};base64,{encoded_content}'
 
 
 def _fix_broken_generated_json(json_str: str) -> str:
@@ -11,7 +11,7 @@
 from typing import Literal
 
 from .base import BaseOpenAIModel
-from .message import MessageContent
+from .message import MessageContent, MessageRole
 
 
 class Choice(BaseOpenAIModel):
@@ -57,6 +57,31 @@ class ChatCompletion(BaseOpenAIModel):
     system_fingerprint: str | None = None
 
 
+class ChoiceDelta(BaseOpenAIModel):
+    role: MessageRole | None = None
+    content: str | None = None
+    reasoning_content: str | None = None
+    refusal: str | None = None
+
+
+class ChunkChoice(BaseOpenAIModel):
+    index: int
+    delta: ChoiceDelta
+    finish_reason: str | None = None
+
+
+class ChatCompletionChunk(BaseOpenAIModel):
+    id: str
+    object: Literal['chat.completion.chunk']
+    created: int
+    model: str
+    choices: list[ChunkChoice]
+    usage: Usage | None = None
+    service_tier: str | None = None
+    system_fingerprint: str | None = None
+
+
 __all__ = [
     'ChatCompletion',
+    'ChatCompletionChunk',
 ]
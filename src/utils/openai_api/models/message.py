@@ -16,6 +16,17 @@ from pydantic import Field
 
 from .base import BaseOpenAIModel
 
+_MESSAGE_OVERHEAD_TOKENS: int = 4
+"""每条消息角色及格式的估算 token 开销"""
+_IMAGE_TOKENS: dict[str | None, int] = {'low': 85}
+"""各 detail 等级图片的估算 token 数, 未指定时按高精度估算"""
+_DEFAULT_IMAGE_TOKENS: int = 765
+
+
+def estimate_text_tokens(text: str) -> int:
+    """粗略估算文本 token 数, 按 UTF-8 编码后每 3 字节计 1 token, 即英文约 3 字符, 中文约 1 字符计 1 token"""
+    return -(-len(text.encode('utf-8')) // 3)
+
 
 class BaseMessageContent[T](BaseOpenAIModel):
     """openai 消息内容基类"""
@@ -134,6 +145,24 @@ class MessageContent(BaseOpenAIModel):
         else:
             return self.content
 
+    @property
+    def estimated_tokens(self) -> int:
+        """估算消息 token 数, 用于限制请求长度, 附件按编码后长度或固定值估算"""
+        tokens = _MESSAGE_OVERHEAD_TOKENS
+        if isinstance(self.content, str):
+            return tokens + estimate_text_tokens(self.content)
+
+        for content in self.content:
+            if isinstance(content, TextMessageContent):
+                tokens += estimate_text_tokens(content.text)
+            elif isinstance(content, ImageMessageContent):
+                tokens += _IMAGE_TOKENS.get(content.image_url.detail, _DEFAULT_IMAGE_TOKENS)
+            elif isinstance(content, AudioMessageContent):
+                tokens += len(content.input_audio.data) // 4
+            elif isinstance(content, FileMessageContent) and content.file.file_data is not None:
+                tokens += len(content.file.file_data) // 4
+        return tokens
+
     def add_audio(self, data: str, format_: str) -> Self:
         if isinstance(self.content, str):
             self.content = [TextMessageContent.model_validate({'type': 'text', 'text': self.content})]
@@ -200,13 +229,23 @@ class MessageContent(BaseOpenAIModel):
 
 
 class Message(BaseOpenAIModel):
-    """openai 消息"""
+    """openai 消息
+
+    对话消息超出 max_messages 条或全部消息估算 token 数超出 max_tokens 时从最早的对话消息开始移除,
+    keep_evicted_messages 为真时保留被移除的消息, 以便之后总结成 summary_text 附加在前置消息之后
+    """
     max_messages: int = Field(default=20, gt=0)
+    max_tokens: int | None = Field(default=None, gt=0)
+    keep_evicted_messages: bool = Field(default=False)
     chat_messages: list[MessageContent] = Field(default_factory=list)
     prefix_messages: list[MessageContent] = Field(default_factory=list)
+    summary_text: str | None = Field(default=None)
+    evicted_messages: list[MessageContent] = Field(default_factory=list, exclude=True)
 
     def clear_chat_messages(self) -> Self:
         self.chat_messages = []
+        self.summary_text = None
+        self.evicted_messages = []
         return self
 
     def set_prefix_content(
@@ -224,25 +263,58 @@ class Message(BaseOpenAIModel):
             self.prefix_messages.append(MessageContent.assistant().set_plain_text(assistant_text))
         return self
 
+    def set_summary_text(self, summary_text: str | None) -> Self:
+        """设置已移除对话消息的总结内容, 并清空待总结的消息"""
+        self.summary_text = summary_text or None
+        self.evicted_messages = []
+        return self.trim_chat_messages()
+
+    def trim_chat_messages(self) -> Self:
+        """按消息数量及估算 token 数移除最早的对话消息, 至少保留最新的一条对话消息"""
+        evict_count = max(len(self.chat_messages) - self.max_messages, 0)
+
+        if self.max_tokens is not None:
+            remain_tokens = [x.estimated_tokens for x in self.chat_messages[evict_count:]]
+            total_tokens = sum(x.estimated_tokens for x in self.prefix_messages) + sum(remain_tokens)
+            if self.summary_text is not None:
+                total_tokens += _MESSAGE_OVERHEAD_TOKENS + estimate_text_tokens(self.summary_text)
+            for tokens in remain_tokens[:-1]:
+                if total_tokens <= self.max_tokens:
+                    break
+                total_tokens -= tokens
+                evict_count += 1
+
+        if evict_count > 0:
+            if self.keep_evicted_messages:
+                self.evicted_messages.extend(self.chat_messages[:evict_count])
+            self.chat_messages = self.chat_messages[evict_count:]
+        return self
+
     def add_content(self, content: MessageContent) -> Self:
         self.chat_messages.append(content)
-        if len(self.chat_messages) > self.max_messages:
-            self.chat_messages = self.chat_messages[-self.max_messages:]
-        return self
+        return self.trim_chat_messages()
 
     def extend_content(self, contents: Iterable[MessageContent]) -> Self:
         self.chat_messages.extend(contents)
-        if len(self.chat_messages) > self.max_messages:
-            self.chat_messages = self.chat_messages[-self.max_messages:]
-        return self
+        return self.trim_chat_messages()
+
+    @property
+    def estimated_tokens(self) -> int:
+        """估算全部消息 token 数"""
+        return sum(x.estimated_tokens for x in self.messages)
 
     @property
     def messages(self) -> list[MessageContent]:
-        return self.prefix_messages + self.chat_messages
+        if self.summary_text is None:
+            return self.prefix_messages + self.chat_messages
+
+        summary_message = MessageContent.system().set_plain_text(f'此前对话内容总结:\n{self.summary_text}')
+        return self.prefix_messages + [summary_message] + self.chat_messages
 
 
 __all__ = [
     'Message',
     'MessageContent',
     'MessageRole',
+    'estimate_text_tokens',
 ]
@@ -8,9 +8,11 @@
 @Software       : PyCharm
 """
 
-from typing import TYPE_CHECKING, Any, Literal, Self, overload
+from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING, Any, ClassVar, Literal, Self, overload
 
 import ujson as json
+from nonebot.log import logger
 from pydantic import BaseModel
 
 from src.compat import parse_json_as
@@ -29,7 +31,14 @@ if TYPE_CHECKING:
 
 
 class ChatSession:
-    """对话会话基类"""
+    """对话会话基类
+
+    设置 max_context_tokens 后按估算 token 数限制请求长度, 超出时移除最早的对话消息,
+    同时启用 summarize_evicted_messages 则在下次请求前将被移除的消息总结后附加在前置消息之后
+    """
+
+    _summary_max_length: ClassVar[int] = 500
+    """对话总结的最大字数"""
 
     def __init__(
             self,
@@ -41,11 +50,17 @@ class ChatSession:
             init_assistant_message: str | None = None,
             use_developer_message: bool = False,
             max_messages: int = 20,
+            max_context_tokens: int | None = None,
+            summarize_evicted_messages: bool = False,
     ) -> None:
         self.client = BaseOpenAIClient.init_from_config(service_name=service_name, model_name=model_name)
         self.default_user_name = default_user_name
         self.model = model_name
-        self.message = Message(max_messages=max_messages)
+        self.message = Message(
+            max_messages=max_messages,
+            max_tokens=max_context_tokens,
+            keep_evicted_messages=summarize_evicted_messages,
+        )
         if init_system_message is not None:
             self.message.set_prefix_content(
                 system_text=init_system_message,
@@ -64,6 +79,8 @@ class ChatSession:
             init_assistant_message: str | None = None,
             use_developer_message: bool = False,
             max_messages: int = 20,
+            max_context_tokens: int | None = None,
+            summarize_evicted_messages: bool = False,
     ) -> Self:
         """使用指定服务与模型名称创建对话 Session, 若不提供则从配置文件中使用默认项初始化"""
         if (service_name is not None) and (model_name is not None):
@@ -75,6 +92,8 @@ class ChatSession:
                 init_assistant_message=init_assistant_message,
                 use_developer_message=use_developer_message,
                 max_messages=max_messages,
+                max_context_tokens=max_context_tokens,
+                summarize_evicted_messages=summarize_evicted_messages,
             )
         else:
             return cls.create_from_config_default(
@@ -83,6 +102,8 @@ class ChatSession:
                 init_assistant_message=init_assistant_message,
                 use_developer_message=use_developer_message,
                 max_messages=max_messages,
+                max_context_tokens=max_context_tokens,
+                summarize_evicted_messages=summarize_evicted_messages,
             )
 
     @classmethod
@@ -94,6 +115,8 @@ class ChatSession:
             init_assistant_message: str | None = None,
             use_developer_message: bool = False,
             max_messages: int = 20,
+            max_context_tokens: int | None = None,
+            summarize_evicted_messages: bool = False,
     ) -> Self:
         """从配置文件中初始化, 使用第一个可用配置项"""
         if not (available_services := BaseOpenAIClient.get_available_services()):
@@ -105,6 +128,8 @@ class ChatSession:
             init_assistant_message=init_assistant_message,
             use_developer_message=use_developer_message,
             max_messages=max_messages,
+            max_context_tokens=max_context_tokens,
+            summarize_evicted_messages=summarize_evicted_messages,
         )
 
     def reset_chat(self) -> None:
@@ -180,8 +205,36 @@ class ChatSession:
         """向会话 Message 序列中添加用户消息"""
         self.message.add_content(MessageContent.user(name=user_name).set_plain_text(message))
 
+    async def summarize_evicted_messages(self) -> None:
+        """将因超出长度限制被移除的对话消息与已有总结合并成新的总结"""
+        if not self.message.evicted_messages:
+            return
+
+        evicted_text = '\n'.join(
+            f'{x.role.value}{f"({x.name})" if x.name else ""}: {x.plain_text}'
+            for x in self.message.evicted_messages
+        )
+        summary_prompt = [
+            MessageContent.system().set_plain_text(
+                '请将已有总结与以下对话内容合并成一份简洁的总结, 保留人物、事实、约定等后续对话需要的关键信息, '
+                f'不超过 {self._summary_max_length} 字, 直接输出总结内容'
+            ),
+            MessageContent.user().set_plain_text(
+                f'已有总结:\n{self.message.summary_text or "无"}\n\n对话内容:\n{evicted_text}'
+            ),
+        ]
+
+        try:
+            result = await self.client.create_chat_completion(model=self.model, message=summary_prompt, temperature=0)
+            self.message.set_summary_text(result.choices[0].message.plain_text.strip())
+        except Exception as e:
+            evicted_count = len(self.message.evicted_messages)
+            logger.warning(f'ChatSession | Summarizing {evicted_count} evicted messages failed, {e}')
+            self.message.set_summary_text(self.message.summary_text)
+
     async def simple_chat(self, **kwargs) -> str:
         """使用现有 Message 序列发起对话, 返回响应对话内容"""
+        await self.summarize_evicted_messages()
         result = await self.client.create_chat_completion(
             model=self.model,
             message=self.message,
@@ -192,6 +245,58 @@ class ChatSession:
         self.message.add_content(reply_message)
         return reply_message.plain_text
 
+    async def simple_stream_chat(self, *, min_segment_length: int = 0, **kwargs) -> AsyncGenerator[str, None]:
+        """使用现有 Message 序列发起流式对话, 逐段返回响应对话内容, 完整响应结束后添加到 Message 序列中
+
+        :param min_segment_length: 为 0 时原样返回每个增量内容, 否则累积到不少于该长度且遇到换行时才返回一段
+        """
+        await self.summarize_evicted_messages()
+
+        content_parts: list[str] = []
+        reasoning_parts: list[str] = []
+        segment = ''
+        async for chunk in self.client.create_chat_completion_stream(model=self.model, message=self.message, **kwargs):
+            if not chunk.choices:
+                continue
+
+            delta = chunk.choices[0].delta
+            if delta.reasoning_content:
+                reasoning_parts.append(delta.reasoning_content)
+            if not delta.content:
+                continue
+
+            content_parts.append(delta.content)
+            if min_segment_length <= 0:
+                yield delta.content
+                continue
+
+            segment += delta.content
+            if len(segment) >= min_segment_length and (split_index := segment.rfind('\n')) >= 0:
+                yield segment[:split_index + 1]
+                segment = segment[split_index + 1:]
+
+        if segment:
+            yield segment
+
+        reply_message = MessageContent.assistant().set_plain_text(''.join(content_parts))
+        reply_message.reasoning_content = ''.join(reasoning_parts)
+        self.message.add_content(reply_message)
+
+    async def stream_chat(
+            self,
+            text: str,
+            *,
+            user_name: str | None = None,
+            min_segment_length: int = 0,
+            **kwargs,
+    ) -> AsyncGenerator[str, None]:
+        """用户发起对话, 逐段返回响应对话内容"""
+        user_name = user_name if user_name is not None else self.default_user_name
+        self.message.add_content(MessageContent.user(name=user_name).set_plain_text(text))
+
+        async for segment in self.simple_stream_chat(min_segment_length=min_segment_length, **kwargs):
+            yield segment
+
     @overload
     async def advance_chat[T: 'BaseModel'](
             self,
@@ -0,0 +1,107 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/18 21:16:44
+@FileName       : seen_filter
+@Project        : omega-miya
+@Description    : 订阅内容已读过滤器, 在内存中按 (source, uid) 维护近期已知内容 ID, 仅将疑似新内容交由数据库确认
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+
+type KnownIdsLoader = Callable[[], Awaitable[Sequence[str]]]
+"""加载已知内容 ID 的函数, 按由新到旧顺序返回, 用于首次检查时预热"""
+type NewIdsConfirmer = Callable[[Sequence[str]], Awaitable[Iterable[str]]]
+"""传入疑似新内容 ID, 返回其中确实为新内容的 ID"""
+
+
+class SeenIdWindow:
+    """单个订阅源的近期已知 ID 窗口, 超出容量时淘汰最早加入的 ID"""
+
+    __slots__ = ('_ids', 'maxsize')
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._ids: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, item: str) -> bool:
+        return item in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, ids: Iterable[str]) -> None:
+        for id_ in ids:
+            self._ids[id_] = None
+            self._ids.move_to_end(id_)
+        while len(self._ids) > self.maxsize:
+            self._ids.popitem(last=False)
+
+
+class SeenContentFilter:
+    """订阅内容已读过滤器
+
+    各订阅源首次检查时通过 load_known 预热已知 ID 窗口, 此后仅不在窗口中的 ID 需要查询数据库确认,
+    绝大多数轮询中全部内容均已知, 无需执行任何查询
+    """
+
+    def __init__(self, *, window_size: int = 512):
+        self.window_size = window_size
+        self._windows: dict[tuple[str, str], SeenIdWindow] = {}
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(window_size={self.window_size}, sources={len(self._windows)})'
+
+    async def filter_new(
+            self,
+            source: str,
+            uid: str,
+            ids: Sequence[str],
+            *,
+            load_known: KnownIdsLoader,
+            confirm_new: NewIdsConfirmer,
+    ) -> list[str]:
+        """过滤出新内容的 ID, 保持输入顺序
+
+        :param source: 订阅源平台
+        :param uid: 订阅源用户 ID
+        :param ids: 本次轮询获取到的全部内容 ID
+        :param load_known: 加载该订阅源已知内容 ID 的函数 (由新到旧), 仅在首次检查时调用
+        :param confirm_new: 批量确认新内容的函数, 仅在存在窗口外的 ID 时调用一次
+        """
+        key = (source, uid)
+        if (window := self._windows.get(key)) is None:
+            window = SeenIdWindow(maxsize=self.window_size)
+            window.add(reversed(await load_known()))
+            self._windows[key] = window
+
+        candidates = [x for x in dict.fromkeys(ids) if x not in window]
+        if not candidates:
+            return []
+
+        confirmed_ids = set(await confirm_new(candidates))
+        window.add(x for x in candidates if x not in confirmed_ids)
+        return [x for x in candidates if x in confirmed_ids]
+
+    def mark_seen(self, source: str, uid: str, ids: Iterable[str]) -> None:
+        """新内容写入数据库后标记为已知"""
+        if (window := self._windows.get((source, uid))) is not None:
+            window.add(ids)
+
+    def reset(self, source: str | None = None, uid: str | None = None) -> None:
+        """清除已知 ID 窗口, 下次检查时重新预热"""
+        if source is None:
+            self._windows.clear()
+        elif uid is None:
+            for key in [x for x in self._windows if x[0] == source]:
+                self._windows.pop(key, None)
+        else:
+            self._windows.pop((source, uid), None)
+
+
+__all__ = [
+    'SeenContentFilter',
+    'SeenIdWindow',
+]
@@ -9,39 +9,49 @@
 """
 
 import sys
+from functools import cache
 from typing import TYPE_CHECKING
 
-from matplotlib import font_manager
-from matplotlib import pyplot as plt
-
+from src.utils.import_utils import lazy_import
 from .config import statistics_tools_config
 
 if TYPE_CHECKING:
+    from matplotlib import font_manager
+    from matplotlib import pyplot as plt
     from matplotlib.axes import Axes
     from matplotlib.figure import Figure
 
     from src.resource import TemporaryResource
+else:
+    # matplotlib 导入及字体加载较慢, 在首次绘制图表时才导入并初始化
+    font_manager = lazy_import('matplotlib.font_manager')
+    plt = lazy_import('matplotlib.pyplot')
+
 
-# 添加中文字体
-font_manager.fontManager.addfont(statistics_tools_config.default_font.path)
-font_manager.fontManager.addfont(statistics_tools_config.alternative_font.path)
+@cache
+def _init_pyplot() -> None:
+    """初始化 pyplot 字体及绘图后端, 仅在首次调用时执行"""
+    # 添加中文字体
+    font_manager.fontManager.addfont(statistics_tools_config.default_font.path)
+    font_manager.fontManager.addfont(statistics_tools_config.alternative_font.path)
 
-# 设置字体
-plt.rcParams['font.family'] = ['sans-serif']
-plt.rcParams['font.sans-serif'].insert(0, 'Microsoft YaHei')
-plt.rcParams['font.sans-serif'].insert(1, 'FZZhengHei-EL-GBK')
+    # 设置字体
+    plt.rcParams['font.family'] = ['sans-serif']
+    plt.rcParams['font.sans-serif'].insert(0, 'Microsoft YaHei')
+    plt.rcParams['font.sans-serif'].insert(1, 'FZZhengHei-EL-GBK')
 
-# Fix RuntimeError caused by GUI needed
-plt.switch_backend('agg')
-if sys.platform.startswith('win'):
-    plt.rcParams['axes.unicode_minus'] = False
+    # Fix RuntimeError caused by GUI needed
+    plt.switch_backend('agg')
+    if sys.platform.startswith('win'):
+        plt.rcParams['axes.unicode_minus'] = False
 
-# 启用约束布局
-plt.rcParams['figure.constrained_layout.use'] = True
+    # 启用约束布局
+    plt.rcParams['figure.constrained_layout.use'] = True
 
 
 def get_font_names() -> list[str]:
     """获取所有已加载的字体名"""
+    _init_pyplot()
     # (font.name, font.fname) for font in font_manager.fontManager.ttflist
     return font_manager.get_font_names()
 
@@ -54,6 +64,7 @@ def create_simple_figure(
         **kwargs
 ) -> 'Figure':
     """Create an empty figure with no Axes"""
+    _init_pyplot()
     fig = plt.figure(num=num, figsize=figsize, dpi=dpi, **kwargs)
     return fig
 
@@ -64,6 +75,7 @@ def create_simple_subplots_figure(
         dpi: float | None = None,
 ) -> tuple['Figure', 'Axes']:
     """Create a figure with a single Axes"""
+    _init_pyplot()
     fig, ax = plt.subplots(nrows=1, ncols=1, figsize=figsize, dpi=dpi)
     return fig, ax
 
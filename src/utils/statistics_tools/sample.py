@@ -12,14 +12,16 @@ import random
 from collections import Counter
 from typing import TYPE_CHECKING
 
-import numpy as np
-
+from src.utils.import_utils import lazy_import
 from .plots import create_simple_subplots_figure, output_figure
 
 if TYPE_CHECKING:
+    import numpy as np
     from numpy.typing import NDArray
 
     from src.resource import TemporaryResource
+else:
+    np = lazy_import('numpy')
 
 
 def run_figure_example() -> 'TemporaryResource':
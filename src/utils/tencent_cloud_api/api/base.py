@@ -12,12 +12,25 @@ import hashlib
 import hmac
 import json
 from datetime import UTC, datetime
+from functools import lru_cache
 from typing import Any
 
 from src.utils import OmegaRequests
 from ..config import tencent_cloud_config
 
 
+@lru_cache(maxsize=32)
+def _derive_signing_key(secret_key: str, date: str, service: str) -> bytes:
+    """计算派生签名密钥, 同一密钥及服务每天只需计算一次"""
+
+    def __sign(key: bytes | bytearray, msg: str) -> bytes:
+        return hmac.new(key, msg.encode('utf-8'), hashlib.sha256).digest()
+
+    secret_date = __sign(f'TC3{secret_key}'.encode(), date)
+    secret_service = __sign(secret_date, service)
+    return __sign(secret_service, 'tc3_request')
+
+
 class BaseTencentCloudAPI:
     """腾讯云 API 基类"""
 
@@ -122,13 +135,7 @@ class BaseTencentCloudAPI:
 
     def __sign_v3(self, payload: dict[str, Any]) -> str:
         """步骤 3: 计算签名摘要"""
-
-        def __sign(key: bytes | bytearray, msg: str) -> bytes:
-            return hmac.new(key, msg.encode('utf-8'), hashlib.sha256).digest()
-
-        secret_date = __sign(f'TC3{self._secret_key}'.encode(), self._date)
-        secret_service = __sign(secret_date, self._service)
-        secret_signing = __sign(secret_service, 'tc3_request')
+        secret_signing = _derive_signing_key(self._secret_key, self._date, self._service)
 
         canonical_request = self.__canonical_request(payload=payload)
         string_to_sign = self.__string_to_sign(canonical_request)
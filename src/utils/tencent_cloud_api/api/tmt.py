@@ -11,7 +11,17 @@
 from collections.abc import Sequence
 
 from .base import BaseTencentCloudAPI
-from ..model.tmt import TencentCloudTextTranslateBatchResponse, TencentCloudTextTranslateResponse
+from ..config import tencent_cloud_config
+from ..memory import TranslatedText, tmt_translation_memory
+from ..model.tmt import (
+    TencentCloudTextTranslateBatchResponse,
+    TencentCloudTextTranslateBatchSuccessResponse,
+    TencentCloudTextTranslateResponse,
+    TencentCloudTextTranslateSuccessResponse,
+)
+
+_BATCH_MAX_TEXT_LENGTH: int = 6000
+"""批量翻译单次请求的文本长度总和上限"""
 
 
 class TencentTMT(BaseTencentCloudAPI):
@@ -25,6 +35,28 @@ class TencentTMT(BaseTencentCloudAPI):
     ):
         super().__init__(host=host, secret_id=secret_id, secret_key=secret_key)
 
+    @staticmethod
+    def _split_batch(source_text_list: Sequence[str]) -> list[list[str]]:
+        """按单次请求文本长度总和上限拆分批量翻译的文本列表"""
+        batches: list[list[str]] = []
+        batch: list[str] = []
+        batch_length = 0
+        for text in source_text_list:
+            if batch and batch_length + len(text) >= _BATCH_MAX_TEXT_LENGTH:
+                batches.append(batch)
+                batch, batch_length = [], 0
+            batch.append(text)
+            batch_length += len(text)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    async def _save_translation_memory(source: str, target: str, items: Sequence[tuple[str, TranslatedText]]) -> None:
+        """保存翻译记忆, 忽略空白文本"""
+        if save_items := [x for x in items if x[0].strip()]:
+            await tmt_translation_memory.save_many(source, target, save_items)
+
     async def text_translate(
             self,
             source_text: str,
@@ -32,7 +64,8 @@ class TencentTMT(BaseTencentCloudAPI):
             source: str = 'auto',
             target: str = 'zh',
             project_id: int = 0,
-            untranslated_text: str | None = None
+            untranslated_text: str | None = None,
+            use_memory: bool = True,
     ) -> TencentCloudTextTranslateResponse:
         """文本翻译
 
@@ -41,37 +74,90 @@ class TencentTMT(BaseTencentCloudAPI):
         :param target: 目标语言
         :param project_id: 项目ID, 如无配置请填写默认项目ID: 0
         :param untranslated_text: 用来标记不希望被翻译的文本内容, 如句子中的特殊符号、人名、地名等, 每次请求只支持配置一个不被翻译的单词, 不要配置动词或短语, 否则会影响翻译结果
+        :param use_memory: 是否使用翻译记忆, 配置了 untranslated_text 时不使用
         """
+        use_memory = all((
+            use_memory, untranslated_text is None, tencent_cloud_config.tencent_tmt_memory_enable, source_text.strip()
+        ))
+        if use_memory:
+            translated, = await tmt_translation_memory.load_many(source, target, [source_text])
+            if translated is not None:
+                return TencentCloudTextTranslateResponse.model_validate({
+                    'Response': {'TargetText': translated.target_text, 'Source': translated.source, 'Target': target}
+                })
+
         payload = {'SourceText': source_text, 'Source': source, 'Target': target, 'ProjectId': project_id}
         if untranslated_text is not None:
             payload.update({'UntranslatedText': untranslated_text})
 
-        return TencentCloudTextTranslateResponse.model_validate(
+        result = TencentCloudTextTranslateResponse.model_validate(
             await self._post_request(action='TextTranslate', version='2018-03-21', region='ap-chengdu', payload=payload)
         )
 
+        if use_memory and isinstance(result.Response, TencentCloudTextTranslateSuccessResponse):
+            translated = TranslatedText(source=result.Response.Source, target_text=result.Response.TargetText)
+            await tmt_translation_memory.save_many(source, target, [(source_text, translated)])
+        return result
+
     async def text_translate_batch(
             self,
             source_text_list: Sequence[str],
             *,
             source: str = 'auto',
             target: str = 'zh',
-            project_id: int = 0
+            project_id: int = 0,
+            use_memory: bool = True,
     ) -> TencentCloudTextTranslateBatchResponse:
-        """批量文本翻译
+        """批量文本翻译, 仅提交翻译记忆中未命中的文本, 并按单次请求文本长度总和上限拆分成多次请求
 
-        :param source_text_list: 待翻译的文本列表, 文本统一使用 utf-8 格式编码, 请传入有效文本, html标记等非常规翻译文本可能会翻译失败, 单次请求的文本长度总和需要低于 6000 字符
+        :param source_text_list: 待翻译的文本列表, 文本统一使用 utf-8 格式编码, html标记等非常规翻译文本可能会翻译失败
         :param source: 源语言
         :param target: 目标语言
         :param project_id: 项目ID, 如无配置请填写默认项目ID: 0
+        :param use_memory: 是否使用翻译记忆
         """
-        payload = {'Source': source, 'Target': target, 'ProjectId': project_id, 'SourceTextList': source_text_list}
+        use_memory = use_memory and tencent_cloud_config.tencent_tmt_memory_enable
+        if use_memory:
+            translated_list = await tmt_translation_memory.load_many(source, target, source_text_list)
+        else:
+            translated_list = [None] * len(source_text_list)
 
-        return TencentCloudTextTranslateBatchResponse.model_validate(
-            await self._post_request(
-                action='TextTranslateBatch', version='2018-03-21', region='ap-chengdu', payload=payload
+        missing_indexes = [index for index, translated in enumerate(translated_list) if translated is None]
+        new_items: list[tuple[str, TranslatedText]] = []
+        request_id = None
+        for batch in self._split_batch([source_text_list[index] for index in missing_indexes]):
+            payload = {'Source': source, 'Target': target, 'ProjectId': project_id, 'SourceTextList': batch}
+            result = TencentCloudTextTranslateBatchResponse.model_validate(
+                await self._post_request(
+                    action='TextTranslateBatch', version='2018-03-21', region='ap-chengdu', payload=payload
+                )
             )
-        )
+            if not isinstance(result.Response, TencentCloudTextTranslateBatchSuccessResponse):
+                # 保存此前已完成请求的翻译结果, 重试时无需再次提交
+                if use_memory:
+                    await self._save_translation_memory(source, target, new_items)
+                return result
+
+            request_id = result.Response.RequestId
+            new_items.extend(
+                (text, TranslatedText(source=result.Response.Source, target_text=target_text))
+                for text, target_text in zip(batch, result.Response.TargetTextList, strict=True)
+            )
+
+        for index, (_, translated) in zip(missing_indexes, new_items, strict=True):
+            translated_list[index] = translated
+
+        if use_memory:
+            await self._save_translation_memory(source, target, new_items)
+
+        return TencentCloudTextTranslateBatchResponse.model_validate({
+            'Response': {
+                'Source': next((x.source for x in translated_list if x is not None), source),
+                'Target': target,
+                'TargetTextList': [x.target_text for x in translated_list if x is not None],
+                'RequestId': request_id,
+            }
+        })
 
 
 __all__ = [
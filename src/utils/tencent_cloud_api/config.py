@@ -9,13 +9,17 @@
 """
 
 from nonebot import get_plugin_config, logger
-from pydantic import BaseModel, ConfigDict, ValidationError
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 
 class TencentCloudConfig(BaseModel):
     """Tencent Cloud 配置"""
     tencent_cloud_secret_id: str | None = None
     tencent_cloud_secret_key: str | None = None
+    # 机器翻译结果缓存(翻译记忆), 持久化保存于全局缓存中, 并使用内存 LRU 缓存最近使用的条目
+    tencent_tmt_memory_enable: bool = True
+    tencent_tmt_memory_ttl_days: int = Field(default=30, gt=0)
+    tencent_tmt_memory_lru_size: int = Field(default=2048, ge=0)
 
     model_config = ConfigDict(extra='ignore')
 
@@ -0,0 +1,163 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/22 15:36:08
+@FileName       : memory.py
+@Project        : omega-miya
+@Description    : 机器翻译记忆, 缓存已翻译的文本
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import hashlib
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+
+from nonebot.log import logger
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+from src.database import GlobalCacheDAL, begin_db_session
+from .config import tencent_cloud_config
+
+_MAX_VALUE_LENGTH: int = 4096
+"""全局缓存单条内容的最大长度"""
+
+
+class TranslatedText(BaseModel):
+    """已翻译的文本
+
+    - source: 源语言, 自动识别时为识别出的源语言
+    - target_text: 翻译后的文本
+    """
+    source: str
+    target_text: str
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+
+class TranslationMemory:
+    """翻译记忆, 以 (源语言, 目标语言, 规范化后文本) 为键, 持久化于全局缓存中, 并使用内存 LRU 缓存最近使用的条目
+
+    内存 LRU 缓存的条目与全局缓存中的条目同时过期
+    """
+
+    def __init__(self, cache_name: str, *, lru_size: int, ttl: timedelta):
+        self._cache_name = cache_name
+        self._lru_size = lru_size
+        self._ttl = ttl
+        self._lru: OrderedDict[str, tuple[datetime, TranslatedText]] = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __repr__(self) -> str:
+        return (f'{self.__class__.__name__}(cache_name={self._cache_name!r}, '
+                f'hits={self.hits}, misses={self.misses}, hit_rate={self.hit_rate:.2%})')
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """去除首尾空白并合并每行内连续空白, 保留换行"""
+        return '\n'.join(' '.join(line.split()) for line in text.strip().splitlines())
+
+    @classmethod
+    def build_key(cls, source: str, target: str, text: str) -> str:
+        return hashlib.sha256(f'{source}\n{target}\n{cls.normalize_text(text)}'.encode()).hexdigest()
+
+    def _get_lru(self, key: str, now: datetime) -> TranslatedText | None:
+        if (item := self._lru.get(key)) is None:
+            return None
+
+        expired_at, value = item
+        if expired_at < now:
+            del self._lru[key]
+            return None
+        self._lru.move_to_end(key)
+        return value
+
+    def _update_lru(self, key: str, value: TranslatedText, expired_at: datetime) -> None:
+        if self._lru_size <= 0:
+            return
+
+        self._lru[key] = (expired_at, value)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._lru_size:
+            self._lru.popitem(last=False)
+
+    async def load_many(self, source: str, target: str, texts: Sequence[str]) -> list[TranslatedText | None]:
+        """批量查询翻译记忆, 返回与 texts 一一对应的结果, 未命中则为 None"""
+        keys = [self.build_key(source, target, text) for text in texts]
+        result: dict[str, TranslatedText] = {}
+
+        now = datetime.now()
+        for key in keys:
+            if (value := self._get_lru(key, now)) is not None:
+                result[key] = value
+
+        if missing_keys := list({key for key in keys if key not in result}):
+            try:
+                async with begin_db_session() as session:
+                    caches = await GlobalCacheDAL(session).query_batch(
+                        cache_name=self._cache_name, cache_keys=missing_keys
+                    )
+                for cache in caches:
+                    try:
+                        result[cache.cache_key] = TranslatedText.model_validate_json(cache.cache_value)
+                    except ValidationError:
+                        continue
+                    self._update_lru(cache.cache_key, result[cache.cache_key], cache.expired_at)
+            except Exception as e:
+                logger.warning(f'TranslationMemory | Querying translation memory failed, {e!r}')
+
+        loaded = [result.get(key) for key in keys]
+        hits = sum(1 for x in loaded if x is not None)
+        self.hits += hits
+        self.misses += len(loaded) - hits
+        return loaded
+
+    async def save_many(self, source: str, target: str, items: Sequence[tuple[str, TranslatedText]]) -> None:
+        """批量保存翻译记忆, items 为 (原文本, 翻译结果) 的序列"""
+        values = {
+            self.build_key(source, target, text): translated
+            for text, translated in items
+        }
+        expired_at = datetime.now() + self._ttl
+        for key, translated in values.items():
+            self._update_lru(key, translated, expired_at)
+
+        try:
+            async with begin_db_session() as session:
+                dal = GlobalCacheDAL(session)
+                for key, translated in values.items():
+                    if len(cache_value := translated.model_dump_json()) > _MAX_VALUE_LENGTH:
+                        continue
+                    await dal.upsert(
+                        cache_name=self._cache_name, cache_key=key, cache_value=cache_value, expired_time=expired_at
+                    )
+        except Exception as e:
+            logger.warning(f'TranslationMemory | Saving translation memory failed, {e!r}')
+
+    def clear_internal(self) -> None:
+        """仅清空内存 LRU 缓存及命中统计"""
+        self._lru.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+tmt_translation_memory: TranslationMemory = TranslationMemory(
+    cache_name='tencent_tmt_memory',
+    lru_size=tencent_cloud_config.tencent_tmt_memory_lru_size,
+    ttl=timedelta(days=tencent_cloud_config.tencent_tmt_memory_ttl_days),
+)
+"""腾讯云机器翻译记忆"""
+
+
+__all__ = [
+    'TranslatedText',
+    'TranslationMemory',
+    'tmt_translation_memory',
+]
@@ -50,6 +50,8 @@ class TencentCloudTextTranslateBatchResponse(BaseTencentCloudResponse):
 
 
 __all__ = [
+    'TencentCloudTextTranslateSuccessResponse',
     'TencentCloudTextTranslateResponse',
+    'TencentCloudTextTranslateBatchSuccessResponse',
     'TencentCloudTextTranslateBatchResponse',
 ]
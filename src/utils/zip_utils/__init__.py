@@ -11,12 +11,19 @@
 import pathlib
 import zipfile
 from collections.abc import Sequence
+from typing import TYPE_CHECKING
 
-import py7zr
 from nonebot.utils import run_sync
 
 from src.resource import BaseResource, TemporaryResource
+from src.utils.import_utils import lazy_import
 from .config import zip_utils_config
+from .writer import ArchiveProgress, ProgressCallback, StreamingArchiveWriter
+
+if TYPE_CHECKING:
+    import py7zr
+else:
+    py7zr = lazy_import('py7zr')
 
 
 class ZipUtils:
@@ -106,7 +113,35 @@ class ZipUtils:
         """
         return await self._create_7z(files=files, password=password)
 
+    def create_stream_writer(
+            self,
+            *,
+            password: str | None = None,
+            compression_level: int | None = None,
+            store_only: bool = False,
+            total_count: int | None = None,
+            progress_callback: ProgressCallback | None = None,
+    ) -> StreamingArchiveWriter:
+        """创建流式压缩文件写入工具, 可在文件下载完成后随时加入压缩文件, 使压缩与下载重叠进行
+
+        :param password: 文件密码, 仅支持 7z 格式
+        :param compression_level: 压缩级别, 为空则使用默认级别
+        :param store_only: 是否仅存储不压缩全部文件, 适用于 JPEG/PNG 等本身已经过压缩的文件
+        :param total_count: 预计加入的文件总数, 仅用于进度回调
+        :param progress_callback: 写入进度回调
+        """
+        return StreamingArchiveWriter(
+            file=self.file,
+            password=password,
+            compression_level=compression_level,
+            store_only=store_only,
+            total_count=total_count,
+            progress_callback=progress_callback,
+        )
+
 
 __all__ = [
-    'ZipUtils'
+    'ArchiveProgress',
+    'StreamingArchiveWriter',
+    'ZipUtils',
 ]
@@ -12,7 +12,7 @@ import zipfile
 from typing import Literal
 
 from nonebot import get_plugin_config, logger
-from pydantic import BaseModel, ConfigDict, ValidationError
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from src.resource import TemporaryResource
 
@@ -20,6 +20,10 @@ from src.resource import TemporaryResource
 class ZipUtilsConfig(BaseModel):
     """ZipUtils 配置"""
     zip_utils_default_zip_compression: int = zipfile.ZIP_STORED
+    # 流式写入压缩文件时的默认压缩级别, 为空则使用各压缩格式的默认级别
+    zip_utils_default_compression_level: int | None = Field(default=None, ge=0, le=9)
+    # 本身已经过压缩的文件类型, 流式写入 zip 文件时这些文件仅存储不压缩
+    zip_utils_stored_file_suffixes: set[str] = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.zip', '.7z'}
 
     # 默认缓存资源保存路径
     zip_utils_default_output_folder_name: Literal['zip_utils'] = 'zip_utils'
@@ -0,0 +1,253 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/8 16:02:27
+@FileName       : writer.py
+@Project        : omega-miya
+@Description    : 流式压缩文件写入工具
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import pathlib
+import time
+import zipfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Literal, Self
+
+from pydantic import BaseModel, ConfigDict
+
+from src.utils.import_utils import lazy_import
+from .config import zip_utils_config
+
+if TYPE_CHECKING:
+    import py7zr
+
+    from src.resource import BaseResource, TemporaryResource
+else:
+    py7zr = lazy_import('py7zr')
+
+
+class ArchiveProgress(BaseModel):
+    """流式写入压缩文件进度"""
+    file_name: str
+    added_count: int
+    total_count: int | None
+    added_size: int
+    elapsed_time: float
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+
+type ProgressCallback = Callable[[ArchiveProgress], Any]
+"""写入进度回调, 每个文件写入完成后在事件循环中调用"""
+
+
+class StreamingArchiveWriter:
+    """流式压缩文件写入工具
+
+    文件可在下载完成后随时加入, 由单独的写入线程按加入顺序依次压缩写入, 与下载等其他任务重叠执行;
+    全部文件加入后调用 `close` 等待写入完成并生成压缩文件
+
+    7z 格式中全部文件写入同一个固实块, 仅支持整体选择是否压缩;
+    zip 格式则按文件类型逐个判断, 已压缩格式的文件仅存储不压缩
+    """
+
+    def __init__(
+            self,
+            file: 'TemporaryResource',
+            *,
+            password: str | None = None,
+            compression_level: int | None = None,
+            store_only: bool = False,
+            total_count: int | None = None,
+            progress_callback: ProgressCallback | None = None,
+    ):
+        """
+        :param file: 输出压缩文件, 根据扩展名确定 zip 或 7z 格式
+        :param password: 文件密码, 仅支持 7z 格式
+        :param compression_level: 压缩级别, 为空则使用默认级别
+        :param store_only: 是否仅存储不压缩全部文件
+        :param total_count: 预计加入的文件总数, 仅用于进度回调
+        :param progress_callback: 写入进度回调
+        """
+        match file.path.suffix:
+            case '.zip':
+                self.archive_type: Literal['zip', '7z'] = 'zip'
+            case '.7z':
+                self.archive_type = '7z'
+            case _:
+                raise ValueError('File suffix must be ".zip" or ".7z"')
+
+        if password is not None and self.archive_type != '7z':
+            raise ValueError('Password only supported with 7z archive')
+
+        self.file = file
+        self.password = password
+        self.compression_level = (
+            zip_utils_config.zip_utils_default_compression_level if compression_level is None else compression_level
+        )
+        self.store_only = store_only
+        self.total_count = total_count
+        self.progress_callback = progress_callback
+
+        self._archive: zipfile.ZipFile | py7zr.SevenZipFile | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending_tasks: list[asyncio.Future[None]] = []
+        self._arcnames: set[str] = set()
+        self._start_time: float = 0.0
+        self._added_count: int = 0
+        self._added_size: int = 0
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(file={self.file.path.name!r})'
+
+    async def __aenter__(self) -> Self:
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            await self.close()
+        else:
+            await self.abort()
+
+    def _get_7z_filters(self) -> list[dict[str, int]] | None:
+        if self.store_only:
+            filters = [{'id': py7zr.FILTER_COPY}]
+        elif self.compression_level is not None:
+            filters = [{'id': py7zr.FILTER_LZMA2, 'preset': self.compression_level}]
+        else:
+            return None
+
+        if self.password:
+            filters.append({'id': py7zr.FILTER_CRYPTO_AES256_SHA256})
+        return filters
+
+    def _open_archive(self) -> None:
+        if not self.file.path.parent.exists():
+            pathlib.Path.mkdir(self.file.path.parent, parents=True)
+
+        if self.archive_type == 'zip':
+            compression = zipfile.ZIP_STORED if self.store_only else zip_utils_config.zip_utils_default_zip_compression
+            self._archive = zipfile.ZipFile(
+                self.file.path.resolve(), mode='w', compression=compression, compresslevel=self.compression_level
+            )
+        else:
+            self._archive = py7zr.SevenZipFile(
+                self.file.path.resolve(), mode='w', password=self.password or None, filters=self._get_7z_filters()
+            )
+            if self.password:
+                self._archive.set_encrypted_header(True)
+
+    def _write_file(self, path: pathlib.Path, arcname: str) -> None:
+        match self._archive:
+            case zipfile.ZipFile():
+                if path.suffix.lower() in zip_utils_config.zip_utils_stored_file_suffixes:
+                    self._archive.write(path, arcname=arcname, compress_type=zipfile.ZIP_STORED)
+                else:
+                    self._archive.write(path, arcname=arcname)
+            case py7zr.SevenZipFile():
+                self._archive.write(path, arcname=arcname)
+            case _:
+                raise RuntimeError('Archive is not opened')
+
+    def _close_archive(self) -> None:
+        if self._archive is not None:
+            try:
+                self._archive.close()
+            finally:
+                self._archive = None
+
+    def _discard_archive(self) -> None:
+        try:
+            self._close_archive()
+        except Exception:
+            pass
+        self.file.path.unlink(missing_ok=True)
+
+    async def open(self) -> None:
+        """创建压缩文件并启动写入线程"""
+        if self._executor is not None:
+            raise RuntimeError(f'{self} is already opened')
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='zip_utils_writer')
+        self._start_time = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._open_archive)
+
+    def _on_file_written(self, arcname: str, size: int) -> None:
+        self._added_count += 1
+        self._added_size += size
+        if self.progress_callback is not None:
+            self.progress_callback(ArchiveProgress(
+                file_name=arcname,
+                added_count=self._added_count,
+                total_count=self.total_count,
+                added_size=self._added_size,
+                elapsed_time=time.perf_counter() - self._start_time,
+            ))
+
+    def add(self, file: 'BaseResource', *, arcname: str | None = None) -> None:
+        """将文件加入写入队列, 不等待写入完成, 写入异常将在 `close` 时抛出
+
+        :param file: 被压缩的文件
+        :param arcname: 文件在压缩文件中的名称, 默认为文件名, 重复的名称将被忽略
+        """
+        if self._executor is None:
+            raise RuntimeError(f'{self} is not opened')
+
+        arcname = file.path.name if arcname is None else arcname
+        if arcname in self._arcnames or not (file.path.exists() and file.path.is_file()):
+            return
+        self._arcnames.add(arcname)
+
+        path = file.path.resolve()
+        size = path.stat().st_size
+        task = asyncio.get_running_loop().run_in_executor(self._executor, self._write_file, path, arcname)
+        task.add_done_callback(
+            lambda t: self._on_file_written(arcname, size) if not t.cancelled() and t.exception() is None else None
+        )
+        self._pending_tasks.append(task)
+
+    async def wait(self) -> None:
+        """等待已加入的文件全部写入完成"""
+        pending_tasks = self._pending_tasks[:]
+        await asyncio.gather(*pending_tasks)
+        # 写入失败时保留未完成的任务以便 `abort` 取消
+        self._pending_tasks = self._pending_tasks[len(pending_tasks):]
+
+    async def close(self) -> 'TemporaryResource':
+        """等待全部文件写入完成, 关闭压缩文件及写入线程, 写入失败时删除不完整的压缩文件"""
+        if self._executor is None:
+            return self.file
+
+        try:
+            await self.wait()
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._close_archive)
+        except BaseException:
+            await self.abort()
+            raise
+        self._executor.shutdown(wait=False)
+        self._executor = None
+        return self.file
+
+    async def abort(self) -> None:
+        """放弃写入, 取消尚未开始的写入任务, 关闭并删除不完整的压缩文件"""
+        if self._executor is None:
+            return
+
+        executor, self._executor = self._executor, None
+        pending_tasks, self._pending_tasks = self._pending_tasks, []
+        for task in pending_tasks:
+            task.cancel()
+        # 写入线程中已开始的任务无法取消, 在其后排队关闭压缩文件, 由线程池保证在正在写入的文件完成后执行
+        await asyncio.shield(asyncio.get_running_loop().run_in_executor(executor, self._discard_archive))
+        executor.shutdown(wait=False)
+
+
+__all__ = [
+    'ArchiveProgress',
+    'ProgressCallback',
+    'StreamingArchiveWriter',
+]
@@ -0,0 +1,30 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/24 11:02:37
+@FileName       : conftest
+@Project        : omega-miya
+@Description    : 单元测试公共配置, 使用 `python -m pytest` 运行
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import os
+import tempfile
+
+import nonebot
+import pytest
+
+# 各模块在导入时读取配置, 需在导入被测模块前初始化 NoneBot, 测试使用临时目录中的 SQLite 数据库
+nonebot.init(
+    driver='~fastapi+~httpx',
+    database='sqlite',
+    db_driver='aiosqlite',
+    db_name=os.path.join(tempfile.mkdtemp(prefix='omega_test_'), 'omega'),
+    db_prefix='test_',
+)
+nonebot.require('nonebot_plugin_apscheduler')
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return 'asyncio'
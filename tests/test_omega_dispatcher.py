@@ -0,0 +1,183 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/24 16:40:21
+@FileName       : test_omega_dispatcher
+@Project        : omega-miya
+@Description    : 统一消息发送调度器测试, 使用模拟的 Bot 发送消息
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+
+import pytest
+from nonebot.exception import ActionFailed
+
+from src.service.omega_dispatcher import OutboundDispatcher
+
+
+class FakeActionFailed(ActionFailed):
+    """与常见适配器一致, 在 repr 中包含平台返回的错误信息"""
+
+    def __init__(self, message: str):
+        super().__init__('Fake')
+        self.message = message
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(message={self.message!r})'
+
+
+class FakeBot:
+    """模拟的 Bot, 记录发送的消息, 可按顺序设置发送时返回的错误"""
+
+    def __init__(self, self_id: str = 'fake_bot'):
+        self.self_id = self_id
+        self.sent: list[tuple[str, str, float]] = []
+        self.errors: list[Exception] = []
+        self.calls: int = 0
+        self.hold: asyncio.Event | None = None
+
+    async def send_msg(self, target: str, message: str) -> str:
+        self.calls += 1
+        if self.hold is not None:
+            await self.hold.wait()
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((target, message, time.monotonic()))
+        return f'sent:{message}'
+
+    @property
+    def messages(self) -> list[str]:
+        return [x[1] for x in self.sent]
+
+
+@pytest.fixture
+async def dispatcher(request: pytest.FixtureRequest) -> AsyncIterator[OutboundDispatcher]:
+    params = {
+        'bot_rate': 1000.0, 'bot_burst': 100, 'target_rate': 1000.0, 'target_burst': 100, 'bot_concurrency': 1,
+        'retry_base_delay': 0.05, **getattr(request, 'param', {}),
+    }
+    dispatcher = OutboundDispatcher(**params)
+    yield dispatcher
+    await dispatcher.close()
+
+
+def _submit(dispatcher: OutboundDispatcher, bot: FakeBot, target: str, message: str, **kwargs) -> asyncio.Task:
+    return asyncio.create_task(
+        dispatcher.submit(bot.self_id, target, lambda: bot.send_msg(target, message), **kwargs)
+    )
+
+
+async def _wait_for_calls(bot: FakeBot, count: int) -> None:
+    while bot.calls < count:
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.anyio
+async def test_submit_returns_send_result(dispatcher: OutboundDispatcher) -> None:
+    bot = FakeBot()
+    assert await _submit(dispatcher, bot, 'group_1', 'hello') == 'sent:hello'
+    assert bot.messages == ['hello']
+
+
+@pytest.mark.anyio
+async def test_interactive_lane_sent_before_broadcast(dispatcher: OutboundDispatcher) -> None:
+    bot = FakeBot()
+    bot.hold = asyncio.Event()
+    blocking = _submit(dispatcher, bot, 'group_0', 'blocking')
+    await _wait_for_calls(bot, 1)
+
+    broadcasts = [_submit(dispatcher, bot, f'group_{x}', f'broadcast_{x}') for x in range(3)]
+    interactives = [_submit(dispatcher, bot, f'user_{x}', f'interactive_{x}', lane='interactive') for x in range(2)]
+    await asyncio.sleep(0.01)
+    bot.hold.set()
+    await asyncio.gather(blocking, *broadcasts, *interactives)
+
+    assert bot.messages == [
+        'blocking', 'interactive_0', 'interactive_1', 'broadcast_0', 'broadcast_1', 'broadcast_2'
+    ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('dispatcher', [{'target_rate': 10.0, 'target_burst': 1}], indirect=True)
+async def test_broadcast_limited_per_target(dispatcher: OutboundDispatcher) -> None:
+    bot = FakeBot()
+    start_time = time.monotonic()
+    tasks = [_submit(dispatcher, bot, 'group_1', f'limited_{x}') for x in range(3)]
+    tasks.append(_submit(dispatcher, bot, 'group_2', 'other'))
+    await asyncio.gather(*tasks)
+
+    # 受限的发送对象不阻塞其他对象的消息
+    assert bot.messages == ['limited_0', 'other', 'limited_1', 'limited_2']
+    sent_at = [x[2] - start_time for x in bot.sent]
+    assert sent_at[1] < 0.05
+    assert sent_at[2] >= 0.09
+    assert sent_at[3] >= 0.19
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('dispatcher', [{'target_rate': 0.1, 'target_burst': 1}], indirect=True)
+async def test_interactive_lane_exempt_from_target_limit(dispatcher: OutboundDispatcher) -> None:
+    bot = FakeBot()
+    start_time = time.monotonic()
+    await asyncio.gather(*(_submit(dispatcher, bot, 'user_1', f'reply_{x}', lane='interactive') for x in range(5)))
+    assert len(bot.sent) == 5
+    assert time.monotonic() - start_time < 0.1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('dispatcher', [{'bot_rate': 10.0, 'bot_burst': 1}], indirect=True)
+async def test_interactive_lane_limited_per_bot(dispatcher: OutboundDispatcher) -> None:
+    bot = FakeBot()
+    start_time = time.monotonic()
+    await asyncio.gather(*(_submit(dispatcher, bot, f'user_{x}', f'reply_{x}', lane='interactive') for x in range(3)))
+    assert time.monotonic() - start_time >= 0.19
+
+
+@pytest.mark.anyio
+async def test_retry_on_rate_limited_error(dispatcher: OutboundDispatcher) -> None:
+    bot = FakeBot()
+    bot.errors.append(FakeActionFailed('429 Too Many Requests, retry after 0.05'))
+    start_time = time.monotonic()
+    assert await _submit(dispatcher, bot, 'group_1', 'retried') == 'sent:retried'
+    assert bot.calls == 2
+    assert time.monotonic() - start_time >= 0.05
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('dispatcher', [{'retry_times': 1}], indirect=True)
+async def test_raise_when_not_retryable(dispatcher: OutboundDispatcher) -> None:
+    bot = FakeBot()
+    bot.errors.append(FakeActionFailed('permission denied'))
+    with pytest.raises(FakeActionFailed):
+        await _submit(dispatcher, bot, 'group_1', 'denied')
+
+    bot.errors.extend([FakeActionFailed('rate limit'), FakeActionFailed('rate limit')])
+    with pytest.raises(FakeActionFailed):
+        await _submit(dispatcher, bot, 'group_1', 'exhausted')
+    assert bot.calls == 3
+
+
+@pytest.mark.anyio
+async def test_close_cancels_pending_retry(dispatcher: OutboundDispatcher) -> None:
+    bot = FakeBot()
+    bot.errors.append(FakeActionFailed('retry after 60'))
+    task = _submit(dispatcher, bot, 'group_1', 'pending')
+    await _wait_for_calls(bot, 1)
+    await asyncio.sleep(0.01)
+
+    await dispatcher.close()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert bot.calls == 1
+    assert dispatcher._bots == {}
+
+
+@pytest.mark.anyio
+async def test_disabled_dispatcher_sends_directly() -> None:
+    bot = FakeBot()
+    dispatcher = OutboundDispatcher(enable=False)
+    assert await _submit(dispatcher, bot, 'group_1', 'direct') == 'sent:direct'
+    assert dispatcher._bots == {}
@@ -0,0 +1,297 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/24 11:15:06
+@FileName       : test_omega_email_imap_client
+@Project        : omega-miya
+@Description    : imap 客户端及连接池测试, 使用进程内的简易 imap 服务器
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import re
+from collections.abc import AsyncIterator
+from functools import partial
+
+import pytest
+
+from src.plugins.omega_email import imap_client
+from src.plugins.omega_email.imap_client import ImapClient, ImapClientError, ImapClientPool
+
+_LITERAL_PATTERN = re.compile(rb'\{(\d+)\}\r\n$')
+
+
+def _make_mail(uid: int, subject: str) -> bytes:
+    return (
+        f'Date: Mon, 1 Jan 2024 00:00:00 +0000\r\nSubject: {subject}\r\nFrom: a@b.c\r\nTo: d@e.f\r\n'
+        f'Content-Type: text/plain; charset=utf-8\r\n\r\nbody {uid}\r\n'
+    ).encode()
+
+
+class FakeImapServer:
+    """仅实现客户端所用命令的 imap 服务器"""
+
+    def __init__(self, *, support_idle: bool = True):
+        self.support_idle = support_idle
+        self.mails: dict[int, bytes] = {}
+        self.uid_validity: int = 1
+        self.connections: int = 0
+        self.commands: list[str] = []
+        self.logins: list[bytes] = []
+        self.logouts: int = 0
+        self.hang_commands: set[str] = set()
+        self._idle_writers: set[asyncio.StreamWriter] = set()
+        self._reported_exists: dict[asyncio.StreamWriter, int] = {}
+        self._stopped = asyncio.Event()
+        self._server: asyncio.Server | None = None
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def deliver(self, uid: int, subject: str) -> None:
+        """投递新邮件, 并向处于 IDLE 的连接推送通知"""
+        self.mails[uid] = _make_mail(uid, subject)
+        for writer in self._idle_writers:
+            await self._report_exists(writer)
+
+    async def _report_exists(self, writer: asyncio.StreamWriter) -> None:
+        """与真实服务器一致, 向连接报告其上次得知后变化的邮件数量"""
+        if self._reported_exists.get(writer) != len(self.mails):
+            self._reported_exists[writer] = len(self.mails)
+            writer.write(f'* {len(self.mails)} EXISTS\r\n'.encode())
+            await writer.drain()
+
+    async def _read_command(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bytes:
+        line = await reader.readline()
+        while line and (literal := _LITERAL_PATTERN.search(line)) is not None:
+            writer.write(b'+ go ahead\r\n')
+            await writer.drain()
+            line = line[:literal.start()] + await reader.readexactly(int(literal.group(1))) + await reader.readline()
+        return line
+
+    async def _handle_idle(self, tag: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(b'+ idling\r\n')
+        await self._report_exists(writer)
+        self._idle_writers.add(writer)
+        try:
+            await reader.readline()
+        finally:
+            self._idle_writers.discard(writer)
+        writer.write(f'{tag} OK IDLE terminated\r\n'.encode())
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        seen: set[int] = set()
+        writer.write(b'* OK fake imap ready\r\n')
+        while line := await self._read_command(reader, writer):
+            tag, command, *args = line.decode().strip().split(' ', 2)
+            command = command.upper()
+            arg = args[0] if args else ''
+            self.commands.append(f'{command} {arg}'.strip())
+            if command in self.hang_commands:
+                await self._stopped.wait()
+                break
+
+            if command == 'LOGIN':
+                self.logins.append(line)
+                status = 'NO bad password' if 'wrong' in arg else 'OK logged in'
+                writer.write(f'{tag} {status}\r\n'.encode())
+            elif command == 'CAPABILITY':
+                capabilities = 'IMAP4rev1 IDLE' if self.support_idle else 'IMAP4rev1'
+                writer.write(f'* CAPABILITY {capabilities}\r\n{tag} OK\r\n'.encode())
+            elif command == 'SELECT':
+                self._reported_exists[writer] = len(self.mails)
+                writer.write((
+                    f'* {len(self.mails)} EXISTS\r\n* OK [UIDVALIDITY {self.uid_validity}]\r\n'
+                    f'{tag} OK [READ-WRITE]\r\n'
+                ).encode())
+            elif command == 'NOOP':
+                writer.write(f'{tag} OK\r\n'.encode())
+            elif command == 'IDLE' and self.support_idle:
+                await self._handle_idle(tag, reader, writer)
+            elif command == 'UID' and arg.upper().startswith('SEARCH'):
+                tokens = arg.split()[1:]
+                uids = [x for x in sorted(self.mails) if 'UNSEEN' not in tokens or x not in seen]
+                if 'UID' in tokens:
+                    lower = int(tokens[tokens.index('UID') + 1].split(':')[0])
+                    # 与真实服务器一致, "n:*" 没有更大的 UID 时仍返回当前最大 UID
+                    uids = [x for x in uids if x >= lower] or ([max(self.mails)] if self.mails else [])
+                writer.write(f'* SEARCH {" ".join(map(str, uids))}\r\n{tag} OK\r\n'.encode())
+            elif command == 'UID' and arg.upper().startswith('FETCH'):
+                for index, uid in enumerate(int(x) for x in arg.split()[1].split(',')):
+                    seen.add(uid)
+                    data = self.mails[uid]
+                    header = f'* {index + 1} FETCH (UID {uid} RFC822 {{{len(data)}}}\r\n'.encode()
+                    writer.write(header + data + b')\r\n')
+                writer.write(f'{tag} OK\r\n'.encode())
+            elif command == 'LOGOUT':
+                self.logouts += 1
+                writer.write(f'* BYE\r\n{tag} OK\r\n'.encode())
+                await writer.drain()
+                break
+            else:
+                writer.write(f'{tag} BAD unknown command\r\n'.encode())
+            await writer.drain()
+        writer.close()
+
+    def count_commands(self, command: str) -> int:
+        return sum(1 for x in self.commands if x.startswith(command))
+
+
+async def _wait_until_idle(server: FakeImapServer, count: int = 1) -> None:
+    """等待连接池中的空闲客户端进入 IDLE"""
+    while len(server._idle_writers) < count:
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def server(request: pytest.FixtureRequest) -> AsyncIterator[FakeImapServer]:
+    server = FakeImapServer(support_idle=getattr(request, 'param', True))
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def pool(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[ImapClientPool]:
+    monkeypatch.setattr(imap_client, 'ImapClient', partial(ImapClient, use_ssl=False))
+    pool = ImapClientPool(max_size=2, timeout=0.5)
+    yield pool
+    await pool.close()
+
+
+def _acquire(pool: ImapClientPool, server: FakeImapServer, address: str = 'user@example.com', password: str = 'pw'):
+    return pool.acquire(host='127.0.0.1', address=address, password=password, port=server.port)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('server', [True, False], indirect=True, ids=['idle', 'no-idle'])
+async def test_fetch_new_mails_incrementally(server: FakeImapServer, pool: ImapClientPool) -> None:
+    server.mails.update({1: _make_mail(1, 'one'), 2: _make_mail(2, 'two')})
+    async with _acquire(pool, server) as client:
+        assert [x.header for x in await client.fetch_new_mails('UNSEEN')] == ['one', 'two']
+    async with _acquire(pool, server) as client:
+        assert await client.fetch_new_mails('UNSEEN') == []
+
+    await server.deliver(3, 'three')
+    async with _acquire(pool, server) as client:
+        assert [x.header for x in await client.fetch_new_mails('UNSEEN')] == ['three']
+        assert client.last_seen_uid == 3
+    assert server.connections == 1
+
+
+@pytest.mark.anyio
+async def test_idle_push_skips_search_without_new_mail(server: FakeImapServer, pool: ImapClientPool) -> None:
+    async with _acquire(pool, server) as client:
+        assert await client.fetch_new_mails('UNSEEN') == []
+    await _wait_until_idle(server)
+
+    async with _acquire(pool, server) as client:
+        assert not client.has_new_mail
+        assert await client.fetch_new_mails('UNSEEN') == []
+    assert server.count_commands('UID SEARCH') == 1
+
+    await _wait_until_idle(server)
+    await server.deliver(1, 'pushed')
+    async with _acquire(pool, server) as client:
+        assert client.has_new_mail
+        assert [x.header for x in await client.fetch_new_mails('UNSEEN')] == ['pushed']
+    assert server.count_commands('UID SEARCH') == 2
+    assert server.connections == 1
+
+
+@pytest.mark.anyio
+async def test_idle_returns_on_notification_and_timeout(server: FakeImapServer) -> None:
+    client = ImapClient(host='127.0.0.1', address='user@example.com', password='pw', port=server.port, use_ssl=False)
+    await client.connect()
+    try:
+        assert not await client.idle(timeout=0.05)
+
+        idle_task = asyncio.create_task(client.idle(timeout=5))
+        await _wait_until_idle(server)
+        await server.deliver(1, 'pushed')
+        assert await asyncio.wait_for(idle_task, timeout=1)
+        assert client.is_connected
+    finally:
+        await client.logout()
+
+
+@pytest.mark.anyio
+async def test_uid_validity_change_resets_last_seen_uid(server: FakeImapServer, pool: ImapClientPool) -> None:
+    server.mails[1] = _make_mail(1, 'one')
+    async with _acquire(pool, server) as client:
+        await client.fetch_new_mails()
+        server.uid_validity = 2
+        await client.select()
+        assert client.last_seen_uid is None
+
+
+@pytest.mark.anyio
+async def test_non_ascii_password_sent_as_literal(server: FakeImapServer, pool: ImapClientPool) -> None:
+    async with _acquire(pool, server, password='密码') as client:
+        assert client.is_connected
+    assert '密码'.encode() in server.logins[-1]
+
+
+@pytest.mark.anyio
+async def test_failed_login_discards_client(server: FakeImapServer, pool: ImapClientPool) -> None:
+    with pytest.raises(ImapClientError):
+        async with _acquire(pool, server, password='wrong'):
+            pass
+    assert pool._clients == {}
+
+
+@pytest.mark.anyio
+async def test_evict_idle_client_when_pool_is_full(server: FakeImapServer, pool: ImapClientPool) -> None:
+    for address in ('a@example.com', 'b@example.com', 'c@example.com'):
+        async with _acquire(pool, server, address=address):
+            pass
+    assert [x[2] for x in pool._clients] == ['b@example.com', 'c@example.com']
+    assert server.logouts == 1
+
+
+@pytest.mark.anyio
+async def test_same_account_is_used_exclusively(server: FakeImapServer, pool: ImapClientPool) -> None:
+    active: list[int] = []
+
+    async def _use(index: int) -> int:
+        async with _acquire(pool, server):
+            active.append(index)
+            assert len(active) == 1
+            await asyncio.sleep(0.02)
+            active.remove(index)
+        return index
+
+    assert await asyncio.gather(*(_use(x) for x in range(5))) == list(range(5))
+
+
+@pytest.mark.anyio
+async def test_unresponsive_server_times_out(server: FakeImapServer, pool: ImapClientPool) -> None:
+    server.hang_commands.add('UID')
+    with pytest.raises(TimeoutError):
+        async with _acquire(pool, server) as client:
+            await client.fetch_new_mails()
+    assert not client.is_connected
+    assert pool._clients == {}
+
+
+@pytest.mark.anyio
+async def test_close_pool_logs_out_idle_clients(server: FakeImapServer, pool: ImapClientPool) -> None:
+    async with _acquire(pool, server):
+        pass
+    await _wait_until_idle(server)
+    await pool.close()
+    assert server.logouts == 1
+    assert pool._clients == {}
+    assert pool._idle_watchers == {}
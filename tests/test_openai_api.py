@@ -0,0 +1,185 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/24 18:02:47
+@FileName       : test_openai_api
+@Project        : omega-miya
+@Description    : openai 对话会话测试, 使用进程内的 openai 兼容 HTTP 服务器
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+import pytest
+import ujson as json
+from aiohttp import web
+
+from src.exception import WebSourceException
+from src.utils.openai_api import ChatSession
+from src.utils.openai_api.cache import chat_response_cache
+from src.utils.openai_api.config import Service, openai_service_config
+
+_MODEL_NAME = 'fake-model'
+
+
+def _make_completion(content: str) -> dict[str, Any]:
+    return {
+        'id': 'chatcmpl-fake', 'object': 'chat.completion', 'created': 1, 'model': _MODEL_NAME,
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2},
+    }
+
+
+def _make_chunk(delta: dict[str, Any] | None) -> bytes:
+    chunk = {
+        'id': 'chatcmpl-fake', 'object': 'chat.completion.chunk', 'created': 1, 'model': _MODEL_NAME,
+        'choices': [] if delta is None else [{'index': 0, 'delta': delta, 'finish_reason': None}],
+    }
+    return f'data: {json.dumps(chunk)}\n\n'.encode()
+
+
+class FakeOpenAIServer:
+    """仅实现 chat completions 接口的 openai 兼容服务器"""
+
+    def __init__(self):
+        self.requests: list[dict[str, Any]] = []
+        self.stream_pieces: list[str] = []
+        self.fail_status: int | None = None
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def base_url(self) -> str:
+        assert self._runner is not None
+        host, port = self._runner.addresses[0][:2]
+        return f'http://{host}:{port}/v1'
+
+    @property
+    def chat_requests(self) -> list[dict[str, Any]]:
+        return [x for x in self.requests if not self._is_summary_request(x)]
+
+    @property
+    def summary_requests(self) -> list[dict[str, Any]]:
+        return [x for x in self.requests if self._is_summary_request(x)]
+
+    @staticmethod
+    def _is_summary_request(data: dict[str, Any]) -> bool:
+        return data['messages'][0]['content'].startswith('请将已有总结')
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post('/v1/chat/completions', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        assert request.headers['Authorization'] == 'Bearer test-key'
+        data = await request.json()
+        self.requests.append(data)
+        if self.fail_status is not None:
+            return web.json_response({'error': {'message': 'server overloaded'}}, status=self.fail_status)
+
+        if self._is_summary_request(data):
+            return web.json_response(_make_completion(f'SUMMARY{len(self.summary_requests)}'))
+        if not data.get('stream'):
+            return web.json_response(_make_completion(f'reply{len(self.chat_requests)}'))
+
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        await response.write(b': keep-alive\n\n')
+        await response.write(_make_chunk({'role': 'assistant', 'reasoning_content': 'thinking'}))
+        for piece in self.stream_pieces:
+            await response.write(_make_chunk({'content': piece}))
+            await asyncio.sleep(0.01)
+        await response.write(_make_chunk(None))
+        await response.write(b'data: [DONE]\n\n')
+        return response
+
+
+@pytest.fixture
+async def server() -> AsyncIterator[FakeOpenAIServer]:
+    server = FakeOpenAIServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+def session_factory(server: FakeOpenAIServer, monkeypatch: pytest.MonkeyPatch) -> Iterator[type[ChatSession]]:
+    service = Service(name='fake', api_key='test-key', base_url=server.base_url, available_models=[_MODEL_NAME])
+    monkeypatch.setattr(openai_service_config, 'openai_service_config', [service])
+    chat_response_cache.clear()
+    yield ChatSession
+    chat_response_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_stream_chat_parses_sse(server: FakeOpenAIServer, session_factory: type[ChatSession]) -> None:
+    server.stream_pieces = ['Hel', 'lo\nwor', 'ld', '\nend']
+    session = session_factory.create()
+
+    assert [x async for x in session.stream_chat('q')] == server.stream_pieces
+    assert server.requests[-1]['stream'] is True
+
+    assert [x async for x in session.stream_chat('q', min_segment_length=5)] == ['Hello\n', 'world\n', 'end']
+    reply_message = session.message.chat_messages[-1]
+    assert reply_message.plain_text == 'Hello\nworld\nend'
+    assert reply_message.reasoning_content == 'thinking'
+    assert len(session.message.chat_messages) == 4
+
+
+@pytest.mark.anyio
+async def test_deterministic_response_cache(server: FakeOpenAIServer, session_factory: type[ChatSession]) -> None:
+    session = session_factory.create()
+    first_reply = await session.chat('hi', temperature=0)
+    session.reset_chat()
+    assert await session.chat('hi', temperature=0) == first_reply
+    assert len(server.requests) == 1
+
+    session.reset_chat()
+    assert await session.chat('hi', temperature=0.7) != first_reply
+    assert len(server.requests) == 2
+
+    server.stream_pieces = ['streamed']
+    session.reset_chat()
+    assert [x async for x in session.stream_chat('hi', temperature=0)] == ['streamed']
+    assert len(server.requests) == 3
+
+
+@pytest.mark.anyio
+async def test_token_budget_trims_and_summarizes(
+        server: FakeOpenAIServer,
+        session_factory: type[ChatSession],
+) -> None:
+    session = session_factory.create(init_system_message='sys', max_context_tokens=120, summarize_evicted_messages=True)
+    for _ in range(6):
+        await session.chat('x' * 90)
+        assert session.message.estimated_tokens <= 120
+
+    assert server.summary_requests
+    assert 'x' * 90 in server.summary_requests[0]['messages'][1]['content']
+    last_messages = server.chat_requests[-1]['messages']
+    assert last_messages[0]['content'] == 'sys'
+    assert last_messages[1]['content'] == f'此前对话内容总结:\nSUMMARY{len(server.summary_requests)}'
+    assert len(last_messages) < 2 * 6 + 1
+
+
+@pytest.mark.anyio
+async def test_stream_error_path(server: FakeOpenAIServer, session_factory: type[ChatSession]) -> None:
+    server.fail_status = 503
+    session = session_factory.create()
+
+    with pytest.raises(WebSourceException) as exc_info:
+        _ = [x async for x in session.client.create_chat_completion_stream(model=_MODEL_NAME, message=[])]
+    assert exc_info.value.status_code == 503
+    assert b'server overloaded' in exc_info.value.content
+
+    with pytest.raises(WebSourceException):
+        _ = [x async for x in session.stream_chat('q')]
+    assert [x.role.value for x in session.message.chat_messages] == ['user']
@@ -0,0 +1,166 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/24 20:15:32
+@FileName       : test_tencent_cloud_tmt
+@Project        : omega-miya
+@Description    : 腾讯云机器翻译及翻译记忆测试, 使用进程内的简易翻译 API 服务器
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from aiohttp import web
+
+from src.database.connector import engine
+from src.database.schema_base import OmegaDeclarativeBase
+from src.utils.tencent_cloud_api import TencentTMT
+from src.utils.tencent_cloud_api.api import tmt
+from src.utils.tencent_cloud_api.memory import TranslatedText, TranslationMemory
+
+
+class FakeTmtServer:
+    """仅实现文本翻译及批量文本翻译接口的腾讯云 API 服务器, 翻译结果为 `T(原文)`"""
+
+    def __init__(self):
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+        self.fail_requests: set[int] = set()
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def endpoint(self) -> str:
+        assert self._runner is not None
+        host, port = self._runner.addresses[0][:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def translated_texts(self) -> list[str]:
+        return [
+            text
+            for _, payload in self.requests
+            for text in payload.get('SourceTextList', [payload.get('SourceText')])
+        ]
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post('/', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, '127.0.0.1', 0).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        assert request.headers['Authorization'].startswith('TC3-HMAC-SHA256 Credential=test-id/')
+        action = request.headers['X-TC-Action']
+        payload = await request.json()
+        self.requests.append((action, payload))
+        if len(self.requests) in self.fail_requests:
+            return web.json_response({
+                'Response': {'Error': {'Code': 'RequestLimitExceeded', 'Message': 'request limit exceeded'}}
+            })
+
+        if action == 'TextTranslate':
+            return web.json_response({
+                'Response': {'TargetText': f'T({payload["SourceText"]})', 'Source': 'en', 'Target': payload['Target']}
+            })
+        return web.json_response({
+            'Response': {
+                'TargetTextList': [f'T({x})' for x in payload['SourceTextList']],
+                'Source': 'en',
+                'Target': payload['Target'],
+            }
+        })
+
+
+@pytest.fixture
+async def server() -> AsyncIterator[FakeTmtServer]:
+    server = FakeTmtServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def memory(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[TranslationMemory]:
+    async with engine.begin() as conn:
+        await conn.run_sync(OmegaDeclarativeBase.metadata.create_all)
+
+    memory = TranslationMemory(cache_name=f'test_tmt_{uuid.uuid4().hex}', lru_size=16, ttl=timedelta(days=1))
+    monkeypatch.setattr(tmt, 'tmt_translation_memory', memory)
+    yield memory
+    await engine.dispose()
+
+
+def _tmt(server: FakeTmtServer) -> TencentTMT:
+    client = TencentTMT(secret_id='test-id', secret_key='test-key')
+    client._endpoint = server.endpoint
+    return client
+
+
+@pytest.mark.anyio
+async def test_translation_memory_hit_rate(server: FakeTmtServer, memory: TranslationMemory) -> None:
+    phrases = ['hello', 'good  morning', 'hello ', 'thanks', 'hello', 'good morning', 'bye'] * 5
+    for phrase in phrases:
+        result = await _tmt(server).text_translate(phrase, target='zh')
+        assert not result.error
+        assert memory.normalize_text(result.Response.TargetText) == f'T({memory.normalize_text(phrase)})'
+
+    # 规范化后仅有 4 条不同的文本
+    assert len(server.requests) == 4
+    assert (memory.hits, memory.misses) == (31, 4)
+    assert memory.hit_rate == pytest.approx(31 / 35)
+
+    # 内存 LRU 缓存清空后从全局缓存中读取
+    memory.clear_internal()
+    result = await _tmt(server).text_translate('good morning', target='zh')
+    assert result.Response.TargetText == 'T(good  morning)'
+    assert len(server.requests) == 4
+    assert memory.hit_rate == 1.0
+
+
+@pytest.mark.anyio
+async def test_batch_submits_missing_texts_in_chunks(server: FakeTmtServer, memory: TranslationMemory) -> None:
+    await _tmt(server).text_translate('hello', target='ja')
+    texts = ['hello', 'new', 'x' * 3500, 'y' * 3500, 'bye']
+
+    result = await _tmt(server).text_translate_batch(texts, target='ja')
+    assert result.Response.TargetTextList == [f'T({x})' for x in texts]
+    assert [len(payload['SourceTextList']) for _, payload in server.requests[1:]] == [2, 2]
+
+    server.requests.clear()
+    result = await _tmt(server).text_translate_batch(texts, target='ja')
+    assert result.Response.TargetTextList == [f'T({x})' for x in texts]
+    assert server.requests == []
+
+
+@pytest.mark.anyio
+async def test_batch_error_keeps_completed_chunks(server: FakeTmtServer, memory: TranslationMemory) -> None:
+    texts = ['new', 'x' * 3500, 'y' * 3500, 'bye']
+    server.fail_requests.add(2)
+    result = await _tmt(server).text_translate_batch(texts, target='ja')
+    assert result.error
+
+    server.fail_requests.clear()
+    server.requests.clear()
+    result = await _tmt(server).text_translate_batch(texts, target='ja')
+    assert result.Response.TargetTextList == [f'T({x})' for x in texts]
+    assert server.translated_texts == ['y' * 3500, 'bye']
+
+
+@pytest.mark.anyio
+async def test_memory_entries_expire(memory: TranslationMemory) -> None:
+    expiring_memory = TranslationMemory(cache_name=memory._cache_name, lru_size=16, ttl=timedelta(seconds=0.2))
+    await expiring_memory.save_many('en', 'zh', [('hello', TranslatedText(source='en', target_text='你好'))])
+    assert await expiring_memory.load_many('en', 'zh', ['hello']) == [TranslatedText(source='en', target_text='你好')]
+
+    await asyncio.sleep(0.3)
+    assert await expiring_memory.load_many('en', 'zh', ['hello']) == [None]
+    assert expiring_memory._lru == {}
@@ -0,0 +1,15 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/6 21:40:18
+@FileName       : mirage_tank_benchmark
+@Project        : ailitonia-toolkit
+@Description    : 幻影坦克合成实现性能对比
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from .benchmark import run_benchmark
+
+__all__ = [
+    'run_benchmark',
+]
@@ -0,0 +1,147 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/6 21:42:53
+@FileName       : benchmark
+@Project        : ailitonia-toolkit
+@Description    : 幻影坦克合成实现性能对比, 统计各实现处理大尺寸图片的耗时及峰值内存
+
+使用方法: python -m tools.mirage_tank_benchmark.benchmark --width 3840 --height 2160 --repeat 3
+
+每个测试项在独立子进程中运行, 峰值内存为子进程生成输入图片后 ru_maxrss 的增量 (仅支持类 Unix 系统)
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Literal
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+type MODE = Literal['gray', 'color']
+type BACKEND = Literal['pillow', 'numpy']
+
+_ALL_CASES: list[tuple[MODE, BACKEND]] = [
+    ('gray', 'pillow'),
+    ('gray', 'numpy'),
+    ('color', 'pillow'),
+    ('color', 'numpy'),
+]
+
+
+def _get_max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 单位为字节, Linux 单位为 KB
+    return max_rss / 1024 / 1024 if sys.platform == 'darwin' else max_rss / 1024
+
+
+def _run_case(mode: MODE, backend: BACKEND, width: int, height: int, repeat: int, tile_rows: int) -> dict[str, Any]:
+    """在当前进程中运行单个测试项"""
+    import nonebot
+
+    nonebot.init(mirage_tank_plugin_tile_rows=tile_rows)
+    nonebot.load_plugins('src/service')
+    nonebot.load_plugin('src.plugins.mirage_tank')
+
+    import numpy as np
+    from PIL import Image
+
+    from src.plugins.mirage_tank import utils
+
+    # 生成带有渐变及噪点的合成输入
+    rng = np.random.default_rng(seed=20250306)
+    gradient = np.linspace(0, 255, num=width, dtype=np.float32)[np.newaxis, :, np.newaxis]
+    noise = rng.integers(0, 64, size=(height, width, 3), dtype=np.uint8)
+    white_image = Image.fromarray((gradient * 0.75 + noise).astype(np.uint8)).convert('RGBA')
+    black_image = Image.fromarray((255 - gradient * 0.75 - noise).astype(np.uint8)).convert('RGBA')
+
+    factory = getattr(utils, f'_complex_{mode}_{backend}')
+    baseline_rss = _get_max_rss_mb()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        factory(white_image, black_image)
+        timings.append(time.perf_counter() - start)
+
+    peak_rss = _get_max_rss_mb()
+    return {
+        'mode': mode,
+        'backend': backend,
+        'size': f'{width}x{height}',
+        'tile_rows': tile_rows,
+        'repeat': repeat,
+        'best_seconds': round(min(timings), 4),
+        'mean_seconds': round(sum(timings) / len(timings), 4),
+        'peak_memory_mb': (
+            round(peak_rss - baseline_rss, 1) if peak_rss is not None and baseline_rss is not None else None
+        ),
+    }
+
+
+def run_benchmark(
+        width: int = 3840,
+        height: int = 2160,
+        repeat: int = 3,
+        tile_rows: int = 128,
+) -> list[dict[str, Any]]:
+    """依次在独立子进程中运行全部测试项"""
+    results = []
+    for mode, backend in _ALL_CASES:
+        process = subprocess.run(
+            [
+                sys.executable, '-m', 'tools.mirage_tank_benchmark.benchmark', '--case', f'{mode}:{backend}',
+                '--width', str(width), '--height', str(height), '--repeat', str(repeat), '--tile-rows', str(tile_rows)
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        results.append(json.loads(process.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='幻影坦克合成实现性能对比')
+    parser.add_argument('--width', type=int, default=3840)
+    parser.add_argument('--height', type=int, default=2160)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tile-rows', type=int, default=128, help='numpy 实现分块处理时每块的行数, 为 0 则不分块')
+    parser.add_argument('--case', type=str, default=None, help='仅在当前进程运行单个测试项, 格式为 mode:backend')
+    parser.add_argument('--output', type=str, default=None, help='将测试结果保存为 JSON 文件')
+    args = parser.parse_args()
+
+    if args.case is not None:
+        mode, backend = args.case.split(':', maxsplit=1)
+        result = _run_case(
+            mode, backend, args.width, args.height, args.repeat, args.tile_rows  # type: ignore[arg-type]
+        )
+        sys.stdout.write(f'{json.dumps(result, ensure_ascii=False)}\n')
+        return
+
+    results = run_benchmark(width=args.width, height=args.height, repeat=args.repeat, tile_rows=args.tile_rows)
+    from nonebot.log import logger
+
+    table = [f'{"mode":<8}{"backend":<10}{"size":<12}{"best(s)":>10}{"mean(s)":>10}{"peak(MB)":>10}']
+    table.extend(
+        f'{x["mode"]:<8}{x["backend"]:<10}{x["size"]:<12}'
+        f'{x["best_seconds"]:>10}{x["mean_seconds"]:>10}{str(x["peak_memory_mb"]):>10}'
+        for x in results
+    )
+    logger.info('Mirage tank benchmark results:\n' + '\n'.join(table))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/16 14:02:37
+@FileName       : omega_benchmark
+@Project        : ailitonia-toolkit
+@Description    : 离线基准测试, 覆盖通用 processor, 数据库 DAL 及图片处理
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from .benchmark import compare_results, run_benchmark
+
+__all__ = [
+    'compare_results',
+    'run_benchmark',
+]
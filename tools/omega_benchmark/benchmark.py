@@ -0,0 +1,623 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/16 14:05:11
+@FileName       : benchmark
+@Project        : ailitonia-toolkit
+@Description    : 离线基准测试, 覆盖通用 processor, 数据库 DAL 及图片处理, 不依赖网络及真实 Bot 连接
+
+使用方法: python -m tools.omega_benchmark.benchmark --repeat 5 --output benchmark.json
+对比基线: python -m tools.omega_benchmark.benchmark --baseline benchmark.json --threshold 0.1
+对比 SQLite 高并发模式: 先以默认配置保存结果, 再添加 --sqlite-performance-mode 参数并指定 --baseline 运行
+
+全部测试项均在临时目录的 SQLite 数据库中运行, 使用合成的 OneBot V11 群消息事件:
+  - processor.*: 速率限制, 全局/插件权限检查, 全局/插件冷却检查
+  - dal.*: HistoryDAL/StatisticDAL 写入及查询, 突发并发读写, ArtworkCollectionDAL.query_by_condition (默认 1万/10万 行)
+  - image.*: ImageTextProcessor 文字绘制, ImageEffectProcessor 模糊/噪点/缩放
+  - sticker.*: petpet GIF 表情包生成
+指定 --baseline 时, 平均耗时超过基线 (1 + threshold) 倍的测试项视为性能回退, 存在回退时以非零状态码退出
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent
+    from nonebot.matcher import Matcher
+
+type CASE_FUNC = Callable[[], Any]
+type CASE_SETUP = Callable[['_BenchmarkContext'], Awaitable[tuple[CASE_FUNC, int]]]
+
+_BOT_SELF_ID: str = '10000'
+_GROUP_ID: int = 20000
+_USER_ID: int = 30000
+_SEED: int = 20250316
+
+
+class _BenchmarkContext:
+    """测试项共享的合成 Bot, 事件及插件 Matcher"""
+
+    def __init__(self, bot: 'Bot', matcher: 'Matcher'):
+        self.bot = bot
+        self.matcher = matcher
+        self.rng = random.Random(_SEED)
+        self.message_id = 0
+        self.inserted_artwork_rows = 0
+        self.failed_operations = 0
+
+    def make_event(self, user_id: int = _USER_ID, text: str = '/benchmark') -> 'GroupMessageEvent':
+        """生成合成的 OneBot V11 群消息事件"""
+        from nonebot.adapters.onebot.v11 import GroupMessageEvent, Message
+
+        self.message_id += 1
+        return GroupMessageEvent.model_validate({
+            'time': int(time.time()),
+            'self_id': int(_BOT_SELF_ID),
+            'post_type': 'message',
+            'sub_type': 'normal',
+            'user_id': user_id,
+            'message_type': 'group',
+            'message_id': self.message_id,
+            'group_id': _GROUP_ID,
+            'message': Message(text),
+            'original_message': Message(text),
+            'raw_message': text,
+            'font': 0,
+            'sender': {'user_id': user_id, 'nickname': f'user{user_id}', 'role': 'member'},
+            'to_me': False,
+        })
+
+
+async def _init_context() -> _BenchmarkContext:
+    """创建数据表, 写入合成 Bot 及会话对象, 并启用全局权限"""
+    import nonebot
+    from nonebot.adapters.onebot.v11 import Adapter, Bot
+
+    from src.database import BotSelfDAL, begin_db_session
+    from src.database.connector import engine
+    from src.database.internal.bot import BotType
+    from src.database.schema_base import OmegaDeclarativeBase
+    from src.service import OmegaMatcherInterface
+
+    async with engine.begin() as conn:
+        await conn.run_sync(OmegaDeclarativeBase.metadata.create_all)
+
+    async with begin_db_session() as session:
+        await BotSelfDAL(session=session).add(self_id=_BOT_SELF_ID, bot_type=BotType.onebot_v11.value, bot_status=1)
+
+    plugin = nonebot.get_plugin('sticker_maker')
+    if plugin is None or not plugin.matcher:
+        raise RuntimeError('sticker_maker plugin not loaded')
+    matcher = next(iter(plugin.matcher))()
+
+    bot = Bot(adapter=nonebot.get_adapter(Adapter), self_id=_BOT_SELF_ID)
+    context = _BenchmarkContext(bot=bot, matcher=matcher)
+    event = context.make_event()
+    for acquire_type in ('event', 'user'):
+        async with begin_db_session() as session:
+            entity = OmegaMatcherInterface.get_entity(bot=bot, event=event, session=session, acquire_type=acquire_type)
+            await entity.add_ignore_exists()
+            await entity.enable_global_permission()
+            await entity.set_permission_level(level=100)
+    return context
+
+
+async def _ignore_blocked(func: Callable[[], Awaitable[Any]]) -> None:
+    """processor 拦截事件时抛出的 IgnoredException 同样计入耗时"""
+    from nonebot.exception import IgnoredException
+
+    try:
+        await func()
+    except IgnoredException:
+        pass
+
+
+async def _setup_processor_rate_limiting(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    from src.service.omega_processor.universal.rate_limiting import preprocessor_rate_limiting
+
+    events = [context.make_event(user_id=_USER_ID + i) for i in range(1000)]
+    users = iter(events * 10)
+
+    async def _run() -> None:
+        await _ignore_blocked(lambda: preprocessor_rate_limiting(bot=context.bot, event=next(users)))
+
+    return _run, 500
+
+
+async def _setup_processor_permission(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    from src.service.omega_processor.universal.permission import (
+        preprocessor_global_permission,
+        preprocessor_plugin_permission,
+    )
+
+    event = context.make_event()
+
+    async def _run() -> None:
+        await _ignore_blocked(
+            lambda: preprocessor_global_permission(matcher=context.matcher, bot=context.bot, event=event)
+        )
+        await _ignore_blocked(
+            lambda: preprocessor_plugin_permission(matcher=context.matcher, bot=context.bot, event=event)
+        )
+
+    return _run, 100
+
+
+async def _setup_processor_cooldown(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    from src.service.omega_processor.universal.cooldown import (
+        preprocessor_global_cooldown,
+        preprocessor_plugin_cooldown,
+    )
+
+    event = context.make_event()
+
+    async def _run() -> None:
+        await _ignore_blocked(
+            lambda: preprocessor_global_cooldown(matcher=context.matcher, bot=context.bot, event=event)
+        )
+        await _ignore_blocked(
+            lambda: preprocessor_plugin_cooldown(matcher=context.matcher, bot=context.bot, event=event)
+        )
+
+    return _run, 100
+
+
+async def _setup_dal_history_add(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    from src.database import HistoryDAL, begin_db_session
+
+    async def _run() -> None:
+        context.message_id += 1
+        async with begin_db_session() as session:
+            await HistoryDAL(session=session).add(
+                message_id=str(context.message_id),
+                bot_self_id=_BOT_SELF_ID,
+                event_entity_id=str(_GROUP_ID),
+                user_entity_id=str(_USER_ID + context.message_id % 100),
+                received_time=int(time.time()),
+                message_type='OneBot V11',
+                message_raw='/benchmark',
+                message_text='/benchmark',
+            )
+
+    return _run, 200
+
+
+async def _setup_dal_history_query(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    from sqlalchemy import insert
+
+    from src.database import HistoryDAL, begin_db_session
+    from src.database.schema import HistoryOrm
+
+    now = int(time.time())
+    async with begin_db_session() as session:
+        await session.execute(insert(HistoryOrm), [
+            {
+                'message_id': f'query_{i}',
+                'bot_self_id': _BOT_SELF_ID,
+                'event_entity_id': str(_GROUP_ID + i % 10),
+                'user_entity_id': str(_USER_ID + i % 100),
+                'received_time': now - i,
+                'message_type': 'OneBot V11',
+                'message_raw': f'message {i}',
+                'message_text': f'message {i}',
+                'created_at': datetime.now(),
+            }
+            for i in range(10000)
+        ])
+
+    start_time = datetime.now() - timedelta(hours=1)
+
+    async def _run() -> None:
+        async with begin_db_session() as session:
+            await HistoryDAL(session=session).query_entity_records(
+                bot_self_id=_BOT_SELF_ID, event_entity_id=str(_GROUP_ID), start_time=start_time
+            )
+
+    return _run, 50
+
+
+async def _setup_dal_statistic_add(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    from src.database import StatisticDAL, begin_db_session
+
+    async def _run() -> None:
+        async with begin_db_session() as session:
+            await StatisticDAL(session=session).add(
+                module_name='src.plugins.sticker_maker',
+                plugin_name='sticker_maker',
+                bot_self_id=_BOT_SELF_ID,
+                parent_entity_id=str(_GROUP_ID),
+                entity_id=str(_USER_ID + context.rng.randrange(100)),
+                call_time=datetime.now(),
+            )
+
+    return _run, 200
+
+
+async def _setup_dal_statistic_count(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    from sqlalchemy import insert
+
+    from src.database import StatisticDAL, begin_db_session
+    from src.database.schema import StatisticOrm
+
+    now = datetime.now()
+    plugins = [f'plugin_{i}' for i in range(20)]
+    async with begin_db_session() as session:
+        await session.execute(insert(StatisticOrm), [
+            {
+                'module_name': f'src.plugins.{plugins[i % 20]}',
+                'plugin_name': plugins[i % 20],
+                'bot_self_id': _BOT_SELF_ID,
+                'parent_entity_id': str(_GROUP_ID + i % 10),
+                'entity_id': str(_USER_ID + i % 100),
+                'call_time': now - timedelta(minutes=i),
+                'created_at': now,
+            }
+            for i in range(20000)
+        ])
+
+    async def _run() -> None:
+        async with begin_db_session() as session:
+            await StatisticDAL(session=session).count_by_condition(
+                bot_self_id=_BOT_SELF_ID, parent_entity_id=str(_GROUP_ID), start_time=now - timedelta(days=7)
+            )
+
+    return _run, 20
+
+
+async def _setup_dal_concurrent_mixed(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    """模拟突发流量下历史记录, 统计写入与查询并发执行, 失败的操作 (如 database is locked) 计入 failed_operations"""
+    from src.database import HistoryDAL, StatisticDAL, begin_db_session
+
+    start_time = datetime.now() - timedelta(hours=1)
+
+    async def _write_history() -> None:
+        context.message_id += 1
+        async with begin_db_session() as session:
+            await HistoryDAL(session=session).add(
+                message_id=f'concurrent_{context.message_id}',
+                bot_self_id=_BOT_SELF_ID,
+                event_entity_id=str(_GROUP_ID),
+                user_entity_id=str(_USER_ID + context.message_id % 100),
+                received_time=int(time.time()),
+                message_type='OneBot V11',
+                message_raw='/benchmark',
+                message_text='/benchmark',
+            )
+
+    async def _write_statistic() -> None:
+        async with begin_db_session() as session:
+            await StatisticDAL(session=session).add(
+                module_name='src.plugins.sticker_maker',
+                plugin_name='sticker_maker',
+                bot_self_id=_BOT_SELF_ID,
+                parent_entity_id=str(_GROUP_ID),
+                entity_id=str(_USER_ID + context.rng.randrange(100)),
+                call_time=datetime.now(),
+            )
+
+    async def _read_statistic() -> None:
+        async with begin_db_session() as session:
+            await StatisticDAL(session=session).count_by_condition(
+                bot_self_id=_BOT_SELF_ID, entity_id=str(_USER_ID + context.rng.randrange(100)), start_time=start_time
+            )
+
+    async def _run() -> None:
+        tasks = [func() for _ in range(50) for func in (_write_history, _write_statistic, _read_statistic)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        context.failed_operations += sum(isinstance(x, Exception) for x in results)
+
+    return _run, 5
+
+
+async def _insert_artwork_rows(context: _BenchmarkContext, target_rows: int) -> None:
+    """补充写入合成作品数据至指定行数"""
+    from sqlalchemy import insert
+
+    from src.database import begin_db_session
+    from src.database.schema import ArtworkCollectionOrm
+
+    tag_pool = [f'tag{i}' for i in range(200)]
+    batch_size = 5000
+    while context.inserted_artwork_rows < target_rows:
+        start = context.inserted_artwork_rows
+        end = min(start + batch_size, target_rows)
+        async with begin_db_session() as session:
+            await session.execute(insert(ArtworkCollectionOrm), [
+                {
+                    'origin': ('pixiv', 'danbooru', 'gelbooru')[i % 3],
+                    'aid': str(i),
+                    'title': f'artwork {i}',
+                    'uid': str(i % 1000),
+                    'uname': f'artist {i % 1000}',
+                    'classification': context.rng.randint(0, 3),
+                    'rating': context.rng.randint(0, 3),
+                    'width': 1000 + i % 1000,
+                    'height': 1000 + i % 700,
+                    'tags': ','.join(context.rng.sample(tag_pool, k=8)),
+                    'source': f'https://example.com/artworks/{i}',
+                    'cover_page': f'https://example.com/artworks/{i}.jpg',
+                    'created_at': datetime.now(),
+                }
+                for i in range(start, end)
+            ])
+        context.inserted_artwork_rows = end
+
+
+def _make_artwork_query_setup(rows: int) -> CASE_SETUP:
+    async def _setup_dal_artwork_query(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+        from src.database import ArtworkCollectionDAL, begin_db_session
+
+        await _insert_artwork_rows(context=context, target_rows=rows)
+
+        async def _run() -> None:
+            async with begin_db_session() as session:
+                dal = ArtworkCollectionDAL(session=session)
+                await dal.query_by_condition(origin='pixiv', keywords=None, num=3)
+                await dal.query_by_condition(origin=None, keywords=['tag1', 'tag2'], num=3)
+
+        return _run, 20
+
+    return _setup_dal_artwork_query
+
+
+async def _setup_image_text(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    from src.utils.image_utils import ImageLoader
+
+    text = '\n'.join(f'Omega Miya benchmark 第 {i} 行测试文本, 包含中英文混排内容' for i in range(40))
+    return lambda: ImageLoader.init_from_text(text=text, image_width=512), 5
+
+
+def _make_image_effect_setup(effect: str) -> CASE_SETUP:
+    async def _setup_image_effect(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+        import numpy as np
+        from PIL import Image
+
+        from src.utils.image_utils import ImageEffectProcessor
+
+        rng = np.random.default_rng(seed=_SEED)
+        image = Image.fromarray(rng.integers(0, 256, size=(1080, 1920, 3), dtype=np.uint8)).convert('RGBA')
+
+        def _run() -> None:
+            processor = ImageEffectProcessor(image=image.copy())
+            match effect:
+                case 'blur':
+                    processor.gaussian_blur(radius=16)
+                case 'noise':
+                    processor.gaussian_noise(sigma=8, enable_random=False)
+                case 'resize':
+                    processor.resize_with_filling(size=(512, 512))
+
+        return _run, 5
+
+    return _setup_image_effect
+
+
+async def _setup_sticker_petpet(context: _BenchmarkContext) -> tuple[CASE_FUNC, int]:
+    import numpy as np
+    from PIL import Image
+
+    from src.plugins.sticker_maker.render import get_render
+    from src.resource import TemporaryResource
+
+    rng = np.random.default_rng(seed=_SEED)
+    input_file = TemporaryResource('omega_benchmark', 'petpet_input.png')
+    input_file.path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(rng.integers(0, 256, size=(512, 512, 3), dtype=np.uint8)).save(input_file.path, format='PNG')
+    render_t = get_render('petpet')
+
+    def _run() -> None:
+        output_file = render_t(external_image=input_file)._make()
+        output_file.path.unlink(missing_ok=True)
+
+    return _run, 3
+
+
+_ALL_CASES: dict[str, CASE_SETUP] = {
+    'processor.rate_limiting': _setup_processor_rate_limiting,
+    'processor.permission': _setup_processor_permission,
+    'processor.cooldown': _setup_processor_cooldown,
+    'dal.history_add': _setup_dal_history_add,
+    'dal.history_query': _setup_dal_history_query,
+    'dal.statistic_add': _setup_dal_statistic_add,
+    'dal.statistic_count': _setup_dal_statistic_count,
+    'dal.concurrent_mixed': _setup_dal_concurrent_mixed,
+    'dal.artwork_query': _make_artwork_query_setup(0),  # 行数由 --artwork-rows 指定
+    'image.text_render': _setup_image_text,
+    'image.effect_blur': _make_image_effect_setup('blur'),
+    'image.effect_noise': _make_image_effect_setup('noise'),
+    'image.effect_resize': _make_image_effect_setup('resize'),
+    'sticker.petpet_gif': _setup_sticker_petpet,
+}
+
+
+async def _timeit(func: CASE_FUNC, *, repeat: int, number: int) -> list[float]:
+    """运行 repeat 轮, 每轮调用 number 次, 返回每轮的单次平均耗时"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            result = func()
+            if inspect.isawaitable(result):
+                await result
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+async def _run_all(cases: Sequence[str], repeat: int, artwork_rows: Sequence[int]) -> list[dict[str, Any]]:
+    from nonebot.log import logger
+
+    from src.database.connector import engine
+    from src.resource import TemporaryResource
+
+    context = await _init_context()
+
+    expanded_cases: list[tuple[str, CASE_SETUP]] = []
+    for case in cases:
+        if case == 'dal.artwork_query':
+            expanded_cases.extend((f'{case}_{x}', _make_artwork_query_setup(x)) for x in sorted(artwork_rows))
+        else:
+            expanded_cases.append((case, _ALL_CASES[case]))
+
+    results = []
+    for case_name, setup in expanded_cases:
+        context.failed_operations = 0
+        try:
+            func, number = await setup(context)
+            await _timeit(func, repeat=1, number=1)  # 预热
+            timings = await _timeit(func, repeat=repeat, number=number)
+        except Exception as e:
+            logger.opt(exception=e).error(f'Omega benchmark case {case_name} failed, {e!r}')
+            results.append({'case': case_name, 'error': repr(e)})
+            continue
+        results.append({
+            'case': case_name,
+            'number': number,
+            'repeat': repeat,
+            'best_seconds': round(min(timings), 6),
+            'mean_seconds': round(sum(timings) / len(timings), 6),
+            **({'failed_operations': context.failed_operations} if context.failed_operations else {}),
+        })
+
+    await engine.dispose()
+    shutil.rmtree(TemporaryResource('omega_benchmark').path, ignore_errors=True)
+    return results
+
+
+def run_benchmark(
+        cases: Sequence[str] | None = None,
+        repeat: int = 5,
+        artwork_rows: Sequence[int] = (10000, 100000),
+        sqlite_performance_mode: bool = False,
+) -> list[dict[str, Any]]:
+    """在临时 SQLite 数据库中依次运行测试项"""
+    import nonebot
+
+    cases = list(_ALL_CASES.keys()) if cases is None else list(cases)
+    if unknown_cases := [x for x in cases if x not in _ALL_CASES]:
+        raise ValueError(f'unknown benchmark case(s): {", ".join(unknown_cases)}')
+
+    with tempfile.TemporaryDirectory(prefix='omega_benchmark_') as temp_dir:
+        nonebot.init(
+            log_level='WARNING',
+            superusers=set(),
+            database='sqlite',
+            db_driver='aiosqlite',
+            db_name=f'{temp_dir}/omega_benchmark',
+            db_prefix='omega_benchmark_',
+            db_sqlite_performance_mode=sqlite_performance_mode,
+            db_profiler_enable=False,
+            omega_metrics_enable=False,
+        )
+        from nonebot.adapters.onebot.v11 import Adapter
+
+        nonebot.get_driver().register_adapter(Adapter)
+        nonebot.load_plugins('src/service')
+        nonebot.load_plugin('src.plugins.sticker_maker')
+
+        return asyncio.run(_run_all(cases=cases, repeat=repeat, artwork_rows=artwork_rows))
+
+
+def compare_results(
+        results: Sequence[dict[str, Any]],
+        baseline: Sequence[dict[str, Any]],
+        threshold: float = 0.1,
+) -> list[dict[str, Any]]:
+    """按平均耗时与基线结果对比, 比值超出 (1 ± threshold) 分别视为回退及提升"""
+    baseline_results = {x['case']: x for x in baseline if 'mean_seconds' in x}
+
+    comparison = []
+    for result in results:
+        base = baseline_results.get(result['case'])
+        if base is None or 'mean_seconds' not in result or not base['mean_seconds']:
+            comparison.append({'case': result['case'], 'ratio': None, 'status': 'missing'})
+            continue
+
+        ratio = result['mean_seconds'] / base['mean_seconds']
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'unchanged'
+        comparison.append({
+            'case': result['case'],
+            'baseline_mean_seconds': base['mean_seconds'],
+            'mean_seconds': result['mean_seconds'],
+            'ratio': round(ratio, 3),
+            'status': status,
+        })
+    return comparison
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Omega 离线基准测试')
+    parser.add_argument('--cases', type=str, default=None, help='仅运行指定测试项, 以逗号分隔')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--artwork-rows', type=str, default='10000,100000', help='作品查询测试的数据行数, 以逗号分隔'
+    )
+    parser.add_argument(
+        '--sqlite-performance-mode', action='store_true', help='启用 SQLite 高并发模式 (WAL 及读写分离)'
+    )
+    parser.add_argument('--output', type=str, default=None, help='将测试结果保存为 JSON 文件')
+    parser.add_argument('--baseline', type=str, default=None, help='与已保存的测试结果 JSON 文件对比')
+    parser.add_argument('--threshold', type=float, default=0.1, help='判定性能回退的平均耗时增幅')
+    parser.add_argument('--list', action='store_true', help='列出全部测试项')
+    args = parser.parse_args()
+
+    if args.list:
+        sys.stdout.write('\n'.join(_ALL_CASES.keys()) + '\n')
+        return
+
+    results = run_benchmark(
+        cases=args.cases.split(',') if args.cases else None,
+        repeat=args.repeat,
+        artwork_rows=[int(x) for x in args.artwork_rows.split(',') if x],
+        sqlite_performance_mode=args.sqlite_performance_mode,
+    )
+    from nonebot.log import logger
+
+    table = [f'{"case":<28}{"number":>8}{"best(ms)":>12}{"mean(ms)":>12}{"failed":>8}']
+    table.extend(
+        f'{x["case"]:<28}{x["number"]:>8}{x["best_seconds"] * 1000:>12.3f}{x["mean_seconds"] * 1000:>12.3f}'
+        f'{x.get("failed_operations", 0):>8}'
+        if 'error' not in x else f'{x["case"]:<28}{"error":>8}  {x["error"]}'
+        for x in results
+    )
+    logger.warning('Omega benchmark results:\n' + '\n'.join(table))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare_results(results=results, baseline=baseline, threshold=args.threshold)
+
+        table = [f'{"case":<28}{"baseline(ms)":>14}{"mean(ms)":>12}{"ratio":>8}  status']
+        table.extend(
+            f'{x["case"]:<28}{x["baseline_mean_seconds"] * 1000:>14.3f}{x["mean_seconds"] * 1000:>12.3f}'
+            f'{x["ratio"]:>8}  {x["status"]}'
+            if x['ratio'] is not None else f'{x["case"]:<28}{"":>34}  {x["status"]}'
+            for x in comparison
+        )
+        logger.warning(f'Omega benchmark comparison (threshold {args.threshold:.0%}):\n' + '\n'.join(table))
+
+        if any(x['status'] == 'regression' for x in comparison):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
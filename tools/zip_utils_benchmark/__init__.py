@@ -0,0 +1,15 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/8 17:20:06
+@FileName       : zip_utils_benchmark
+@Project        : ailitonia-toolkit
+@Description    : 压缩文件两阶段打包与流式打包耗时对比
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+from .benchmark import run_benchmark
+
+__all__ = [
+    'run_benchmark',
+]
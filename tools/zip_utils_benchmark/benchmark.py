@@ -0,0 +1,138 @@
+"""
+@Author         : Ailitonia
+@Date           : 2025/3/8 17:21:39
+@FileName       : benchmark
+@Project        : ailitonia-toolkit
+@Description    : 压缩文件两阶段打包与流式打包耗时对比, 统计模拟下载并打包图集的总耗时
+
+使用方法: python -m tools.zip_utils_benchmark.benchmark --pages 200 --page-size 400 --latency 0.2
+
+以随机内容文件模拟已压缩的图片, 以随机延迟模拟下载, 分别测试:
+  - two_phase: 全部下载完成后调用 ZipUtils.create_7z 一次性打包
+  - streaming: 每个文件下载完成后立即加入 StreamingArchiveWriter (默认压缩)
+  - streaming_store: 同上, 但仅存储不压缩
+@GitHub         : https://github.com/Ailitonia
+@Software       : PyCharm
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import time
+from typing import Any, Literal
+
+type CASE = Literal['two_phase', 'streaming', 'streaming_store']
+
+_ALL_CASES: list[CASE] = ['two_phase', 'streaming', 'streaming_store']
+
+
+async def _run_case(case: CASE, pages: int, page_size: int, latency: float, concurrency: int) -> dict[str, Any]:
+    from src.resource import TemporaryResource
+    from src.utils import semaphore_gather
+    from src.utils.zip_utils import ZipUtils
+
+    work_folder = TemporaryResource('zip_utils_benchmark', case)
+    if work_folder.path.exists():
+        shutil.rmtree(work_folder.path)
+    work_folder.path.mkdir(parents=True)
+
+    rng = random.Random(20250308)
+    password = 'benchmark'
+    zip_file = ZipUtils(file_name=f'{case}.7z', folder=work_folder)
+
+    async def _download(index: int) -> TemporaryResource:
+        await asyncio.sleep(rng.uniform(latency * 0.5, latency * 1.5))
+        file = work_folder(f'{index:04d}.jpg')
+        async with file.async_open('wb') as af:
+            await af.write(os.urandom(page_size * 1024))
+        return file
+
+    start_time = time.perf_counter()
+    if case == 'two_phase':
+        files = await semaphore_gather(
+            tasks=[_download(index) for index in range(pages)], semaphore_num=concurrency, return_exceptions=False
+        )
+        download_time = time.perf_counter() - start_time
+        archive = await zip_file.create_7z(files=files, password=password)
+    else:
+        async with zip_file.create_stream_writer(password=password, store_only=case == 'streaming_store') as writer:
+
+            async def _download_and_pack(index: int) -> None:
+                writer.add(await _download(index))
+
+            await semaphore_gather(
+                tasks=[_download_and_pack(index) for index in range(pages)],
+                semaphore_num=concurrency,
+                return_exceptions=False,
+            )
+            download_time = time.perf_counter() - start_time
+        archive = writer.file
+    total_time = time.perf_counter() - start_time
+
+    result = {
+        'case': case,
+        'pages': pages,
+        'page_size_kb': page_size,
+        'download_seconds': round(download_time, 3),
+        'total_seconds': round(total_time, 3),
+        'pack_tail_seconds': round(total_time - download_time, 3),
+        'archive_size_mb': round(archive.path.stat().st_size / 1024 / 1024, 2),
+    }
+    shutil.rmtree(work_folder.path)
+    return result
+
+
+def run_benchmark(
+        pages: int = 200,
+        page_size: int = 400,
+        latency: float = 0.2,
+        concurrency: int = 10,
+) -> list[dict[str, Any]]:
+    """依次运行全部测试项"""
+    import nonebot
+
+    nonebot.init()
+    nonebot.load_plugins('src/service')
+
+    async def _run_all() -> list[dict[str, Any]]:
+        return [
+            await _run_case(case, pages=pages, page_size=page_size, latency=latency, concurrency=concurrency)
+            for case in _ALL_CASES
+        ]
+
+    return asyncio.run(_run_all())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='压缩文件两阶段打包与流式打包耗时对比')
+    parser.add_argument('--pages', type=int, default=200, help='模拟下载的文件数量')
+    parser.add_argument('--page-size', type=int, default=400, help='每个文件的大小, 单位 KB')
+    parser.add_argument('--latency', type=float, default=0.2, help='模拟单个文件下载的平均耗时, 单位秒')
+    parser.add_argument('--concurrency', type=int, default=10, help='模拟下载的并发数量')
+    parser.add_argument('--output', type=str, default=None, help='将测试结果保存为 JSON 文件')
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        pages=args.pages, page_size=args.page_size, latency=args.latency, concurrency=args.concurrency
+    )
+
+    from nonebot.log import logger
+
+    table = [f'{"case":<18}{"download(s)":>13}{"total(s)":>10}{"tail(s)":>10}{"size(MB)":>10}']
+    table.extend(
+        f'{x["case"]:<18}{x["download_seconds"]:>13}{x["total_seconds"]:>10}'
+        f'{x["pack_tail_seconds"]:>10}{x["archive_size_mb"]:>10}'
+        for x in results
+    )
+    logger.info('ZipUtils benchmark results:\n' + '\n'.join(table))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()